@@ -0,0 +1,162 @@
+"""A benchmark of the in-memory statistics engine against the SQL aggregations.
+
+Computes every statistic over a synthetic snapshot of lendings, inline and
+in a process pool. With `--sql`, the snapshot is loaded from the configured
+database instead and the SQL queries of the statistics repository are
+timed on the same data.
+
+Usage (from the `libraryapi` directory):
+    python -m benchmarks.analytics --lends 5000000
+    python -m benchmarks.analytics --sql
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable
+
+import numpy as np
+
+from src.infrastructure.utils import analytics
+from src.infrastructure.utils.analytics import CategoryIndex, LendingSnapshot
+
+
+def build_snapshot(lends_count: int, books_count: int) -> tuple[LendingSnapshot, CategoryIndex]:
+    """Generate lendings of Zipf-distributed books over ten years.
+
+    Args:
+        lends_count (int): The number of lendings.
+        books_count (int): The number of books.
+
+    Returns:
+        tuple[LendingSnapshot, CategoryIndex]: The snapshot and the categories.
+    """
+    rng = np.random.default_rng(42)
+    book_ids = np.minimum(rng.zipf(1.3, lends_count), books_count)
+    users = rng.integers(0, lends_count // 20 + 1, lends_count)
+    borrowed = rng.integers(
+        analytics.to_day(np.datetime64("2015-01-01").item()),
+        analytics.to_day(np.datetime64("2025-01-01").item()),
+        lends_count,
+    )
+
+    snapshot = LendingSnapshot()
+    snapshot.bulk_load(
+        {
+            "id": lend_id,
+            "book_id": book_id,
+            "user_id": user_id,
+            "borrowed_date": day.item(),
+            "returned_date": None,
+        }
+        for lend_id, (book_id, user_id, day) in enumerate(
+            zip(book_ids.tolist(), users.tolist(), borrowed.astype("datetime64[D]")),
+            start=1,
+        )
+    )
+
+    categories = CategoryIndex()
+    categories.bulk_load(
+        {"id": book_id, "categories": f"category {book_id % 40}"}
+        for book_id in range(1, books_count + 1)
+    )
+    return snapshot, categories
+
+
+def statistics(categories: CategoryIndex) -> dict[str, tuple[Callable[..., Any], tuple[str, ...], tuple]]:
+    """The computed statistics, their columns and extra arguments, keyed by name."""
+    return {
+        "top_10_borrowed_books": (analytics.top_books, ("book_id",), (10,)),
+        "monthly_borrowed_books": (analytics.monthly_counts, ("borrowed_date",), ()),
+        "year_summary": (analytics.year_summary, ("book_id", "borrowed_date"), (2020,)),
+        "category_monthly_averages": (
+            analytics.category_monthly_averages,
+            ("book_id", "borrowed_date"),
+            (categories.codes,),
+        ),
+    }
+
+
+async def measure(call: Callable[[], Awaitable[Any]], repeats: int) -> float:
+    """Measure the best time of repeated calls in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await call()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def run_engine(snapshot: LendingSnapshot, categories: CategoryIndex, repeats: int, workers: int) -> None:
+    """Time every statistic inline and in a process pool."""
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, (function, columns, args) in statistics(categories).items():
+            async def inline() -> Any:
+                return function(snapshot.frame(columns), *args)
+
+            async def pooled() -> Any:
+                return await loop.run_in_executor(pool, function, snapshot.frame(columns, copy=True), *args)
+
+            await pooled()
+            print(
+                f"{name:28} inline {await measure(inline, repeats):9.1f}ms"
+                f"  pool {await measure(pooled, repeats):9.1f}ms"
+            )
+
+
+async def run_sql(repeats: int, workers: int) -> None:
+    """Time the SQL aggregations and the engine over the configured database."""
+    # pylint: disable=import-outside-toplevel
+    from src.db import database
+    from src.infrastructure.repositories.statisticsdb import StatisticsRepository
+
+    await database.connect()
+    try:
+        repository = StatisticsRepository()
+        snapshot, categories = LendingSnapshot(), CategoryIndex()
+
+        started = time.perf_counter()
+        snapshot.bulk_load([dict(row) async for row in repository.iterate_lend_rows()])
+        categories.bulk_load([dict(row) async for row in repository.iterate_category_rows()])
+        print(f"snapshot load: {time.perf_counter() - started:.2f}s for {len(snapshot):,} lendings")
+
+        queries = {
+            "top_10_borrowed_books": repository.get_top_borrowed_books,
+            "monthly_borrowed_books": repository.get_monthly_borrowed_books,
+            "year_summary": lambda: repository.get_year_summary(2020),
+            "category_monthly_averages": repository.get_average_borrowed_per_category_monthly,
+        }
+        for name, query in queries.items():
+            try:
+                print(f"{name:28} sql    {await measure(query, repeats):9.1f}ms")
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"{name:28} sql    failed: {e}")
+
+        await run_engine(snapshot, categories, repeats, workers)
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lends", type=int, default=5_000_000)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--sql", action="store_true", help="compare with the configured database")
+    args = parser.parse_args()
+
+    if args.sql:
+        asyncio.run(run_sql(args.repeats, args.workers))
+        return
+
+    started = time.perf_counter()
+    snapshot, categories = build_snapshot(args.lends, args.books)
+    print(f"snapshot load: {time.perf_counter() - started:.2f}s for {len(snapshot):,} lendings")
+    asyncio.run(run_engine(snapshot, categories, args.repeats, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""A benchmark of bytes-on-wire and CPU cost of response compression.
+
+The payloads mimic `/book/all`, `/lend/all` and `/lend/user/{user_id}/lends`
+with the real DTOs. Every available codec is measured at several levels,
+both for single-message bodies and for streamed bodies flushed in chunks.
+
+Usage (from the `libraryapi` directory):
+    python -m benchmarks.compression --books 5000 --lends 50000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+
+from src.api.utils.compression import available_codecs
+from src.core.domain.lend import LendTransaction
+from src.infrastructure.dto.bookdto import BookDTO
+from src.infrastructure.dto.lenddto import UserLendHistoryResponseDTO
+from src.infrastructure.dto.publisherdto import PublisherDTO
+from src.infrastructure.dto.userdto import UserDTO
+
+LEVELS = {
+    "gzip": (1, 6, 9),
+    "br": (1, 4, 6, 9),
+    "zstd": (1, 3, 9, 19),
+}
+STREAM_CHUNK_SIZE = 64 * 1024
+REPEATS = 3
+
+
+def _encode(content: object) -> bytes:
+    """Serialize content the way `JSONResponse` does."""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def build_payloads(books_count: int, lends_count: int) -> dict[str, bytes]:
+    """Build representative response bodies.
+
+    Args:
+        books_count (int): The number of books in the catalog.
+        lends_count (int): The number of lend transactions.
+
+    Returns:
+        dict[str, bytes]: The encoded bodies keyed by endpoint.
+    """
+    rng = random.Random(42)
+    genres = ["Adventure", "Drama", "Fantasy", "Sci-Fi", "History", "Thriller"]
+    publishers = [
+        PublisherDTO(id=i, company_name=f"publisher{i}", contact_email=f"publisher{i}@gmail.com")
+        for i in range(1, 21)
+    ]
+    books = [
+        BookDTO(
+            id=i,
+            title=f"Book title number {i}",
+            author=f"Author {rng.randint(1, books_count // 5 + 1)}",
+            epoch=rng.choice(["Modern", "Contemporary", "Medieval", "Future"]),
+            genre=rng.choice(genres),
+            kind=rng.choice(["Novel", "Play", "Poetry"]),
+            publication_year=str(rng.randint(1950, 2024)),
+            language=rng.choice(["English", "Polish", "German"]),
+            borrowed_count=rng.randint(0, 500),
+            publisher=rng.choice(publishers),
+            quantity=rng.randint(0, 20),
+        )
+        for i in range(1, books_count + 1)
+    ]
+    users = [uuid4() for _ in range(max(lends_count // 20, 1))]
+    lends = [
+        LendTransaction(
+            id=i,
+            book_id=rng.randint(1, books_count),
+            user_id=rng.choice(users),
+            borrowed_date=date(2020, 1, 1) + timedelta(days=rng.randint(0, 1500)),
+            status="returned",
+            returned_date=date(2024, 1, 1),
+        )
+        for i in range(1, lends_count + 1)
+    ]
+    history = UserLendHistoryResponseDTO(
+        user=UserDTO(id=uuid4(), name="user1", email="user1@gmail.com", phone="111111111"),
+        history=books[:500],
+    )
+
+    return {
+        "/book/all": _encode(books),
+        "/lend/all": _encode(lends),
+        "/lend/user/{user_id}/lends": _encode(history),
+    }
+
+
+def measure(codec: type, level: int, body: bytes, streamed: bool) -> tuple[int, float]:
+    """Compress a body and report the output size and the best CPU time.
+
+    Args:
+        codec (type): The compressor class.
+        level (int): The compression level.
+        body (bytes): The uncompressed body.
+        streamed (bool): Whether to compress in flushed chunks.
+
+    Returns:
+        tuple[int, float]: The compressed size in bytes and the time in seconds.
+    """
+    best = float("inf")
+    size = 0
+    for _ in range(REPEATS):
+        started = time.process_time()
+        compressor = codec(level)
+        if streamed:
+            chunks = [body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE)]
+            output = b"".join(compressor.compress(chunk) for chunk in chunks[:-1])
+            output += compressor.finish(chunks[-1])
+        else:
+            output = compressor.finish(body)
+        best = min(best, time.process_time() - started)
+        size = len(output)
+
+    return size, best
+
+
+def main() -> None:
+    """Run the benchmark and print a table per endpoint."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--lends", type=int, default=50000)
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    missing = sorted(set(LEVELS) - set(codecs))
+    if missing:
+        print(f"Skipping unavailable codecs: {', '.join(missing)}")
+
+    for endpoint, body in build_payloads(args.books, args.lends).items():
+        print(f"\n{endpoint}: {len(body):,} bytes uncompressed")
+        print(f"{'codec':<6}{'level':>6}{'mode':>8}{'bytes':>12}{'ratio':>8}{'cpu ms':>9}{'MB/s':>9}")
+        for coding, codec in codecs.items():
+            for level in LEVELS[coding]:
+                for streamed in (False, True):
+                    size, seconds = measure(codec, level, body, streamed)
+                    throughput = len(body) / seconds / 1e6 if seconds else float("inf")
+                    print(
+                        f"{coding:<6}{level:>6}{'stream' if streamed else 'whole':>8}"
+                        f"{size:>12,}{len(body) / size:>8.1f}{seconds * 1000:>9.1f}{throughput:>9.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""A report of the import time of the app, checked against a cold start budget.
+
+Imports `src.main` in fresh interpreters with `-X importtime`, then reports
+the median total and the modules taking the most time, by cumulative and
+by own time. Exits with status 1 when the median exceeds the budget, so the
+report can guard cold starts in CI.
+
+Usage (from the `libraryapi` directory):
+    python -m benchmarks.importtime --runs 5 --budget-ms 2000
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def import_times(module: str) -> list[tuple[str, int, int, int]]:
+    """Import a module in a fresh interpreter and parse its `-X importtime` report.
+
+    Args:
+        module (str): The imported module.
+
+    Returns:
+        list[tuple[str, int, int, int]]: The name, nesting depth, own and
+            cumulative microseconds of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(own), int(cumulative)))
+
+    return entries
+
+
+def main() -> None:
+    """Run the report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # The first import compiles the bytecode, which is not part of a cold start.
+    import_times(args.module)
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [sum(cumulative for _, depth, _, cumulative in run if depth == 0) / 1000 for run in runs]
+
+    own = defaultdict(list)
+    cumulative = defaultdict(list)
+    for run in runs:
+        for name, _, own_us, cumulative_us in run:
+            own[name].append(own_us / 1000)
+            cumulative[name].append(cumulative_us / 1000)
+
+    for title, times in (("cumulative", cumulative), ("own", own)):
+        print(f"slowest modules by {title} time (median ms):")
+        medians = sorted(((statistics.median(samples), name) for name, samples in times.items()), reverse=True)
+        for median, name in medians[:args.top]:
+            print(f"  {median:8.1f}  {name}")
+
+    total = statistics.median(totals)
+    print(f"import {args.module}: median {total:.0f}ms over {args.runs} runs, budget {args.budget_ms:.0f}ms")
+    if total > args.budget_ms:
+        print("over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""A benchmark of the throughput of the production server by number of workers.
+
+Starts `python -m src.serve` with 1, 2, 4, ... workers and loads
+`/book/{id}` from client processes holding keep-alive connections, then
+reports requests per second, latency percentiles and the speedup over one
+worker. The server needs the database, e.g. `docker compose up db`, and the
+clients share the CPUs of the server when both run on one machine.
+
+Usage (from the `libraryapi` directory):
+    python -m benchmarks.serve --max-workers 8 --book-id 1
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from src.serve import usable_cpus
+
+
+async def load_connection(host: str, port: int, request: bytes, deadline: float, latencies: list[float]) -> int:
+    """Send requests one after another over one keep-alive connection until the deadline.
+
+    Args:
+        host (str): The server host.
+        port (int): The server port.
+        request (bytes): The raw HTTP request.
+        deadline (float): The `perf_counter` time to stop at.
+        latencies (list[float]): Collects the latency of every response.
+
+    Returns:
+        int: The number of non-2xx responses.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    while (started := time.perf_counter()) < deadline:
+        writer.write(request)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(
+            int(line.split(b":", 1)[1])
+            for line in head.split(b"\r\n")
+            if line.lower().startswith(b"content-length:")
+        )
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - started)
+        if not head.startswith(b"HTTP/1.1 2"):
+            errors += 1
+
+    writer.close()
+    return errors
+
+
+def load_process(host: str, port: int, path: str, connections: int, duration: float, results) -> None:
+    """Load the server from one client process.
+
+    Args:
+        host (str): The server host.
+        port (int): The server port.
+        path (str): The requested path.
+        connections (int): The number of concurrent connections.
+        duration (float): The seconds of load.
+        results (multiprocessing.Queue): Receives the latencies and the number of errors.
+    """
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+
+    async def run() -> tuple[list[float], int]:
+        latencies: list[float] = []
+        deadline = time.perf_counter() + duration
+        errors = await asyncio.gather(*(
+            load_connection(host, port, request, deadline, latencies)
+            for _ in range(connections)
+        ))
+        return latencies, sum(errors)
+
+    results.put(asyncio.run(run()))
+
+
+def wait_until_ready(host: str, port: int, timeout: float) -> None:
+    """Wait until the server accepts connections and answers.
+
+    Args:
+        host (str): The server host.
+        port (int): The server port.
+        timeout (float): The seconds to wait.
+
+    Raises:
+        TimeoutError: If the server is not ready in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1) as connection:
+                connection.sendall(f"GET /docs HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+                if connection.recv(12).startswith(b"HTTP/1.1"):
+                    return
+        except OSError:
+            time.sleep(0.2)
+
+    raise TimeoutError("The server did not start")
+
+
+def measure(args: argparse.Namespace, workers: int) -> tuple[float, np.ndarray, int]:
+    """Run the server with a number of workers and load it.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        workers (int): The number of workers.
+
+    Returns:
+        tuple[float, np.ndarray, int]: The requests per second, the latencies and the number of errors.
+    """
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.serve", "--host", args.host, "--port", str(args.port), "--workers", str(workers)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(args.host, args.port, timeout=60)
+        # Warms up the caches and connection pools of every worker.
+        measure_load(args, duration=2)
+        return measure_load(args, duration=args.duration)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def measure_load(args: argparse.Namespace, duration: float) -> tuple[float, np.ndarray, int]:
+    """Load the running server from the client processes.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        duration (float): The seconds of load.
+
+    Returns:
+        tuple[float, np.ndarray, int]: The requests per second, the latencies and the number of errors.
+    """
+    results = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(
+            target=load_process,
+            args=(args.host, args.port, f"/book/{args.book_id}", args.connections, duration, results),
+        )
+        for _ in range(args.clients)
+    ]
+    for client in clients:
+        client.start()
+    outcomes = [results.get() for _ in clients]
+    for client in clients:
+        client.join()
+
+    latencies = np.concatenate([np.array(latencies) for latencies, _ in outcomes])
+    return len(latencies) / duration, latencies, sum(errors for _, errors in outcomes)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--book-id", type=int, default=1)
+    parser.add_argument("--max-workers", type=int, default=usable_cpus())
+    parser.add_argument("--clients", type=int, default=max(1, usable_cpus() // 2))
+    parser.add_argument("--connections", type=int, default=64, help="per client process")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes x {args.connections} connections")
+    baseline = None
+    for workers in counts:
+        rate, latencies, errors = measure(args, workers)
+        baseline = baseline or rate
+        p50, p99 = np.percentile(latencies * 1e3, [50, 99])
+        print(
+            f"{workers:3d} workers: {rate:10,.0f} req/s  x{rate / baseline:5.2f}"
+            f"  p50 {p50:7.2f}ms  p99 {p99:7.2f}ms  errors {errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
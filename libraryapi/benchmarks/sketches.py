@@ -0,0 +1,107 @@
+"""A benchmark of the accuracy and size of the sketches of approximate statistics.
+
+Counts synthetic lendings of Zipf-distributed books in a sketch store and
+compares the estimates with exact counts: the relative error of distinct
+borrowers over all months of every book with enough borrowers, the recall
+of the top-10 books and the error of their counts, and the size of the
+serialized sketches.
+
+Usage (from the `libraryapi` directory):
+    python -m benchmarks.sketches --lends 1000000
+"""
+import argparse
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from src.infrastructure.utils.sketches import ALL_TIME, BORROWERS, HyperLogLog, SketchStore, TopK
+
+TOP_COUNT = 10
+
+
+def generate(lends_count: int, books_count: int, users_count: int) -> list[dict]:
+    """Generate lendings of Zipf-distributed books over two years.
+
+    Args:
+        lends_count (int): The number of lendings.
+        books_count (int): The number of books.
+        users_count (int): The number of patrons.
+
+    Returns:
+        list[dict]: The lendings with a `book_id`, `user_id` and `borrowed_date`.
+    """
+    rng = np.random.default_rng(42)
+    book_ids = np.minimum(rng.zipf(1.3, lends_count), books_count)
+    users = rng.integers(0, users_count, lends_count)
+    days = rng.integers(0, 730, lends_count).astype("timedelta64[D]") + np.datetime64("2023-01-01")
+
+    return [
+        {"book_id": book_id, "user_id": f"user-{user}", "borrowed_date": str(day)}
+        for book_id, user, day in zip(book_ids.tolist(), users.tolist(), days)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lends", type=int, default=1_000_000)
+    parser.add_argument("--books", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--precision", type=int, default=11)
+    parser.add_argument("--width", type=int, default=2048)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--min-borrowers", type=int, default=100)
+    args = parser.parse_args()
+
+    lends = generate(args.lends, args.books, args.users)
+    store = SketchStore(args.precision, args.width, args.depth, args.k)
+
+    started = time.perf_counter()
+    store.add_borrows(lends)
+    print(f"build: {time.perf_counter() - started:.2f}s for {len(lends):,} lendings")
+
+    started = time.perf_counter()
+    rows = store.take_dirty()
+    sizes = Counter()
+    for row in rows:
+        sizes[row["kind"]] += len(row["data"])
+    print(f"serialize: {time.perf_counter() - started:.2f}s for {len(rows):,} sketches")
+    for kind, size in sizes.items():
+        print(f"  {kind:10} {size / 1024:10.1f} KiB")
+
+    borrowers = defaultdict(set)
+    for lend in lends:
+        borrowers[lend["book_id"]].add(lend["user_id"])
+
+    merged: dict[int, HyperLogLog] = {}
+    for row in rows:
+        if row["kind"] == BORROWERS and len(borrowers[row["book_id"]]) >= args.min_borrowers:
+            sketch = HyperLogLog.from_bytes(row["data"])
+            if row["book_id"] in merged:
+                merged[row["book_id"]].merge(sketch)
+            else:
+                merged[row["book_id"]] = sketch
+
+    errors = np.array([
+        abs(sketch.count() - len(borrowers[book_id])) / len(borrowers[book_id])
+        for book_id, sketch in merged.items()
+    ])
+    print(
+        f"distinct borrowers of {len(errors):,} books: relative error"
+        f" mean {errors.mean():.2%}, p99 {np.quantile(errors, 0.99):.2%}, max {errors.max():.2%}"
+    )
+
+    exact = dict(Counter(lend["book_id"] for lend in lends).most_common(TOP_COUNT))
+    top = next(
+        TopK.from_bytes(row["data"]).top(TOP_COUNT)
+        for row in rows if row["period"] == ALL_TIME
+    )
+    recall = len(exact.keys() & {book_id for book_id, _ in top}) / TOP_COUNT
+    overcount = max((count - exact[book_id]) / exact[book_id] for book_id, count in top if book_id in exact)
+    print(f"top {TOP_COUNT} books: recall {recall:.0%}, max overcount {overcount:.2%}")
+
+
+if __name__ == "__main__":
+    main()
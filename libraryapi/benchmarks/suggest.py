@@ -0,0 +1,110 @@
+"""A benchmark of the prefix autocomplete index.
+
+Builds the index over synthetic titles and authors and reports build time,
+resident memory, lookup latency per prefix length and the cost of updates.
+
+Usage (from the `libraryapi` directory):
+    python -m benchmarks.suggest --books 1000000
+"""
+import argparse
+import random
+import resource
+import string
+import time
+
+import numpy as np
+
+from src.infrastructure.utils.prefix import PrefixIndex
+
+WORDS = [
+    "".join(random.Random(seed).choices(string.ascii_lowercase, k=random.Random(seed).randint(3, 9)))
+    for seed in range(5000)
+]
+
+
+def build_rows(books_count: int) -> list[dict]:
+    """Generate rows ordered like `iterate_index_rows`, most borrowed first.
+
+    Args:
+        books_count (int): The number of books.
+
+    Returns:
+        list[dict]: The rows.
+    """
+    rng = random.Random(42)
+    rows = [
+        {
+            "id": book_id,
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(1, 5))).title(),
+            "author": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            "borrowed_count": int(rng.paretovariate(1.2)),
+        }
+        for book_id in range(1, books_count + 1)
+    ]
+    rows.sort(key=lambda row: -row["borrowed_count"])
+    return rows
+
+
+def max_rss_mb() -> float:
+    """The peak resident memory of the process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(samples: list[float]) -> str:
+    """Format the latency percentiles of samples in microseconds."""
+    p50, p99, p999 = np.percentile(np.array(samples) * 1e6, [50, 99, 99.9])
+    return f"p50 {p50:8.1f}us  p99 {p99:8.1f}us  p99.9 {p999:8.1f}us"
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = build_rows(args.books)
+    rss_before = max_rss_mb()
+
+    index = PrefixIndex(max_items=args.books)
+    started = time.perf_counter()
+    index.bulk_load(rows)
+    print(f"build: {time.perf_counter() - started:.2f}s for {len(index):,} books")
+    print(f"peak RSS growth: {max_rss_mb() - rss_before:,.0f} MB")
+
+    rng = random.Random(7)
+    for length in (1, 2, 3, 4, 6):
+        prefixes = [
+            rng.choice(rows)[rng.choice(("title", "author"))][:length]
+            for _ in range(args.lookups)
+        ]
+        samples = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.suggest(prefix, args.limit)
+            samples.append(time.perf_counter() - started)
+        print(f"suggest, prefix length {length}: {percentiles(samples)}")
+
+    updates = {"set_score": [], "upsert (new title)": [], "remove": []}
+    for _ in range(1000):
+        row = rng.choice(rows)
+        started = time.perf_counter()
+        index.set_score(row["id"], row["borrowed_count"] + 1)
+        updates["set_score"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index.upsert(row["id"], {**row, "title": row["title"] + " II"})
+        updates["upsert (new title)"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index.remove(row["id"])
+        updates["remove"].append(time.perf_counter() - started)
+        index.upsert(row["id"], row)
+
+    for name, samples in updates.items():
+        print(f"{name}: {percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,75 @@
 """A module containing book endpoints."""
-from typing import Iterable, Any
+import asyncio
+from typing import AsyncIterator, Iterable, Any, Optional
 
 from dependency_injector.wiring import inject, Provide
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
 
+from src.api.utils.conditional import BOOK_ENTITIES, CATALOG_CACHE_CONTROL, conditional_response, make_etag
+from src.api.utils.fields import projected_response, sparse_fields
+from src.api.utils.transactions import transactional
+from src.config import config
 from src.infrastructure.utils import consts
 from src.container import Container
 from src.core.domain.book import Book, BookIn, BookPublisherId
-from src.infrastructure.dto.bookdto import BookDTO, BookAvailabilityDTO
+from src.infrastructure.dto.bookdto import (
+    BookDTO,
+    BookAvailabilityDTO,
+    BookBrowseDTO,
+    BookRecommendationDTO,
+    BookSuggestionDTO,
+)
+from src.infrastructure.utils.broadcaster import Broadcaster
+from src.infrastructure.utils.idempotency import IdempotencyStore
 
 from src.infrastructure.services.ibook import IBookService
+from src.infrastructure.services.ichange import IChangeService
 from src.infrastructure.services.ipublisher import IPublisherService
+from src.infrastructure.services.irecommendation import IRecommendationService
 from src.infrastructure.services.iuser import IUserService
 
 bearer_scheme = HTTPBearer()
 
 router = APIRouter()
 
-@router.post("/create", tags=["Book"], response_model=Book, status_code=201)
+@router.post(
+    "/create",
+    tags=["Book"],
+    response_model=Book,
+    status_code=201,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def create_book(
         book: BookIn,
         service: IBookService = Depends(Provide[Container.book_service]),
         publisher_service: IPublisherService = Depends(Provide[Container.publisher_service]),
+        idempotency_store: IdempotencyStore = Depends(Provide[Container.idempotency_store]),
+        idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
         credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ) -> dict:
     """An endpoint for adding a new book.
 
+    Retries sent with the same `Idempotency-Key` header replay the first
+    response instead of inserting the book again.
+
     Args:
         book (BookIn): The book data.
         service (IBookService, optional): The injected service dependency.
         publisher_service (IPublisherService, optional): The injected publisher_service dependency.
+        idempotency_store (IdempotencyStore, optional): The injected idempotency store.
+        idempotency_key (Optional[str], optional): The client-generated idempotency key.
         credentials (HTTPAuthorizationCredentials, optional): The credentials.
 
     Raises:
         HTTPException:
             - 403 if the user is unauthorized (invalid or missing Bearer token).
             - 403 if no publisher account is found for the authenticated user.
+            - 409 if the idempotency key is used by a request which did not complete.
+            - 422 if the idempotency key was used with a different payload.
 
     Returns:
         dict: The new book attributes.
@@ -61,49 +92,202 @@ async def create_book(
     book_data = book.model_dump()
     book_data["publisher_id"] = publisher.id
 
-    new_book = await service.add_book(BookPublisherId(**book_data))
-    return new_book if new_book else {}
+    async def add_book() -> Any:
+        new_book = await service.add_book(BookPublisherId(**book_data))
+        return dict(new_book) if new_book else {}
+
+    return await idempotency_store.run(
+        key=f"book:create:{user_uuid}:{idempotency_key}" if idempotency_key else None,
+        payload=book.model_dump_json(),
+        handler=add_book,
+    )
 
 @router.get("/all", tags=["Book"], response_model=list[BookDTO], status_code=200)
 @inject
 async def get_all_books(
+        request: Request,
+        response: Response,
         service: IBookService = Depends(Provide[Container.book_service]),
-) -> Iterable:
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+        fields: tuple[str, ...] | None = Depends(sparse_fields(BookDTO)),
+) -> Iterable | Response:
     """An endpoint for getting all books.
 
     Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
         service (IBookService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
+
+    Raises:
+        HTTPException: 400 if an unknown field was requested.
 
     Returns:
-        Iterable: The book attributes collection.
+        Iterable | Response: The book attributes collection or 304 if unchanged.
     """
-    books = await service.get_all()
+    etag = make_etag(request, await change_service.get_version(BOOK_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, CATALOG_CACHE_CONTROL):
+        return not_modified
+
+    books = await service.get_all(fields)
+    if fields:
+        return projected_response(books, response)
+
     return books
 
+@router.get("/browse", tags=["Book"], response_model=BookBrowseDTO, status_code=200)
+@inject
+async def browse_books(
+        request: Request,
+        response: Response,
+        genre: list[str] = Query(default=[]),
+        epoch: list[str] = Query(default=[]),
+        kind: list[str] = Query(default=[]),
+        language: list[str] = Query(default=[]),
+        publisher_id: list[int] = Query(default=[]),
+        offset: int = Query(default=0, ge=0),
+        limit: int = Query(default=20, ge=1, le=100),
+        service: IBookService = Depends(Provide[Container.book_service]),
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> BookBrowseDTO | Response:
+    """An endpoint for browsing the catalog by facets.
+
+    Repeating a facet selects any of its values, e.g. `?genre=Drama&genre=Fantasy`,
+    while different facets must all match. The counts of each facet are
+    computed without that facet's own selection.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        genre (list[str], optional): The selected genres.
+        epoch (list[str], optional): The selected epochs.
+        kind (list[str], optional): The selected kinds.
+        language (list[str], optional): The selected languages.
+        publisher_id (list[int], optional): The selected publisher IDs.
+        offset (int, optional): The number of matching books to skip.
+        limit (int, optional): The maximum number of books to return.
+        service (IBookService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+
+    Returns:
+        BookBrowseDTO | Response: The page of matching books with facet counts or 304 if unchanged.
+    """
+    etag = make_etag(request, await change_service.get_version(BOOK_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, CATALOG_CACHE_CONTROL):
+        return not_modified
+
+    filters = {
+        "genre": genre,
+        "epoch": epoch,
+        "kind": kind,
+        "language": language,
+        "publisher_id": [str(value) for value in publisher_id],
+    }
+    return await service.browse(filters, offset, limit)
+
+@router.get("/suggest", tags=["Book"], response_model=list[BookSuggestionDTO], status_code=200)
+@inject
+async def suggest_books(
+        prefix: str = Query(min_length=1, max_length=100),
+        limit: int = Query(default=10, ge=1, le=50),
+        service: IBookService = Depends(Provide[Container.book_service]),
+) -> Iterable:
+    """An endpoint for autocompleting titles and authors.
+
+    Matching ignores case and diacritics, and the most borrowed books come first.
+
+    Args:
+        prefix (str): The typed prefix of a title or an author.
+        limit (int, optional): The maximum number of suggestions.
+        service (IBookService, optional): The injected service dependency.
+
+    Returns:
+        Iterable: The suggested books.
+    """
+    return await service.suggest(prefix, limit)
+
 @router.get("/{book_id}", tags=["Book"], response_model=BookDTO, status_code=200)
 @inject
 async def get_book_by_id(
         book_id: int,
+        request: Request,
+        response: Response,
         service: IBookService = Depends(Provide[Container.book_service]),
-) -> dict | None:
+        fields: tuple[str, ...] | None = Depends(sparse_fields(BookDTO)),
+) -> dict | Response | None:
     """An endpoint for getting book by id.
 
+    The ETag of a whole book comes from the versions the book was read at,
+    so a cached book is never tagged as a newer one.
+
     Args:
         book_id (int): The id of the book.
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
         service (IBookService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
+        HTTPException: 400 if an unknown field was requested.
         HTTPException: 404 if the book with the provided ID does not exist.
 
     Returns:
-        dict | None: The book details.
+        dict | Response | None: The book details or 304 if unchanged.
     """
-    if book := await service.get_book_by_id(book_id):
+    if fields:
+        if version := await service.get_book_version(book_id):
+            etag = make_etag(request, version)
+            if not_modified := conditional_response(request, response, etag, CATALOG_CACHE_CONTROL):
+                return not_modified
+
+        if book := await service.get_book_by_id(book_id, fields=fields):
+            return projected_response(book, response)
+
+    elif book := await service.get_book_by_id(book_id):
+        if book.version:
+            etag = make_etag(request, book.version)
+            if not_modified := conditional_response(request, response, etag, CATALOG_CACHE_CONTROL):
+                return not_modified
+
         return book.model_dump()
 
     raise HTTPException(status_code=404, detail="Book not found")
 
-@router.put("/{book_id}/", tags=["Book"], response_model=Book, status_code=201)
+@router.get(
+    "/{book_id}/recommendations",
+    tags=["Book"],
+    response_model=list[BookRecommendationDTO],
+    status_code=200,
+)
+@inject
+async def get_book_recommendations(
+        book_id: int,
+        limit: int = Query(default=10, ge=1, le=config.RECOMMENDATION_TOP_K),
+        service: IRecommendationService = Depends(Provide[Container.recommendation_service]),
+) -> Iterable:
+    """An endpoint for getting the books patrons borrowed together with a book.
+
+    Recommendations are precomputed from the lending history and refreshed
+    every `RECOMMENDATION_REFRESH_SECONDS`.
+
+    Args:
+        book_id (int): The id of the book.
+        limit (int, optional): The maximum number of recommendations.
+        service (IRecommendationService, optional): The injected service dependency.
+
+    Returns:
+        Iterable: The recommended books, best first.
+    """
+    return await service.get_recommendations(book_id, limit)
+
+@router.put(
+    "/{book_id}/",
+    tags=["Book"],
+    response_model=Book,
+    status_code=201,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def update_book(
         book_id: int,
@@ -164,7 +348,12 @@ async def update_book(
     updated_book_data = {**updated_book.model_dump(), "id": book_id, "publisher_id": publisher.id}
     return updated_book_data
 
-@router.delete("/{book_id}/", tags=["Book"], status_code=204)
+@router.delete(
+    "/{book_id}/",
+    tags=["Book"],
+    status_code=204,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def delete_book(
         book_id: int,
@@ -238,48 +427,107 @@ async def get_books_availability(
 
     raise HTTPException(status_code=404, detail="Books not found")
 
+@router.get("/all/books_availability/stream", tags=["Book"], status_code=200)
+@inject
+async def stream_books_availability(
+        request: Request,
+        broadcaster: Broadcaster = Depends(Provide[Container.availability_broadcaster]),
+) -> StreamingResponse:
+    """An endpoint streaming availability changes of books as server-sent events.
+
+    Each `availability` event carries the `book_id` and its new `availableStock`
+    after a lend or a return was committed. A `resync` event means that the
+    client fell behind and should reload `/all/books_availability`.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        broadcaster (Broadcaster, optional): The injected availability broadcaster.
+
+    Returns:
+        StreamingResponse: The `text/event-stream` response.
+    """
+    async def events() -> AsyncIterator[str]:
+        with broadcaster.subscribe() as subscription:
+            yield "retry: 3000\n\n"
+
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(),
+                        timeout=config.SSE_HEARTBEAT_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield "event: resync\ndata: {}\n\n"
+
+                yield f"event: availability\ndata: {message}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/{book_title}/search_books_by_title", tags=["Book"], response_model=list[BookDTO], status_code=200)
 @inject
 async def search_books_by_title(
     title: str,
+    response: Response,
     service: IBookService = Depends(Provide[Container.book_service]),
-) -> Iterable:
+    fields: tuple[str, ...] | None = Depends(sparse_fields(BookDTO)),
+) -> Iterable | Response:
     """An endpoint for searching books by title.
 
     Args:
         title (str): The title of the book to search for.
+        response (Response): The outgoing HTTP response.
         service (IBookService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
+        HTTPException: 400 if an unknown field was requested.
         HTTPException: 404 if no books are found with the given title.
 
     Returns:
-        Iterable: A list of books matching the title.
+        Iterable | Response: A list of books matching the title.
     """
-    books = await service.search_books_by_title(title)
+    books = await service.search_books_by_title(title, fields)
     if not books:
         raise HTTPException(status_code=404, detail="No books found")
+    if fields:
+        return projected_response(books, response)
     return books
 
 @router.get("/{book_author}/search_books_by_author", tags=["Book"], response_model=list[BookDTO], status_code=200)
 @inject
 async def search_books_by_author(
     author: str,
+    response: Response,
     service: IBookService = Depends(Provide[Container.book_service]),
-) -> Iterable:
+    fields: tuple[str, ...] | None = Depends(sparse_fields(BookDTO)),
+) -> Iterable | Response:
     """An endpoint for searching books by author.
 
     Args:
         author (str): The author of the book to search for.
+        response (Response): The outgoing HTTP response.
         service (IBookService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
+        HTTPException: 400 if an unknown field was requested.
         HTTPException: 404 if no books are found with the given author.
 
     Returns:
-        Iterable: A list of books matching the author.
+        Iterable | Response: A list of books matching the author.
     """
-    books = await service.search_books_by_author(author)
+    books = await service.search_books_by_author(author, fields)
     if not books:
         raise HTTPException(status_code=404, detail="No books found")
-    return books
\ No newline at end of file
+    if fields:
+        return projected_response(books, response)
+    return books
@@ -0,0 +1,31 @@
+"""A module containing change feed endpoints."""
+from dependency_injector.wiring import inject, Provide
+from fastapi import Depends, APIRouter, Query
+
+from src.container import Container
+from src.core.domain.change import ChangeFeed
+from src.infrastructure.services.ichange import IChangeService
+
+router = APIRouter()
+
+@router.get("", tags=["Changes"], response_model=ChangeFeed, status_code=200)
+@inject
+async def get_changes(
+        after: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        service: IChangeService = Depends(Provide[Container.change_service]),
+) -> ChangeFeed:
+    """An endpoint for reading catalog, lend, publisher and user changes in order.
+
+    Consumers pass the `last_seq` of the previous page as `after` to read
+    only the events they have not seen yet.
+
+    Args:
+        after (int): The last sequence number already seen by the consumer.
+        limit (int): The maximum number of events to return.
+        service (IChangeService, optional): The injected service dependency.
+
+    Returns:
+        ChangeFeed: The page of events and the cursor for the next request.
+    """
+    return await service.get_changes(after, limit)
@@ -0,0 +1,101 @@
+"""A module containing lending export endpoints."""
+import os
+from datetime import date
+from typing import Optional
+
+from dependency_injector.wiring import inject, Provide
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import FileResponse
+
+from src.container import Container
+from src.core.domain.export import Export, ExportFormat
+from src.infrastructure.services.iexport import IExportService
+from src.infrastructure.utils.export import EXPORT_MEDIA_TYPES
+
+router = APIRouter()
+
+@router.post("/lendings", tags=["Exports"], response_model=Export, status_code=202)
+@inject
+async def start_lending_export(
+        background_tasks: BackgroundTasks,
+        export_format: ExportFormat = Query(default=ExportFormat.parquet, alias="format"),
+        start: Optional[date] = Query(default=None, alias="from"),
+        end: Optional[date] = Query(default=None, alias="to"),
+        service: IExportService = Depends(Provide[Container.export_service]),
+) -> Export:
+    """An endpoint for exporting the lendings to a columnar file in the background.
+
+    Every lending is written with the attributes of its book and publisher,
+    streamed from a server-side cursor in chunks, with repeated strings
+    dictionary-encoded. Poll `/exports/{export_id}` until the export is
+    `done`, then download `/exports/{export_id}/file`.
+
+    Args:
+        background_tasks (BackgroundTasks): The tasks run after the response.
+        export_format (ExportFormat, optional): `parquet` or `arrow` (an Arrow IPC stream), passed as `format`.
+        start (Optional[date], optional): The first borrow day exported, passed as `from`.
+        end (Optional[date], optional): The last borrow day exported, passed as `to`.
+        service (IExportService, optional): The injected service dependency.
+
+    Raises:
+        HTTPException:
+            - 400 if `to` precedes `from`.
+            - 503 if exports are not available on this server.
+
+    Returns:
+        Export: The running export.
+    """
+    export = await service.start_export(export_format, start, end)
+    background_tasks.add_task(service.run_export, export)
+
+    return export
+
+@router.get("/{export_id}", tags=["Exports"], response_model=Export, status_code=200)
+@inject
+async def get_export(
+        export_id: str,
+        service: IExportService = Depends(Provide[Container.export_service]),
+) -> Export:
+    """An endpoint for checking the state of an export.
+
+    Args:
+        export_id (str): The ID of the export.
+        service (IExportService, optional): The injected service dependency.
+
+    Raises:
+        HTTPException:
+            - 404 if the export does not exist.
+
+    Returns:
+        Export: The export.
+    """
+    return await service.get_export(export_id)
+
+@router.get("/{export_id}/file", tags=["Exports"], status_code=200)
+@inject
+async def download_export(
+        export_id: str,
+        service: IExportService = Depends(Provide[Container.export_service]),
+) -> FileResponse:
+    """An endpoint for downloading the file of a finished export.
+
+    Args:
+        export_id (str): The ID of the export.
+        service (IExportService, optional): The injected service dependency.
+
+    Raises:
+        HTTPException:
+            - 404 if the export does not exist, failed or its file is missing.
+            - 409 if the export is still running.
+
+    Returns:
+        FileResponse: The exported file.
+    """
+    path = await service.get_export_path(export_id)
+    filename = os.path.basename(path)
+
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[os.path.splitext(filename)[1]],
+        filename=f"lendings-{filename}",
+    )
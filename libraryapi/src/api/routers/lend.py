@@ -1,13 +1,15 @@
 """A module containing lend endpoints."""
 from datetime import date
-from typing import Iterable
+from typing import Iterable, Optional
 from uuid import UUID
 
 from dependency_injector.wiring import inject, Provide
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
 
+from src.api.utils.fields import projected_response, sparse_fields
+from src.api.utils.transactions import transactional
 from src.container import Container
 from src.core.domain.lend import LendTransactionIn, LendBroker
 from src.core.domain.lend import LendTransaction as LendTransaction
@@ -17,24 +19,41 @@ from src.infrastructure.services.ibook import IBookService
 from src.infrastructure.services.ilend import ILendService
 from src.infrastructure.services.iuser import IUserService
 from src.infrastructure.utils import consts
+from src.infrastructure.utils.idempotency import IdempotencyStore
+from src.infrastructure.utils.ratelimit import TokenBucketLimiter, retry_after
 
 bearer_scheme = HTTPBearer()
 router = APIRouter()
 
-@router.post("/create", tags=["Lend"], response_model=LendTransaction, status_code=201)
+@router.post(
+    "/create",
+    tags=["Lend"],
+    response_model=LendTransaction,
+    status_code=201,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def create_lend(
         lend: LendTransactionIn,
         service: ILendService = Depends(Provide[Container.lend_service]),
         book_service: IBookService = Depends(Provide[Container.book_service]),
+        idempotency_store: IdempotencyStore = Depends(Provide[Container.idempotency_store]),
+        rate_limiter: TokenBucketLimiter = Depends(Provide[Container.lend_rate_limiter]),
+        idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
         credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ) -> dict:
     """An endpoint for creating a new lend transaction.
 
+    Retries sent with the same `Idempotency-Key` header replay the first
+    response instead of failing on the already active lend.
+
     Args:
         lend (LendTransactionIn): The details of the lend transaction.
         service (ILendService, optional): The injected service dependency.
         book_service (IBookService, optional): The injected book_service dependency.
+        idempotency_store (IdempotencyStore, optional): The injected idempotency store.
+        rate_limiter (TokenBucketLimiter, optional): The injected rate limit of the users.
+        idempotency_key (Optional[str], optional): The client-generated idempotency key.
         credentials (HTTPAuthorizationCredentials, optional): The authorization credentials.
 
     Raises:
@@ -42,6 +61,9 @@ async def create_lend(
             - 401 if no token is provided.
             - 403 if the user is not authorized.
             - 404 if the book is deleted or not found.
+            - 409 if the idempotency key is used by a request which did not complete.
+            - 422 if the idempotency key was used with a different payload.
+            - 429 if the user exceeded the rate limit.
             - 500 if the lend transaction creation fails.
 
     Returns:
@@ -63,35 +85,59 @@ async def create_lend(
     if not user_uuid:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    book = await book_service.get_book_by_id(lend.book_id)
-    if not book or book.is_deleted:
-        raise HTTPException(status_code=404, detail="Book not available for lending")
+    if wait := await rate_limiter.acquire(user_uuid):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": retry_after(wait)},
+        )
+
+    async def add_lend() -> dict:
+        book = await book_service.get_book_by_id(lend.book_id)
+        if not book or book.is_deleted:
+            raise HTTPException(status_code=404, detail="Book not available for lending")
 
-    lend_with_user = LendBroker(**lend.model_dump(), user_id=user_uuid)
+        lend_with_user = LendBroker(**lend.model_dump(), user_id=user_uuid)
 
-    new_lend = await service.add_lend(lend_with_user)
-    if not new_lend:
-        raise HTTPException(status_code=500, detail="Failed to create lend transaction")
+        new_lend = await service.add_lend(lend_with_user)
+        if not new_lend:
+            raise HTTPException(status_code=500, detail="Failed to create lend transaction")
 
-    await book_service.increment_borrowed_count(lend.book_id)
+        await book_service.increment_borrowed_count(lend.book_id)
 
-    return new_lend.model_dump()
+        return new_lend.model_dump()
+
+    return await idempotency_store.run(
+        key=f"lend:create:{user_uuid}:{idempotency_key}" if idempotency_key else None,
+        payload=lend.model_dump_json(),
+        handler=add_lend,
+    )
 
 
 @router.get("/all", tags=["Lend"], response_model=list[LendTransaction], status_code=200)
 @inject
 async def get_all_lends(
+        response: Response,
         service: ILendService = Depends(Provide[Container.lend_service]),
-) -> Iterable:
+        fields: tuple[str, ...] | None = Depends(sparse_fields(LendTransaction)),
+) -> Iterable | Response:
     """An endpoint for getting all lend transactions.
 
     Args:
+        response (Response): The outgoing HTTP response.
         service (ILendService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
+
+    Raises:
+        HTTPException: 400 if an unknown field was requested.
 
     Returns:
-        Iterable: The collection of all lend transactions.
+        Iterable | Response: The collection of all lend transactions.
     """
-    lends = await service.get_all()
+    lends = await service.get_all(fields)
+    if fields:
+        return projected_response(lends, response)
+
     return lends
 
 
@@ -99,26 +145,41 @@ async def get_all_lends(
 @inject
 async def get_lend_by_id(
         lend_id: int,
+        response: Response,
         service: ILendService = Depends(Provide[Container.lend_service]),
-) -> dict:
+        fields: tuple[str, ...] | None = Depends(sparse_fields(LendTransaction)),
+) -> dict | Response:
     """An endpoint for getting a lend transaction by its ID.
 
     Args:
         lend_id (int): The ID of the lend transaction.
+        response (Response): The outgoing HTTP response.
         service (ILendService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
+        HTTPException: 400 if an unknown field was requested.
         HTTPException: 404 if the lend transaction with the given ID is not found.
 
     Returns:
-        dict: The details of the lend transaction.
+        dict | Response: The details of the lend transaction.
     """
-    if lend := await service.get_lend_by_id(lend_id):
+    if fields:
+        if lend := await service.get_lend_by_id(lend_id, fields):
+            return projected_response(lend, response)
+
+    elif lend := await service.get_lend_by_id(lend_id):
         return lend.model_dump()
 
     raise HTTPException(status_code=404, detail="Lend not found")
 
-@router.put("/{lend_id}/return", tags=["Lend"], response_model=dict, status_code=200)
+@router.put(
+    "/{lend_id}/return",
+    tags=["Lend"],
+    response_model=dict,
+    status_code=200,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def return_book(
         book_id: int,
@@ -0,0 +1,78 @@
+"""A module containing monitoring endpoints."""
+from dependency_injector.wiring import inject, Provide
+from fastapi import Depends, APIRouter
+
+from src.container import Container
+from src.db import read_database
+from src.infrastructure.dto.admissiondto import AdmissionStatsDTO
+from src.infrastructure.dto.cachedto import CacheStatsDTO
+from src.infrastructure.dto.jobdto import JobRunDTO
+from src.infrastructure.utils.admission import AdmissionController
+from src.infrastructure.utils.cache import ReadThroughCache
+from src.infrastructure.utils.scheduler import Scheduler
+
+router = APIRouter()
+
+@router.get("/cache", tags=["Monitoring"], response_model=list[CacheStatsDTO], status_code=200)
+@inject
+async def get_cache_stats(
+        cache: ReadThroughCache = Depends(Provide[Container.lookup_cache]),
+) -> list[CacheStatsDTO]:
+    """An endpoint for reading the hit ratio of the lookup cache of this worker.
+
+    Args:
+        cache (ReadThroughCache, optional): The injected cache dependency.
+
+    Returns:
+        list[CacheStatsDTO]: The counters of every cached namespace.
+    """
+    return [
+        CacheStatsDTO(namespace=namespace, **counters)
+        for namespace, counters in cache.stats().items()
+    ]
+
+
+@router.get("/admission", tags=["Monitoring"], response_model=list[AdmissionStatsDTO], status_code=200)
+@inject
+async def get_admission_stats(
+        controller: AdmissionController = Depends(Provide[Container.admission_controller]),
+) -> list[AdmissionStatsDTO]:
+    """An endpoint for reading the admission control of this worker.
+
+    Args:
+        controller (AdmissionController, optional): The injected admission controller.
+
+    Returns:
+        list[AdmissionStatsDTO]: The state and counters of every limited route class.
+    """
+    return [
+        AdmissionStatsDTO(route_class=route_class, **counters)
+        for route_class, counters in controller.stats().items()
+    ]
+
+
+@router.get("/replicas", tags=["Monitoring"], response_model=list[float | None], status_code=200)
+async def get_replica_lags() -> list[float | None]:
+    """An endpoint for reading the lag of the read replicas seen by this worker.
+
+    Returns:
+        list[float | None]: The lag in seconds of every configured replica,
+            None for unreachable ones.
+    """
+    return read_database.lags()
+
+
+@router.get("/jobs", tags=["Monitoring"], response_model=list[JobRunDTO], status_code=200)
+@inject
+async def get_job_runs(
+        scheduler: Scheduler = Depends(Provide[Container.scheduler]),
+) -> list[JobRunDTO]:
+    """An endpoint for reading the last run of every scheduled job.
+
+    Args:
+        scheduler (Scheduler, optional): The injected scheduler dependency.
+
+    Returns:
+        list[JobRunDTO]: The last runs, by job name.
+    """
+    return [JobRunDTO(**run) for run in await scheduler.get_runs()]
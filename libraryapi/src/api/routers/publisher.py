@@ -1,22 +1,35 @@
 """A module containing publisher endpoints."""
-from typing import Iterable
+from datetime import date
+from typing import Iterable, Optional
 
 from dependency_injector.wiring import inject, Provide
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 
+from src.api.utils.conditional import PUBLISHER_ENTITIES, CATALOG_CACHE_CONTROL, conditional_response, make_etag
+from src.api.utils.fields import projected_response, sparse_fields
+from src.api.utils.transactions import transactional
 from src.container import Container
 from src.core.domain.publisher import Publisher, PublisherIn, PublisherBroker
+from src.core.domain.statistics import PublisherStatistics
 
+from src.infrastructure.services.ichange import IChangeService
 from src.infrastructure.services.ipublisher import IPublisherService
+from src.infrastructure.services.istatistics import IStatisticsService
 from src.infrastructure.utils import consts
 
 bearer_scheme = HTTPBearer()
 
 router = APIRouter()
 
-@router.post("/create", tags=["Publisher"], response_model=Publisher, status_code=201)
+@router.post(
+    "/create",
+    tags=["Publisher"],
+    response_model=Publisher,
+    status_code=201,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def create_publisher(
         publisher: PublisherIn,
@@ -76,44 +89,130 @@ async def create_publisher(
 @router.get("/all", tags=["Publisher"], response_model=list[PublisherIn], status_code=200)
 @inject
 async def get_all_publishers(
+        request: Request,
+        response: Response,
         service: IPublisherService = Depends(Provide[Container.publisher_service]),
-) -> Iterable:
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+        fields: tuple[str, ...] | None = Depends(sparse_fields(PublisherIn)),
+) -> Iterable | Response:
     """An endpoint for retrieving all publishers.
 
     Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
         service (IPublisherService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
+
+    Raises:
+        HTTPException: 400 if an unknown field was requested.
 
     Returns:
-        Iterable: A collection of all publishers.
+        Iterable | Response: A collection of all publishers or 304 if unchanged.
     """
-    publishers = await service.get_all()
+    etag = make_etag(request, await change_service.get_version(PUBLISHER_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, CATALOG_CACHE_CONTROL):
+        return not_modified
+
+    publishers = await service.get_all(fields)
+    if fields:
+        return projected_response(publishers, response)
 
     return publishers
 
+@router.get("/me/statistics", tags=["Publisher"], response_model=PublisherStatistics, status_code=200)
+@inject
+async def get_own_statistics(
+        start: Optional[date] = Query(default=None, alias="from"),
+        end: Optional[date] = Query(default=None, alias="to"),
+        service: IPublisherService = Depends(Provide[Container.publisher_service]),
+        statistics_service: IStatisticsService = Depends(Provide[Container.statistics_service]),
+        credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> PublisherStatistics:
+    """An endpoint for retrieving the borrows of the books of the publisher of the current user.
+
+    Counts come from per-publisher daily rollups, so the cost depends on
+    the length of the range and not on the number of lendings.
+
+    Args:
+        start (Optional[date], optional): The first borrow day counted, passed as `from`.
+        end (Optional[date], optional): The last borrow day counted, passed as `to`.
+        service (IPublisherService, optional): The injected service dependency.
+        statistics_service (IStatisticsService, optional): The injected statistics_service dependency.
+        credentials (HTTPAuthorizationCredentials, optional): The credentials.
+
+    Raises:
+        HTTPException:
+            - 401 if the token is not provided.
+            - 403 if the user is not authorized.
+            - 404 if the user has no publisher.
+            - 400 if `to` precedes `from`.
+
+    Returns:
+        PublisherStatistics: The total, most borrowed books and monthly borrows.
+    """
+    token = credentials.credentials
+
+    token_payload = jwt.decode(
+        token,
+        key=consts.SECRET_KEY,
+        algorithms=[consts.ALGORITHM],
+    )
+
+    user_uuid = token_payload.get("sub")
+
+    if not credentials or not credentials.credentials:
+        raise HTTPException(status_code=401, detail="Token not provided")
+
+    if not user_uuid:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    publisher = await service.get_publisher_by_user_id(user_uuid=user_uuid)
+
+    if not publisher:
+        raise HTTPException(status_code=404, detail="Publisher not found")
+
+    return await statistics_service.get_publisher_statistics(publisher.id, start, end)
+
 @router.get("/{publisher_id}", tags=["Publisher"], response_model=PublisherIn, status_code=200)
 @inject
 async def get_publisher_by_id(
         publisher_id: int,
+        response: Response,
         service: IPublisherService = Depends(Provide[Container.publisher_service]),
-) -> dict | None:
+        fields: tuple[str, ...] | None = Depends(sparse_fields(PublisherIn)),
+) -> dict | Response | None:
     """An endpoint for retrieving a publisher by their ID.
 
     Args:
         publisher_id (int): The ID of the publisher.
+        response (Response): The outgoing HTTP response.
         service (IPublisherService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
+        HTTPException: 400 if an unknown field was requested.
         HTTPException: 404 if the publisher is not found.
 
     Returns:
-        dict | None: The publisher details.
+        dict | Response | None: The publisher details.
     """
-    if publisher := await service.get_publisher_by_id(publisher_id):
+    if fields:
+        if publisher := await service.get_publisher_by_id(publisher_id, fields):
+            return projected_response(publisher, response)
+
+    elif publisher := await service.get_publisher_by_id(publisher_id):
         return publisher.model_dump()
 
     raise HTTPException(status_code=404, detail="Publisher not found")
 
-@router.put("/", tags=["Publisher"], response_model=PublisherIn, status_code=201)
+@router.put(
+    "/",
+    tags=["Publisher"],
+    response_model=PublisherIn,
+    status_code=201,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def update_publisher(
         updated_publisher: PublisherIn,
@@ -164,7 +263,12 @@ async def update_publisher(
 
     return {**updated_publisher.model_dump(), "id": publisher.id, "user_id": user_uuid}
 
-@router.delete("/", tags=["Publisher"], status_code=204)
+@router.delete(
+    "/",
+    tags=["Publisher"],
+    status_code=204,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def delete_publisher(
         service: IPublisherService = Depends(Provide[Container.publisher_service]),
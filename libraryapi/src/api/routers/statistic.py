@@ -1,25 +1,59 @@
 """A module containing statistics endpoints."""
-from typing import List
+from datetime import date
+from typing import List, Optional
 
 from dependency_injector.wiring import inject, Provide
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response
 
+from src.api.utils.conditional import STATISTICS_ENTITIES, STATISTICS_CACHE_CONTROL, conditional_response, make_etag
 from src.container import Container
-from src.core.domain.statistics import Statistics, MonthlyBorrowedBooks, YearSummary, MonthlyCategoryStats
+from src.core.domain.statistics import (
+    BorrowTimeSeries,
+    DistinctBorrowers,
+    DurationGrouping,
+    Granularity,
+    LoanDurationStats,
+    MonthlyBorrowedBooks,
+    MonthlyCategoryStats,
+    Statistics,
+    StatisticsDashboard,
+    YearSummary,
+)
 
+from src.infrastructure.services.ichange import IChangeService
+from src.infrastructure.services.isketch import ISketchService
 from src.infrastructure.services.istatistics import IStatisticsService
 
 router = APIRouter()
 
+# The format of the `month` query parameter, e.g. `2024-05`.
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
 @router.get("/top_10_borrowed_books", tags=["Statistics"], response_model=Statistics, status_code=200)
 @inject
 async def get_top10_borrowed_books(
+        request: Request,
+        response: Response,
+        month: Optional[str] = Query(default=None, pattern=MONTH_PATTERN),
+        approx: bool = Query(default=False),
         service: IStatisticsService = Depends(Provide[Container.statistics_service]),
-    ) -> Statistics:
+        sketch_service: ISketchService = Depends(Provide[Container.sketch_service]),
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+    ) -> Statistics | Response:
     """An endpoint for retrieving the top 10 most borrowed books.
 
+    With `approx`, the borrow counts are estimated from a top-K sketch in
+    constant time. The sketch lags new lendings by up to a refresh interval,
+    so approximate responses carry no ETag.
+
     Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        month (Optional[str], optional): Counts only borrows of this month, e.g. `2024-05`.
+        approx (bool, optional): Whether to estimate the counts from the sketch.
         service (IStatisticsService, optional): The injected service dependency.
+        sketch_service (ISketchService, optional): The injected sketch_service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
 
     Raises:
         HTTPException:
@@ -28,21 +62,71 @@ async def get_top10_borrowed_books(
     Returns:
         Statistics: The top 10 most borrowed books.
     """
-    top_books = await service.get_top_borrowed_books()
+    if approx:
+        top_books = await sketch_service.get_top_borrowed_books(month)
+    else:
+        etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+        if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+            return not_modified
+
+        top_books = await service.get_top_borrowed_books(month)
     if not top_books:
         raise HTTPException(status_code=404, detail="No data")
 
     return Statistics(top_books=top_books)
 
+@router.get("/dashboard", tags=["Statistics"], response_model=StatisticsDashboard, status_code=200)
+@inject
+async def get_dashboard(
+        request: Request,
+        response: Response,
+        year: Optional[int] = Query(default=None),
+        service: IStatisticsService = Depends(Provide[Container.statistics_service]),
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> StatisticsDashboard | Response:
+    """An endpoint for retrieving every statistic of the dashboard at once.
+
+    The top 10 books, monthly borrowings, yearly summary and category
+    averages are computed concurrently from one consistent snapshot.
+    Sections which time out or fail are null and listed in `incomplete`;
+    such partial responses are not cached.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        year (Optional[int], optional): The year of the summary, the current year by default.
+        service (IStatisticsService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+
+    Returns:
+        StatisticsDashboard: The statistics of the dashboard.
+    """
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
+    dashboard = await service.get_dashboard(date.today().year if year is None else year)
+    if dashboard.incomplete:
+        del response.headers["ETag"]
+        response.headers["Cache-Control"] = "no-store"
+
+    return dashboard
+
 @router.get("/monthly_borrowed_books", tags=["Statistics"], response_model=List[MonthlyBorrowedBooks], status_code=200)
 @inject
 async def get_monthly_borrowed_books(
+        request: Request,
+        response: Response,
         service: IStatisticsService = Depends(Provide[Container.statistics_service]),
-) -> List[MonthlyBorrowedBooks]:
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> List[MonthlyBorrowedBooks] | Response:
     """An endpoint for retrieving monthly statistics of borrowed books.
 
     Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
         service (IStatisticsService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
 
     Raises:
         HTTPException:
@@ -51,6 +135,10 @@ async def get_monthly_borrowed_books(
     Returns:
         List[MonthlyBorrowedBooks]: A list of monthly borrowed book statistics.
     """
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
     monthly_books = await service.get_monthly_borrowed_books()
     if not monthly_books:
         raise HTTPException(status_code=404, detail="No data")
@@ -61,13 +149,22 @@ async def get_monthly_borrowed_books(
 @inject
 async def get_year_summary(
         year: int,
+        request: Request,
+        response: Response,
         service: IStatisticsService = Depends(Provide[Container.statistics_service]),
-) -> YearSummary:
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> YearSummary | Response:
     """An endpoint for retrieving a yearly summary of borrowed books for a given year.
 
+    Summaries precomputed by the scheduler are served when available; the
+    summary of the current year is refreshed every YEAR_SUMMARY_REFRESH_SECONDS.
+
     Args:
         year (int): The year for which the summary is to be fetched.
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
         service (IStatisticsService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
 
     Raises:
         HTTPException:
@@ -76,19 +173,75 @@ async def get_year_summary(
     Returns:
         YearSummary: The summary of borrowed books for the requested year.
     """
+    stored = await service.get_year_summaries(year, year)
+    if stored.summaries:
+        etag = make_etag(request, stored.seq)
+        if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+            return not_modified
+        return stored.summaries[0]
+
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
     year_summary = await service.get_year_summary(year)
     if not year_summary:
         raise HTTPException(status_code=404, detail="No data")
 
     return year_summary
 
+@router.get("/yearly_summaries", tags=["Statistics"], response_model=List[YearSummary], status_code=200)
+@inject
+async def get_year_summaries(
+        request: Request,
+        response: Response,
+        from_year: int = Query(),
+        to_year: int = Query(),
+        service: IStatisticsService = Depends(Provide[Container.statistics_service]),
+) -> List[YearSummary] | Response:
+    """An endpoint for retrieving the precomputed yearly summaries of a range of years.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        from_year (int): The first year.
+        to_year (int): The last year.
+        service (IStatisticsService, optional): The injected service dependency.
+
+    Raises:
+        HTTPException:
+            - 400 if `to_year` precedes `from_year`.
+            - 404 if no year of the range has lendings.
+
+    Returns:
+        List[YearSummary]: The summaries of the years with lendings, oldest first.
+    """
+    stored = await service.get_year_summaries(from_year, to_year)
+    if not stored.summaries:
+        raise HTTPException(status_code=404, detail="No data available")
+
+    etag = make_etag(request, stored.seq)
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
+    return stored.summaries
+
 @router.get("/average_borrowed_per_category_monthly", tags=["Statistics"], response_model=List[MonthlyCategoryStats], status_code=200)
 @inject
 async def get_average_borrowed_per_category_monthly(
+        request: Request,
+        response: Response,
         service: IStatisticsService = Depends(Provide[Container.statistics_service]),
-) -> List[MonthlyCategoryStats]:
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> List[MonthlyCategoryStats] | Response:
     """An endpoint for retrieving the average number of borrowed books per category monthly.
 
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        service (IStatisticsService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+
     Returns:
         List[MonthlyCategoryStats]: A list of statistics with the average number of books borrowed per category each month.
 
@@ -96,8 +249,169 @@ async def get_average_borrowed_per_category_monthly(
         HTTPException:
             - 404 if no data is available.
     """
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
     average_borrowed = await service.get_average_borrowed_per_category_monthly()
     if not average_borrowed:
         raise HTTPException(status_code=404, detail="No data available")
 
-    return average_borrowed
\ No newline at end of file
+    return average_borrowed
+
+@router.get("/distinct_borrowers/{book_id}", tags=["Statistics"], response_model=DistinctBorrowers, status_code=200)
+@inject
+async def get_distinct_borrowers(
+        book_id: int,
+        request: Request,
+        response: Response,
+        start: Optional[date] = Query(default=None, alias="from"),
+        end: Optional[date] = Query(default=None, alias="to"),
+        approx: bool = Query(default=False),
+        service: IStatisticsService = Depends(Provide[Container.statistics_service]),
+        sketch_service: ISketchService = Depends(Provide[Container.sketch_service]),
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> DistinctBorrowers | Response:
+    """An endpoint for retrieving the number of distinct patrons who borrowed a book.
+
+    With `approx`, the number is estimated from monthly HyperLogLog sketches
+    in constant time per month, within about 2%. The months of `from` and
+    `to` are then counted entirely, and approximate responses carry no ETag.
+
+    Args:
+        book_id (int): The ID of the book.
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        start (Optional[date], optional): The first borrow day counted, passed as `from`.
+        end (Optional[date], optional): The last borrow day counted, passed as `to`.
+        approx (bool, optional): Whether to estimate the number from the sketches.
+        service (IStatisticsService, optional): The injected service dependency.
+        sketch_service (ISketchService, optional): The injected sketch_service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+
+    Raises:
+        HTTPException:
+            - 400 if `to` precedes `from`.
+
+    Returns:
+        DistinctBorrowers: The number of borrowers.
+    """
+    if approx:
+        return await sketch_service.get_distinct_borrowers(book_id, start, end)
+
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
+    return await service.get_distinct_borrowers(book_id, start, end)
+
+@router.get("/timeseries", tags=["Statistics"], response_model=BorrowTimeSeries, status_code=200)
+@inject
+async def get_borrow_timeseries(
+        request: Request,
+        response: Response,
+        start: date = Query(alias="from"),
+        end: date = Query(alias="to"),
+        granularity: Granularity = Query(default=Granularity.month),
+        book_id: Optional[int] = Query(default=None),
+        category: Optional[str] = Query(default=None),
+        publisher_id: Optional[int] = Query(default=None),
+        service: IStatisticsService = Depends(Provide[Container.statistics_service]),
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> BorrowTimeSeries | Response:
+    """An endpoint for retrieving the number of borrows in every period of a date range.
+
+    Periods without borrows are included with a count of 0. Periods start on
+    the first day of the week (Monday), month, quarter or year containing them.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        start (date): The first day of the range, passed as `from`.
+        end (date): The last day of the range, passed as `to`.
+        granularity (Granularity, optional): The length of the periods.
+        book_id (Optional[int], optional): Counts only borrows of this book.
+        category (Optional[str], optional): Counts only borrows of books of this category.
+        publisher_id (Optional[int], optional): Counts only borrows of books of this publisher.
+        service (IStatisticsService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+
+    Raises:
+        HTTPException:
+            - 400 if `to` precedes `from` or the range has too many periods.
+
+    Returns:
+        BorrowTimeSeries: The zero-filled series of borrow counts.
+    """
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
+    return await service.get_borrow_timeseries(
+        start,
+        end,
+        granularity,
+        book_id=book_id,
+        category=category,
+        publisher_id=publisher_id,
+    )
+
+@router.get("/loan_durations", tags=["Statistics"], response_model=List[LoanDurationStats], status_code=200)
+@inject
+async def get_loan_durations(
+        request: Request,
+        response: Response,
+        start: Optional[date] = Query(default=None, alias="from"),
+        end: Optional[date] = Query(default=None, alias="to"),
+        group_by: Optional[DurationGrouping] = Query(default=None),
+        book_id: Optional[int] = Query(default=None),
+        category: Optional[str] = Query(default=None),
+        publisher_id: Optional[int] = Query(default=None),
+        limit: int = Query(default=50, ge=1, le=500),
+        service: IStatisticsService = Depends(Provide[Container.statistics_service]),
+        change_service: IChangeService = Depends(Provide[Container.change_service]),
+) -> List[LoanDurationStats] | Response:
+    """An endpoint for retrieving the distribution of the durations of returned loans.
+
+    Durations are counted in days from borrowing to returning, summarized by
+    percentiles and a histogram, for all loans or per book, category or
+    publisher.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The outgoing HTTP response.
+        start (Optional[date], optional): The first borrow day of the loans, passed as `from`.
+        end (Optional[date], optional): The last borrow day of the loans, passed as `to`.
+        group_by (Optional[DurationGrouping], optional): Summarizes every book, category or publisher.
+        book_id (Optional[int], optional): Summarizes only loans of this book.
+        category (Optional[str], optional): Summarizes only loans of books of this category.
+        publisher_id (Optional[int], optional): Summarizes only loans of books of this publisher.
+        limit (int, optional): The maximum number of groups, those with the most loans.
+        service (IStatisticsService, optional): The injected service dependency.
+        change_service (IChangeService, optional): The injected change_service dependency.
+
+    Raises:
+        HTTPException:
+            - 400 if `to` precedes `from`.
+            - 404 if no returned loans match.
+
+    Returns:
+        List[LoanDurationStats]: The distributions, most loans first.
+    """
+    etag = make_etag(request, await change_service.get_version(STATISTICS_ENTITIES))
+    if not_modified := conditional_response(request, response, etag, STATISTICS_CACHE_CONTROL):
+        return not_modified
+
+    durations = await service.get_loan_durations(
+        start,
+        end,
+        group_by,
+        book_id=book_id,
+        category=category,
+        publisher_id=publisher_id,
+        limit=limit,
+    )
+    if not durations:
+        raise HTTPException(status_code=404, detail="No data available")
+
+    return durations
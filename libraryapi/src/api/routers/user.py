@@ -3,18 +3,27 @@ from typing import Iterable
 from uuid import UUID
 
 from dependency_injector.wiring import inject, Provide
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Response
 
+from src.api.utils.fields import projected_response, sparse_fields
+from src.api.utils.transactions import transactional
 from src.container import Container
 from src.core.domain.user import User, UserIn, UserAuth
 from src.infrastructure.dto.tokendto import TokenDTO
 from src.infrastructure.dto.userdto import UserDTO
 
 from src.infrastructure.services.iuser import IUserService
+from src.infrastructure.utils.ratelimit import TokenBucketLimiter, retry_after
 
 router = APIRouter()
 
-@router.post("/register", tags=["User"], response_model=UserDTO, status_code=201)
+@router.post(
+    "/register",
+    tags=["User"],
+    response_model=UserDTO,
+    status_code=201,
+    dependencies=[Depends(transactional)],
+)
 @inject
 async def register_user(
         user: UserIn,
@@ -44,20 +53,33 @@ async def register_user(
 async def authenticate_user(
         user: UserAuth,
         service: IUserService = Depends(Provide[Container.user_service]),
+        rate_limiter: TokenBucketLimiter = Depends(Provide[Container.token_rate_limiter]),
 ) -> dict:
     """An endpoint for authenticating a user and generating a token.
 
+    Attempts are limited by e-mail, so guessing the password of an account
+    is slowed down whichever workers serve the attempts.
+
     Args:
         user (UserAuth): The user's login credentials.
         service (IUserService, optional): The injected service dependency.
+        rate_limiter (TokenBucketLimiter, optional): The injected rate limit of the attempts.
 
     Raises:
         HTTPException:
             - 401 if the provided credentials are incorrect.
+            - 429 if the attempts for the e-mail exceeded the rate limit.
 
     Returns:
         TokenDTO: The authentication token.
     """
+    if wait := await rate_limiter.acquire(user.email.lower()):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": retry_after(wait)},
+        )
+
     if token_details := await service.authenticate_user(user):
         print("user confirmed")
         return token_details.model_dump()
@@ -85,45 +107,61 @@ async def authenticate_user(
 @router.get("/all", tags=["User"], response_model=list[UserDTO], status_code=200)
 @inject
 async def get_all_users(
+        response: Response,
         service: IUserService = Depends(Provide[Container.user_service]),
-) -> Iterable:
+        fields: tuple[str, ...] | None = Depends(sparse_fields(UserDTO)),
+) -> Iterable | Response:
     """An endpoint for retrieving all users in the system.
 
     Args:
+        response (Response): The outgoing HTTP response.
         service (IUserService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
         HTTPException:
+            - 400 if an unknown field was requested.
             - 404 if no users are found.
 
     Returns:
-        list: A list of all users in the system.
+        list | Response: A list of all users in the system.
     """
-    users = await service.get_all()
+    users = await service.get_all(fields)
     if not users:
         raise HTTPException(status_code=404, detail="No data")
+    if fields:
+        return projected_response(users, response)
     return users
 
 @router.get("/{user_id}", tags=["User"], response_model=UserDTO, status_code=200)
 @inject
 async def get_user_by_uuid(
         user_id: UUID,
+        response: Response,
         service: IUserService = Depends(Provide[Container.user_service]),
-) -> dict | None:
+        fields: tuple[str, ...] | None = Depends(sparse_fields(UserDTO)),
+) -> dict | Response | None:
     """An endpoint for fetching a user by their UUID.
 
     Args:
         user_id (UUID): The unique identifier of the user.
+        response (Response): The outgoing HTTP response.
         service (IUserService, optional): The injected service dependency.
+        fields (tuple[str, ...] | None, optional): The requested fields, all if omitted.
 
     Raises:
         HTTPException:
+            - 400 if an unknown field was requested.
             - 404 if the user is not found.
 
     Returns:
-        dict: The user details corresponding to the provided UUID.
+        dict | Response: The user details corresponding to the provided UUID.
     """
-    if user := await service.get_user_by_id(user_id):
+    if fields:
+        if user := await service.get_user_by_id(user_id, fields):
+            return projected_response(user, response)
+
+    elif user := await service.get_user_by_id(user_id):
         return user.model_dump()
 
     raise HTTPException(status_code=404, detail="User not found")
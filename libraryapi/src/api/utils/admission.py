@@ -0,0 +1,57 @@
+"""A module containing the middleware refusing requests beyond the admission limits."""
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.infrastructure.utils.admission import AdmissionController
+
+
+class AdmissionMiddleware:
+    """An ASGI middleware running requests within the limits of their route class.
+
+    Refused requests get a 503 response with a `Retry-After` header. A slot
+    is held until the response and its background tasks are done, so an
+    export started in the background counts until it is written.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, retry_after: int = 1) -> None:
+        """The initializer of the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            controller (AdmissionController): The limits of the route classes.
+            retry_after (int, optional): The seconds refused clients are asked to wait.
+        """
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The receive channel.
+            send (Send): The send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.controller.classify(scope["method"], scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limit.acquire(self.controller.queue_timeout):
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
@@ -0,0 +1,298 @@
+"""A module containing the response compression middleware."""
+import zlib
+from typing import Any, Callable
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.utils.conditional import encode_etag
+
+# Content types which are either already compressed or must reach the
+# client unbuffered.
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    # Parquet and Arrow exports, compressed by their writer.
+    "application/vnd.apache.",
+)
+
+
+class GzipCompressor:
+    """A streaming gzip compressor."""
+
+    def __init__(self, level: int) -> None:
+        """The initializer of the compressor.
+
+        Args:
+            level (int): The zlib compression level.
+        """
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it to the output."""
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and close the stream."""
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliCompressor:
+    """A streaming brotli compressor."""
+
+    def __init__(self, level: int) -> None:
+        """The initializer of the compressor.
+
+        Args:
+            level (int): The brotli quality.
+        """
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it to the output."""
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and close the stream."""
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class ZstdCompressor:
+    """A streaming zstd compressor."""
+
+    def __init__(self, level: int) -> None:
+        """The initializer of the compressor.
+
+        Args:
+            level (int): The zstd compression level.
+        """
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it to the output."""
+        return (
+            self._compressor.compress(data)
+            + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and close the stream."""
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+def available_codecs() -> dict[str, type]:
+    """List the codecs usable in this environment, in order of preference.
+
+    Returns:
+        dict[str, type]: The compressor classes keyed by content coding.
+    """
+    codecs: dict[str, type] = {}
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCompressor
+    if brotli is not None:
+        codecs["br"] = BrotliCompressor
+    codecs["gzip"] = GzipCompressor
+    return codecs
+
+
+def negotiate(accept_encoding: str, codecs: dict[str, type]) -> str | None:
+    """Pick the preferred codec accepted by the client.
+
+    Args:
+        accept_encoding (str): The value of the `Accept-Encoding` header.
+        codecs (dict[str, type]): The available codecs in order of preference.
+
+    Returns:
+        str | None: The chosen content coding or None to send the body as is.
+    """
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = [
+        coding for coding in codecs
+        if accepted.get(coding, wildcard) > 0
+    ]
+    if not candidates:
+        return None
+
+    return max(candidates, key=lambda coding: accepted.get(coding, wildcard))
+
+
+class CompressionMiddleware:
+    """An ASGI middleware compressing responses with gzip, brotli or zstd.
+
+    Bodies sent in one message are compressed at once when they reach the
+    minimum size. Streamed bodies are compressed chunk by chunk, flushing
+    after every chunk so that streaming semantics are kept. Strong ETags of
+    compressed responses get the content coding appended, since each coding
+    is a representation of its own.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 1024,
+            levels: dict[str, int] | None = None,
+    ) -> None:
+        """The initializer of the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            minimum_size (int, optional): The smallest body worth compressing.
+            levels (dict[str, int] | None, optional): The levels keyed by content coding.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+        self.codecs = available_codecs()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI call.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The receive channel.
+            send (Send): The send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send,
+            coding,
+            lambda: self.codecs[coding](self.levels[coding]),
+            self.minimum_size,
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """A send channel compressing the messages of a single response."""
+
+    def __init__(
+            self,
+            send: Send,
+            coding: str,
+            compressor_factory: Callable[[], Any],
+            minimum_size: int,
+    ) -> None:
+        """The initializer of the responder.
+
+        Args:
+            send (Send): The original send channel.
+            coding (str): The negotiated content coding.
+            compressor_factory (Callable[[], Any]): The factory of the compressor.
+            minimum_size (int): The smallest body worth compressing.
+        """
+        self._send = send
+        self._coding = coding
+        self._compressor_factory = compressor_factory
+        self._minimum_size = minimum_size
+        self._start: Message | None = None
+        self._compressor: Any = None
+        self._passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        """Forward a message, compressing the body when applicable.
+
+        Args:
+            message (Message): The ASGI message.
+        """
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._start is not None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=start["headers"])
+
+            if (
+                not self._is_compressible(start, headers)
+                or (not more_body and len(body) < self._minimum_size)
+            ):
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self._compressor = self._compressor_factory()
+            headers["Content-Encoding"] = self._coding
+            headers.add_vary_header("Accept-Encoding")
+            if etag := headers.get("etag"):
+                headers["ETag"] = encode_etag(etag, self._coding)
+
+            if not more_body:
+                body = self._compressor.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            del headers["Content-Length"]
+            await self._send(start)
+
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        if more_body:
+            body = self._compressor.compress(body)
+        else:
+            body = self._compressor.finish(body)
+
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    @staticmethod
+    def _is_compressible(start: Message, headers: MutableHeaders) -> bool:
+        """Check whether the response may be compressed.
+
+        Args:
+            start (Message): The `http.response.start` message.
+            headers (MutableHeaders): The response headers.
+
+        Returns:
+            bool: True if the response should be compressed.
+        """
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+
+        if "content-encoding" in headers:
+            return False
+
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(EXCLUDED_CONTENT_TYPES)
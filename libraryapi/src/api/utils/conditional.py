@@ -0,0 +1,118 @@
+"""A module containing helpers for conditional GET requests."""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+CATALOG_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+STATISTICS_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+# Outbox entities whose events change the representation of a resource.
+BOOK_ENTITIES = ("book", "publisher")
+PUBLISHER_ENTITIES = ("publisher",)
+STATISTICS_ENTITIES = ("lend", "book")
+
+
+def make_etag(request: Request, *parts: Any) -> str:
+    """Build a strong ETag from version tokens instead of the response body.
+
+    The path and the query string are part of the tag, so different
+    representations of the same data never share it.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        *parts (Any): The version tokens of the represented data.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    source = "|".join([request.url.path, request.url.query, *map(str, parts)])
+    return f'"{hashlib.blake2b(source.encode(), digest_size=12).hexdigest()}"'
+
+
+def encode_etag(etag: str, coding: str) -> str:
+    """Derive the ETag of a content-coded representation.
+
+    Every content coding of a body is a different representation, so a
+    strong tag gets the coding appended inside its quotes. Weak tags are
+    shared by equivalent representations and are kept.
+
+    Args:
+        etag (str): The quoted entity tag of the unencoded body.
+        coding (str): The content coding, e.g. `gzip`.
+
+    Returns:
+        str: The entity tag of the encoded body.
+    """
+    if etag.startswith("W/"):
+        return etag
+
+    return f'{etag[:-1]}-{coding}"'
+
+
+def matching_etag(request: Request, etag: str) -> str | None:
+    """Find the tag of the `If-None-Match` header matching an ETag in any content coding.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        etag (str): The current entity tag of the unencoded body.
+
+    Returns:
+        str | None: The matching tag as sent by the client, or None.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+
+    if header.strip() == "*":
+        return etag
+
+    encoded_prefix = f"{etag[:-1]}-"
+    for candidate in header.split(","):
+        tag = candidate.strip().removeprefix("W/")
+        if tag == etag or (tag.startswith(encoded_prefix) and tag.endswith('"')):
+            return candidate.strip()
+
+    return None
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check the `If-None-Match` header of the request against an ETag.
+
+    Tags of content-coded representations of the same body match as well.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        etag (str): The current entity tag of the unencoded body.
+
+    Returns:
+        bool: True if the client already has the current representation.
+    """
+    return matching_etag(request, etag) is not None
+
+
+def conditional_response(
+        request: Request,
+        response: Response,
+        etag: str,
+        cache_control: str,
+) -> Response | None:
+    """Set validator headers and answer 304 when the client's copy is current.
+
+    Args:
+        request (Request): The incoming HTTP request.
+        response (Response): The response whose headers are set on a 200.
+        etag (str): The current entity tag.
+        cache_control (str): The `Cache-Control` policy of the route.
+
+    Returns:
+        Response | None: The 304 response or None if the body must be sent.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if (matched := matching_etag(request, etag)) is not None:
+        # The 304 repeats the tag of the representation the client holds.
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,83 @@
+"""A module containing helpers for sparse fieldsets (`?fields=`)."""
+import json
+from datetime import date
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+
+
+def sparse_fields(model: type[BaseModel]) -> Callable[..., tuple[str, ...] | None]:
+    """Build a dependency parsing the `fields` query parameter of a route.
+
+    Args:
+        model (type[BaseModel]): The response model the fields are validated against.
+
+    Returns:
+        Callable[..., tuple[str, ...] | None]: The dependency.
+    """
+    allowed = tuple(model.model_fields)
+
+    def dependency(
+            fields: Optional[str] = Query(
+                default=None,
+                description=f"Comma-separated subset of: {', '.join(allowed)}",
+            ),
+    ) -> tuple[str, ...] | None:
+        """Parse the requested fields.
+
+        Args:
+            fields (Optional[str], optional): The comma-separated field names.
+
+        Raises:
+            HTTPException: 400 if an unknown field was requested.
+
+        Returns:
+            tuple[str, ...] | None: The distinct fields in request order or None for all.
+        """
+        if fields is None:
+            return None
+
+        requested = tuple(dict.fromkeys(
+            field.strip() for field in fields.split(",") if field.strip()
+        ))
+        if not requested:
+            return None
+
+        if unknown := [field for field in requested if field not in allowed]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}",
+            )
+
+        return requested
+
+    return dependency
+
+
+def _encode(value: Any) -> Any:
+    """Encode the values the standard JSON encoder does not support."""
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def projected_response(content: dict | Iterable[dict], response: Response) -> Response:
+    """Render projected rows, bypassing validation against the full response model.
+
+    Args:
+        content (dict | Iterable[dict]): The projected row or rows.
+        response (Response): The route's response whose headers are kept.
+
+    Returns:
+        Response: The JSON response.
+    """
+    if not isinstance(content, dict):
+        content = list(content)
+
+    projected = Response(
+        content=json.dumps(content, default=_encode, separators=(",", ":")),
+        media_type="application/json",
+    )
+    projected.headers.update(response.headers)
+    return projected
@@ -0,0 +1,16 @@
+"""A module containing the dependency giving every request its own loaders."""
+from typing import AsyncIterator
+
+from src.infrastructure.utils.loaders import request_scope
+
+
+async def request_loaders() -> AsyncIterator[None]:
+    """A dependency scoping the batching loaders and identity map to the request.
+
+    Added to the dependencies of the app, so every endpoint runs in a scope.
+
+    Yields:
+        None: Control while the endpoint runs.
+    """
+    with request_scope():
+        yield
@@ -0,0 +1,17 @@
+"""A module containing the dependency keeping the reads of a request on one database."""
+from typing import AsyncIterator
+
+from src.infrastructure.utils.replicas import consistent_reads
+
+
+async def request_reads() -> AsyncIterator[None]:
+    """A dependency sending every read of the request to the same database.
+
+    Added to the dependencies of the app, so the version tagging a response
+    is never newer than the body read after it from another replica.
+
+    Yields:
+        None: Control while the endpoint runs.
+    """
+    with consistent_reads():
+        yield
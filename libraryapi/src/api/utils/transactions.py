@@ -0,0 +1,42 @@
+"""A module containing the dependency running a request in a unit of work."""
+from typing import AsyncIterator
+
+from dependency_injector.wiring import inject, Provide
+from fastapi import Depends
+
+from src.container import Container
+from src.infrastructure.utils.unitofwork import UnitOfWork
+
+
+@inject
+async def get_unit_of_work(
+        unit_of_work: UnitOfWork = Depends(Provide[Container.unit_of_work]),
+) -> UnitOfWork:
+    """A dependency resolving the unit of work from the container.
+
+    Kept apart from `transactional`, since injection wraps generators into
+    plain functions FastAPI would not enter.
+
+    Args:
+        unit_of_work (UnitOfWork, optional): The injected unit of work.
+
+    Returns:
+        UnitOfWork: The unit of work.
+    """
+    return unit_of_work
+
+
+async def transactional(unit_of_work: UnitOfWork = Depends(get_unit_of_work)) -> AsyncIterator[None]:
+    """A dependency running the endpoint and its repositories on one connection in one transaction.
+
+    Added to the `dependencies` of writing routes. The transaction commits
+    when the endpoint returns and rolls back when it raises.
+
+    Args:
+        unit_of_work (UnitOfWork, optional): The resolved unit of work.
+
+    Yields:
+        None: Control while the endpoint runs.
+    """
+    async with unit_of_work.begin():
+        yield
@@ -13,5 +13,96 @@ class AppConfig(BaseConfig):
     DB_NAME: Optional[str] = None
     DB_USER: Optional[str] = None
     DB_PASSWORD: Optional[str] = None
+    # Keeps every change in one transaction rolled back on shutdown. NOTIFY is
+    # delivered only on commit, so live updates require disabling it.
+    DB_FORCE_ROLLBACK: bool = True
+    # Hosts of read replicas, e.g. `["replica-1:5432"]`. Replicas are not used
+    # while DB_FORCE_ROLLBACK keeps writes uncommitted.
+    DB_REPLICA_HOSTS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_SECONDS: float = 2.0
+    # Every worker keeps up to DB_POOL_MAX_SIZE pooled connections, and the
+    # server sizes the workers to fit in DB_MAX_CONNECTIONS.
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_MAX_CONNECTIONS: int = 100
+    # Inserts sample data at every startup into an empty database, e.g. with
+    # DB_FORCE_ROLLBACK in development; `python -m src.init_data` commits it once.
+    SEED_SAMPLE_DATA: bool = False
+    # The production server (`python -m src.serve`) starts SERVE_WORKERS
+    # workers, by default one per usable CPU within the connection budget,
+    # and a single one with DB_FORCE_ROLLBACK.
+    SERVE_HOST: str = "0.0.0.0"
+    SERVE_PORT: int = 8000
+    SERVE_WORKERS: Optional[int] = None
+    SERVE_GRACEFUL_TIMEOUT_SECONDS: float = 30.0
+    SERVE_ACCESS_LOG: bool = False
+    # Responses of requests with an `Idempotency-Key` are kept in the database
+    # for IDEMPOTENCY_TTL_SECONDS, and expired ones removed by a job.
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_PRUNE_SECONDS: float = 600.0
+    SSE_BUFFER_SIZE: int = 256
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    INDEX_SYNC_INTERVAL_SECONDS: float = 1.0
+    # Events of writes outside of requests, or of requests which ended before
+    # older transactions, are numbered by a job every OUTBOX_PUBLISH_SECONDS.
+    OUTBOX_PUBLISH_SECONDS: float = 1.0
+    SUGGEST_MAX_BOOKS: int = 500_000
+    # Lookups of books, users and publishers by ID are cached per worker,
+    # or in a shared Redis-compatible server when a URL is given.
+    CACHE_TTL_SECONDS: float = 30.0
+    CACHE_MAX_ENTRIES: int = 50_000
+    CACHE_REDIS_URL: Optional[str] = None
+    # Periodic jobs run in one worker at a time, checked every SCHEDULER_TICK_SECONDS.
+    SCHEDULER_TICK_SECONDS: float = 1.0
+    YEAR_SUMMARY_REFRESH_SECONDS: float = 300.0
+    RECOMMENDATION_TOP_K: int = 20
+    RECOMMENDATION_REFRESH_SECONDS: float = 60.0
+    RECOMMENDATION_MAX_USER_BOOKS: int = 500
+    # Statistics are computed from an in-memory snapshot of the lendings,
+    # in a process pool once it holds ANALYTICS_POOL_MIN_ROWS lendings.
+    # The snapshot checks the outbox on every request by default, so the
+    # ETags of statistics always match the served content.
+    ANALYTICS_IN_MEMORY: bool = True
+    ANALYTICS_SYNC_INTERVAL_SECONDS: float = 0.0
+    ANALYTICS_POOL_MIN_ROWS: int = 2_000_000
+    ANALYTICS_POOL_WORKERS: int = 2
+    TIMESERIES_MAX_POINTS: int = 5000
+    DASHBOARD_SECTION_TIMEOUT_SECONDS: float = 5.0
+    # Lendings written without counting their borrows per publisher, e.g.
+    # sample data, are counted by a job checking the lendings added since
+    # its last run, up to PUBLISHER_ROLLUP_BATCH_SIZE at a time.
+    PUBLISHER_ROLLUP_CHECK_SECONDS: float = 60.0
+    PUBLISHER_ROLLUP_BATCH_SIZE: int = 100_000
+    # Approximate statistics (`approx=true`) are read from sketches which one
+    # worker at a time updates with new lendings every SKETCH_REFRESH_SECONDS.
+    SKETCH_REFRESH_SECONDS: float = 5.0
+    SKETCH_HLL_PRECISION: int = 11
+    SKETCH_CMS_WIDTH: int = 2048
+    SKETCH_CMS_DEPTH: int = 4
+    SKETCH_TOP_K: int = 100
+    # Lending exports are written by the worker starting them, EXPORT_CHUNK_SIZE
+    # rows at a time, and downloaded from workers sharing EXPORT_DIRECTORY,
+    # relative to the working directory; the Docker image uses `/exports`.
+    EXPORT_DIRECTORY: str = "exports"
+    EXPORT_CHUNK_SIZE: int = 50_000
+    # Requests running at once in a worker by route class, sized against
+    # DB_POOL_MAX_SIZE, and requests waiting at most ADMISSION_QUEUE_TIMEOUT_SECONDS
+    # behind them. Other requests get 503 with `Retry-After`.
+    ADMISSION_LIMITS: dict[str, int] = {"checkout": 32, "catalog": 64, "analytics": 2, "export": 1}
+    ADMISSION_QUEUE_SIZES: dict[str, int] = {"checkout": 128, "catalog": 128, "analytics": 4, "export": 0}
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    # Token buckets per user shared by the workers: bursts of *_BURST requests,
+    # then *_PER_MINUTE requests a minute; a burst of 0 disables the limit.
+    RATE_LIMIT_TOKEN_BURST: int = 10
+    RATE_LIMIT_TOKEN_PER_MINUTE: float = 10.0
+    RATE_LIMIT_LEND_BURST: int = 20
+    RATE_LIMIT_LEND_PER_MINUTE: float = 30.0
+    RATE_LIMIT_PRUNE_SECONDS: float = 600.0
 
 config = AppConfig()
\ No newline at end of file
@@ -1,51 +1,200 @@
 """Module providing containers injecting dependencies."""
+from concurrent.futures import ProcessPoolExecutor
+
 from dependency_injector.containers import DeclarativeContainer
-from dependency_injector.providers import Factory, Singleton
+from dependency_injector.providers import Singleton
 
 from src.infrastructure.repositories.lenddb import LendRepository
 from src.infrastructure.repositories.publisherdb import PublisherRepository
 from src.infrastructure.repositories.userdb import UserRepository
 from src.infrastructure.repositories.bookdb import BookRepository
 from src.infrastructure.repositories.statisticsdb import StatisticsRepository
+from src.infrastructure.repositories.changedb import ChangeRepository
+from src.infrastructure.repositories.exportdb import ExportRepository
+from src.infrastructure.repositories.jobdb import JobRepository
+from src.infrastructure.repositories.recommendationdb import RecommendationRepository
+from src.infrastructure.repositories.sketchdb import SketchRepository
 from src.infrastructure.services.lend import LendService
 from src.infrastructure.services.publisher import PublisherService
 from src.infrastructure.services.statistics import StatisticsService
+from src.infrastructure.services.change import ChangeService
+from src.infrastructure.services.export import ExportService
+from src.infrastructure.services.recommendation import RecommendationService
+from src.infrastructure.services.sketch import SketchService
 
 from src.infrastructure.services.user import UserService
 from src.infrastructure.services.book import BookService
+from src.infrastructure.utils.admission import AdmissionController
+from src.infrastructure.utils.analytics import CategoryIndex, LendingSnapshot
+from src.infrastructure.utils.broadcaster import Broadcaster
+from src.infrastructure.utils.cache import ReadThroughCache, create_cache_backend
+from src.infrastructure.utils.cooccurrence import CoOccurrence
+from src.infrastructure.utils.consts import BOOK_FACETS, CACHE_INVALIDATION_CHANNEL
+from src.infrastructure.utils.facets import FacetIndex
+from src.infrastructure.utils.prefix import PrefixIndex
+from src.infrastructure.utils.scheduler import Scheduler
+from src.infrastructure.utils.sketches import SketchStore
+from src.infrastructure.utils.idempotency import IdempotencyStore
+from src.infrastructure.utils.invalidation import InvalidationBus
+from src.infrastructure.utils.unitofwork import UnitOfWork
+from src.infrastructure.utils.pgnotify import PgNotifyListener
+from src.infrastructure.utils.ratelimit import TokenBucketLimiter
+from src.config import config
+from src.db import database, db_dsn
 
 
 class Container(DeclarativeContainer):
-    """Container class for dependency injecting purposes."""
+    """Container class for dependency injecting purposes.
+
+    Services hold no request state, so one instance of each serves every
+    request. The state of a request, its connection and transaction, lives
+    in the unit of work its endpoint begins.
+    """
     user_repository = Singleton(UserRepository)
     book_repository = Singleton(BookRepository)
     lend_repository = Singleton(LendRepository)
     publisher_repository = Singleton(PublisherRepository)
     statistics_repository = Singleton(StatisticsRepository)
+    change_repository = Singleton(ChangeRepository)
+    recommendation_repository = Singleton(RecommendationRepository)
+    sketch_repository = Singleton(SketchRepository)
+    job_repository = Singleton(JobRepository, dsn=db_dsn)
+    export_repository = Singleton(ExportRepository)
+    unit_of_work = Singleton(UnitOfWork, database=database)
+
+    idempotency_store = Singleton(IdempotencyStore, ttl_seconds=config.IDEMPOTENCY_TTL_SECONDS)
+    notify_listener = Singleton(PgNotifyListener, dsn=db_dsn)
+    admission_controller = Singleton(
+        AdmissionController,
+        limits=config.ADMISSION_LIMITS,
+        queue_sizes=config.ADMISSION_QUEUE_SIZES,
+        queue_timeout=config.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    )
+    token_rate_limiter = Singleton(
+        TokenBucketLimiter,
+        name="token",
+        capacity=config.RATE_LIMIT_TOKEN_BURST,
+        per_minute=config.RATE_LIMIT_TOKEN_PER_MINUTE,
+    )
+    lend_rate_limiter = Singleton(
+        TokenBucketLimiter,
+        name="lend",
+        capacity=config.RATE_LIMIT_LEND_BURST,
+        per_minute=config.RATE_LIMIT_LEND_PER_MINUTE,
+    )
+    scheduler = Singleton(Scheduler, repository=job_repository, tick_seconds=config.SCHEDULER_TICK_SECONDS)
+    availability_broadcaster = Singleton(Broadcaster, buffer_size=config.SSE_BUFFER_SIZE)
+    book_facets = Singleton(
+        FacetIndex,
+        facets=BOOK_FACETS,
+        sync_interval=config.INDEX_SYNC_INTERVAL_SECONDS,
+    )
+    book_suggestions = Singleton(
+        PrefixIndex,
+        max_items=config.SUGGEST_MAX_BOOKS,
+        sync_interval=config.INDEX_SYNC_INTERVAL_SECONDS,
+    )
+
+    cache_backend = Singleton(
+        create_cache_backend,
+        redis_url=config.CACHE_REDIS_URL,
+        max_entries=config.CACHE_MAX_ENTRIES,
+    )
+    book_cooccurrence = Singleton(
+        CoOccurrence,
+        max_user_books=config.RECOMMENDATION_MAX_USER_BOOKS,
+    )
+    lend_snapshot = Singleton(
+        LendingSnapshot,
+        sync_interval=config.ANALYTICS_SYNC_INTERVAL_SECONDS,
+    )
+    book_categories = Singleton(
+        CategoryIndex,
+        sync_interval=config.ANALYTICS_SYNC_INTERVAL_SECONDS,
+    )
+    statistics_sketches = Singleton(
+        SketchStore,
+        precision=config.SKETCH_HLL_PRECISION,
+        width=config.SKETCH_CMS_WIDTH,
+        depth=config.SKETCH_CMS_DEPTH,
+        k=config.SKETCH_TOP_K,
+    )
+    analytics_pool = Singleton(ProcessPoolExecutor, max_workers=config.ANALYTICS_POOL_WORKERS)
+    invalidation_bus = Singleton(InvalidationBus, channel=CACHE_INVALIDATION_CHANNEL)
+    lookup_cache = Singleton(
+        ReadThroughCache,
+        backend=cache_backend,
+        ttl_seconds=config.CACHE_TTL_SECONDS,
+        bus=invalidation_bus,
+    )
 
-    user_service = Factory(
+    user_service = Singleton(
         UserService,
         repository=user_repository,
+        cache=lookup_cache,
     )
 
-    book_service = Factory(
+    book_service = Singleton(
         BookService,
         repository=book_repository,
+        facets=book_facets,
+        suggestions=book_suggestions,
+        change_repository=change_repository,
+        cache=lookup_cache,
     )
 
-    lend_service = Factory(
+    lend_service = Singleton(
         LendService,
         repository=lend_repository,
         book_service=book_service,
         user_service=user_service,
+        cache=lookup_cache,
     )
 
-    publisher_service = Factory(
+    publisher_service = Singleton(
         PublisherService,
         repository=publisher_repository,
+        cache=lookup_cache,
     )
 
-    statistics_service = Factory(
+    statistics_service = Singleton(
         StatisticsService,
         repository=statistics_repository,
-    )
\ No newline at end of file
+        lendings=lend_snapshot,
+        categories=book_categories,
+        change_repository=change_repository,
+        pool=analytics_pool,
+        pool_min_rows=config.ANALYTICS_POOL_MIN_ROWS,
+        in_memory=config.ANALYTICS_IN_MEMORY,
+        max_points=config.TIMESERIES_MAX_POINTS,
+        section_timeout=config.DASHBOARD_SECTION_TIMEOUT_SECONDS,
+        rollup_batch_size=config.PUBLISHER_ROLLUP_BATCH_SIZE,
+    )
+
+    change_service = Singleton(
+        ChangeService,
+        repository=change_repository,
+    )
+
+    recommendation_service = Singleton(
+        RecommendationService,
+        repository=recommendation_repository,
+        matrix=book_cooccurrence,
+        change_repository=change_repository,
+        top_k=config.RECOMMENDATION_TOP_K,
+    )
+
+    sketch_service = Singleton(
+        SketchService,
+        repository=sketch_repository,
+        store=statistics_sketches,
+        change_repository=change_repository,
+        statistics_repository=statistics_repository,
+    )
+
+    export_service = Singleton(
+        ExportService,
+        repository=export_repository,
+        directory=config.EXPORT_DIRECTORY,
+        chunk_size=config.EXPORT_CHUNK_SIZE,
+    )
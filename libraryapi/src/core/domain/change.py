@@ -0,0 +1,23 @@
+"""Module containing change feed domain models."""
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ChangeEvent(BaseModel):
+    """Model representing a single event appended to the outbox."""
+    seq: int
+    entity: str
+    entity_id: str
+    action: str
+    payload: Optional[dict] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+
+class ChangeFeed(BaseModel):
+    """Model representing a page of the change feed."""
+    events: List[ChangeEvent]
+    last_seq: int
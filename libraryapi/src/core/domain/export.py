@@ -0,0 +1,32 @@
+"""Module containing lending export domain models."""
+from datetime import date, datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ExportFormat(str, Enum):
+    """Enum class representing the file formats of lending exports."""
+    parquet = "parquet"
+    arrow = "arrow"
+
+class ExportStatus(str, Enum):
+    """Enum class representing the states of lending exports."""
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+class Export(BaseModel):
+    """Model representing an export of lendings to a columnar file."""
+    id: str
+    format: ExportFormat
+    status: ExportStatus
+    start: Optional[date]
+    end: Optional[date]
+    rows: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
@@ -1,5 +1,7 @@
 """Module containing statistics-related domain models."""
-from typing import List
+from datetime import date
+from enum import Enum
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -15,6 +17,16 @@ class Statistics(BaseModel):
 
     model_config = ConfigDict(from_attributes=True, extra="ignore")
 
+class DistinctBorrowers(BaseModel):
+    """Model representing the number of distinct patrons who borrowed a book."""
+    book_id: int
+    start: Optional[date]
+    end: Optional[date]
+    borrowers: int
+    approximate: bool
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
 class MonthlyBorrowedBooks(BaseModel):
     """Model representing monthly statistics on borrowed books."""
     month: str
@@ -26,14 +38,91 @@ class YearSummary(BaseModel):
     """Model representing yearly statistics for the library."""
     year: int
     total_borrows: int
-    most_borrowed_book_title: str
+    most_borrowed_book_title: Optional[str]
 
     model_config = ConfigDict(from_attributes=True, extra="ignore")
 
+class StoredYearSummaries(BaseModel):
+    """Model representing precomputed yearly summaries and the last lend event they reflect."""
+    seq: int
+    summaries: List[YearSummary]
+
 class MonthlyCategoryStats(BaseModel):
     """Model representing the average number of books borrowed per category each month."""
     month: str
     category: str
     average_borrows_per_month: float
 
-    model_config = ConfigDict(from_attributes=True, extra="ignore")
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+class PublisherStatistics(BaseModel):
+    """Model representing the borrows of the books of one publisher."""
+    publisher_id: int
+    start: Optional[date]
+    end: Optional[date]
+    total_borrows: int
+    top_books: List[TopBorrowedBooks]
+    monthly_borrows: List[MonthlyBorrowedBooks]
+
+class StatisticsDashboard(BaseModel):
+    """Model representing the statistics of the dashboard, computed from one snapshot.
+
+    A section is None when there is no data for it or when it is listed in
+    `incomplete` because it timed out or failed.
+    """
+    top_books: Optional[List[TopBorrowedBooks]] = None
+    monthly_borrowed_books: Optional[List[MonthlyBorrowedBooks]] = None
+    year_summary: Optional[YearSummary] = None
+    category_monthly_averages: Optional[List[MonthlyCategoryStats]] = None
+    incomplete: List[str] = []
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+class Granularity(str, Enum):
+    """Enum class representing the lengths of time series periods, named as in `date_trunc`."""
+    day = "day"
+    week = "week"
+    month = "month"
+    quarter = "quarter"
+    year = "year"
+
+class TimeSeriesPoint(BaseModel):
+    """Model representing the number of borrows in a period starting on `period`."""
+    period: date
+    borrow_count: int
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+class BorrowTimeSeries(BaseModel):
+    """Model representing the numbers of borrows in consecutive periods of a date range."""
+    granularity: Granularity
+    start: date
+    end: date
+    points: List[TimeSeriesPoint]
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+class DurationGrouping(str, Enum):
+    """Enum class representing the groups of loans whose durations are summarized."""
+    book = "book"
+    category = "category"
+    publisher = "publisher"
+
+class DurationBucket(BaseModel):
+    """Model representing the number of loans lasting from `min_days` up to, excluding, `max_days`."""
+    min_days: int
+    max_days: Optional[int]
+    loans: int
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
+
+class LoanDurationStats(BaseModel):
+    """Model representing the distribution of the durations of returned loans, in days."""
+    key: Optional[str]
+    loans: int
+    mean_days: float
+    p50_days: float
+    p90_days: float
+    p99_days: float
+    histogram: List[DurationBucket]
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
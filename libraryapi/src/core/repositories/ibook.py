@@ -1,6 +1,6 @@
 """Module containing book repository abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable, Any
+from typing import AsyncIterator, Iterable, Any, Sequence
 from src.core.domain.book import Book, BookIn
 from src.infrastructure.dto.bookdto import BookAvailabilityDTO
 
@@ -9,20 +9,29 @@ class IBookRepository(ABC):
     """An abstract class representing the protocol of the book repository."""
 
     @abstractmethod
-    async def get_all_books(self) -> Iterable[Any]:
+    async def get_all_books(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """The abstract method to get all books from the data storage.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
             Iterable[Any]: A collection of books from the data storage.
         """
 
     @abstractmethod
-    async def get_book_by_id(self, book_id: int, include_deleted: bool = False) -> Book | None:
+    async def get_book_by_id(
+            self,
+            book_id: int,
+            include_deleted: bool = False,
+            fields: Sequence[str] | None = None,
+    ) -> Book | None:
         """The abstract method to get a book by its ID.
 
         Args:
             book_id (int): The ID of the book.
             include_deleted (bool): Whether to include deleted books in the result.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Book | None: The book details or None if not found.
@@ -63,14 +72,14 @@ class IBookRepository(ABC):
         """
 
     @abstractmethod
-    async def increment_borrowed_count(self, book_id: int) -> None:
+    async def increment_borrowed_count(self, book_id: int) -> int | None:
         """The abstract method to increment the borrow count of a book.
 
         Args:
             book_id (int): The ID of the book whose borrow count is to be incremented.
 
         Returns:
-            None
+            int | None: The new borrow count or None if the book does not exist.
         """
 
     @abstractmethod
@@ -82,11 +91,64 @@ class IBookRepository(ABC):
         """
 
     @abstractmethod
-    async def search_books_by_title(self, title: str) -> Iterable[Any]:
+    async def get_books_by_ids(
+            self,
+            book_ids: Sequence[int],
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """The abstract method to get the books with the given IDs.
+
+        Args:
+            book_ids (Sequence[int]): The IDs of the books.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
+        Returns:
+            Iterable[Any]: The books ordered by ID.
+        """
+
+    @abstractmethod
+    async def get_index_rows(self, book_ids: Iterable[int]) -> Iterable[Any]:
+        """The abstract method to get the columns of active books kept in memory indexes.
+
+        Args:
+            book_ids (Iterable[int]): The IDs of the books.
+
+        Returns:
+            Iterable[Any]: The indexed columns of the books which are not deleted.
+        """
+
+    @abstractmethod
+    def iterate_index_rows(self) -> AsyncIterator[Any]:
+        """The abstract method to stream the indexed columns of all active books.
+
+        Returns:
+            AsyncIterator[Any]: The rows, most borrowed books first.
+        """
+
+    @abstractmethod
+    async def get_book_version(self, book_id: int) -> str | None:
+        """The abstract method to get the version token of a book.
+
+        The token changes whenever the book or its publisher changes.
+
+        Args:
+            book_id (int): The ID of the book.
+
+        Returns:
+            str | None: The version token or None if the book does not exist.
+        """
+
+    @abstractmethod
+    async def search_books_by_title(
+            self,
+            title: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """Searches for books by title.
 
         Args:
             title (str): The title of the book to search for.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Iterable[Any]: A collection of books from the data storage.
@@ -96,11 +158,16 @@ class IBookRepository(ABC):
         """
 
     @abstractmethod
-    async def search_books_by_author(self, author: str) -> Iterable[Any]:
+    async def search_books_by_author(
+            self,
+            author: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """Searches for books by author.
 
         Args:
             author (str): The author of the book to search for.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Iterable[Any]: A collection of books from the data storage.
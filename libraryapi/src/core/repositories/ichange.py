@@ -0,0 +1,50 @@
+"""Module containing change feed repository abstractions."""
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+
+from src.core.domain.change import ChangeEvent
+
+
+class IChangeRepository(ABC):
+    """An abstract class representing the protocol of the change feed repository."""
+
+    @abstractmethod
+    async def get_changes(
+            self,
+            after: int,
+            limit: int,
+            entities: Iterable[str] | None = None,
+    ) -> List[ChangeEvent]:
+        """The abstract method to get the events appended after a sequence number.
+
+        Args:
+            after (int): The last sequence number already seen by the consumer.
+            limit (int): The maximum number of events to return.
+            entities (Iterable[str] | None, optional): The kinds of entities to include, all if None.
+
+        Returns:
+            List[ChangeEvent]: The events ordered by their sequence number.
+        """
+
+    @abstractmethod
+    async def get_last_seq(self, entities: Iterable[str]) -> int:
+        """The abstract method to get the sequence number of the latest event.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            int: The latest sequence number or 0 if there are no events.
+        """
+
+    @abstractmethod
+    async def get_read_version(self, entities: Iterable[str]) -> str:
+        """The abstract method to get a token changing with every committed event seen by reads.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            str: The version token on the database serving the reads of the
+                request, counting numbered and not yet numbered events.
+        """
@@ -0,0 +1,68 @@
+"""Module containing lending export repository abstractions."""
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, AsyncIterator, Optional, Sequence
+
+
+class IExportRepository(ABC):
+    """An abstract class representing the protocol of the lending export repository."""
+
+    @abstractmethod
+    def iterate_lendings(
+            self,
+            start: Optional[date],
+            end: Optional[date],
+            chunk_size: int,
+    ) -> AsyncIterator[Sequence[Sequence[Any]]]:
+        """The abstract method to stream lendings with the attributes of their books and publishers.
+
+        Args:
+            start (Optional[date]): The first borrow day exported.
+            end (Optional[date]): The last borrow day exported.
+            chunk_size (int): The number of rows fetched at once.
+
+        Yields:
+            Sequence[Sequence[Any]]: The chunks of rows, with values in the
+                order of `EXPORT_COLUMNS`.
+        """
+
+    @abstractmethod
+    async def add_export(
+            self,
+            export_id: str,
+            export_format: str,
+            start: Optional[date],
+            end: Optional[date],
+    ) -> Any:
+        """The abstract method to record a started export.
+
+        Args:
+            export_id (str): The ID of the export.
+            export_format (str): The file format.
+            start (Optional[date]): The first borrow day exported.
+            end (Optional[date]): The last borrow day exported.
+
+        Returns:
+            Any: The recorded export.
+        """
+
+    @abstractmethod
+    async def finish_export(self, export_id: str, rows: Optional[int], error: Optional[str] = None) -> None:
+        """The abstract method to record the end of an export.
+
+        Args:
+            export_id (str): The ID of the export.
+            rows (Optional[int]): The number of exported rows, None on failure.
+            error (Optional[str], optional): The error which ended the export, if any.
+        """
+
+    @abstractmethod
+    async def get_export(self, export_id: str) -> Any | None:
+        """The abstract method to get an export.
+
+        Args:
+            export_id (str): The ID of the export.
+
+        Returns:
+            Any | None: The export if it exists.
+        """
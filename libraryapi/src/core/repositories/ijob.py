@@ -0,0 +1,47 @@
+"""Module containing scheduled job repository abstractions."""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncContextManager, Iterable, Optional
+
+
+class IJobRepository(ABC):
+    """An abstract class representing the protocol of the scheduled job repository."""
+
+    @abstractmethod
+    async def hold_leader_lock(self) -> bool:
+        """The abstract method taking the scheduler lock if it is free, or checking it is still held.
+
+        Returns:
+            bool: Whether this worker holds the lock.
+        """
+
+    @abstractmethod
+    async def release_leader_lock(self) -> None:
+        """The abstract method releasing the scheduler lock if this worker holds it."""
+
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager[None]:
+        """The abstract method opening the transaction of one run of a job.
+
+        Returns:
+            AsyncContextManager[None]: The context committing the run, or rolling it back on errors.
+        """
+
+    @abstractmethod
+    async def get_runs(self) -> Iterable[Any]:
+        """The abstract method getting the last run of every job.
+
+        Returns:
+            Iterable[Any]: The rows with a `name`, `last_started_at`,
+                `last_finished_at` and `last_error`.
+        """
+
+    @abstractmethod
+    async def save_run(self, name: str, started_at: datetime, error: Optional[str] = None) -> None:
+        """The abstract method recording a finished run of a job.
+
+        Args:
+            name (str): The name of the job.
+            started_at (datetime): The start of the run.
+            error (Optional[str], optional): The error which ended the run, if any.
+        """
@@ -1,7 +1,7 @@
 """Module containing lend repository abstractions."""
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import Iterable, Any
+from typing import Iterable, Any, Sequence
 
 from pydantic import UUID4
 
@@ -13,24 +13,43 @@ class ILendRepository(ABC):
     """An abstract class representing the protocol of the lend repository."""
 
     @abstractmethod
-    async def get_all_lends(self) -> Iterable[Any]:
+    async def get_all_lends(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """The abstract method to get all lend transactions from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
             Iterable[Any]: A collection of all lend transactions from the repository.
         """
 
     @abstractmethod
-    async def get_lend_by_id(self, lend_id: int) -> Lend | None:
+    async def get_lend_by_id(
+            self,
+            lend_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> Lend | None:
         """The abstract method to get a lend transaction by its ID.
 
         Args:
             lend_id (int): The ID of the lend transaction.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Lend | None: The lend transaction details or None if not found.
         """
 
+    @abstractmethod
+    async def get_lends_by_ids(self, lend_ids: Sequence[int]) -> Iterable[Any]:
+        """The abstract method to get the lend transactions with the given IDs.
+
+        Args:
+            lend_ids (Sequence[int]): The IDs of the lend transactions.
+
+        Returns:
+            Iterable[Any]: The lend transactions which exist.
+        """
+
     @abstractmethod
     async def add_lend(self, data: Lend) -> Any | None:
         """The abstract method to add a new lend transaction to the repository.
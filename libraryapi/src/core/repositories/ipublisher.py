@@ -1,6 +1,6 @@
 """Module containing publisher repository abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable, Any
+from typing import Iterable, Any, Sequence
 
 from src.core.domain.publisher import Publisher, PublisherIn
 
@@ -9,24 +9,43 @@ class IPublisherRepository(ABC):
     """An abstract class representing the protocol of the publisher repository."""
 
     @abstractmethod
-    async def get_all_publishers(self) -> Iterable[Any]:
+    async def get_all_publishers(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """The abstract method to get all publishers from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
             Iterable[Any]: A collection of all publishers from the repository.
         """
 
     @abstractmethod
-    async def get_publisher_by_id(self, publisher_id: int) -> Publisher | None:
+    async def get_publisher_by_id(
+            self,
+            publisher_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> Publisher | None:
         """The abstract method to get a publisher by its ID.
 
         Args:
             publisher_id (int): The ID of the publisher.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Publisher | None: The publisher details or None if not found.
         """
 
+    @abstractmethod
+    async def get_publishers_by_ids(self, publisher_ids: Sequence[int]) -> Iterable[Publisher]:
+        """The abstract method to get the publishers with the given IDs.
+
+        Args:
+            publisher_ids (Sequence[int]): The IDs of the publishers.
+
+        Returns:
+            Iterable[Publisher]: The publishers which exist.
+        """
+
     @abstractmethod
     async def add_publisher(self, data: PublisherIn) -> Publisher | None:
         """The abstract method to add a new publisher to the repository.
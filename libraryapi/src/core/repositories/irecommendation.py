@@ -0,0 +1,53 @@
+"""Module containing recommendation repository abstractions."""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncContextManager, Iterable, Mapping
+
+import numpy as np
+
+
+class IRecommendationRepository(ABC):
+    """An abstract class representing the protocol of the recommendation repository."""
+
+    @abstractmethod
+    async def get_recommendations(self, book_id: int, limit: int) -> Iterable[Any]:
+        """The abstract method getting the precomputed neighbors of a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            limit (int): The maximum number of neighbors.
+
+        Returns:
+            Iterable[Any]: The neighbors with their title, author and score, best first.
+        """
+
+    @abstractmethod
+    async def get_borrow_pairs(self) -> Iterable[Any]:
+        """The abstract method getting the distinct `(user_id, book_id)` pairs of all lendings.
+
+        Returns:
+            Iterable[Any]: The pairs.
+        """
+
+    @abstractmethod
+    def refresh_lock(self) -> AsyncContextManager[bool]:
+        """The abstract method opening a transaction holding the refresh lock if it is free.
+
+        Returns:
+            AsyncContextManager[bool]: The context yielding whether the lock was acquired.
+        """
+
+    @abstractmethod
+    async def save_recommendations(
+            self,
+            book_ids: list[int],
+            neighbors: Mapping[str, np.ndarray],
+            replace_all: bool = False,
+    ) -> None:
+        """The abstract method replacing the neighbors of books.
+
+        Args:
+            book_ids (list[int]): The IDs of the books whose neighbors are replaced.
+            neighbors (Mapping[str, np.ndarray]): The aligned `book_id`, `rank`,
+                `neighbor_id` and `score` arrays.
+            replace_all (bool, optional): Whether to drop the neighbors of every book first.
+        """
@@ -0,0 +1,54 @@
+"""Module containing sketch repository abstractions."""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncContextManager, AsyncIterator, Iterable
+
+
+class ISketchRepository(ABC):
+    """An abstract class representing the protocol of the statistics sketch repository."""
+
+    @abstractmethod
+    async def get_sketches(self, kind: str, book_id: int, first_period: str, last_period: str) -> list[bytes]:
+        """The abstract method getting the saved sketches of a book in a range of periods.
+
+        Args:
+            kind (str): The kind of the sketches.
+            book_id (int): The ID of the book, 0 for sketches of all books.
+            first_period (str): The first period.
+            last_period (str): The last period.
+
+        Returns:
+            list[bytes]: The serialized sketches.
+        """
+
+    @abstractmethod
+    def iterate_sketches(self) -> AsyncIterator[Any]:
+        """The abstract method streaming all saved sketches.
+
+        Returns:
+            AsyncIterator[Any]: The rows with a `kind`, `book_id`, `period`, `data` and `seq`.
+        """
+
+    @abstractmethod
+    def iterate_borrows(self) -> AsyncIterator[Any]:
+        """The abstract method streaming the book, patron and day of all lendings.
+
+        Returns:
+            AsyncIterator[Any]: The rows with a `book_id`, `user_id` and `borrowed_date`.
+        """
+
+    @abstractmethod
+    def refresh_lock(self) -> AsyncContextManager[bool]:
+        """The abstract method opening a transaction holding the refresh lock if it is free.
+
+        Returns:
+            AsyncContextManager[bool]: The context yielding whether the lock was acquired.
+        """
+
+    @abstractmethod
+    async def save_sketches(self, rows: Iterable[dict[str, Any]], seq: int) -> None:
+        """The abstract method inserting or replacing sketches.
+
+        Args:
+            rows (Iterable[dict[str, Any]]): The sketches with a `kind`, `book_id`, `period` and `data`.
+            seq (int): The last outbox event counted by the sketches.
+        """
@@ -1,17 +1,36 @@
 """Module containing statistics repository abstractions."""
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import date
+from typing import Any, AsyncIterator, Iterable, List, Optional
 
-from src.core.domain.statistics import TopBorrowedBooks, MonthlyBorrowedBooks, YearSummary, MonthlyCategoryStats
+from src.core.domain.statistics import (
+    DurationGrouping,
+    Granularity,
+    LoanDurationStats,
+    MonthlyBorrowedBooks,
+    MonthlyCategoryStats,
+    StoredYearSummaries,
+    TimeSeriesPoint,
+    TopBorrowedBooks,
+    YearSummary,
+)
 
 
 class IStatisticsRepository(ABC):
     """An abstract class representing the protocol of the statistics repository."""
 
     @abstractmethod
-    async def get_top_borrowed_books(self) -> List[TopBorrowedBooks]:
+    async def get_top_borrowed_books(
+            self,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> List[TopBorrowedBooks]:
         """The abstract method to get a list of the top borrowed books.
 
+        Args:
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
         Returns:
             List[TopBorrowedBooks]: A list of top borrowed books.
         """
@@ -35,10 +54,220 @@ class IStatisticsRepository(ABC):
             YearSummary: The summary of book borrowing for the given year.
         """
 
+    @abstractmethod
+    async def get_stored_year_summaries(self, first_year: int, last_year: int) -> StoredYearSummaries:
+        """The abstract method to get the precomputed summaries of a range of years.
+
+        Args:
+            first_year (int): The first year.
+            last_year (int): The last year.
+
+        Returns:
+            StoredYearSummaries: The summaries of the years with lendings, oldest first.
+        """
+
+    @abstractmethod
+    async def get_year_summaries_seq(self) -> Optional[int]:
+        """The abstract method to get the last lend event reflected by every precomputed yearly summary.
+
+        Returns:
+            Optional[int]: The sequence number, None without summaries.
+        """
+
+    @abstractmethod
+    async def compute_year_summaries(self, year: Optional[int] = None) -> Iterable[Any]:
+        """The abstract method to summarize the lendings of every year.
+
+        Args:
+            year (Optional[int], optional): Summarizes only this year.
+
+        Returns:
+            Iterable[Any]: The rows with a `year`, `total_borrows` and
+                `most_borrowed_book_id` for every year with lendings.
+        """
+
+    @abstractmethod
+    async def save_year_summaries(self, rows: Iterable[Any], seq: int, year: Optional[int] = None) -> None:
+        """The abstract method to replace precomputed yearly summaries.
+
+        Args:
+            rows (Iterable[Any]): The new summaries, as from `compute_year_summaries`.
+            seq (int): The last lend event reflected by every summary after saving.
+            year (Optional[int], optional): Replaces only the summary of this year.
+        """
+
     @abstractmethod
     async def get_average_borrowed_per_category_monthly(self) -> List[MonthlyCategoryStats]:
         """The abstract method to get the average number of books borrowed per category each month.
 
         Returns:
             List[MonthlyCategoryStats]: A list of monthly statistics for each category, including the average borrows per month.
-        """
\ No newline at end of file
+        """
+    @abstractmethod
+    async def get_borrow_timeseries(
+            self,
+            start: date,
+            end: date,
+            granularity: Granularity,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+    ) -> List[TimeSeriesPoint]:
+        """The abstract method to get the number of borrows in every period of a date range.
+
+        Args:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            granularity (Granularity): The length of the periods.
+            book_id (Optional[int], optional): Counts only borrows of this book.
+            category (Optional[str], optional): Counts only borrows of books of this category.
+            publisher_id (Optional[int], optional): Counts only borrows of books of this publisher.
+
+        Returns:
+            List[TimeSeriesPoint]: Every period overlapping the range, including
+                periods without borrows, oldest first.
+        """
+
+    @abstractmethod
+    async def get_loan_durations(
+            self,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+            group_by: Optional[DurationGrouping] = None,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+            limit: int = 50,
+    ) -> List[LoanDurationStats]:
+        """The abstract method to get the distribution of the durations of returned loans.
+
+        Args:
+            start (Optional[date], optional): The first borrow day of the loans.
+            end (Optional[date], optional): The last borrow day of the loans.
+            group_by (Optional[DurationGrouping], optional): Summarizes the
+                loans of every book, category or publisher instead of all loans.
+            book_id (Optional[int], optional): Summarizes only loans of this book.
+            category (Optional[str], optional): Summarizes only loans of books of this category.
+            publisher_id (Optional[int], optional): Summarizes only loans of books of this publisher.
+            limit (int, optional): The maximum number of groups, those with the most loans.
+
+        Returns:
+            List[LoanDurationStats]: The distributions, most loans first, or a
+                single distribution without a key when not grouped.
+        """
+
+    @abstractmethod
+    async def get_distinct_borrowers(
+            self,
+            book_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> int:
+        """The abstract method to count the distinct patrons who borrowed a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Returns:
+            int: The number of patrons.
+        """
+
+    @abstractmethod
+    async def get_publisher_top_books(
+            self,
+            publisher_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+            limit: int = 10,
+    ) -> List[TopBorrowedBooks]:
+        """The abstract method to get the most borrowed books of a publisher from its rollups.
+
+        Args:
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+            limit (int, optional): The maximum number of books.
+
+        Returns:
+            List[TopBorrowedBooks]: The books, most borrowed first.
+        """
+
+    @abstractmethod
+    async def get_publisher_monthly_borrows(
+            self,
+            publisher_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> List[MonthlyBorrowedBooks]:
+        """The abstract method to get the borrows of the books of a publisher per month from its rollups.
+
+        Args:
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Returns:
+            List[MonthlyBorrowedBooks]: The months with borrows, e.g. `2024-05`, oldest first.
+        """
+
+    @abstractmethod
+    async def reconcile_publisher_rollups(self, batch_size: int) -> int:
+        """The abstract method to add the lendings added since the last check to the rollups if they miss them.
+
+        Args:
+            batch_size (int): The maximum number of lendings checked.
+
+        Returns:
+            int: The number of corrected rollups.
+        """
+
+    @abstractmethod
+    def iterate_lend_rows(self) -> AsyncIterator[Any]:
+        """The abstract method to stream the columns of all lends kept in the analytics snapshot.
+
+        Yields:
+            Any: The rows.
+        """
+
+    @abstractmethod
+    async def get_lend_rows(self, lend_ids: Iterable[int]) -> Iterable[Any]:
+        """The abstract method to get the columns of lends kept in the analytics snapshot.
+
+        Args:
+            lend_ids (Iterable[int]): The IDs of the lends.
+
+        Returns:
+            Iterable[Any]: The rows of the existing lends.
+        """
+
+    @abstractmethod
+    def iterate_category_rows(self) -> AsyncIterator[Any]:
+        """The abstract method to stream the categories of all books.
+
+        Yields:
+            Any: The rows with an `id` and `categories`.
+        """
+
+    @abstractmethod
+    async def get_category_rows(self, book_ids: Iterable[int]) -> Iterable[Any]:
+        """The abstract method to get the categories of books.
+
+        Args:
+            book_ids (Iterable[int]): The IDs of the books.
+
+        Returns:
+            Iterable[Any]: The rows of the existing books.
+        """
+
+    @abstractmethod
+    async def get_book_titles(self, book_ids: Iterable[int]) -> dict[int, str]:
+        """The abstract method to get the titles of books.
+
+        Args:
+            book_ids (Iterable[int]): The IDs of the books.
+
+        Returns:
+            dict[int, str]: The titles keyed by book ID.
+        """
@@ -1,6 +1,6 @@
 """Module containing user repository abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable, Any
+from typing import Iterable, Any, Sequence
 
 from pydantic import UUID5, UUID4
 
@@ -44,24 +44,43 @@ class IUserRepository(ABC):
         """
 
     @abstractmethod
-    async def get_all_users(self) -> Iterable[Any]:
+    async def get_all_users(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """Fetches all users from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
             Iterable[Any]: A collection of all users.
         """
 
     @abstractmethod
-    async def get_user_by_id(self, user_id: int) -> User | None:
+    async def get_user_by_id(
+            self,
+            user_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> User | None:
         """Fetches a user by their ID.
 
         Args:
             user_id (int): The ID of the user.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             User | None: The user associated with the provided ID, or None if not found.
         """
 
+    @abstractmethod
+    async def get_users_by_ids(self, user_uuids: Sequence[UUID4 | str]) -> Iterable[Any]:
+        """Fetches the users with the given IDs.
+
+        Args:
+            user_uuids (Sequence[UUID4 | str]): The UUIDs of the users.
+
+        Returns:
+            Iterable[Any]: The users which exist.
+        """
+
     # @abstractmethod
     # async def add_user(self, data: UserIn) -> Any | None:
     #     """Adds a new user to the repository.
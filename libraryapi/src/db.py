@@ -1,11 +1,16 @@
 """A module providing database access."""
 import asyncio
-from sqlalchemy.dialects.postgresql import UUID
+import hashlib
+from typing import Any
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 import databases
 import sqlalchemy
 from sqlalchemy import Enum
 from sqlalchemy.exc import OperationalError, DatabaseError
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlalchemy.ext.asyncio import create_async_engine
 from asyncpg.exceptions import (    # type: ignore
     CannotConnectNowError,
@@ -13,6 +18,7 @@ from asyncpg.exceptions import (    # type: ignore
 )
 
 from src.config import config
+from src.infrastructure.utils.replicas import ReadRouter
 
 metadata = sqlalchemy.MetaData()
 
@@ -48,6 +54,7 @@ book_table = sqlalchemy.Table(
     sqlalchemy.Column("genre", sqlalchemy.String, nullable=True),
     sqlalchemy.Column("quantity", sqlalchemy.Integer, default=1, nullable=False),
     sqlalchemy.Column("is_deleted", sqlalchemy.Boolean, default=False, nullable=False),
+    sqlalchemy.Column("version", sqlalchemy.Integer, default=1, server_default="1", nullable=False),
 )
 
 lend_table = sqlalchemy.Table(
@@ -61,6 +68,16 @@ lend_table = sqlalchemy.Table(
     sqlalchemy.Column("returned_date", sqlalchemy.Date, nullable=True),
     sqlalchemy.Column("status", Enum("borrowed", "returned", name="lend_status"), nullable=False, default="borrowed"),
 )
+# Range predicates of the statistics time series.
+sqlalchemy.Index("ix_lendings_borrowed_date", lend_table.c.borrowed_date)
+sqlalchemy.Index("ix_lendings_book_id_borrowed_date", lend_table.c.book_id, lend_table.c.borrowed_date)
+# Covers the loan duration statistics, which only read returned lendings.
+sqlalchemy.Index(
+    "ix_lendings_returned_borrowed_date",
+    lend_table.c.borrowed_date,
+    postgresql_include=["returned_date", "book_id"],
+    postgresql_where=lend_table.c.returned_date.isnot(None),
+)
 
 publisher_table = sqlalchemy.Table(
     "publishers",
@@ -69,13 +86,207 @@ publisher_table = sqlalchemy.Table(
     sqlalchemy.Column("company_name", sqlalchemy.String, nullable=False),
     sqlalchemy.Column("contact_email", sqlalchemy.String, nullable=True),
     sqlalchemy.Column("user_id", UUID(as_uuid=True), sqlalchemy.ForeignKey("users.id"), nullable=False),
+    sqlalchemy.Column("version", sqlalchemy.Integer, default=1, server_default="1", nullable=False),
+)
+
+# The ID of the transaction appending an event, comparable with `pg_current_snapshot()`.
+CURRENT_XID = "CAST(CAST(pg_current_xact_id() AS text) AS bigint)"
+
+# Events are inserted with a `seq` of NULL and numbered once every transaction
+# which could still insert an earlier event has ended, see `publish_events`.
+outbox_table = sqlalchemy.Table(
+    "outbox",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.BigInteger, sqlalchemy.Identity(), primary_key=True),
+    sqlalchemy.Column("seq", sqlalchemy.BigInteger, nullable=True),
+    sqlalchemy.Column("xid", sqlalchemy.BigInteger, server_default=sqlalchemy.text(CURRENT_XID), nullable=False),
+    sqlalchemy.Column("entity", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("entity_id", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("action", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("payload", JSONB, nullable=True),
+    sqlalchemy.Column(
+        "created_at",
+        sqlalchemy.DateTime(timezone=True),
+        server_default=sqlalchemy.func.now(),
+        nullable=False,
+    ),
+)
+sqlalchemy.Index("ix_outbox_entity_seq", outbox_table.c.entity, outbox_table.c.seq)
+sqlalchemy.Index("ix_outbox_seq", outbox_table.c.seq, unique=True)
+sqlalchemy.Index("ix_outbox_unpublished", outbox_table.c.id, postgresql_where=outbox_table.c.seq.is_(None))
+
+# The precomputed neighbors of every book, served by a primary key lookup.
+recommendation_table = sqlalchemy.Table(
+    "book_recommendations",
+    metadata,
+    sqlalchemy.Column(
+        "book_id",
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey("books.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    sqlalchemy.Column("rank", sqlalchemy.SmallInteger, primary_key=True),
+    sqlalchemy.Column(
+        "neighbor_id",
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey("books.id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    sqlalchemy.Column("score", sqlalchemy.Float, nullable=False),
+)
+
+# Serialized probabilistic sketches of approximate statistics, e.g. the
+# distinct borrowers of a book in a month. Sketches of all books have book 0.
+sketch_table = sqlalchemy.Table(
+    "statistics_sketches",
+    metadata,
+    sqlalchemy.Column("kind", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("book_id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("period", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("data", sqlalchemy.LargeBinary, nullable=False),
+    # The last outbox event counted when the sketch was saved.
+    sqlalchemy.Column("seq", sqlalchemy.BigInteger, nullable=False),
+)
+
+# The last run of every scheduled job, shared by the workers.
+job_table = sqlalchemy.Table(
+    "scheduled_jobs",
+    metadata,
+    sqlalchemy.Column("name", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("last_started_at", sqlalchemy.DateTime(timezone=True), nullable=False),
+    sqlalchemy.Column("last_finished_at", sqlalchemy.DateTime(timezone=True), nullable=False),
+    sqlalchemy.Column("last_error", sqlalchemy.String, nullable=True),
+)
+
+# Precomputed yearly summaries, reflecting the lend events up to `seq`.
+year_summary_table = sqlalchemy.Table(
+    "year_summaries",
+    metadata,
+    sqlalchemy.Column("year", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("total_borrows", sqlalchemy.Integer, nullable=False),
+    sqlalchemy.Column(
+        "most_borrowed_book_id",
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey("books.id", ondelete="SET NULL"),
+        nullable=True,
+    ),
+    sqlalchemy.Column("seq", sqlalchemy.BigInteger, nullable=False),
+)
+
+# Borrows per publisher, day and book, updated by every lending write, so
+# the statistics of a publisher read only its rows in the requested days.
+publisher_rollup_table = sqlalchemy.Table(
+    "publisher_daily_borrows",
+    metadata,
+    sqlalchemy.Column("publisher_id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("day", sqlalchemy.Date, primary_key=True),
+    sqlalchemy.Column("book_id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("borrows", sqlalchemy.Integer, nullable=False),
+)
+
+# The highest lending ID whose borrows were checked against the rollups.
+rollup_watermark_table = sqlalchemy.Table(
+    "rollup_watermarks",
+    metadata,
+    sqlalchemy.Column("name", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("lend_id", sqlalchemy.BigInteger, nullable=False),
+)
+
+# Exports of the lendings to columnar files, tracked across workers.
+export_table = sqlalchemy.Table(
+    "lending_exports",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("format", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("status", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("start", sqlalchemy.Date, nullable=True),
+    sqlalchemy.Column("end", sqlalchemy.Date, nullable=True),
+    sqlalchemy.Column("rows", sqlalchemy.BigInteger, nullable=True),
+    sqlalchemy.Column("error", sqlalchemy.String, nullable=True),
+    sqlalchemy.Column(
+        "created_at",
+        sqlalchemy.DateTime(timezone=True),
+        server_default=sqlalchemy.func.now(),
+        nullable=False,
+    ),
+    sqlalchemy.Column("finished_at", sqlalchemy.DateTime(timezone=True), nullable=True),
 )
 
-db_uri = (
-    f"postgresql+asyncpg://{config.DB_USER}:{config.DB_PASSWORD}"
+# Token buckets of the per-user rate limits, shared by every worker. The
+# table is unlogged: losing the buckets in a crash only refills them.
+rate_limit_table = sqlalchemy.Table(
+    "rate_limit_buckets",
+    metadata,
+    sqlalchemy.Column("key", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("tokens", sqlalchemy.Float, nullable=False),
+    sqlalchemy.Column("granted", sqlalchemy.Boolean, nullable=False),
+    sqlalchemy.Column("updated_at", sqlalchemy.DateTime(timezone=True), nullable=False),
+    prefixes=["UNLOGGED"],
+)
+
+# Responses of requests sent with an `Idempotency-Key`, by digest of the scoped key.
+idempotency_table = sqlalchemy.Table(
+    "idempotency_keys",
+    metadata,
+    sqlalchemy.Column("key", sqlalchemy.LargeBinary, primary_key=True),
+    sqlalchemy.Column("fingerprint", sqlalchemy.LargeBinary, nullable=False),
+    sqlalchemy.Column("response", JSONB, nullable=True),
+    sqlalchemy.Column("expires_at", sqlalchemy.DateTime(timezone=True), nullable=False),
+)
+sqlalchemy.Index("ix_idempotency_keys_expires_at", idempotency_table.c.expires_at)
+
+# The fingerprint of the schema applied last, so workers skip DDL when it matches.
+schema_version_table = sqlalchemy.Table(
+    "schema_version",
+    metadata,
+    sqlalchemy.Column("fingerprint", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column(
+        "applied_at",
+        sqlalchemy.DateTime(timezone=True),
+        server_default=sqlalchemy.func.now(),
+        nullable=False,
+    ),
+)
+
+# Arbitrary application-wide key of the advisory lock letting one worker apply the schema.
+SCHEMA_LOCK_KEY = 27_000_005
+
+# Idempotent DDL bringing tables created by older releases up to date,
+# since `create_all` only creates missing tables.
+schema_upgrades = [
+    "ALTER TABLE books ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE publishers ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "CREATE INDEX IF NOT EXISTS ix_lendings_borrowed_date ON lendings (borrowed_date)",
+    "CREATE INDEX IF NOT EXISTS ix_lendings_book_id_borrowed_date ON lendings (book_id, borrowed_date)",
+    "CREATE INDEX IF NOT EXISTS ix_lendings_returned_borrowed_date ON lendings (borrowed_date)"
+    " INCLUDE (returned_date, book_id) WHERE returned_date IS NOT NULL",
+    # Outboxes numbered by an identity `seq` at insert time get an insert `id`.
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'outbox' AND column_name = 'id'
+        ) THEN
+            ALTER TABLE outbox DROP CONSTRAINT outbox_pkey;
+            ALTER TABLE outbox ALTER COLUMN seq DROP IDENTITY IF EXISTS;
+            ALTER TABLE outbox ALTER COLUMN seq DROP NOT NULL;
+            ALTER TABLE outbox ADD COLUMN id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY;
+            ALTER TABLE outbox ADD COLUMN xid BIGINT NOT NULL DEFAULT {CURRENT_XID};
+        END IF;
+    END $$
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_outbox_seq ON outbox (seq)",
+    "CREATE INDEX IF NOT EXISTS ix_outbox_unpublished ON outbox (id) WHERE seq IS NULL",
+]
+
+db_dsn = (
+    f"postgresql://{config.DB_USER}:{config.DB_PASSWORD}"
     f"@{config.DB_HOST}/{config.DB_NAME}"
 )
 
+db_uri = db_dsn.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 engine = create_async_engine(
     db_uri,
     echo=True,
@@ -85,21 +296,86 @@ engine = create_async_engine(
 
 database = databases.Database(
     db_uri,
-    force_rollback=True,
+    force_rollback=config.DB_FORCE_ROLLBACK,
+    min_size=config.DB_POOL_MIN_SIZE,
+    max_size=config.DB_POOL_MAX_SIZE,
 )
 
-async def init_db(retries: int = 5, delay: int = 5) -> None:
-    """Function initializing the DB.
+replica_databases = [
+    databases.Database(
+        f"postgresql+asyncpg://{config.DB_USER}:{config.DB_PASSWORD}@{host}/{config.DB_NAME}",
+        min_size=config.DB_POOL_MIN_SIZE,
+        max_size=config.DB_POOL_MAX_SIZE,
+    )
+    for host in ([] if config.DB_FORCE_ROLLBACK else config.DB_REPLICA_HOSTS)
+]
+
+# Used by repository reads which tolerate a lag of DB_REPLICA_MAX_LAG_SECONDS.
+read_database = ReadRouter(
+    database,
+    replica_databases,
+    max_lag_seconds=config.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=config.DB_REPLICA_CHECK_SECONDS,
+)
+
+def schema_fingerprint() -> str:
+    """Function hashing the DDL of the tables, indexes and upgrades of this release.
+
+    Returns:
+        str: The fingerprint, changed by any change of the schema.
+    """
+    dialect = postgresql.dialect()
+    statements = [str(CreateTable(table).compile(dialect=dialect)) for table in metadata.sorted_tables]
+    statements += [
+        str(CreateIndex(index).compile(dialect=dialect))
+        for table in metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda index: index.name)
+    ]
+
+    return hashlib.sha256("\n".join(statements + schema_upgrades).encode()).hexdigest()
+
+
+async def applied_fingerprint(conn: Any) -> str | None:
+    """Function reading the fingerprint of the schema applied last.
+
+    Args:
+        conn (Any): The connection of the engine.
+
+    Returns:
+        str | None: The fingerprint, None before the first start.
+    """
+    if not await conn.scalar(sqlalchemy.text("SELECT to_regclass('schema_version') IS NOT NULL")):
+        return None
+
+    return await conn.scalar(sqlalchemy.select(schema_version_table.c.fingerprint))
+
+
+async def init_db(retries: int = 5, delay: float = 0.5) -> None:
+    """Function bringing the DB schema up to date.
+
+    The DDL runs only when the recorded fingerprint differs from the one of
+    this release, e.g. at the first start after an upgrade, and then in one
+    worker at a time; the others find the schema applied once they get the lock.
 
     Args:
         retries (int, optional): Number of retries of connect to DB.
             Defaults to 5.
-        delay (int, optional): Delay of connect do DB. Defaults to 2.
+        delay (float, optional): Delay before the first retry, doubled
+            after every failure up to 5 seconds. Defaults to 0.5.
     """
+    fingerprint = schema_fingerprint()
     for attempt in range(retries):
         try:
             async with engine.begin() as conn:
-                await conn.run_sync(metadata.create_all)
+                if await applied_fingerprint(conn) != fingerprint:
+                    await conn.execute(sqlalchemy.text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+                    if await applied_fingerprint(conn) != fingerprint:
+                        await conn.run_sync(metadata.create_all)
+                        for statement in schema_upgrades:
+                            await conn.execute(sqlalchemy.text(statement))
+                        await conn.execute(schema_version_table.delete())
+                        await conn.execute(schema_version_table.insert().values(fingerprint=fingerprint))
+            await engine.dispose()
             return
         except (
             OperationalError,
@@ -108,6 +384,6 @@ async def init_db(retries: int = 5, delay: int = 5) -> None:
             ConnectionDoesNotExistError,
         ) as e:
             print(f"Attempt {attempt + 1} failed: {e}")
-            await asyncio.sleep(delay)
+            await asyncio.sleep(min(delay * 2 ** attempt, 5))
 
     raise ConnectionError("Could not connect to DB after several retries.")
\ No newline at end of file
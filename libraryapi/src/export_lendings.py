@@ -0,0 +1,50 @@
+"""A command exporting the lendings to a columnar file for analytics.
+
+Streams every lending with the attributes of its book and publisher from a
+server-side cursor into a Parquet file or an Arrow IPC stream, one chunk
+at a time, without holding the table in memory. Requires `pyarrow`.
+
+Usage (from the `libraryapi` directory):
+    python -m src.export_lendings --output lendings.parquet
+    python -m src.export_lendings --format arrow --from 2024-01-01 --output lendings.arrows
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from src.container import Container
+from src.core.domain.export import ExportFormat
+from src.db import database, read_database
+
+
+async def export_lendings(args: argparse.Namespace) -> None:
+    """Connect to the database and write the export.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    service = Container().export_service()
+    await database.connect()
+    await read_database.connect()
+    try:
+        started = time.perf_counter()
+        rows = await service.write_export(args.output, args.format, args.start, args.end)
+        print(f"exported {rows:,} lendings to {args.output} in {time.perf_counter() - started:.1f}s")
+    finally:
+        await read_database.disconnect()
+        await database.disconnect()
+
+
+def main() -> None:
+    """Run the command."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", required=True, help="the path of the written file")
+    parser.add_argument("--format", type=ExportFormat, choices=[f.value for f in ExportFormat], default="parquet")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="the first borrow day exported")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="the last borrow day exported")
+    asyncio.run(export_lendings(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
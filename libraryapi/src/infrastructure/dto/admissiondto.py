@@ -0,0 +1,18 @@
+"""Module containing DTO model for admission control statistics."""
+from pydantic import BaseModel, ConfigDict
+
+
+class AdmissionStatsDTO(BaseModel):
+    """A model representing DTO for the state and counters of a route class."""
+    route_class: str
+    limit: int
+    queue_size: int
+    active: int
+    queued: int
+    admitted: int
+    rejected: int
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+    )
\ No newline at end of file
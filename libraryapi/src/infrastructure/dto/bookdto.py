@@ -1,7 +1,7 @@
 """A module containing DTO models for output books and their availability."""
 from typing import Optional
 from asyncpg import Record  # type: ignore
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from src.infrastructure.dto.publisherdto import PublisherDTO
 
@@ -20,6 +20,8 @@ class BookDTO(BaseModel):
     publisher: PublisherDTO
     quantity: int = 1
     is_deleted: bool = False
+    # The versions of the book and its publisher the DTO was read at.
+    _version: Optional[str] = PrivateAttr(default=None)
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -27,6 +29,11 @@ class BookDTO(BaseModel):
         arbitrary_types_allowed=True,
     )
 
+    @property
+    def version(self) -> Optional[str]:
+        """The version token of the DTO, None if it was read without versions."""
+        return self._version
+
     @classmethod
     def from_record(cls, record: Record) -> "BookDTO":
         """A method for preparing DTO instance based on a DB record.
@@ -45,7 +52,7 @@ class BookDTO(BaseModel):
             contact_email=record_dict.get("contact_email")  # type: ignore
         )
 
-        return cls(
+        book = cls(
             id=record_dict.get("id"),  # type: ignore
             title=record_dict.get("title"),  # type: ignore
             author=record_dict.get("author"),  # type: ignore
@@ -59,6 +66,10 @@ class BookDTO(BaseModel):
             quantity=record_dict.get("quantity"),
             is_deleted=record_dict.get("is_deleted"),
         )
+        if record_dict.get("publisher_version") is not None:
+            book._version = f"{record_dict['version']}.{record_dict['publisher_version']}"
+
+        return book
 
 class BookAvailabilityDTO(BaseModel):
     """A model representing DTO for book availability."""
@@ -92,4 +103,31 @@ class BookAvailabilityDTO(BaseModel):
             totalStock=record_dict.get("totalStock"),  # type: ignore
             availableStock=record_dict.get("quantity"),  # type: ignore
             borrowed=record_dict.get("borrowed"),  # type: ignore
-        )
\ No newline at end of file
+        )
+
+class BookBrowseDTO(BaseModel):
+    """A model representing DTO for a page of faceted catalog browsing."""
+    total: int
+    books: list[BookDTO]
+    facets: dict[str, dict[str, int]]
+
+
+class BookSuggestionDTO(BaseModel):
+    """A model representing DTO for an autocomplete suggestion."""
+    id: int
+    title: str
+    author: str
+    borrowed_count: int
+
+
+class BookRecommendationDTO(BaseModel):
+    """A model representing DTO for a book often borrowed together with another one."""
+    id: int
+    title: str
+    author: str
+    score: float
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+    )
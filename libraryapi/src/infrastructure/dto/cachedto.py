@@ -0,0 +1,17 @@
+"""Module containing DTO model for cache statistics."""
+from pydantic import BaseModel, ConfigDict
+
+
+class CacheStatsDTO(BaseModel):
+    """A model representing DTO for the counters of a cache namespace."""
+    namespace: str
+    hits: int
+    misses: int
+    invalidations: int
+    remote_invalidations: int
+    hit_ratio: float
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+    )
@@ -0,0 +1,19 @@
+"""Module containing DTO model for scheduled job runs."""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobRunDTO(BaseModel):
+    """A model representing DTO for the last run of a scheduled job."""
+    name: str
+    interval_seconds: Optional[float]
+    last_started_at: datetime
+    last_finished_at: datetime
+    last_error: Optional[str]
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+    )
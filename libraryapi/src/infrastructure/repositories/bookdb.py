@@ -1,8 +1,8 @@
 """Module containing book repository implementation."""
-from typing import Any, Iterable
+from typing import Any, AsyncIterator, Iterable, Sequence
 
 from asyncpg import Record  # type: ignore
-from sqlalchemy import select, func, case, and_
+from sqlalchemy import Select, select, func, case, and_
 
 from src.core.domain.lend import LendStatus
 from src.core.repositories.ibook import IBookRepository
@@ -12,72 +12,84 @@ from src.db import (
     publisher_table,
     book_table,
     database,
+    read_database,
 )
 
 from src.infrastructure.dto.bookdto import BookDTO, BookAvailabilityDTO
+from src.infrastructure.utils.consts import BOOK_FACETS
+from src.infrastructure.utils.outbox import append_event
+from src.infrastructure.utils.projection import Projection
+from src.infrastructure.utils.rollups import move_borrows
+
+BOOK_PROJECTION = Projection(
+    BookDTO,
+    {
+        "id": book_table.c.id,
+        "title": book_table.c.title,
+        "author": book_table.c.author,
+        "epoch": book_table.c.epoch,
+        "genre": book_table.c.genre,
+        "kind": book_table.c.kind,
+        "publication_year": book_table.c.publication_year,
+        "language": book_table.c.language,
+        "borrowed_count": book_table.c.borrowed_count,
+        "publisher": {
+            "id": publisher_table.c.id,
+            "company_name": publisher_table.c.company_name,
+            "contact_email": publisher_table.c.contact_email,
+        },
+        "quantity": book_table.c.quantity,
+        "is_deleted": book_table.c.is_deleted,
+    },
+)
 
 class BookRepository(IBookRepository):
     """A class representing book database repository."""
-    async def get_all_books(self) -> Iterable[Any]:
+    async def get_all_books(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """Retrieve all books from the data storage.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
-            Iterable[Any]: List of all books in the data storage.
+            Iterable[Any]: List of all books, projected to dicts if fields are given.
         """
+        query = self._select_books(fields).order_by(book_table.c.id.asc())
 
-        query = (
-            select(
-                book_table,
-                publisher_table.c.id.label("publisher_id"),
-                publisher_table.c.company_name.label("company_name"),
-                publisher_table.c.contact_email.label("contact_email")
-            )
-            .join(publisher_table, book_table.c.publisher_id == publisher_table.c.id)
-            .order_by(book_table.c.id.asc())
-        )
+        books = await read_database.fetch_all(query)
 
-        books = await database.fetch_all(query)
+        return self._render_books(books, fields)
 
-        return [BookDTO.from_record(book) for book in books]
-
-    async def get_book_by_id(self, book_id: int, include_deleted: bool = False) -> Any | None:
+    async def get_book_by_id(
+            self,
+            book_id: int,
+            include_deleted: bool = False,
+            fields: Sequence[str] | None = None,
+    ) -> Any | None:
         """Retrieve a book by its ID.
 
         Args:
             book_id (int): The ID of the book.
             include_deleted (bool): Whether to include deleted books.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
-            Any | None: The book details or None if not found.
+            Any | None: The book details, projected to a dict if fields are given,
+                or None if not found.
         """
 
         if not include_deleted:
-            query = (
-                select(
-                    book_table,
-                    publisher_table.c.id.label("publisher_id"),
-                    publisher_table.c.company_name.label("company_name"),
-                    publisher_table.c.contact_email.label("contact_email")
-                )
-                .join(publisher_table, book_table.c.publisher_id == publisher_table.c.id)
-                .where(book_table.c.id == book_id)
-            )
+            query = self._select_books(fields).where(book_table.c.id == book_id)
         else:
             query = (
-                select(
-                    book_table,
-                    publisher_table.c.id.label("publisher_id"),
-                    publisher_table.c.company_name.label("company_name"),
-                    publisher_table.c.contact_email.label("contact_email")
-                )
-                .join(publisher_table, book_table.c.publisher_id == publisher_table.c.id)
+                self._select_books(fields)
                 .where(book_table.c.id == book_id, book_table.c.is_deleted == False)
             )
 
-        book = await database.fetch_one(query)
+        book = await read_database.fetch_one(query)
 
         if book:
-            return BookDTO.from_record(book)
+            return self._render_books([book], fields)[0]
         return None
 
     async def add_book(self, data: BookIn) -> Any | None:
@@ -89,8 +101,11 @@ class BookRepository(IBookRepository):
         Returns:
             Any | None: The new book record or None if insertion failed.
         """
-        query = book_table.insert().values(**data.model_dump(), borrowed_count=0, is_deleted=False)
-        new_book_id = await database.execute(query)
+        async with database.transaction():
+            query = book_table.insert().values(**data.model_dump(), borrowed_count=0, is_deleted=False)
+            new_book_id = await database.execute(query)
+            await append_event("book", new_book_id, "created", data.model_dump())
+
         query = book_table.select().where(book_table.c.id == new_book_id)
         new_book_record = await database.fetch_one(query)
         return new_book_record
@@ -118,9 +133,17 @@ class BookRepository(IBookRepository):
             .where(
                 and_(book_table.c.id == book_id, book_table.c.is_deleted == False)
             )
-            .values(**data.model_dump())
+            .values(**data.model_dump(), version=book_table.c.version + 1)
         )
-        await database.execute(query)
+        async with database.transaction():
+            # The lock keeps the former publisher until the borrows are moved.
+            former_publisher_id = await database.fetch_val(
+                select(book_table.c.publisher_id).where(book_table.c.id == book_id).with_for_update()
+            )
+            await database.execute(query)
+            if former_publisher_id is not None and former_publisher_id != data.publisher_id:
+                await move_borrows(book_id, former_publisher_id, data.publisher_id)
+            await append_event("book", book_id, "updated", data.model_dump())
 
         updated_book = await database.fetch_one(
             select(book_table).where(
@@ -147,24 +170,37 @@ class BookRepository(IBookRepository):
                 query = (
                     book_table.update()
                     .where(book_table.c.id == book_id)
-                    .values(is_deleted=True)
+                    .values(is_deleted=True, version=book_table.c.version + 1)
                 )
-                await database.execute(query)
+                async with database.transaction():
+                    await database.execute(query)
+                    await append_event("book", book_id, "deleted")
             return True
 
         return False
 
-    async def increment_borrowed_count(self, book_id: int) -> None:
+    async def increment_borrowed_count(self, book_id: int) -> int | None:
         """Increment the borrowed count for a book.
 
         Args:
             book_id (int): The ID of the book.
+
+        Returns:
+            int | None: The new borrowed count or None if the book does not exist.
         """
         query = (
             book_table.update().where(book_table.c.id == book_id)
-            .values(borrowed_count = book_table.c.borrowed_count + 1)
+            .values(
+                borrowed_count=book_table.c.borrowed_count + 1,
+                version=book_table.c.version + 1,
+            )
+            .returning(book_table.c.borrowed_count)
         )
-        await database.execute(query)
+        async with database.transaction():
+            borrowed_count = await database.fetch_val(query)
+            await append_event("book", book_id, "updated", {"borrowed_count": borrowed_count})
+
+        return borrowed_count
 
     async def get_books_availability(self) -> list[BookAvailabilityDTO]:
         """Retrieve availability information for all books.
@@ -202,57 +238,191 @@ class BookRepository(IBookRepository):
             .order_by(book_table.c.id.asc())
         )
 
-        books = await database.fetch_all(query)
+        books = await read_database.fetch_all(query)
         books_availability = [BookAvailabilityDTO.from_record(book) for book in books]
         return books_availability
 
-    async def search_books_by_title(self, title: str) -> Iterable[Any]:
+    async def get_books_by_ids(
+            self,
+            book_ids: Sequence[int],
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
+        """Retrieve the books with the given IDs.
+
+        Args:
+            book_ids (Sequence[int]): The IDs of the books.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
+        Returns:
+            Iterable[Any]: The books ordered by ID, projected to dicts if fields are given.
+        """
+        if not book_ids:
+            return []
+
+        query = (
+            self._select_books(fields)
+            .where(book_table.c.id.in_(book_ids))
+            .order_by(book_table.c.id.asc())
+        )
+        books = await read_database.fetch_all(query)
+
+        return self._render_books(books, fields)
+
+    async def get_index_rows(self, book_ids: Iterable[int]) -> Iterable[Any]:
+        """Retrieve the columns of active books kept in memory indexes.
+
+        Args:
+            book_ids (Iterable[int]): The IDs of the books.
+
+        Returns:
+            Iterable[Any]: The indexed columns of the books which are not deleted.
+        """
+        query = self._select_index_rows().where(book_table.c.id.in_(list(book_ids)))
+
+        return await read_database.fetch_all(query)
+
+    async def iterate_index_rows(self) -> AsyncIterator[Any]:
+        """Stream the indexed columns of all active books through a server-side cursor.
+
+        Yields:
+            Any: The rows, most borrowed books first.
+        """
+        query = self._select_index_rows().order_by(
+            book_table.c.borrowed_count.desc().nulls_last(),
+            book_table.c.id.asc(),
+        )
+
+        async for row in read_database.iterate(query):
+            yield row
+
+    async def get_book_version(self, book_id: int) -> str | None:
+        """Retrieve the version token of a book without loading its details.
+
+        Args:
+            book_id (int): The ID of the book.
+
+        Returns:
+            str | None: The version token or None if the book does not exist.
+        """
+        query = (
+            select(book_table.c.version, publisher_table.c.version.label("publisher_version"))
+            .join(publisher_table, book_table.c.publisher_id == publisher_table.c.id)
+            .where(book_table.c.id == book_id)
+        )
+        row = await read_database.fetch_one(query)
+
+        if row:
+            return f"{row['version']}.{row['publisher_version']}"
+        return None
+
+    async def search_books_by_title(
+            self,
+            title: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """Search for books by title.
 
         Args:
             title (str): The title of the book to search for.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Iterable[Any]: List of all books matching the title in the data storage.
         """
         query = (
-            select(
-                book_table,
-                publisher_table.c.id.label("publisher_id"),
-                publisher_table.c.company_name.label("company_name"),
-                publisher_table.c.contact_email.label("contact_email")
-            )
-            .join(publisher_table, publisher_table.c.id == book_table.c.publisher_id)
+            self._select_books(fields)
             .where(book_table.c.title.ilike(f"%{title}%"))
         )
 
-        books = await database.fetch_all(query)
+        books = await read_database.fetch_all(query)
 
-        return [BookDTO.from_record(book) for book in books]
+        return self._render_books(books, fields)
 
-    async def search_books_by_author(self, author: str) -> Iterable[Any]:
+    async def search_books_by_author(
+            self,
+            author: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """Search for books by author.
 
         Args:
             author (str): The author of the book to search for.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
             Iterable[Any]: List of all books matching the author in the data storage.
         """
         query = (
-            select(
+            self._select_books(fields)
+            .where(book_table.c.author.ilike(f"%{author}%"))
+        )
+
+        books = await read_database.fetch_all(query)
+
+        return self._render_books(books, fields)
+
+    @staticmethod
+    def _select_books(fields: Sequence[str] | None) -> Select:
+        """Build the base query of book reads.
+
+        Without fields every book column and the publisher are selected.
+        With fields only their columns are selected, and the publisher is
+        joined only when it was requested.
+
+        Args:
+            fields (Sequence[str] | None): The requested DTO fields.
+
+        Returns:
+            Select: The query selecting from the books table.
+        """
+        if fields is None:
+            return select(
                 book_table,
                 publisher_table.c.id.label("publisher_id"),
                 publisher_table.c.company_name.label("company_name"),
-                publisher_table.c.contact_email.label("contact_email")
+                publisher_table.c.contact_email.label("contact_email"),
+                publisher_table.c.version.label("publisher_version"),
+            ).join(publisher_table, book_table.c.publisher_id == publisher_table.c.id)
+
+        query = select(*BOOK_PROJECTION.select_list(fields)).select_from(book_table)
+        if "publisher" in fields:
+            query = query.join(publisher_table, book_table.c.publisher_id == publisher_table.c.id)
+
+        return query
+
+    @staticmethod
+    def _select_index_rows() -> Select:
+        """Build the query of the columns kept in memory indexes.
+
+        Returns:
+            Select: The query selecting active books.
+        """
+        return (
+            select(
+                book_table.c.id,
+                book_table.c.title,
+                book_table.c.author,
+                book_table.c.borrowed_count,
+                *(book_table.c[facet] for facet in BOOK_FACETS),
             )
-            .join(publisher_table, publisher_table.c.id == book_table.c.publisher_id)
-            .where(book_table.c.author.ilike(f"%{author}%"))
+            .where(book_table.c.is_deleted == False)
         )
 
-        books = await database.fetch_all(query)
+    @staticmethod
+    def _render_books(books: Iterable[Record], fields: Sequence[str] | None) -> list[Any]:
+        """Convert book records into DTOs or into projected dicts.
+
+        Args:
+            books (Iterable[Record]): The records selected with `_select_books`.
+            fields (Sequence[str] | None): The requested DTO fields.
+
+        Returns:
+            list[Any]: The rendered books.
+        """
+        if fields is None:
+            return [BookDTO.from_record(book) for book in books]
 
-        return [BookDTO.from_record(book) for book in books]
+        return [BOOK_PROJECTION.serialize(book, fields) for book in books]
 
     async def _get_by_id(self, book_id: int) -> Record | None:
         """Retrieve a book record by ID.
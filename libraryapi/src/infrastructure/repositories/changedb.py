@@ -0,0 +1,100 @@
+"""Module containing change feed repository implementation."""
+from typing import Iterable, List
+
+from sqlalchemy import Select, select, func
+
+from src.core.domain.change import ChangeEvent
+from src.core.repositories.ichange import IChangeRepository
+from src.db import outbox_table, database, read_database
+
+
+class ChangeRepository(IChangeRepository):
+    """A class representing the outbox-backed change feed repository."""
+    async def get_changes(
+            self,
+            after: int,
+            limit: int,
+            entities: Iterable[str] | None = None,
+    ) -> List[ChangeEvent]:
+        """Fetch the events appended after a sequence number.
+
+        Args:
+            after (int): The last sequence number already seen by the consumer.
+            limit (int): The maximum number of events to return.
+            entities (Iterable[str] | None, optional): The kinds of entities to include, all if None.
+
+        Returns:
+            List[ChangeEvent]: The events ordered by their sequence number.
+        """
+        query = (
+            select(outbox_table)
+            .where(outbox_table.c.seq > after)
+            .order_by(outbox_table.c.seq.asc())
+            .limit(limit)
+        )
+        if entities is not None:
+            query = query.where(outbox_table.c.entity.in_(list(entities)))
+        events = await database.fetch_all(query)
+
+        return [ChangeEvent(**dict(event)) for event in events]
+
+    async def get_last_seq(self, entities: Iterable[str]) -> int:
+        """Fetch the sequence number of the latest event of the given entities.
+
+        Each entity is looked up separately, so every lookup is a single
+        backward scan of the `(entity, seq)` index.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            int: The latest sequence number or 0 if there are no events.
+        """
+        return await database.fetch_val(self._select_last_seq(entities))
+
+    async def get_read_version(self, entities: Iterable[str]) -> str:
+        """Fetch a token changing with every committed event seen by reads.
+
+        Besides the latest sequence number, the token counts the committed
+        events not numbered yet, which the latest sequence number does not
+        reflect until the next numbering. It is read like the data it
+        versions, on a replica lagging behind the primary as much as the
+        rest of the reads of the request.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            str: The version token.
+        """
+        entities = list(entities)
+        unnumbered = (
+            select(
+                func.count().label("count"),
+                func.coalesce(func.max(outbox_table.c.id), 0).label("last_id"),
+            )
+            .where(outbox_table.c.seq.is_(None), outbox_table.c.entity.in_(entities))
+            .subquery()
+        )
+        last_seq = self._select_last_seq(entities).scalar_subquery().label("last_seq")
+        row = await read_database.fetch_one(select(last_seq, unnumbered.c.count, unnumbered.c.last_id))
+
+        return f"{row['last_seq']}-{row['count']}-{row['last_id']}"
+
+    @staticmethod
+    def _select_last_seq(entities: Iterable[str]) -> Select:
+        """Build the query of the latest sequence number of the given entities.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            Select: The query selecting the sequence number, 0 without events.
+        """
+        latest = [
+            select(func.max(outbox_table.c.seq))
+            .where(outbox_table.c.entity == entity)
+            .scalar_subquery()
+            for entity in entities
+        ]
+        return select(func.coalesce(func.greatest(*latest), 0))
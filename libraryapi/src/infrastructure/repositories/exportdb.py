@@ -0,0 +1,126 @@
+"""Module containing lending export repository implementation."""
+from datetime import date
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import func, insert, select, update
+
+from src.core.domain.export import ExportStatus
+from src.core.repositories.iexport import IExportRepository
+from src.db import database, export_table, read_database
+
+# Lendings with the attributes of their books and publishers, in the order
+# of `EXPORT_COLUMNS`. Written for the driver directly, whose cursors fetch
+# large chunks of plain records instead of a few rows per round trip.
+EXPORT_LENDINGS = """
+SELECT
+    lendings.id,
+    lendings.book_id,
+    lendings.user_id::text,
+    lendings.borrowed_date,
+    lendings.returned_date,
+    lendings.status::text,
+    books.title,
+    books.author,
+    books.publication_year,
+    books.language,
+    books.categories,
+    books.genre,
+    books.kind,
+    books.epoch,
+    books.publisher_id,
+    publishers.company_name
+FROM lendings
+LEFT JOIN books ON books.id = lendings.book_id
+LEFT JOIN publishers ON publishers.id = books.publisher_id
+WHERE ($1::date IS NULL OR lendings.borrowed_date >= $1)
+    AND ($2::date IS NULL OR lendings.borrowed_date <= $2)
+"""
+
+
+class ExportRepository(IExportRepository):
+    """A class representing the repository of lending exports."""
+
+    async def iterate_lendings(
+            self,
+            start: Optional[date],
+            end: Optional[date],
+            chunk_size: int,
+    ) -> AsyncIterator[Sequence[Sequence[Any]]]:
+        """Stream lendings with the attributes of their books and publishers through a server-side cursor.
+
+        Args:
+            start (Optional[date]): The first borrow day exported.
+            end (Optional[date]): The last borrow day exported.
+            chunk_size (int): The number of rows fetched at once.
+
+        Yields:
+            Sequence[Sequence[Any]]: The chunks of rows, with values in the
+                order of `EXPORT_COLUMNS`.
+        """
+        async with read_database.connection() as connection:
+            async with connection.transaction():
+                cursor = await connection.raw_connection.cursor(EXPORT_LENDINGS, start, end)
+                while rows := await cursor.fetch(chunk_size):
+                    yield rows
+
+    async def add_export(
+            self,
+            export_id: str,
+            export_format: str,
+            start: Optional[date],
+            end: Optional[date],
+    ) -> Any:
+        """Record a started export.
+
+        Args:
+            export_id (str): The ID of the export.
+            export_format (str): The file format.
+            start (Optional[date]): The first borrow day exported.
+            end (Optional[date]): The last borrow day exported.
+
+        Returns:
+            Any: The recorded export.
+        """
+        query = (
+            insert(export_table)
+            .values(
+                id=export_id,
+                format=export_format,
+                status=ExportStatus.running.value,
+                start=start,
+                end=end,
+            )
+            .returning(export_table)
+        )
+
+        return await database.fetch_one(query)
+
+    async def finish_export(self, export_id: str, rows: Optional[int], error: Optional[str] = None) -> None:
+        """Record the end of an export.
+
+        Args:
+            export_id (str): The ID of the export.
+            rows (Optional[int]): The number of exported rows, None on failure.
+            error (Optional[str], optional): The error which ended the export, if any.
+        """
+        status = ExportStatus.failed if error is not None else ExportStatus.done
+        query = (
+            update(export_table)
+            .where(export_table.c.id == export_id)
+            .values(status=status.value, rows=rows, error=error, finished_at=func.clock_timestamp())
+        )
+
+        await database.execute(query)
+
+    async def get_export(self, export_id: str) -> Any | None:
+        """Fetch an export.
+
+        Args:
+            export_id (str): The ID of the export.
+
+        Returns:
+            Any | None: The export if it exists.
+        """
+        query = select(export_table).where(export_table.c.id == export_id)
+
+        return await database.fetch_one(query)
@@ -0,0 +1,113 @@
+"""Module containing scheduled job repository implementation."""
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Optional
+
+import asyncpg  # type: ignore
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.repositories.ijob import IJobRepository
+from src.db import database, job_table
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key of the advisory lock electing the worker running jobs.
+SCHEDULER_LOCK_KEY = 27_000_004
+
+
+class JobRepository(IJobRepository):
+    """A class representing the repository of the runs of scheduled jobs.
+
+    The scheduler lock is a session-level advisory lock held on a dedicated
+    connection, outside of the pool, so no transaction stays open while the
+    jobs run. The worker holding it stays the leader until the connection is
+    lost or the lock is released.
+    """
+
+    def __init__(self, dsn: str) -> None:
+        """The initializer of the repository.
+
+        Args:
+            dsn (str): The asyncpg connection string of the lock connection.
+        """
+        self._dsn = dsn
+        self._connection: Any = None
+        self._leader = False
+
+    async def hold_leader_lock(self) -> bool:
+        """Take the scheduler lock if it is free, or check it is still held.
+
+        Returns:
+            bool: Whether this worker holds the lock.
+        """
+        try:
+            if self._connection is None or self._connection.is_closed():
+                self._leader = False
+                self._connection = await asyncpg.connect(self._dsn)
+
+            if self._leader:
+                await self._connection.execute("SELECT 1")
+            else:
+                self._leader = await self._connection.fetchval(
+                    "SELECT pg_try_advisory_lock($1)",
+                    SCHEDULER_LOCK_KEY,
+                )
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            logger.warning("Scheduler lock connection failed: %s", e)
+            await self.release_leader_lock()
+
+        return self._leader
+
+    async def release_leader_lock(self) -> None:
+        """Release the scheduler lock by closing its connection."""
+        connection, self._connection, self._leader = self._connection, None, False
+        if connection is not None and not connection.is_closed():
+            connection.terminate()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Open the transaction of one run of a job.
+
+        Yields:
+            None: Nothing; an error rolls the run back.
+        """
+        async with database.transaction():
+            yield
+
+    async def get_runs(self) -> Iterable[Any]:
+        """Fetch the last run of every job.
+
+        Returns:
+            Iterable[Any]: The rows with a `name`, `last_started_at`,
+                `last_finished_at` and `last_error`.
+        """
+        query = select(job_table).order_by(job_table.c.name)
+
+        return await database.fetch_all(query)
+
+    async def save_run(self, name: str, started_at: datetime, error: Optional[str] = None) -> None:
+        """Record a finished run of a job.
+
+        Args:
+            name (str): The name of the job.
+            started_at (datetime): The start of the run.
+            error (Optional[str], optional): The error which ended the run, if any.
+        """
+        query = insert(job_table).values(
+            name=name,
+            last_started_at=started_at,
+            last_finished_at=func.clock_timestamp(),
+            last_error=error,
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[job_table.c.name],
+            set_={
+                "last_started_at": query.excluded.last_started_at,
+                "last_finished_at": query.excluded.last_finished_at,
+                "last_error": query.excluded.last_error,
+            },
+        )
+
+        await database.execute(query)
@@ -1,6 +1,6 @@
 """Module containing lend repository implementation."""
 from datetime import date
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 from fastapi import HTTPException
 from pydantic import UUID4
 from sqlalchemy import select
@@ -13,41 +13,77 @@ from src.db import (
     user_table,
     book_table,
     database, publisher_table,
+    read_database,
 )
 from src.infrastructure.dto.bookdto import BookDTO
 from src.infrastructure.dto.lenddto import BookLendHistoryResponseDTO, LendDTO, UserLendHistoryResponseDTO
 from src.infrastructure.dto.publisherdto import PublisherDTO
 from src.infrastructure.dto.userdto import UserDTO
+from src.infrastructure.utils.consts import AVAILABILITY_CHANNEL
+from src.infrastructure.utils.outbox import append_event
+from src.infrastructure.utils.pgnotify import notify
+from src.infrastructure.utils.rollups import count_borrow
+from src.infrastructure.utils.projection import Projection
+
+LEND_PROJECTION = Projection(
+    LendTransaction,
+    {
+        "book_id": lend_table.c.book_id,
+        "borrowed_date": lend_table.c.borrowed_date,
+        "id": lend_table.c.id,
+        "user_id": lend_table.c.user_id,
+        "status": lend_table.c.status,
+        "returned_date": lend_table.c.returned_date,
+    },
+)
 
 
 class LendRepository(ILendRepository):
     """A class that implements methods for managing lend transactions in the repository."""
-    async def get_all_lends(self) -> Iterable[Any]:
+    async def get_all_lends(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """The method retrieves all lend transactions from the data storage.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
-            Iterable[Any]: List of lend transactions.
+            Iterable[Any]: List of lend transactions, projected to dicts if fields are given.
         """
+        columns = LEND_PROJECTION.select_list(fields) if fields else [lend_table]
         query = (
-            select(lend_table)
+            select(*columns)
+            .select_from(lend_table)
             .join(user_table, lend_table.c.user_id == user_table.c.id)
             .join(book_table, lend_table.c.book_id == book_table.c.id)
         )
-        lends = await database.fetch_all(query)
+        lends = await read_database.fetch_all(query)
+
+        if fields:
+            return [LEND_PROJECTION.serialize(lend, fields) for lend in lends]
 
         return [LendTransaction(**dict(lend)) for lend in lends]
 
-    async def get_lend_by_id(self, lend_id: int) -> LendTransaction | None:
+    async def get_lend_by_id(
+            self,
+            lend_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> LendTransaction | dict | None:
         """The method retrieves a lend transaction by its ID.
 
         Args:
             lend_id (int): The ID of the lend transaction.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
-            LendTransaction | None: The lend transaction if found, else None.
+            LendTransaction | dict | None: The lend transaction, projected to a dict
+                if fields are given, else None.
         """
-        query = select(lend_table).where(lend_table.c.id == lend_id)
-        lend = await database.fetch_one(query)
+        columns = LEND_PROJECTION.select_list(fields) if fields else [lend_table]
+        query = select(*columns).where(lend_table.c.id == lend_id)
+        lend = await read_database.fetch_one(query)
+
+        if lend and fields:
+            return LEND_PROJECTION.serialize(lend, fields)
 
         if lend:
             lend_data = dict(lend)
@@ -57,52 +93,76 @@ class LendRepository(ILendRepository):
 
         return None
 
+    async def get_lends_by_ids(self, lend_ids: Sequence[int]) -> Iterable[Any]:
+        """The method retrieves the lend transactions with the given IDs.
+
+        Args:
+            lend_ids (Sequence[int]): The IDs of the lend transactions.
+
+        Returns:
+            Iterable[Any]: The lend transactions which exist.
+        """
+        if not lend_ids:
+            return []
+
+        query = select(lend_table).where(lend_table.c.id.in_(lend_ids))
+        lends = await read_database.fetch_all(query)
+
+        return [LendTransaction(**{**dict(lend), "status": LendStatus(lend["status"])}) for lend in lends]
+
     async def add_lend(self, data: Lend) -> Lend | None:
         """The method adds a new lend transaction to the repository.
 
+        The user is checked by the service and enforced by the foreign key.
+        The book is read once, locked, so concurrent lends cannot take its
+        last copy twice.
+
         Args:
             data (Lend): The lend transaction data.
 
         Returns:
             Lend | None: The added lend transaction if successful, else None.
         """
-        book_exist_query = select(book_table.c.id).where(book_table.c.id == data.book_id)
-        book_exists = await database.fetch_one(book_exist_query)
-        if not book_exists:
-            return None
-            # return {"success": False, "message": "Book does not exist."}
-
-        book_quantity_query = select(book_table.c.id, book_table.c.quantity).where(book_table.c.id == data.book_id)
-        quantity_exists = await database.fetch_one(book_quantity_query)
-        if not quantity_exists or quantity_exists['quantity'] <= 0:
-            return None
-            # return {"success": False, "message": "Book is out of stock."}
-
-        user_exist_query = select(user_table.c.id).where(user_table.c.id == data.user_id)
-        user_exists = await database.fetch_one(user_exist_query)
-        if not user_exists:
-            return None
-
+        book_quantity_query = (
+            select(book_table.c.quantity)
+            .where(book_table.c.id == data.book_id)
+            .with_for_update()
+        )
         active_lend_query = select(lend_table).where(
             (lend_table.c.user_id == data.user_id) &
             (lend_table.c.book_id == data.book_id) &
             (lend_table.c.status == LendStatus.borrowed.value)
         )
-        active_lend = await database.fetch_one(active_lend_query)
-        if active_lend:
-            return None
-
         query_lend = lend_table.insert().values(
             **data.model_dump(),
             status=LendStatus.borrowed.value,
             returned_date=None
         )
-        new_lend_id = await database.execute(query_lend)
+        async with database.transaction():
+            quantity = await database.fetch_val(book_quantity_query)
+            if quantity is None or quantity <= 0:
+                return None
 
-        await database.execute(
-            book_table.update().where(book_table.c.id == data.book_id)
-            .values(quantity=book_table.c.quantity - 1)
-        )
+            if await database.fetch_one(active_lend_query):
+                return None
+
+            new_lend_id = await database.execute(query_lend)
+
+            quantity = await database.fetch_val(
+                book_table.update().where(book_table.c.id == data.book_id)
+                .values(quantity=book_table.c.quantity - 1, version=book_table.c.version + 1)
+                .returning(book_table.c.quantity)
+            )
+
+            await append_event(
+                "lend",
+                new_lend_id,
+                "created",
+                {**data.model_dump(), "status": LendStatus.borrowed.value},
+            )
+            await append_event("book", data.book_id, "updated", {"quantity": quantity})
+            await count_borrow(data.book_id, data.borrowed_date)
+            await notify(AVAILABILITY_CHANNEL, {"book_id": data.book_id, "availableStock": quantity})
 
         return await self.get_lend_by_id(new_lend_id)
 
@@ -117,7 +177,17 @@ class LendRepository(ILendRepository):
             Lend | None: The updated lend transaction if successful, else None.
         """
         query = lend_table.update().where(lend_table.c.id == lend_id).values(**data.model_dump())
-        await database.execute(query)
+        async with database.transaction():
+            previous = await database.fetch_one(
+                select(lend_table.c.book_id, lend_table.c.borrowed_date)
+                .where(lend_table.c.id == lend_id)
+                .with_for_update()
+            )
+            await database.execute(query)
+            await append_event("lend", lend_id, "updated", data.model_dump())
+            if previous and (previous["book_id"], previous["borrowed_date"]) != (data.book_id, data.borrowed_date):
+                await count_borrow(previous["book_id"], previous["borrowed_date"], -1)
+                await count_borrow(data.book_id, data.borrowed_date)
         return await self.get_lend_by_id(lend_id)
 
     async def delete_lend(self, lend_id: int) -> bool:
@@ -133,35 +203,71 @@ class LendRepository(ILendRepository):
         if not lend:
             raise False
 
-        await database.execute(lend_table.delete().where(lend_table.c.id == lend_id))
+        async with database.transaction():
+            await database.execute(lend_table.delete().where(lend_table.c.id == lend_id))
+            await append_event(
+                "lend",
+                lend_id,
+                "deleted",
+                {"book_id": lend.book_id, "borrowed_date": lend.borrowed_date},
+            )
+            await count_borrow(lend.book_id, lend.borrowed_date, -1)
 
         return True
 
     async def return_book(self, user_id: UUID4, book_id: int, return_date: date) -> bool:
         """The method marks a book as returned.
 
+        The latest lend of the book by the user is locked while it is
+        checked, so concurrent returns of one lend return the copy once.
+
         Args:
             user_id (UUID4): The user ID returning the book.
             book_id (int): The book ID being returned.
             return_date (date): The date the book is returned.
 
         Returns:
-            bool: True if return is successful, else False.
+            bool: True if return is successful, False if the user has no
+                lend of the book or it was already returned.
         """
-        lend_id = await self.get_lend_id_by_book_id_and_user_id(user_id, book_id)
-
-        if not lend_id:
-            return False
+        async with database.transaction():
+            lend = await database.fetch_one(
+                select(lend_table.c.id, lend_table.c.status)
+                .where(lend_table.c.user_id == user_id)
+                .where(lend_table.c.book_id == book_id)
+                .order_by(lend_table.c.returned_date.desc())
+                .limit(1)
+                .with_for_update()
+            )
+            if not lend or lend["status"] == LendStatus.returned.value:
+                return False
+
+            lend_id = lend["id"]
+            await database.execute(
+                lend_table.update()
+                .where(lend_table.c.id == lend_id)
+                .values(status=LendStatus.returned.value, returned_date=return_date)  # Enum -> str
+            )
 
-        await database.execute(
-            lend_table.update()
-            .where(lend_table.c.id == lend_id)
-            .values(status=LendStatus.returned.value, returned_date=return_date)  # Enum -> str
-        )
+            quantity = await database.fetch_val(
+                book_table.update().where(book_table.c.id == book_id)
+                .values(quantity=book_table.c.quantity + 1, version=book_table.c.version + 1)
+                .returning(book_table.c.quantity)
+            )
 
-        await database.execute(
-            book_table.update().where(book_table.c.id == book_id).values(quantity=book_table.c.quantity + 1)
-        )
+            await append_event(
+                "lend",
+                lend_id,
+                "returned",
+                {
+                    "book_id": book_id,
+                    "user_id": user_id,
+                    "returned_date": return_date,
+                    "status": LendStatus.returned.value,
+                },
+            )
+            await append_event("book", book_id, "updated", {"quantity": quantity})
+            await notify(AVAILABILITY_CHANNEL, {"book_id": book_id, "availableStock": quantity})
 
         return True
 
@@ -193,7 +299,7 @@ class LendRepository(ILendRepository):
             .where(lend_table.c.user_id == user_id)
             .order_by(lend_table.c.id.asc())
         )
-        lends = await database.fetch_all(query)
+        lends = await read_database.fetch_all(query)
 
         if not lends:
             raise HTTPException(status_code=404, detail="No history for this user")
@@ -251,7 +357,7 @@ class LendRepository(ILendRepository):
             .where(lend_table.c.book_id == book_id)
             .order_by(lend_table.c.id.asc())
         )
-        lends = await database.fetch_all(query)
+        lends = await read_database.fetch_all(query)
 
         if not lends:
             raise HTTPException(status_code=404, detail="No history for this book")
@@ -1,5 +1,5 @@
 """Module containing publisher repository implementation."""
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 
 from asyncpg import Record
 from pydantic import UUID4
@@ -7,36 +7,78 @@ from sqlalchemy import select
 
 from src.core.repositories.ipublisher import IPublisherRepository
 from src.core.domain.publisher import Publisher, PublisherIn
-from src.db import publisher_table, database, book_table
+from src.db import publisher_table, database, read_database, book_table
+from src.infrastructure.utils.outbox import append_event
+from src.infrastructure.utils.projection import Projection
+
+PUBLISHER_PROJECTION = Projection(
+    PublisherIn,
+    {
+        "company_name": publisher_table.c.company_name,
+        "contact_email": publisher_table.c.contact_email,
+    },
+)
 
 
 class PublisherRepository(IPublisherRepository):
     """Repository class for handling Publisher-related operations."""
-    async def get_all_publishers(self) -> Iterable[Any]:
+    async def get_all_publishers(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """Fetch all publishers from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
-            Iterable[Any]: A list of Publisher objects.
+            Iterable[Any]: A list of Publisher objects, projected to dicts if fields are given.
         """
-        query = select(publisher_table).order_by(publisher_table.c.id.asc())
-        publishers = await database.fetch_all(query)
+        columns = PUBLISHER_PROJECTION.select_list(fields) if fields else [publisher_table]
+        query = select(*columns).order_by(publisher_table.c.id.asc())
+        publishers = await read_database.fetch_all(query)
+        if fields:
+            return [PUBLISHER_PROJECTION.serialize(publisher, fields) for publisher in publishers]
         return [Publisher(**dict(publisher)) for publisher in publishers]
 
-    async def get_publisher_by_id(self, publisher_id: int) -> Any | None:
+    async def get_publisher_by_id(
+            self,
+            publisher_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> Any | None:
         """Fetch a publisher by its ID from the repository.
 
         Args:
             publisher_id (int): The ID of the publisher to retrieve.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
-            Any | None: The Publisher object if found, else None.
+            Any | None: The Publisher object, projected to a dict if fields are given,
+                if found, else None.
         """
-        query = select(publisher_table).where(publisher_table.c.id == publisher_id)
-        publisher = await database.fetch_one(query)
+        columns = PUBLISHER_PROJECTION.select_list(fields) if fields else [publisher_table]
+        query = select(*columns).where(publisher_table.c.id == publisher_id)
+        publisher = await read_database.fetch_one(query)
+        if publisher and fields:
+            return PUBLISHER_PROJECTION.serialize(publisher, fields)
         if publisher:
             return Publisher(**dict(publisher))
         return None
 
+    async def get_publishers_by_ids(self, publisher_ids: Sequence[int]) -> Iterable[Any]:
+        """Fetch the publishers with the given IDs from the repository.
+
+        Args:
+            publisher_ids (Sequence[int]): The IDs of the publishers.
+
+        Returns:
+            Iterable[Any]: The Publisher objects which exist.
+        """
+        if not publisher_ids:
+            return []
+
+        query = select(publisher_table).where(publisher_table.c.id.in_(publisher_ids))
+        publishers = await read_database.fetch_all(query)
+
+        return [Publisher(**dict(publisher)) for publisher in publishers]
+
     async def add_publisher(self, data: PublisherIn) -> Any | None:
         """Add a new publisher to the repository.
 
@@ -47,7 +89,9 @@ class PublisherRepository(IPublisherRepository):
             Any | None: The added Publisher object if successful, else None.
         """
         query = publisher_table.insert().values(**data.model_dump()).returning(publisher_table.c.id)
-        new_publisher_id = await database.fetch_val(query)
+        async with database.transaction():
+            new_publisher_id = await database.fetch_val(query)
+            await append_event("publisher", new_publisher_id, "created", data.model_dump())
         new_publisher = await self._get_by_id(new_publisher_id)
         return Publisher(**dict(new_publisher)) if new_publisher else None
 
@@ -72,9 +116,11 @@ class PublisherRepository(IPublisherRepository):
             query = (
                 publisher_table.update()
                 .where(publisher_table.c.id == publisher_id)
-                .values(**data.model_dump())
+                .values(**data.model_dump(), version=publisher_table.c.version + 1)
             )
-            await database.execute(query)
+            async with database.transaction():
+                await database.execute(query)
+                await append_event("publisher", publisher_id, "updated", data.model_dump())
             updated_publisher = await self.get_publisher_by_id(publisher_id)
 
             return Publisher(**dict(updated_publisher)) if updated_publisher else None
@@ -90,7 +136,9 @@ class PublisherRepository(IPublisherRepository):
             bool: True if the publisher was deleted successfully, else False.
         """
         query = publisher_table.delete().where(publisher_table.c.id == publisher_id)
-        result = await database.execute(query)
+        async with database.transaction():
+            result = await database.execute(query)
+            await append_event("publisher", publisher_id, "deleted")
 
         return result > 0 if result is not None else False
 
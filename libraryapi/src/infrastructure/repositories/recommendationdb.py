@@ -0,0 +1,113 @@
+"""Module containing recommendation repository implementation."""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Mapping
+
+import numpy as np
+from sqlalchemy import and_, select, text
+
+from src.core.repositories.irecommendation import IRecommendationRepository
+from src.db import book_table, database, lend_table, read_database, recommendation_table
+
+# Arbitrary application-wide key of the advisory lock letting one worker refresh.
+RECOMMENDATION_LOCK_KEY = 27_000_002
+
+# Inserts the neighbors of many books at once from aligned arrays.
+INSERT_NEIGHBORS = text(
+    """
+    INSERT INTO book_recommendations (book_id, rank, neighbor_id, score)
+    SELECT * FROM unnest(
+        CAST(:book_ids AS integer[]),
+        CAST(:ranks AS smallint[]),
+        CAST(:neighbor_ids AS integer[]),
+        CAST(:scores AS double precision[])
+    )
+    """
+)
+
+
+class RecommendationRepository(IRecommendationRepository):
+    """A class representing the repository of precomputed book recommendations."""
+
+    async def get_recommendations(self, book_id: int, limit: int) -> Iterable[Any]:
+        """Fetch the precomputed neighbors of a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            limit (int): The maximum number of neighbors.
+
+        Returns:
+            Iterable[Any]: The neighbors with their title, author and score, best first.
+        """
+        query = (
+            select(
+                book_table.c.id,
+                book_table.c.title,
+                book_table.c.author,
+                recommendation_table.c.score,
+            )
+            .select_from(recommendation_table)
+            .join(book_table, recommendation_table.c.neighbor_id == book_table.c.id)
+            .where(
+                and_(
+                    recommendation_table.c.book_id == book_id,
+                    book_table.c.is_deleted == False,
+                )
+            )
+            .order_by(recommendation_table.c.rank.asc())
+            .limit(limit)
+        )
+
+        return await read_database.fetch_all(query)
+
+    async def get_borrow_pairs(self) -> Iterable[Any]:
+        """Fetch the distinct `(user_id, book_id)` pairs of all lendings.
+
+        Returns:
+            Iterable[Any]: The pairs.
+        """
+        query = select(lend_table.c.user_id, lend_table.c.book_id).distinct()
+
+        return await database.fetch_all(query)
+
+    @asynccontextmanager
+    async def refresh_lock(self) -> AsyncIterator[bool]:
+        """Open a transaction holding the refresh lock if no other worker holds it.
+
+        Yields:
+            bool: Whether the lock was acquired.
+        """
+        async with database.transaction():
+            yield await database.fetch_val(
+                "SELECT pg_try_advisory_xact_lock(:key)",
+                {"key": RECOMMENDATION_LOCK_KEY},
+            )
+
+    async def save_recommendations(
+            self,
+            book_ids: list[int],
+            neighbors: Mapping[str, np.ndarray],
+            replace_all: bool = False,
+    ) -> None:
+        """Replace the neighbors of books.
+
+        Args:
+            book_ids (list[int]): The IDs of the books whose neighbors are replaced.
+            neighbors (Mapping[str, np.ndarray]): The aligned `book_id`, `rank`,
+                `neighbor_id` and `score` arrays.
+            replace_all (bool, optional): Whether to drop the neighbors of every book first.
+        """
+        delete = recommendation_table.delete()
+        if not replace_all:
+            delete = delete.where(recommendation_table.c.book_id.in_(book_ids))
+
+        async with database.transaction():
+            await database.execute(delete)
+            await database.execute(
+                INSERT_NEIGHBORS,
+                {
+                    "book_ids": neighbors["book_id"].tolist(),
+                    "ranks": neighbors["rank"].tolist(),
+                    "neighbor_ids": neighbors["neighbor_id"].tolist(),
+                    "scores": neighbors["score"].tolist(),
+                },
+            )
@@ -0,0 +1,114 @@
+"""Module containing statistics sketch repository implementation."""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable
+
+from sqlalchemy import and_, select, text
+
+from src.core.repositories.isketch import ISketchRepository
+from src.db import database, lend_table, read_database, sketch_table
+
+# Arbitrary application-wide key of the advisory lock letting one worker refresh.
+SKETCH_LOCK_KEY = 27_000_003
+
+# The number of sketches written per statement.
+SAVE_BATCH_SIZE = 5_000
+
+# Upserts many sketches at once from aligned arrays.
+UPSERT_SKETCHES = text(
+    """
+    INSERT INTO statistics_sketches (kind, book_id, period, data, seq)
+    SELECT sketch.kind, sketch.book_id, sketch.period, sketch.data, :seq FROM unnest(
+        CAST(:kinds AS text[]),
+        CAST(:book_ids AS integer[]),
+        CAST(:periods AS text[]),
+        CAST(:data AS bytea[])
+    ) AS sketch (kind, book_id, period, data)
+    ON CONFLICT (kind, book_id, period)
+    DO UPDATE SET data = EXCLUDED.data, seq = EXCLUDED.seq
+    """
+)
+
+
+class SketchRepository(ISketchRepository):
+    """A class representing the repository of the sketches of approximate statistics."""
+
+    async def get_sketches(self, kind: str, book_id: int, first_period: str, last_period: str) -> list[bytes]:
+        """Fetch the saved sketches of a book in a range of periods.
+
+        Args:
+            kind (str): The kind of the sketches.
+            book_id (int): The ID of the book, 0 for sketches of all books.
+            first_period (str): The first period.
+            last_period (str): The last period.
+
+        Returns:
+            list[bytes]: The serialized sketches.
+        """
+        query = (
+            select(sketch_table.c.data)
+            .where(
+                and_(
+                    sketch_table.c.kind == kind,
+                    sketch_table.c.book_id == book_id,
+                    sketch_table.c.period.between(first_period, last_period),
+                )
+            )
+        )
+        rows = await read_database.fetch_all(query)
+
+        return [row["data"] for row in rows]
+
+    async def iterate_sketches(self) -> AsyncIterator[Any]:
+        """Stream all saved sketches through a server-side cursor.
+
+        Yields:
+            Any: The rows with a `kind`, `book_id`, `period`, `data` and `seq`.
+        """
+        async for row in database.iterate(select(sketch_table)):
+            yield row
+
+    async def iterate_borrows(self) -> AsyncIterator[Any]:
+        """Stream the book, patron and day of all lendings through a server-side cursor.
+
+        Yields:
+            Any: The rows with a `book_id`, `user_id` and `borrowed_date`.
+        """
+        query = select(lend_table.c.book_id, lend_table.c.user_id, lend_table.c.borrowed_date)
+
+        async for row in database.iterate(query):
+            yield row
+
+    @asynccontextmanager
+    async def refresh_lock(self) -> AsyncIterator[bool]:
+        """Open a transaction holding the refresh lock if no other worker holds it.
+
+        Yields:
+            bool: Whether the lock was acquired.
+        """
+        async with database.transaction():
+            yield await database.fetch_val(
+                "SELECT pg_try_advisory_xact_lock(:key)",
+                {"key": SKETCH_LOCK_KEY},
+            )
+
+    async def save_sketches(self, rows: Iterable[dict[str, Any]], seq: int) -> None:
+        """Insert or replace sketches.
+
+        Args:
+            rows (Iterable[dict[str, Any]]): The sketches with a `kind`, `book_id`, `period` and `data`.
+            seq (int): The last outbox event counted by the sketches.
+        """
+        rows = list(rows)
+        async with database.transaction():
+            for offset in range(0, len(rows), SAVE_BATCH_SIZE):
+                batch = rows[offset:offset + SAVE_BATCH_SIZE]
+                await database.execute(
+                    UPSERT_SKETCHES,
+                    {
+                        "seq": seq,
+                        "kinds": [row["kind"] for row in batch],
+                        "book_ids": [row["book_id"] for row in batch],
+                        "periods": [row["period"] for row in batch],
+                        "data": [row["data"] for row in batch],
+                    },
+                )
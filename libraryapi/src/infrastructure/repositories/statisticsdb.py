@@ -1,23 +1,91 @@
 """Module containing statistics repository implementation."""
-from typing import List
+from datetime import date
+from typing import Any, AsyncIterator, Iterable, List, Optional
 
 from fastapi import HTTPException
-from sqlalchemy import select, func, join
+from sqlalchemy import Date, DateTime, Integer, Interval, Select, String, cast, literal, select, func, join, text
+from sqlalchemy.dialects import postgresql
 
 from src.core.domain.lend import LendStatus
 from src.core.repositories.istatistics import IStatisticsRepository
-from src.core.domain.statistics import TopBorrowedBooks, MonthlyBorrowedBooks, YearSummary, MonthlyCategoryStats
+from src.core.domain.statistics import (
+    DurationBucket,
+    DurationGrouping,
+    Granularity,
+    LoanDurationStats,
+    MonthlyBorrowedBooks,
+    MonthlyCategoryStats,
+    StoredYearSummaries,
+    TimeSeriesPoint,
+    TopBorrowedBooks,
+    YearSummary,
+)
 from src.db import (
     book_table,
-    lend_table,
     database,
+    lend_table,
+    publisher_rollup_table,
+    read_database,
+    rollup_watermark_table,
+    year_summary_table,
+)
+from src.infrastructure.utils.consts import LOAN_DURATION_BUCKETS
+
+# The name of the watermark of the per-publisher rollups.
+PUBLISHER_ROLLUPS = "publisher_daily_borrows"
+
+# Adds the borrows missing from the rollups of the days and books of the
+# lendings in an ID range. Both counts come from one snapshot, in which a
+# lending write is either complete or absent, and the difference is added
+# rather than set, so concurrent writes keep counting themselves.
+RECONCILE_PUBLISHER_ROLLUPS = text(
+    """
+    WITH touched AS (
+        SELECT DISTINCT book_id, borrowed_date
+        FROM lendings
+        WHERE id > :after AND id <= :until AND book_id IS NOT NULL
+    ),
+    missing AS (
+        SELECT
+            books.publisher_id,
+            touched.borrowed_date AS day,
+            touched.book_id,
+            (
+                SELECT COUNT(*) FROM lendings
+                WHERE lendings.book_id = touched.book_id
+                AND lendings.borrowed_date = touched.borrowed_date
+            ) - COALESCE((
+                SELECT rollups.borrows FROM publisher_daily_borrows AS rollups
+                WHERE rollups.publisher_id = books.publisher_id
+                AND rollups.day = touched.borrowed_date
+                AND rollups.book_id = touched.book_id
+            ), 0) AS borrows
+        FROM touched JOIN books ON books.id = touched.book_id
+    )
+    INSERT INTO publisher_daily_borrows (publisher_id, day, book_id, borrows)
+    SELECT publisher_id, day, book_id, borrows FROM missing WHERE borrows <> 0
+    ON CONFLICT (publisher_id, day, book_id)
+    DO UPDATE SET borrows = publisher_daily_borrows.borrows + EXCLUDED.borrows
+    RETURNING publisher_id
+    """
 )
 
+# The percentiles of loan durations, as returned in `LoanDurationStats`.
+LOAN_DURATION_PERCENTILES = (0.5, 0.9, 0.99)
+
 class StatisticsRepository(IStatisticsRepository):
     """Repository class for handling statistics-related operations."""
-    async def get_top_borrowed_books(self) -> List[TopBorrowedBooks]:
+    async def get_top_borrowed_books(
+            self,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> List[TopBorrowedBooks]:
         """Fetch the top 10 most borrowed books.
 
+        Args:
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
         Returns:
             List[TopBorrowedBooks]: A list of the top 10 most borrowed books.
         """
@@ -34,8 +102,12 @@ class StatisticsRepository(IStatisticsRepository):
             .order_by(func.count(lend_table.c.id).desc())
             .limit(10)
         )
+        if start is not None:
+            query = query.where(lend_table.c.borrowed_date >= start)
+        if end is not None:
+            query = query.where(lend_table.c.borrowed_date <= end)
 
-        rows = await database.fetch_all(query)
+        rows = await read_database.fetch_all(query)
         return [
             TopBorrowedBooks(
                 id=row["id"],
@@ -61,7 +133,7 @@ class StatisticsRepository(IStatisticsRepository):
             .order_by(func.count(lend_table.c.id).desc())
         )
 
-        rows = await database.fetch_all(query)
+        rows = await read_database.fetch_all(query)
         return [
             MonthlyBorrowedBooks(
                 month=row["month"],
@@ -124,7 +196,7 @@ class StatisticsRepository(IStatisticsRepository):
             .group_by(year_expr)
         )
 
-        rows = await database.fetch_all(query)
+        rows = await read_database.fetch_all(query)
         if not rows:
             raise HTTPException(status_code=404, detail=f"No data for year {year}")
 
@@ -134,6 +206,128 @@ class StatisticsRepository(IStatisticsRepository):
             most_borrowed_book_title=rows[0]["most_borrowed_book_title"],
         )
 
+    async def get_stored_year_summaries(self, first_year: int, last_year: int) -> StoredYearSummaries:
+        """Fetch the precomputed summaries of a range of years.
+
+        Args:
+            first_year (int): The first year.
+            last_year (int): The last year.
+
+        Returns:
+            StoredYearSummaries: The summaries of the years with lendings, oldest first.
+        """
+        query = (
+            select(
+                year_summary_table.c.year,
+                year_summary_table.c.total_borrows,
+                book_table.c.title.label("most_borrowed_book_title"),
+                year_summary_table.c.seq,
+            )
+            .select_from(
+                year_summary_table.outerjoin(
+                    book_table,
+                    year_summary_table.c.most_borrowed_book_id == book_table.c.id,
+                )
+            )
+            .where(year_summary_table.c.year.between(first_year, last_year))
+            .order_by(year_summary_table.c.year)
+        )
+        rows = await read_database.fetch_all(query)
+
+        return StoredYearSummaries(
+            seq=max((row["seq"] for row in rows), default=0),
+            summaries=[
+                YearSummary(
+                    year=row["year"],
+                    total_borrows=row["total_borrows"],
+                    most_borrowed_book_title=row["most_borrowed_book_title"],
+                )
+                for row in rows
+            ],
+        )
+
+    async def get_year_summaries_seq(self) -> Optional[int]:
+        """Fetch the last lend event reflected by every precomputed yearly summary.
+
+        Returns:
+            Optional[int]: The sequence number, None without summaries.
+        """
+        return await database.fetch_val(select(func.min(year_summary_table.c.seq)))
+
+    async def compute_year_summaries(self, year: Optional[int] = None) -> Iterable[Any]:
+        """Summarize the lendings of every year in one scan.
+
+        Args:
+            year (Optional[int], optional): Summarizes only this year.
+
+        Returns:
+            Iterable[Any]: The rows with a `year`, `total_borrows` and
+                `most_borrowed_book_id`, the book with the most lendings and
+                the lowest ID among ties, for every year with lendings.
+        """
+        year_expr = cast(func.extract("year", lend_table.c.borrowed_date), Integer)
+        counts = (
+            select(
+                year_expr.label("year"),
+                lend_table.c.book_id,
+                func.count(lend_table.c.id).label("borrows"),
+            )
+            .group_by(year_expr, lend_table.c.book_id)
+        )
+        if year is not None:
+            counts = counts.where(
+                lend_table.c.borrowed_date.between(date(year, 1, 1), date(year, 12, 31))
+            )
+        counts = counts.subquery("counts")
+
+        ranked = select(
+            counts.c.year,
+            counts.c.book_id,
+            cast(func.sum(counts.c.borrows).over(partition_by=counts.c.year), Integer).label("total_borrows"),
+            func.row_number().over(
+                partition_by=counts.c.year,
+                order_by=(counts.c.book_id.is_(None), counts.c.borrows.desc(), counts.c.book_id),
+            ).label("rank"),
+        ).subquery("ranked")
+
+        query = (
+            select(
+                ranked.c.year,
+                ranked.c.total_borrows,
+                ranked.c.book_id.label("most_borrowed_book_id"),
+            )
+            .where(ranked.c.rank == 1)
+        )
+
+        return await database.fetch_all(query)
+
+    async def save_year_summaries(self, rows: Iterable[Any], seq: int, year: Optional[int] = None) -> None:
+        """Replace precomputed yearly summaries.
+
+        Args:
+            rows (Iterable[Any]): The new summaries, as from `compute_year_summaries`.
+            seq (int): The last lend event reflected by every summary after saving.
+            year (Optional[int], optional): Replaces only the summary of this year.
+        """
+        delete = year_summary_table.delete()
+        if year is not None:
+            delete = delete.where(year_summary_table.c.year == year)
+        values = [
+            {
+                "year": row["year"],
+                "total_borrows": row["total_borrows"],
+                "most_borrowed_book_id": row["most_borrowed_book_id"],
+                "seq": seq,
+            }
+            for row in rows
+        ]
+
+        async with database.transaction():
+            await database.execute(delete)
+            if values:
+                await database.execute_many(year_summary_table.insert(), values)
+            await database.execute(year_summary_table.update().values(seq=seq))
+
     async def get_average_borrowed_per_category_monthly(self) -> List[MonthlyCategoryStats]:
         """Fetch the average number of books borrowed per category each month.
 
@@ -154,7 +348,7 @@ class StatisticsRepository(IStatisticsRepository):
             .order_by(month_expr.desc())
         )
 
-        rows = await database.fetch_all(query)
+        rows = await read_database.fetch_all(query)
 
         return [
             MonthlyCategoryStats(
@@ -163,4 +357,458 @@ class StatisticsRepository(IStatisticsRepository):
                 average_borrows_per_month=row["average_borrow_count"]
             )
             for row in rows
-        ]
\ No newline at end of file
+        ]
+
+    async def get_borrow_timeseries(
+            self,
+            start: date,
+            end: date,
+            granularity: Granularity,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+    ) -> List[TimeSeriesPoint]:
+        """Fetch the number of borrows in every period of a date range.
+
+        The lendings are selected by a range of `borrowed_date`, which the
+        indexes of the column serve, and the periods without borrows are
+        filled in from `generate_series`. The first and last periods may
+        extend beyond the range; only the borrows within the range are counted.
+
+        Args:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            granularity (Granularity): The length of the periods.
+            book_id (Optional[int], optional): Counts only borrows of this book.
+            category (Optional[str], optional): Counts only borrows of books of this category.
+            publisher_id (Optional[int], optional): Counts only borrows of books of this publisher.
+
+        Returns:
+            List[TimeSeriesPoint]: Every period overlapping the range, including
+                periods without borrows, oldest first.
+        """
+        period = func.date_trunc(granularity.value, cast(lend_table.c.borrowed_date, DateTime))
+        counts = self._filter_lends(
+            select(period.label("period"), func.count(lend_table.c.id).label("borrow_count")).group_by(period),
+            start,
+            end,
+            book_id,
+            category,
+            publisher_id,
+        ).subquery("counts")
+
+        series = select(
+            func.generate_series(
+                func.date_trunc(granularity.value, cast(literal(start, Date), DateTime)),
+                cast(literal(end, Date), DateTime),
+                cast(literal(f"1 {granularity.value}", String), Interval),
+            ).label("period")
+        ).subquery("series")
+
+        query = (
+            select(
+                cast(series.c.period, Date).label("period"),
+                func.coalesce(counts.c.borrow_count, 0).label("borrow_count"),
+            )
+            .select_from(series.outerjoin(counts, counts.c.period == series.c.period))
+            .order_by(series.c.period)
+        )
+
+        rows = await read_database.fetch_all(query)
+        return [
+            TimeSeriesPoint(period=row["period"], borrow_count=row["borrow_count"])
+            for row in rows
+        ]
+
+    async def get_loan_durations(
+            self,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+            group_by: Optional[DurationGrouping] = None,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+            limit: int = 50,
+    ) -> List[LoanDurationStats]:
+        """Fetch the distribution of the durations of returned loans.
+
+        Returned lendings are selected by a range of `borrowed_date` through
+        a partial index covering their return dates, and summarized with
+        `percentile_cont` and `width_bucket` over `LOAN_DURATION_BUCKETS`.
+
+        Args:
+            start (Optional[date], optional): The first borrow day of the loans.
+            end (Optional[date], optional): The last borrow day of the loans.
+            group_by (Optional[DurationGrouping], optional): Summarizes the
+                loans of every book, category or publisher instead of all loans.
+            book_id (Optional[int], optional): Summarizes only loans of this book.
+            category (Optional[str], optional): Summarizes only loans of books of this category.
+            publisher_id (Optional[int], optional): Summarizes only loans of books of this publisher.
+            limit (int, optional): The maximum number of groups, those with the most loans.
+
+        Returns:
+            List[LoanDurationStats]: The distributions, most loans first, or a
+                single distribution without a key when not grouped.
+        """
+        days = (lend_table.c.returned_date - lend_table.c.borrowed_date).label("days")
+        group_keys = {
+            DurationGrouping.book: cast(lend_table.c.book_id, String),
+            DurationGrouping.category: book_table.c.categories,
+            DurationGrouping.publisher: cast(book_table.c.publisher_id, String),
+        }
+
+        loans = select(days).where(lend_table.c.returned_date.isnot(None))
+        if group_by is not None:
+            loans = loans.add_columns(group_keys[group_by].label("key")).where(group_keys[group_by].isnot(None))
+        loans = self._filter_lends(
+            loans,
+            start,
+            end,
+            book_id,
+            category,
+            publisher_id,
+            join_books=group_by in (DurationGrouping.category, DurationGrouping.publisher),
+        ).subquery("loans")
+
+        # Without a grouping, the single summary gets a NULL key.
+        keys = [loans.c.key] if group_by is not None else []
+        key = loans.c.key if group_by is not None else literal(None, String).label("key")
+
+        summary_query = (
+            select(
+                key,
+                func.count().label("loans"),
+                func.avg(loans.c.days).label("mean_days"),
+                func.percentile_cont(postgresql.array(LOAN_DURATION_PERCENTILES))
+                .within_group(loans.c.days)
+                .label("percentiles"),
+            )
+            .group_by(*keys)
+            .order_by(func.count().desc(), *keys)
+            .limit(limit)
+        )
+        summaries = [row for row in await read_database.fetch_all(summary_query) if row["loans"]]
+        if not summaries:
+            return []
+
+        bucket = func.width_bucket(loans.c.days, postgresql.array(LOAN_DURATION_BUCKETS))
+        histogram_query = (
+            select(key, bucket.label("bucket"), func.count().label("loans"))
+            .group_by(*keys, bucket)
+        )
+        if group_by is not None:
+            histogram_query = histogram_query.where(loans.c.key.in_([row["key"] for row in summaries]))
+
+        histograms = {row["key"]: [0] * len(LOAN_DURATION_BUCKETS) for row in summaries}
+        for row in await read_database.fetch_all(histogram_query):
+            # Bucket 0 holds durations below the first edge, which only
+            # inconsistent return dates produce.
+            histograms[row["key"]][max(row["bucket"], 1) - 1] += row["loans"]
+
+        edges = [*LOAN_DURATION_BUCKETS, None]
+        return [
+            LoanDurationStats(
+                key=row["key"],
+                loans=row["loans"],
+                mean_days=float(row["mean_days"]),
+                p50_days=row["percentiles"][0],
+                p90_days=row["percentiles"][1],
+                p99_days=row["percentiles"][2],
+                histogram=[
+                    DurationBucket(min_days=edges[position], max_days=edges[position + 1], loans=count)
+                    for position, count in enumerate(histograms[row["key"]])
+                ],
+            )
+            for row in summaries
+        ]
+
+    async def get_distinct_borrowers(
+            self,
+            book_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> int:
+        """Count the distinct patrons who borrowed a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Returns:
+            int: The number of patrons.
+        """
+        query = self._filter_lends(
+            select(func.count(lend_table.c.user_id.distinct())).select_from(lend_table),
+            start,
+            end,
+            book_id,
+            None,
+            None,
+        )
+
+        return await read_database.fetch_val(query)
+
+    async def get_publisher_top_books(
+            self,
+            publisher_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+            limit: int = 10,
+    ) -> List[TopBorrowedBooks]:
+        """Fetch the most borrowed books of a publisher from its rollups.
+
+        Args:
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+            limit (int, optional): The maximum number of books.
+
+        Returns:
+            List[TopBorrowedBooks]: The books, most borrowed first.
+        """
+        borrows = func.sum(publisher_rollup_table.c.borrows)
+        counts = (
+            self._filter_rollups(
+                select(publisher_rollup_table.c.book_id, borrows.label("borrow_count")),
+                publisher_id,
+                start,
+                end,
+            )
+            .group_by(publisher_rollup_table.c.book_id)
+            .having(borrows > 0)
+            .order_by(borrows.desc(), publisher_rollup_table.c.book_id)
+            .limit(limit)
+            .subquery()
+        )
+        query = (
+            select(counts.c.book_id, book_table.c.title, counts.c.borrow_count)
+            .select_from(counts.join(book_table, book_table.c.id == counts.c.book_id))
+            .order_by(counts.c.borrow_count.desc(), counts.c.book_id)
+        )
+
+        rows = await read_database.fetch_all(query)
+        return [
+            TopBorrowedBooks(
+                id=row["book_id"],
+                title=row["title"],
+                borrow_count=row["borrow_count"])
+            for row in rows
+        ]
+
+    async def get_publisher_monthly_borrows(
+            self,
+            publisher_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> List[MonthlyBorrowedBooks]:
+        """Fetch the borrows of the books of a publisher per month from its rollups.
+
+        Args:
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Returns:
+            List[MonthlyBorrowedBooks]: The months with borrows, e.g. `2024-05`, oldest first.
+        """
+        month = func.to_char(publisher_rollup_table.c.day, "YYYY-MM")
+        borrows = func.sum(publisher_rollup_table.c.borrows)
+        query = (
+            self._filter_rollups(
+                select(month.label("month"), borrows.label("borrow_count")),
+                publisher_id,
+                start,
+                end,
+            )
+            .group_by(month)
+            .having(borrows > 0)
+            .order_by(month)
+        )
+
+        rows = await read_database.fetch_all(query)
+        return [
+            MonthlyBorrowedBooks(month=row["month"], borrow_count=row["borrow_count"])
+            for row in rows
+        ]
+
+    async def reconcile_publisher_rollups(self, batch_size: int) -> int:
+        """Add the lendings added since the last check to the rollups if they miss them.
+
+        Lendings inserted without the repository, e.g. sample data or
+        lendings written before the rollups existed, are not counted by
+        lending writes. Only the days and books of lendings above the stored
+        watermark are checked, at most `batch_size` lendings at a time.
+
+        Args:
+            batch_size (int): The maximum number of lendings checked.
+
+        Returns:
+            int: The number of corrected rollups.
+        """
+        async with database.transaction():
+            after = await database.fetch_val(
+                select(rollup_watermark_table.c.lend_id)
+                .where(rollup_watermark_table.c.name == PUBLISHER_ROLLUPS)
+            ) or 0
+            last = await database.fetch_val(select(func.max(lend_table.c.id)))
+            if last is None or last <= after:
+                return 0
+
+            until = min(last, after + batch_size)
+            corrected = await database.fetch_all(
+                RECONCILE_PUBLISHER_ROLLUPS,
+                {"after": after, "until": until},
+            )
+            await database.execute(
+                postgresql.insert(rollup_watermark_table)
+                .values(name=PUBLISHER_ROLLUPS, lend_id=until)
+                .on_conflict_do_update(
+                    index_elements=[rollup_watermark_table.c.name],
+                    set_={"lend_id": until},
+                )
+            )
+
+        return len(corrected)
+
+    async def iterate_lend_rows(self) -> AsyncIterator[Any]:
+        """Stream the columns of all lends kept in the analytics snapshot through a server-side cursor.
+
+        Yields:
+            Any: The rows.
+        """
+        async for row in read_database.iterate(self._select_lend_rows()):
+            yield row
+
+    async def get_lend_rows(self, lend_ids: Iterable[int]) -> Iterable[Any]:
+        """Fetch the columns of lends kept in the analytics snapshot.
+
+        Args:
+            lend_ids (Iterable[int]): The IDs of the lends.
+
+        Returns:
+            Iterable[Any]: The rows of the existing lends.
+        """
+        query = self._select_lend_rows().where(lend_table.c.id.in_(list(lend_ids)))
+
+        return await read_database.fetch_all(query)
+
+    async def iterate_category_rows(self) -> AsyncIterator[Any]:
+        """Stream the categories of all books through a server-side cursor.
+
+        Yields:
+            Any: The rows with an `id` and `categories`.
+        """
+        query = select(book_table.c.id, book_table.c.categories)
+
+        async for row in read_database.iterate(query):
+            yield row
+
+    async def get_category_rows(self, book_ids: Iterable[int]) -> Iterable[Any]:
+        """Fetch the categories of books.
+
+        Args:
+            book_ids (Iterable[int]): The IDs of the books.
+
+        Returns:
+            Iterable[Any]: The rows of the existing books.
+        """
+        query = (
+            select(book_table.c.id, book_table.c.categories)
+            .where(book_table.c.id.in_(list(book_ids)))
+        )
+
+        return await read_database.fetch_all(query)
+
+    async def get_book_titles(self, book_ids: Iterable[int]) -> dict[int, str]:
+        """Fetch the titles of books.
+
+        Args:
+            book_ids (Iterable[int]): The IDs of the books.
+
+        Returns:
+            dict[int, str]: The titles keyed by book ID.
+        """
+        query = (
+            select(book_table.c.id, book_table.c.title)
+            .where(book_table.c.id.in_(list(book_ids)))
+        )
+        rows = await read_database.fetch_all(query)
+
+        return {row["id"]: row["title"] for row in rows}
+
+    @staticmethod
+    def _filter_lends(
+            query: Select,
+            start: Optional[date],
+            end: Optional[date],
+            book_id: Optional[int],
+            category: Optional[str],
+            publisher_id: Optional[int],
+            join_books: bool = False,
+    ) -> Select:
+        """Restrict a query of lendings to a borrow date range and to some books.
+
+        Args:
+            query (Select): The query selecting from the lendings.
+            start (Optional[date]): The first borrow day.
+            end (Optional[date]): The last borrow day.
+            book_id (Optional[int]): Keeps only lendings of this book.
+            category (Optional[str]): Keeps only lendings of books of this category.
+            publisher_id (Optional[int]): Keeps only lendings of books of this publisher.
+            join_books (bool, optional): Whether the books are joined regardless of the filters.
+
+        Returns:
+            Select: The restricted query.
+        """
+        if start is not None:
+            query = query.where(lend_table.c.borrowed_date >= start)
+        if end is not None:
+            query = query.where(lend_table.c.borrowed_date <= end)
+        if book_id is not None:
+            query = query.where(lend_table.c.book_id == book_id)
+        if join_books or category is not None or publisher_id is not None:
+            query = query.join_from(lend_table, book_table, lend_table.c.book_id == book_table.c.id)
+        if category is not None:
+            query = query.where(book_table.c.categories == category)
+        if publisher_id is not None:
+            query = query.where(book_table.c.publisher_id == publisher_id)
+
+        return query
+
+    @staticmethod
+    def _filter_rollups(query: Select, publisher_id: int, start: Optional[date], end: Optional[date]) -> Select:
+        """Restrict a query of the per-publisher rollups to a publisher and a range of days.
+
+        Args:
+            query (Select): The query selecting from the rollups.
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date]): The first borrow day.
+            end (Optional[date]): The last borrow day.
+
+        Returns:
+            Select: The restricted query, served by the primary key index.
+        """
+        query = query.where(publisher_rollup_table.c.publisher_id == publisher_id)
+        if start is not None:
+            query = query.where(publisher_rollup_table.c.day >= start)
+        if end is not None:
+            query = query.where(publisher_rollup_table.c.day <= end)
+
+        return query
+
+    @staticmethod
+    def _select_lend_rows() -> Select:
+        """Build the query of the lend columns kept in the analytics snapshot.
+
+        Returns:
+            Select: The query selecting every lend.
+        """
+        return select(
+            lend_table.c.id,
+            lend_table.c.book_id,
+            lend_table.c.user_id,
+            lend_table.c.borrowed_date,
+            lend_table.c.returned_date,
+            lend_table.c.status,
+        )
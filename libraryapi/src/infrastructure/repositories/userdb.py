@@ -1,5 +1,5 @@
 """Module containing user repository implementation."""
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 
 from asyncpg import Record
 from pydantic import UUID5, UUID4
@@ -11,9 +11,22 @@ from src.db import (
     lend_table,
     user_table,
     database,
+    read_database,
 )
 from src.infrastructure.dto.userdto import UserDTO
+from src.infrastructure.utils.outbox import append_event
 from src.infrastructure.utils.password import hash_password
+from src.infrastructure.utils.projection import Projection
+
+USER_PROJECTION = Projection(
+    UserDTO,
+    {
+        "id": user_table.c.id,
+        "name": user_table.c.name,
+        "email": user_table.c.email,
+        "phone": user_table.c.phone,
+    },
+)
 
 
 class UserRepository(IUserRepository):
@@ -33,7 +46,9 @@ class UserRepository(IUserRepository):
         user.password = hash_password(user.password)
 
         query = user_table.insert().values(**user.model_dump())
-        new_user_uuid = await database.execute(query)
+        async with database.transaction():
+            new_user_uuid = await database.execute(query)
+            await append_event("user", new_user_uuid, "created", user.model_dump(exclude={"password"}))
 
         return await self.get_by_uuid(new_user_uuid)
 
@@ -69,36 +84,70 @@ class UserRepository(IUserRepository):
 
         return user
 
-    async def get_all_users(self) -> Iterable[Any]:
+    async def get_all_users(self, fields: Sequence[str] | None = None) -> Iterable[Any]:
         """A method getting all users from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields.
+
         Returns:
-            Iterable[Any]: List of user objects.
+            Iterable[Any]: List of user objects, projected to dicts if fields are given.
         """
+        columns = USER_PROJECTION.select_list(fields) if fields else [user_table]
         query = (
-            select(user_table)
+            select(*columns)
             .order_by(user_table.c.name.asc())
         )
-        users = await database.fetch_all(query)
+        users = await read_database.fetch_all(query)
+
+        if fields:
+            return [USER_PROJECTION.serialize(user, fields) for user in users]
 
         return [User(**dict(user)) for user in users]
 
-    async def get_user_by_id(self, user_uuid: UUID4) -> Any | None:
+    async def get_user_by_id(
+            self,
+            user_uuid: UUID4,
+            fields: Sequence[str] | None = None,
+    ) -> Any | None:
         """A method getting user by ID from the repository.
 
         Args:
             user_uuid (UUID4): The UUID of the user.
+            fields (Sequence[str] | None, optional): The requested DTO fields.
 
         Returns:
-            Any | None: The user object if exists, otherwise None.
+            Any | None: The user object, projected to a dict if fields are given,
+                if exists, otherwise None.
         """
-        query = select(user_table).where(user_table.c.id == user_uuid)
-        user = await database.fetch_one(query)
+        columns = USER_PROJECTION.select_list(fields) if fields else [user_table]
+        query = select(*columns).where(user_table.c.id == user_uuid)
+        user = await read_database.fetch_one(query)
+
+        if user and fields:
+            return USER_PROJECTION.serialize(user, fields)
 
         if user:
             return UserDTO.from_record(user)
         return None
 
+    async def get_users_by_ids(self, user_uuids: Sequence[UUID4 | str]) -> Iterable[Any]:
+        """A method getting the users with the given IDs.
+
+        Args:
+            user_uuids (Sequence[UUID4 | str]): The UUIDs of the users.
+
+        Returns:
+            Iterable[Any]: The users which exist.
+        """
+        if not user_uuids:
+            return []
+
+        query = select(user_table).where(user_table.c.id.in_(user_uuids))
+        users = await read_database.fetch_all(query)
+
+        return [UserDTO.from_record(user) for user in users]
+
     # async def add_user(self, data: UserIn) -> Any | None:
     #     """A method adding a new user to the repository.
     #
@@ -133,7 +182,9 @@ class UserRepository(IUserRepository):
                 .where(user_table.c.id == user_id)
                 .values(**data.model_dump())
             )
-            await database.execute(query)
+            async with database.transaction():
+                await database.execute(query)
+                await append_event("user", user_id, "updated", data.model_dump(exclude={"password"}))
 
             user = await self._get_by_id(user_id)
 
@@ -159,7 +210,9 @@ class UserRepository(IUserRepository):
         query = user_table \
                 .delete() \
                 .where(user_table.c.id == user_id)
-        await database.execute(query)
+        async with database.transaction():
+            await database.execute(query)
+            await append_event("user", user_id, "deleted")
         return {"success": True, "message": "User deleted successfully."}
 
     async def _get_by_id(self, user_id: int) -> Record | None:
@@ -1,47 +1,82 @@
 """Module containing book service implementation."""
-from typing import Iterable
+from typing import Any, Collection, Iterable, Mapping, Sequence
 
 from src.core.domain.book import Book, BookIn
 from src.core.repositories.ibook import IBookRepository
-from src.infrastructure.dto.bookdto import BookDTO, BookAvailabilityDTO
+from src.core.repositories.ichange import IChangeRepository
+from src.infrastructure.dto.bookdto import BookDTO, BookAvailabilityDTO, BookBrowseDTO, BookSuggestionDTO
 from src.infrastructure.services.ibook import IBookService
+from src.infrastructure.utils.cache import ReadThroughCache
+from src.infrastructure.utils.facets import FacetIndex
+from src.infrastructure.utils.loaders import request_loader
+from src.infrastructure.utils.memindex import MemoryIndex, sync_index
+from src.infrastructure.utils.prefix import PrefixIndex
+from src.infrastructure.utils.unitofwork import after_commit
 
 
 class BookService(IBookService):
     """A class implementing the book service."""
     _repository: IBookRepository
+    _facets: FacetIndex
+    _suggestions: PrefixIndex
+    _change_repository: IChangeRepository
+    _cache: ReadThroughCache
 
-    def __init__(self, repository: IBookRepository) -> None:
+    def __init__(
+            self,
+            repository: IBookRepository,
+            facets: FacetIndex,
+            suggestions: PrefixIndex,
+            change_repository: IChangeRepository,
+            cache: ReadThroughCache,
+    ) -> None:
         """The initializer of the `book service`.
 
         Args:
             repository (IBookRepository): The reference to the book repository.
+            facets (FacetIndex): The shared facet index of the catalog.
+            suggestions (PrefixIndex): The shared prefix index of titles and authors.
+            change_repository (IChangeRepository): The reference to the change feed repository.
+            cache (ReadThroughCache): The shared cache of lookups by ID.
         """
         self._repository = repository
+        self._facets = facets
+        self._suggestions = suggestions
+        self._change_repository = change_repository
+        self._cache = cache
+        self._indexes: tuple[MemoryIndex, ...] = (facets, suggestions)
 
-    async def get_all(self) -> Iterable[BookDTO]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[BookDTO]:
         """The method getting all books from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[BookDTO]: All books from the repository.
         """
-        return await self._repository.get_all_books()
+        return await self._repository.get_all_books(fields)
 
     async def get_book_by_id(
             self,
             book_id: int,
-            include_deleted: bool = False
+            include_deleted: bool = False,
+            fields: Sequence[str] | None = None,
     ) -> BookDTO | None:
         """The method getting a book by its ID from the repository.
 
         Args:
             book_id (int): The ID of the book.
             include_deleted (bool, optional): Whether to include deleted books. Defaults to False.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             BookDTO | None: The book details or None if the book doesn't exist.
         """
-        return await self._repository.get_book_by_id(book_id)
+        if fields:
+            return await self._repository.get_book_by_id(book_id, fields=fields)
+
+        return await request_loader("book", self._load_books).load(book_id)
 
     async def add_book(self, data: BookIn) -> Book | None:
         """The method adding a new book to the repository.
@@ -52,7 +87,11 @@ class BookService(IBookService):
         Returns:
             Book | None: The newly added book or None if the operation fails.
         """
-        return await self._repository.add_book(data)
+        new_book = await self._repository.add_book(data)
+        if new_book:
+            after_commit(lambda: self._upsert_indexed(new_book["id"], dict(new_book)))
+
+        return new_book
 
     async def update_book(
             self,
@@ -68,10 +107,15 @@ class BookService(IBookService):
         Returns:
             Book | None: The updated book details or None if the operation fails.
         """
-        return await self._repository.update_book(
+        updated_book = await self._repository.update_book(
             book_id=book_id,
             data=data,
         )
+        await self._cache.invalidate("book", book_id)
+        if updated_book:
+            after_commit(lambda: self._upsert_indexed(book_id, updated_book.model_dump()))
+
+        return updated_book
 
     async def delete_book(self, book_id: int) -> bool:
         """The method removing a book from the repository.
@@ -82,7 +126,122 @@ class BookService(IBookService):
         Returns:
             bool: Success or failure of the deletion operation.
         """
-        return await self._repository.delete_book(book_id)
+        deleted = await self._repository.delete_book(book_id)
+        await self._cache.invalidate("book", book_id)
+        if deleted:
+            after_commit(lambda: self._remove_indexed(book_id))
+
+        return deleted
+
+    async def browse(
+            self,
+            filters: Mapping[str, Collection[str]],
+            offset: int,
+            limit: int,
+    ) -> BookBrowseDTO:
+        """The method browsing the catalog by facets.
+
+        Args:
+            filters (Mapping[str, Collection[str]]): The selected values keyed by facet.
+            offset (int): The number of matching books to skip.
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            BookBrowseDTO: The page of matching books and the facet counts.
+        """
+        await self._sync_index(self._facets)
+
+        matching = self._facets.match(filters)
+        books = await self._repository.get_books_by_ids(
+            self._facets.ids(matching, offset, limit),
+        )
+
+        return BookBrowseDTO(
+            total=matching.bit_count(),
+            books=books,
+            facets=self._facets.counts(filters),
+        )
+
+    async def suggest(self, prefix: str, limit: int) -> list[BookSuggestionDTO]:
+        """The method suggesting books whose title or author starts with a prefix.
+
+        Args:
+            prefix (str): The typed prefix.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list[BookSuggestionDTO]: The most borrowed matching books.
+        """
+        await self._sync_index(self._suggestions)
+
+        return [
+            BookSuggestionDTO(id=book_id, title=title, author=author, borrowed_count=borrowed_count)
+            for book_id, title, author, borrowed_count in self._suggestions.suggest(prefix, limit)
+        ]
+
+    async def sync_indexes(self) -> None:
+        """The method bringing the in-memory indexes of the catalog up to date."""
+        for index in self._indexes:
+            await self._sync_index(index)
+
+    async def _load_books(self, book_ids: list[int]) -> dict[int, BookDTO]:
+        """Load books through the cache, reading the missing ones with one query.
+
+        Args:
+            book_ids (list[int]): The IDs of the books.
+
+        Returns:
+            dict[int, BookDTO]: The books which exist, by ID.
+        """
+        async def read(missing: list[int]) -> dict[int, BookDTO]:
+            return {book.id: book for book in await self._repository.get_books_by_ids(missing)}
+
+        return await self._cache.get_or_load_many("book", book_ids, read)
+
+    def _upsert_indexed(self, book_id: int, values: Mapping[str, Any]) -> None:
+        """Apply a committed change of a book to the loaded indexes.
+
+        Args:
+            book_id (int): The ID of the book.
+            values (Mapping[str, Any]): The indexed attributes of the book.
+        """
+        for index in self._indexes:
+            if index.loaded:
+                index.upsert(book_id, values)
+
+    def _remove_indexed(self, book_id: int) -> None:
+        """Remove a committed deleted book from the indexes.
+
+        Args:
+            book_id (int): The ID of the book.
+        """
+        for index in self._indexes:
+            index.remove(book_id)
+
+    async def _sync_index(self, index: MemoryIndex) -> None:
+        """Bring an in-memory index of the catalog up to date with the outbox.
+
+        Args:
+            index (MemoryIndex): The index to synchronize.
+        """
+        await sync_index(
+            index,
+            self._change_repository,
+            "book",
+            self._repository.iterate_index_rows,
+            self._repository.get_index_rows,
+        )
+
+    async def get_book_version(self, book_id: int) -> str | None:
+        """The method getting the version token of a book.
+
+        Args:
+            book_id (int): The ID of the book.
+
+        Returns:
+            str | None: The version token or None if the book does not exist.
+        """
+        return await self._repository.get_book_version(book_id)
 
     async def increment_borrowed_count(self, book_id: int) -> None:
         """The method incrementing the borrow count of a book.
@@ -90,7 +249,10 @@ class BookService(IBookService):
         Args:
             book_id (int): The ID of the book.
         """
-        await self._repository.increment_borrowed_count(book_id)
+        borrowed_count = await self._repository.increment_borrowed_count(book_id)
+        await self._cache.invalidate("book", book_id)
+        if borrowed_count is not None:
+            after_commit(lambda: self._suggestions.set_score(book_id, borrowed_count))
 
     async def get_books_availability(self) -> BookAvailabilityDTO:
         """The method getting the availability details of books.
@@ -100,24 +262,34 @@ class BookService(IBookService):
         """
         return await self._repository.get_books_availability()
 
-    async def search_books_by_title(self, title: str) -> Iterable[BookDTO]:
+    async def search_books_by_title(
+            self,
+            title: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[BookDTO]:
         """The method searching for books by title.
 
         Args:
             title (str): The title of the book to search for.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             Iterable[BookDTO]: All books from repository that match the title.
         """
-        return await self._repository.search_books_by_title(title)
+        return await self._repository.search_books_by_title(title, fields)
 
-    async def search_books_by_author(self, author: str) -> Iterable[BookDTO]:
+    async def search_books_by_author(
+            self,
+            author: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[BookDTO]:
         """The method searching for books by author.
 
         Args:
             author (str): The author of the book to search for.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             Iterable[BookDTO]: All books from repository that match the author.
         """
-        return await self._repository.search_books_by_author(author)
\ No newline at end of file
+        return await self._repository.search_books_by_author(author, fields)
\ No newline at end of file
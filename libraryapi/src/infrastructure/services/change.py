@@ -0,0 +1,51 @@
+"""Module containing change feed service implementation."""
+from typing import Iterable
+
+from src.core.domain.change import ChangeFeed
+from src.core.repositories.ichange import IChangeRepository
+from src.infrastructure.services.ichange import IChangeService
+
+
+class ChangeService(IChangeService):
+    """A class implementing the change feed service."""
+    _repository: IChangeRepository
+
+    def __init__(self, repository: IChangeRepository) -> None:
+        """The initializer of the `change service`.
+
+        Args:
+            repository (IChangeRepository): The reference to the change feed repository.
+        """
+        self._repository = repository
+
+    async def get_changes(self, after: int, limit: int) -> ChangeFeed:
+        """The method getting the events appended after a sequence number.
+
+        Args:
+            after (int): The last sequence number already seen by the consumer.
+            limit (int): The maximum number of events to return.
+
+        Returns:
+            ChangeFeed: The page of events and the cursor for the next request.
+        """
+        events = await self._repository.get_changes(after, limit)
+
+        return ChangeFeed(
+            events=events,
+            last_seq=events[-1].seq if events else after,
+        )
+
+    async def get_version(self, entities: Iterable[str]) -> str:
+        """The method getting a token changing with every committed event.
+
+        The token is read like the data it versions, so the data read after
+        it in the request is at least as recent. Committed events change it
+        before they are numbered.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            str: The version token.
+        """
+        return await self._repository.get_read_version(entities)
@@ -0,0 +1,156 @@
+"""Module containing lending export service implementation."""
+import logging
+import os
+from datetime import date
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from src.core.domain.export import Export, ExportFormat, ExportStatus
+from src.core.repositories.iexport import IExportRepository
+from src.infrastructure.services.iexport import IExportService
+from src.infrastructure.utils.export import EXPORT_EXTENSIONS, is_available, write_export
+
+logger = logging.getLogger(__name__)
+
+
+class ExportService(IExportService):
+    """A class implementing the lending export service.
+
+    Exports stream the lendings from a server-side cursor into a file in
+    the export directory, one chunk at a time. Their state is kept in the
+    database, so any worker reports it; files are served by workers
+    sharing the export directory.
+    """
+    _repository: IExportRepository
+
+    def __init__(self, repository: IExportRepository, directory: str, chunk_size: int) -> None:
+        """The initializer of the `export service`.
+
+        Args:
+            repository (IExportRepository): The reference to the export repository.
+            directory (str): The directory of the exported files.
+            chunk_size (int): The number of lendings fetched and written at once.
+        """
+        self._repository = repository
+        self._directory = directory
+        self._chunk_size = chunk_size
+
+    async def start_export(
+            self,
+            export_format: ExportFormat,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> Export:
+        """The method recording a new export, to be written by `run_export`.
+
+        Args:
+            export_format (ExportFormat): The file format.
+            start (Optional[date], optional): The first borrow day exported.
+            end (Optional[date], optional): The last borrow day exported.
+
+        Raises:
+            HTTPException: If exports are unavailable or the range is reversed.
+
+        Returns:
+            Export: The running export.
+        """
+        if not is_available():
+            raise HTTPException(status_code=503, detail="Exports are not available on this server")
+
+        if start and end and start > end:
+            raise HTTPException(status_code=400, detail="The start date is after the end date")
+
+        row = await self._repository.add_export(uuid4().hex, export_format.value, start, end)
+
+        return Export.model_validate(row)
+
+    async def run_export(self, export: Export) -> None:
+        """The method writing the file of a started export and recording the outcome.
+
+        Args:
+            export (Export): The export.
+        """
+        try:
+            rows = await self.write_export(self._path(export), export.format, export.start, export.end)
+        except Exception as e:
+            logger.exception("Export %s failed", export.id)
+            await self._repository.finish_export(export.id, None, str(e) or type(e).__name__)
+        else:
+            await self._repository.finish_export(export.id, rows)
+
+    async def write_export(
+            self,
+            path: str,
+            export_format: ExportFormat,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> int:
+        """The method writing lendings to a file.
+
+        Args:
+            path (str): The path of the file.
+            export_format (ExportFormat): The file format.
+            start (Optional[date], optional): The first borrow day exported.
+            end (Optional[date], optional): The last borrow day exported.
+
+        Returns:
+            int: The number of exported lendings.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        chunks = self._repository.iterate_lendings(start, end, self._chunk_size)
+
+        return await write_export(chunks, path, export_format.value)
+
+    async def get_export(self, export_id: str) -> Export:
+        """The method getting an export.
+
+        Args:
+            export_id (str): The ID of the export.
+
+        Raises:
+            HTTPException: If the export does not exist.
+
+        Returns:
+            Export: The export.
+        """
+        row = await self._repository.get_export(export_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Export not found")
+
+        return Export.model_validate(row)
+
+    async def get_export_path(self, export_id: str) -> str:
+        """The method getting the file of a finished export.
+
+        Args:
+            export_id (str): The ID of the export.
+
+        Raises:
+            HTTPException: If the export does not exist, is running, failed
+                or its file is not on this host.
+
+        Returns:
+            str: The path of the file.
+        """
+        export = await self.get_export(export_id)
+        if export.status == ExportStatus.running:
+            raise HTTPException(status_code=409, detail="Export is still running")
+
+        path = self._path(export)
+        if export.status == ExportStatus.failed or not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Export file not found")
+
+        return path
+
+    def _path(self, export: Export) -> str:
+        """Build the path of the file of an export.
+
+        Args:
+            export (Export): The export.
+
+        Returns:
+            str: The path in the export directory.
+        """
+        return os.path.join(self._directory, f"{export.id}{EXPORT_EXTENSIONS[export.format.value]}")
@@ -1,17 +1,20 @@
 """Module containing book service abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable, Any
+from typing import Collection, Iterable, Any, Mapping, Sequence
 
 from src.core.domain.book import Book, BookIn
-from src.infrastructure.dto.bookdto import BookDTO, BookAvailabilityDTO
+from src.infrastructure.dto.bookdto import BookDTO, BookAvailabilityDTO, BookBrowseDTO, BookSuggestionDTO
 
 
 class IBookService(ABC):
     """A class representing book service abstractions."""
     @abstractmethod
-    async def get_all(self) -> Iterable[BookDTO]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[BookDTO]:
         """The method getting all books from the service.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[BookDTO]: All books available.
         """
@@ -20,13 +23,15 @@ class IBookService(ABC):
     async def get_book_by_id(
             self,
             book_id: int,
-            include_deleted: bool = False
+            include_deleted: bool = False,
+            fields: Sequence[str] | None = None,
     ) -> BookDTO | None:
         """The method getting a book by its ID.
 
         Args:
             book_id (int): The ID of the book.
             include_deleted (bool, optional): Whether to include deleted books. Defaults to False.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             BookDTO | None: The details of the book if found, otherwise None.
@@ -70,6 +75,51 @@ class IBookService(ABC):
             bool: Success of the operation.
         """
 
+    @abstractmethod
+    async def browse(
+            self,
+            filters: Mapping[str, Collection[str]],
+            offset: int,
+            limit: int,
+    ) -> BookBrowseDTO:
+        """The method browsing the catalog by facets.
+
+        Args:
+            filters (Mapping[str, Collection[str]]): The selected values keyed by facet.
+            offset (int): The number of matching books to skip.
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            BookBrowseDTO: The page of matching books and the facet counts.
+        """
+
+    @abstractmethod
+    async def suggest(self, prefix: str, limit: int) -> list[BookSuggestionDTO]:
+        """The method suggesting books whose title or author starts with a prefix.
+
+        Args:
+            prefix (str): The typed prefix.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list[BookSuggestionDTO]: The most borrowed matching books.
+        """
+
+    @abstractmethod
+    async def sync_indexes(self) -> None:
+        """The method bringing the in-memory indexes of the catalog up to date."""
+
+    @abstractmethod
+    async def get_book_version(self, book_id: int) -> str | None:
+        """The method getting the version token of a book.
+
+        Args:
+            book_id (int): The ID of the book.
+
+        Returns:
+            str | None: The version token or None if the book does not exist.
+        """
+
     @abstractmethod
     async def increment_borrowed_count(self, book_id: int) -> None:
         """The method incrementing the borrowed count for a book.
@@ -87,22 +137,32 @@ class IBookService(ABC):
         """
 
     @abstractmethod
-    async def search_books_by_title(self, title: str) -> Iterable[Any]:
+    async def search_books_by_title(
+            self,
+            title: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """Searches for books by title.
 
         Args:
             title (str): The title or partial title of the book.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             Iterable[Any]: A list of books whose titles match the query.
         """
 
     @abstractmethod
-    async def search_books_by_author(self, author: str) -> Iterable[Any]:
+    async def search_books_by_author(
+            self,
+            author: str,
+            fields: Sequence[str] | None = None,
+    ) -> Iterable[Any]:
         """Searches for books by author.
 
         Args:
             author (str): The author's name or part of it.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             Iterable[Any]: A list of books whose authors match the query.
@@ -0,0 +1,31 @@
+"""Module containing change feed service abstractions."""
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+from src.core.domain.change import ChangeFeed
+
+
+class IChangeService(ABC):
+    """A class representing change feed service abstractions."""
+    @abstractmethod
+    async def get_changes(self, after: int, limit: int) -> ChangeFeed:
+        """The method getting the events appended after a sequence number.
+
+        Args:
+            after (int): The last sequence number already seen by the consumer.
+            limit (int): The maximum number of events to return.
+
+        Returns:
+            ChangeFeed: The page of events and the cursor for the next request.
+        """
+
+    @abstractmethod
+    async def get_version(self, entities: Iterable[str]) -> str:
+        """The method getting a token changing with every committed event.
+
+        Args:
+            entities (Iterable[str]): The kinds of entities to consider.
+
+        Returns:
+            str: The version token.
+        """
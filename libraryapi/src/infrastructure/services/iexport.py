@@ -0,0 +1,88 @@
+"""Module containing lending export service abstractions."""
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Optional
+
+from src.core.domain.export import Export, ExportFormat
+
+
+class IExportService(ABC):
+    """A class representing the abstractions of the lending export service."""
+
+    @abstractmethod
+    async def start_export(
+            self,
+            export_format: ExportFormat,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> Export:
+        """The method recording a new export, to be written by `run_export`.
+
+        Args:
+            export_format (ExportFormat): The file format.
+            start (Optional[date], optional): The first borrow day exported.
+            end (Optional[date], optional): The last borrow day exported.
+
+        Raises:
+            HTTPException: If exports are unavailable or the range is reversed.
+
+        Returns:
+            Export: The running export.
+        """
+
+    @abstractmethod
+    async def run_export(self, export: Export) -> None:
+        """The method writing the file of a started export and recording the outcome.
+
+        Args:
+            export (Export): The export.
+        """
+
+    @abstractmethod
+    async def write_export(
+            self,
+            path: str,
+            export_format: ExportFormat,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> int:
+        """The method writing lendings to a file.
+
+        Args:
+            path (str): The path of the file.
+            export_format (ExportFormat): The file format.
+            start (Optional[date], optional): The first borrow day exported.
+            end (Optional[date], optional): The last borrow day exported.
+
+        Returns:
+            int: The number of exported lendings.
+        """
+
+    @abstractmethod
+    async def get_export(self, export_id: str) -> Export:
+        """The method getting an export.
+
+        Args:
+            export_id (str): The ID of the export.
+
+        Raises:
+            HTTPException: If the export does not exist.
+
+        Returns:
+            Export: The export.
+        """
+
+    @abstractmethod
+    async def get_export_path(self, export_id: str) -> str:
+        """The method getting the file of a finished export.
+
+        Args:
+            export_id (str): The ID of the export.
+
+        Raises:
+            HTTPException: If the export does not exist, is running, failed
+                or its file is not on this host.
+
+        Returns:
+            str: The path of the file.
+        """
@@ -1,6 +1,6 @@
 """Module containing lend service abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable, List
+from typing import Iterable, List, Sequence
 from datetime import date
 
 from pydantic import UUID4
@@ -11,19 +11,27 @@ from src.core.domain.lend import LendTransactionIn as Lend, LendTransaction
 class ILendService(ABC):
     """A class representing lend service abstractions."""
     @abstractmethod
-    async def get_all(self) -> Iterable[LendTransaction]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[LendTransaction]:
         """The method getting all lend transactions from the service.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[LendTransaction]: All lend transactions.
         """
 
     @abstractmethod
-    async def get_lend_by_id(self, lend_id: int) -> LendTransaction | None:
+    async def get_lend_by_id(
+            self,
+            lend_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> LendTransaction | None:
         """The method getting a lend transaction by its ID.
 
         Args:
             lend_id (int): The ID of the lend transaction.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             LendTransaction | None: The lend transaction if found, otherwise None.
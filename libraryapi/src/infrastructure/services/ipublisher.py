@@ -1,6 +1,6 @@
 """Module containing publisher service abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable, Any
+from typing import Iterable, Any, Sequence
 
 from src.core.domain.publisher import Publisher, PublisherIn
 
@@ -8,19 +8,27 @@ from src.core.domain.publisher import Publisher, PublisherIn
 class IPublisherService(ABC):
     """A class representing publisher service abstractions."""
     @abstractmethod
-    async def get_all(self) -> Iterable[Publisher]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[Publisher]:
         """The method getting all publishers from the service.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[Publisher]: All publishers in the service.
         """
 
     @abstractmethod
-    async def get_publisher_by_id(self, publisher_id: int) -> Publisher | None:
+    async def get_publisher_by_id(
+            self,
+            publisher_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> Publisher | None:
         """The method getting a publisher by its ID.
 
         Args:
             publisher_id (int): The ID of the publisher.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             Publisher | None: The publisher if found, otherwise None.
@@ -0,0 +1,24 @@
+"""Module containing recommendation service abstractions."""
+from abc import ABC, abstractmethod
+
+from src.infrastructure.dto.bookdto import BookRecommendationDTO
+
+
+class IRecommendationService(ABC):
+    """A class representing recommendation service abstractions."""
+
+    @abstractmethod
+    async def get_recommendations(self, book_id: int, limit: int) -> list[BookRecommendationDTO]:
+        """The method getting the books most often borrowed together with a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            limit (int): The maximum number of recommendations.
+
+        Returns:
+            list[BookRecommendationDTO]: The recommended books, best first.
+        """
+
+    @abstractmethod
+    async def refresh(self) -> None:
+        """The method updating the precomputed recommendations with new lendings."""
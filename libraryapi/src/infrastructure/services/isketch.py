@@ -0,0 +1,46 @@
+"""Module containing sketch service abstractions."""
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List, Optional
+
+from src.core.domain.statistics import DistinctBorrowers, TopBorrowedBooks
+
+
+class ISketchService(ABC):
+    """A class representing the abstractions of the service of approximate statistics."""
+
+    @abstractmethod
+    async def get_top_borrowed_books(self, month: Optional[str] = None) -> List[TopBorrowedBooks]:
+        """The method estimating the top borrowed books.
+
+        Args:
+            month (Optional[str], optional): Counts only borrows of this month, e.g. `2024-05`.
+
+        Returns:
+            List[TopBorrowedBooks]: The top borrowed books with estimated borrow counts.
+        """
+
+    @abstractmethod
+    async def get_distinct_borrowers(
+            self,
+            book_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> DistinctBorrowers:
+        """The method estimating the number of distinct patrons who borrowed a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            start (Optional[date], optional): A day of the first month counted.
+            end (Optional[date], optional): A day of the last month counted.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            DistinctBorrowers: The estimated number of borrowers.
+        """
+
+    @abstractmethod
+    async def refresh(self) -> None:
+        """The method counting new lendings in the saved sketches."""
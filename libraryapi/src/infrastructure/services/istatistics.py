@@ -1,16 +1,33 @@
 """Module containing statistics service abstractions."""
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import date
+from typing import List, Optional
 
-from src.core.domain.statistics import TopBorrowedBooks, MonthlyBorrowedBooks, YearSummary, MonthlyCategoryStats
+from src.core.domain.statistics import (
+    BorrowTimeSeries,
+    DistinctBorrowers,
+    DurationGrouping,
+    Granularity,
+    LoanDurationStats,
+    MonthlyBorrowedBooks,
+    MonthlyCategoryStats,
+    PublisherStatistics,
+    StatisticsDashboard,
+    StoredYearSummaries,
+    TopBorrowedBooks,
+    YearSummary,
+)
 
 
 class IStatisticsService(ABC):
     """A class representing statistics service abstractions."""
     @abstractmethod
-    async def get_top_borrowed_books(self) -> List[TopBorrowedBooks]:
+    async def get_top_borrowed_books(self, month: Optional[str] = None) -> List[TopBorrowedBooks]:
         """The method getting the top borrowed books.
 
+        Args:
+            month (Optional[str], optional): Counts only borrows of this month, e.g. `2024-05`.
+
         Returns:
             List[TopBorrowedBooks]: A list of top borrowed books.
         """
@@ -34,10 +51,142 @@ class IStatisticsService(ABC):
             The summary data for the specified year.
         """
 
+    @abstractmethod
+    async def get_year_summaries(self, first_year: int, last_year: int) -> StoredYearSummaries:
+        """The method getting the precomputed summaries of a range of years.
+
+        Args:
+            first_year (int): The first year.
+            last_year (int): The last year.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            StoredYearSummaries: The summaries of the years with lendings, oldest first.
+        """
+
+    @abstractmethod
+    async def refresh_year_summaries(self) -> None:
+        """The method updating the precomputed yearly summaries with new lendings."""
+
     @abstractmethod
     async def get_average_borrowed_per_category_monthly(self) -> List[MonthlyCategoryStats]:
         """The method getting the average number of books borrowed per category each month.
 
         Returns:
             The average number of borrows per category for each month.
-        """
\ No newline at end of file
+        """
+
+    @abstractmethod
+    async def get_borrow_timeseries(
+            self,
+            start: date,
+            end: date,
+            granularity: Granularity,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+    ) -> BorrowTimeSeries:
+        """The method getting the number of borrows in every period of a date range.
+
+        Args:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            granularity (Granularity): The length of the periods.
+            book_id (Optional[int], optional): Counts only borrows of this book.
+            category (Optional[str], optional): Counts only borrows of books of this category.
+            publisher_id (Optional[int], optional): Counts only borrows of books of this publisher.
+
+        Returns:
+            BorrowTimeSeries: The zero-filled series of borrow counts.
+        """
+
+    @abstractmethod
+    async def get_loan_durations(
+            self,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+            group_by: Optional[DurationGrouping] = None,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+            limit: int = 50,
+    ) -> List[LoanDurationStats]:
+        """The method getting the distribution of the durations of returned loans.
+
+        Args:
+            start (Optional[date], optional): The first borrow day of the loans.
+            end (Optional[date], optional): The last borrow day of the loans.
+            group_by (Optional[DurationGrouping], optional): Summarizes the
+                loans of every book, category or publisher instead of all loans.
+            book_id (Optional[int], optional): Summarizes only loans of this book.
+            category (Optional[str], optional): Summarizes only loans of books of this category.
+            publisher_id (Optional[int], optional): Summarizes only loans of books of this publisher.
+            limit (int, optional): The maximum number of groups, those with the most loans.
+
+        Returns:
+            List[LoanDurationStats]: The distributions, most loans first, or a
+                single distribution without a key when not grouped.
+        """
+
+    @abstractmethod
+    async def get_distinct_borrowers(
+            self,
+            book_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> DistinctBorrowers:
+        """The method counting the distinct patrons who borrowed a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            DistinctBorrowers: The number of borrowers.
+        """
+
+    @abstractmethod
+    async def get_publisher_statistics(
+            self,
+            publisher_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> PublisherStatistics:
+        """The method getting the borrows of the books of a publisher.
+
+        Args:
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            PublisherStatistics: The total, most borrowed books and monthly borrows.
+        """
+
+    @abstractmethod
+    async def reconcile_publisher_rollups(self) -> None:
+        """The method adding the lendings added since the last check to the rollups if they miss them."""
+
+    @abstractmethod
+    async def get_dashboard(self, year: int) -> StatisticsDashboard:
+        """The method getting every statistic of the dashboard concurrently from one snapshot.
+
+        Args:
+            year (int): The year of the yearly summary.
+
+        Returns:
+            StatisticsDashboard: The statistics, without the sections which timed out or failed.
+        """
+
+    @abstractmethod
+    async def sync_snapshots(self) -> None:
+        """The method bringing the in-memory snapshots of the statistics up to date."""
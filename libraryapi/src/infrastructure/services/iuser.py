@@ -1,6 +1,6 @@
 """Module containing user service abstractions."""
 from abc import ABC, abstractmethod
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from pydantic import UUID5
 from pydantic.v1 import UUID4
@@ -57,19 +57,27 @@ class IUserService(ABC):
         """
 
     @abstractmethod
-    async def get_all(self) -> Iterable[UserDTO]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[UserDTO]:
         """The method gets all users.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[UserDTO]: A list of all user details.
         """
 
     @abstractmethod
-    async def get_user_by_id(self, user_uuid: UUID4) -> UserDTO | None:
+    async def get_user_by_id(
+            self,
+            user_uuid: UUID4,
+            fields: Sequence[str] | None = None,
+    ) -> UserDTO | None:
         """The method gets a user by their UUID.
 
         Args:
             user_uuid (UUID4): The unique identifier of the user.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             UserDTO | None: The user details or None if no user is found.
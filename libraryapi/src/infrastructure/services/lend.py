@@ -1,27 +1,31 @@
 """Module containing lend service implementation."""
-from typing import Iterable
+from typing import Iterable, Sequence
 from datetime import date
 
 from fastapi import HTTPException
 from pydantic import UUID4
 
-from src.core.domain.lend import LendTransaction, LendTransactionIn, LendStatus
+from src.core.domain.lend import LendTransaction, LendTransactionIn
 from src.core.repositories.ilend import ILendRepository
 from src.infrastructure.dto.lenddto import BookLendHistoryResponseDTO, UserLendHistoryResponseDTO
 from src.infrastructure.services.ibook import IBookService
 from src.infrastructure.services.ilend import ILendService
+from src.infrastructure.utils.loaders import forget_loaded, request_loader
 from src.infrastructure.services.iuser import IUserService
+from src.infrastructure.utils.cache import ReadThroughCache
 
 
 class LendService(ILendService):
     """A class implementing the lend service."""
     _repository: ILendRepository
+    _cache: ReadThroughCache
 
     def __init__(
             self,
             repository: ILendRepository,
             book_service: IBookService,
-            user_service: IUserService
+            user_service: IUserService,
+            cache: ReadThroughCache,
     ) -> None:
         """The initializer of the `lend service`.
 
@@ -29,29 +33,42 @@ class LendService(ILendService):
             repository (ILendRepository): The reference to the lend repository.
             book_service (IBookService): The reference to the book service.
             user_service (IUserService): The reference to the user service.
+            cache (ReadThroughCache): The shared cache of lookups by ID.
         """
         self._repository = repository
         self._book_service = book_service
         self._user_service = user_service
+        self._cache = cache
 
-    async def get_all(self) -> Iterable[LendTransaction]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[LendTransaction]:
         """The method getting all lend transactions from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[LendTransaction]: All lend transactions.
         """
-        return await self._repository.get_all_lends()
+        return await self._repository.get_all_lends(fields)
 
-    async def get_lend_by_id(self, lend_id: int) -> LendTransaction | None:
+    async def get_lend_by_id(
+            self,
+            lend_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> LendTransaction | None:
         """The method getting a lend transaction by its ID.
 
         Args:
             lend_id (int): The ID of the lend transaction.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             LendTransaction | None: The lend transaction details or None if not found.
         """
-        return await self._repository.get_lend_by_id(lend_id)
+        if fields:
+            return await self._repository.get_lend_by_id(lend_id, fields)
+
+        return await request_loader("lend", self._load_lends).load(lend_id)
 
     async def add_lend(self, data: LendTransactionIn) -> LendTransaction | None:
         """The method adding a new lend transaction to the repository.
@@ -74,6 +91,8 @@ class LendService(ILendService):
             raise HTTPException(status_code=400, detail="User not found")
 
         new_lend = await self._repository.add_lend(data)
+        # The lend took a copy of the book, so its quantity changed.
+        await self._cache.invalidate("book", data.book_id)
 
         if not new_lend:
             raise HTTPException(status_code=500, detail="Failed to create lend transaction")
@@ -94,10 +113,13 @@ class LendService(ILendService):
         Returns:
             LendTransaction | None: The updated lend transaction or None if failed.
         """
-        return await self._repository.update_lend(
+        updated_lend = await self._repository.update_lend(
             lend_id=lend_id,
             data=data,
         )
+        forget_loaded("lend", lend_id)
+
+        return updated_lend
 
     async def delete_lend(self, lend_id: int) -> bool:
         """The method deleting a lend transaction by its ID.
@@ -108,7 +130,10 @@ class LendService(ILendService):
         Returns:
             bool: True if deletion is successful, False otherwise.
         """
-        return await self._repository.delete_lend(lend_id)
+        deleted = await self._repository.delete_lend(lend_id)
+        forget_loaded("lend", lend_id)
+
+        return deleted
 
     async def return_book(
             self,
@@ -118,6 +143,9 @@ class LendService(ILendService):
     ) -> bool:
         """The method returning a borrowed book by updating its lend status.
 
+        A lend exists only for an existing user and book, so finding the
+        active lend checks both.
+
         Args:
             user_id (UUID4): The ID of the user returning the book.
             book_id (int): The ID of the book being returned.
@@ -126,29 +154,13 @@ class LendService(ILendService):
         Returns:
             bool: True if the return operation is successful, False otherwise.
         """
-        user = await self._user_service.get_user_by_id(user_id)
-        if not user:
-            return False
-
-        book = await self._book_service.get_book_by_id(book_id)
-        if not book:
-            return False
-
-        lend_id = await self._repository.get_lend_id_by_book_id_and_user_id(user_id, book_id)
-        lend = await self._repository.get_lend_by_id(lend_id)
-        if not lend:
-            return False
+        returned = await self._repository.return_book(user_id, book_id, return_date)
+        if returned:
+            await self._cache.invalidate("book", book_id)
+            # The returned lend is not known by ID here.
+            forget_loaded("lend")
 
-        if lend.status == LendStatus.returned.value:
-            return False
-
-        if not lend_id:
-            return False
-
-
-        returned_lend = await self._repository.return_book(user_id, book_id, return_date)
-
-        return returned_lend is not None
+        return returned
 
     async def get_book_lends(self, book_id: int) -> Iterable[LendTransactionIn]:
         """The method getting the lend history of a book.
@@ -172,3 +184,16 @@ class LendService(ILendService):
             UserLendHistoryResponseDTO: The lend history of the user.
         """
         return await self._repository.get_user_lends(user_id)
+
+    async def _load_lends(self, lend_ids: list[int]) -> dict[int, LendTransaction]:
+        """Load lend transactions with one query.
+
+        Args:
+            lend_ids (list[int]): The IDs of the lend transactions.
+
+        Returns:
+            dict[int, LendTransaction]: The lend transactions which exist, by ID.
+        """
+        lends = await self._repository.get_lends_by_ids(lend_ids)
+
+        return {lend.id: lend for lend in lends}
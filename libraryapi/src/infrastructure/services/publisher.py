@@ -1,41 +1,57 @@
 """Module containing publisher service implementation."""
-from typing import Iterable, Any
+from typing import Iterable, Any, Sequence
 
 from src.core.domain.publisher import Publisher, PublisherIn
 from src.core.repositories.ipublisher import IPublisherRepository
 from src.infrastructure.services.ipublisher import IPublisherService
+from src.infrastructure.utils.cache import ReadThroughCache
+from src.infrastructure.utils.loaders import forget_loaded, request_loader
 
 
 class PublisherService(IPublisherService):
     """A class implementing the publisher service."""
     _repository: IPublisherRepository
+    _cache: ReadThroughCache
 
-    def __init__(self, repository: IPublisherRepository) -> None:
+    def __init__(self, repository: IPublisherRepository, cache: ReadThroughCache) -> None:
         """The initializer of the `publisher service`.
 
         Args:
             repository (IPublisherRepository): The reference to the publisher repository.
+            cache (ReadThroughCache): The shared cache of lookups by ID.
         """
         self._repository = repository
+        self._cache = cache
 
-    async def get_all(self) -> Iterable[Publisher]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[Publisher]:
         """The method getting all publishers from the repository.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[Publisher]: All publishers.
         """
-        return await self._repository.get_all_publishers()
+        return await self._repository.get_all_publishers(fields)
 
-    async def get_publisher_by_id(self, publisher_id: int) -> Publisher | None:
+    async def get_publisher_by_id(
+            self,
+            publisher_id: int,
+            fields: Sequence[str] | None = None,
+    ) -> Publisher | None:
         """The method getting a publisher by its ID.
 
         Args:
             publisher_id (int): The ID of the publisher.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             Publisher | None: The publisher details or None if not found.
         """
-        return await self._repository.get_publisher_by_id(publisher_id)
+        if fields:
+            return await self._repository.get_publisher_by_id(publisher_id, fields)
+
+        return await request_loader("publisher", self._load_publishers).load(publisher_id)
 
     async def add_publisher(self, data: PublisherIn) -> Any | None:
         """The method adding a new publisher to the repository.
@@ -62,10 +78,15 @@ class PublisherService(IPublisherService):
         Returns:
             Publisher | None: The updated publisher details or None if failed.
         """
-        return await self._repository.update_publisher(
+        updated_publisher = await self._repository.update_publisher(
             publisher_id=publisher_id,
             data=data,
         )
+        forget_loaded("publisher", publisher_id)
+        if updated_publisher:
+            await self._cache.invalidate("publisher_by_user", str(updated_publisher.user_id))
+
+        return updated_publisher
 
     async def delete_publisher(self, publisher_id: int) -> bool:
         """The method deleting a publisher by its ID.
@@ -76,7 +97,13 @@ class PublisherService(IPublisherService):
         Returns:
             bool: True if deletion is successful, False otherwise.
         """
-        return await self._repository.delete_publisher(publisher_id)
+        publisher = await self.get_publisher_by_id(publisher_id)
+        deleted = await self._repository.delete_publisher(publisher_id)
+        forget_loaded("publisher", publisher_id)
+        if publisher:
+            await self._cache.invalidate("publisher_by_user", str(publisher.user_id))
+
+        return deleted
 
     async def is_publisher_assigned_to_books(self, publisher_id):
         """The method checking if the publisher is assigned to any books.
@@ -98,4 +125,21 @@ class PublisherService(IPublisherService):
         Returns:
             Publisher | None: The publisher associated with the user or None if not found.
         """
-        return await self._repository.get_publisher_by_user_id(user_uuid)
\ No newline at end of file
+        return await self._cache.get_or_load(
+            "publisher_by_user",
+            str(user_uuid),
+            lambda: self._repository.get_publisher_by_user_id(user_uuid),
+        )
+
+    async def _load_publishers(self, publisher_ids: list[int]) -> dict[int, Publisher]:
+        """Load publishers with one query.
+
+        Args:
+            publisher_ids (list[int]): The IDs of the publishers.
+
+        Returns:
+            dict[int, Publisher]: The publishers which exist, by ID.
+        """
+        publishers = await self._repository.get_publishers_by_ids(publisher_ids)
+
+        return {publisher.id: publisher for publisher in publishers}
@@ -0,0 +1,100 @@
+"""Module containing recommendation service implementation."""
+import asyncio
+
+from src.core.repositories.ichange import IChangeRepository
+from src.core.repositories.irecommendation import IRecommendationRepository
+from src.infrastructure.dto.bookdto import BookRecommendationDTO
+from src.infrastructure.services.irecommendation import IRecommendationService
+from src.infrastructure.utils.cooccurrence import CoOccurrence, borrow_pairs
+
+# The number of new lend events above which the matrix is rebuilt instead
+# of being patched.
+RECOMMENDATION_SYNC_LIMIT = 10_000
+
+
+class RecommendationService(IRecommendationService):
+    """A class implementing the recommendation service."""
+    _repository: IRecommendationRepository
+    _matrix: CoOccurrence
+    _change_repository: IChangeRepository
+
+    def __init__(
+            self,
+            repository: IRecommendationRepository,
+            matrix: CoOccurrence,
+            change_repository: IChangeRepository,
+            top_k: int,
+    ) -> None:
+        """The initializer of the `recommendation service`.
+
+        Args:
+            repository (IRecommendationRepository): The reference to the recommendation repository.
+            matrix (CoOccurrence): The co-borrowing matrix of this worker.
+            change_repository (IChangeRepository): The reference to the change feed repository.
+            top_k (int): The number of neighbors stored per book.
+        """
+        self._repository = repository
+        self._matrix = matrix
+        self._change_repository = change_repository
+        self._top_k = top_k
+
+    async def get_recommendations(self, book_id: int, limit: int) -> list[BookRecommendationDTO]:
+        """The method getting the books most often borrowed together with a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            limit (int): The maximum number of recommendations.
+
+        Returns:
+            list[BookRecommendationDTO]: The recommended books, best first.
+        """
+        rows = await self._repository.get_recommendations(book_id, limit)
+
+        return [BookRecommendationDTO(**dict(row)) for row in rows]
+
+    async def refresh(self) -> None:
+        """The method updating the precomputed recommendations with new lendings.
+
+        Only the worker holding the refresh lock writes. The matrix is built
+        from all lendings once, then patched with the lend events of the
+        outbox, and only the books whose rows changed get new neighbors.
+        """
+        matrix = self._matrix
+        async with self._repository.refresh_lock() as acquired:
+            if not acquired:
+                return
+
+            last_seq = await self._change_repository.get_last_seq(("lend",))
+            if matrix.loaded and last_seq <= matrix.seq:
+                return
+
+            events = []
+            if matrix.loaded:
+                events = await self._change_repository.get_changes(
+                    matrix.seq,
+                    RECOMMENDATION_SYNC_LIMIT,
+                    entities=("lend",),
+                )
+
+            rebuild = not matrix.loaded or len(events) == RECOMMENDATION_SYNC_LIMIT
+            # The matrix is updated in a thread, keeping the event loop responsive.
+            if rebuild:
+                pairs = borrow_pairs(await self._repository.get_borrow_pairs())
+                books = await asyncio.to_thread(matrix.build, pairs)
+            else:
+                pairs = borrow_pairs(
+                    event.payload for event in events
+                    if event.action == "created" and event.payload
+                )
+                books = await asyncio.to_thread(matrix.add, pairs)
+
+            if rebuild or len(books):
+                neighbors = await asyncio.to_thread(matrix.top_neighbors, books, self._top_k)
+                await self._repository.save_recommendations(
+                    books.tolist(),
+                    neighbors,
+                    replace_all=rebuild,
+                )
+
+            matrix.seq = max(last_seq, events[-1].seq if events else 0)
+            matrix.loaded = True
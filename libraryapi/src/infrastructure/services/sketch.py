@@ -0,0 +1,194 @@
+"""Module containing sketch service implementation."""
+import asyncio
+from datetime import date
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from src.core.domain.statistics import DistinctBorrowers, TopBorrowedBooks
+from src.core.repositories.ichange import IChangeRepository
+from src.core.repositories.isketch import ISketchRepository
+from src.core.repositories.istatistics import IStatisticsRepository
+from src.infrastructure.services.isketch import ISketchService
+from src.infrastructure.services.statistics import TOP_BOOKS_COUNT
+from src.infrastructure.utils.memindex import INDEX_SYNC_LIMIT
+from src.infrastructure.utils.sketches import (
+    ALL_TIME,
+    BORROWERS,
+    TOP_BOOKS,
+    HyperLogLog,
+    SketchStore,
+    TopK,
+    month_of,
+)
+
+
+class SketchService(ISketchService):
+    """A class implementing the service of approximate statistics.
+
+    Estimates are read from sketches saved in the database, so answering
+    costs one small query per month regardless of the number of lendings.
+    """
+    _repository: ISketchRepository
+    _store: SketchStore
+
+    def __init__(
+            self,
+            repository: ISketchRepository,
+            store: SketchStore,
+            change_repository: IChangeRepository,
+            statistics_repository: IStatisticsRepository,
+    ) -> None:
+        """The initializer of the `sketch service`.
+
+        Args:
+            repository (ISketchRepository): The reference to the sketch repository.
+            store (SketchStore): The sketches of this worker.
+            change_repository (IChangeRepository): The reference to the change feed repository.
+            statistics_repository (IStatisticsRepository): The reference to the statistics repository.
+        """
+        self._repository = repository
+        self._store = store
+        self._change_repository = change_repository
+        self._statistics_repository = statistics_repository
+
+    async def get_top_borrowed_books(self, month: Optional[str] = None) -> List[TopBorrowedBooks]:
+        """The method estimating the top borrowed books.
+
+        Args:
+            month (Optional[str], optional): Counts only borrows of this month, e.g. `2024-05`.
+
+        Returns:
+            List[TopBorrowedBooks]: The top borrowed books with estimated borrow counts.
+        """
+        window = month or ALL_TIME
+        sketches = await self._repository.get_sketches(TOP_BOOKS, 0, window, window)
+        if not sketches:
+            return []
+
+        # Every tracked book is a candidate, so the books which no longer
+        # exist are replaced by the next ones.
+        sketch = TopK.from_bytes(sketches[0])
+        top = sketch.top(sketch.k)
+        titles = await self._statistics_repository.get_book_titles([book_id for book_id, _ in top])
+
+        return [
+            TopBorrowedBooks(id=book_id, title=titles[book_id], borrow_count=count)
+            for book_id, count in top
+            if book_id in titles
+        ][:TOP_BOOKS_COUNT]
+
+    async def get_distinct_borrowers(
+            self,
+            book_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> DistinctBorrowers:
+        """The method estimating the number of distinct patrons who borrowed a book.
+
+        The sketches count whole months, so the months of `start` and `end`
+        are counted entirely.
+
+        Args:
+            book_id (int): The ID of the book.
+            start (Optional[date], optional): A day of the first month counted.
+            end (Optional[date], optional): A day of the last month counted.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            DistinctBorrowers: The estimated number of borrowers.
+        """
+        if start is not None and end is not None and end < start:
+            raise HTTPException(status_code=400, detail="`to` must not precede `from`")
+
+        sketches = await self._repository.get_sketches(
+            BORROWERS,
+            book_id,
+            month_of(start) if start else "",
+            month_of(end) if end else "9999-12",
+        )
+
+        borrowers = 0
+        if sketches:
+            merged = HyperLogLog.from_bytes(sketches[0])
+            for sketch in sketches[1:]:
+                merged.merge(HyperLogLog.from_bytes(sketch))
+            borrowers = round(merged.count())
+
+        return DistinctBorrowers(
+            book_id=book_id,
+            start=start,
+            end=end,
+            borrowers=borrowers,
+            approximate=True,
+        )
+
+    async def refresh(self) -> None:
+        """The method counting new lendings in the saved sketches.
+
+        Only the worker holding the refresh lock writes. It loads the saved
+        sketches once, building them from all lendings if none are saved,
+        then counts the lendings created since in the lend events of the
+        outbox and saves the changed sketches.
+        """
+        store = self._store
+        async with self._repository.refresh_lock() as acquired:
+            if not acquired:
+                return
+
+            try:
+                if not store.loaded:
+                    await self._load()
+
+                while True:
+                    events = await self._change_repository.get_changes(
+                        store.seq,
+                        INDEX_SYNC_LIMIT,
+                        entities=("lend",),
+                    )
+                    if not events:
+                        break
+
+                    # The sketches are updated in a thread, keeping the event loop responsive.
+                    await asyncio.to_thread(
+                        store.add_borrows,
+                        [
+                            event.payload for event in events
+                            if event.action == "created" and event.payload
+                        ],
+                    )
+                    await self._save(events[-1].seq)
+                    if len(events) < INDEX_SYNC_LIMIT:
+                        break
+            except Exception:
+                # The sketches may count lendings whose saving was rolled back.
+                store.loaded = False
+                raise
+
+    async def _load(self) -> None:
+        """Load the saved sketches, or build and save them if none are saved."""
+        store = self._store
+        rows = [row async for row in self._repository.iterate_sketches()]
+        await asyncio.to_thread(store.load, rows)
+        store.seq = max((row["seq"] for row in rows), default=0)
+
+        if not rows:
+            last_seq = await self._change_repository.get_last_seq(("lend",))
+            borrows = [row async for row in self._repository.iterate_borrows()]
+            await asyncio.to_thread(store.add_borrows, borrows)
+            await self._save(last_seq)
+
+        store.loaded = True
+
+    async def _save(self, seq: int) -> None:
+        """Save the changed sketches.
+
+        Args:
+            seq (int): The last outbox event counted by the sketches.
+        """
+        rows = await asyncio.to_thread(self._store.take_dirty)
+        if rows:
+            await self._repository.save_sketches(rows, seq)
+        self._store.seq = seq
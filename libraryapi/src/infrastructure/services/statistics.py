@@ -1,29 +1,188 @@
 """Module containing statistics service implementation."""
-from typing import List
+import asyncio
+import calendar
+import contextvars
+import logging
+from concurrent.futures import Executor
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, List, Optional
 
-from src.core.domain.statistics import TopBorrowedBooks, MonthlyBorrowedBooks, MonthlyCategoryStats
+import numpy as np
+from fastapi import HTTPException
+
+from src.core.domain.statistics import (
+    BorrowTimeSeries,
+    DistinctBorrowers,
+    DurationGrouping,
+    Granularity,
+    LoanDurationStats,
+    MonthlyBorrowedBooks,
+    MonthlyCategoryStats,
+    PublisherStatistics,
+    StatisticsDashboard,
+    StoredYearSummaries,
+    TopBorrowedBooks,
+    YearSummary,
+)
+from src.core.repositories.ichange import IChangeRepository
 from src.core.repositories.istatistics import IStatisticsRepository
 from src.infrastructure.services.istatistics import IStatisticsService
+from src.infrastructure.utils import analytics
+from src.infrastructure.utils.analytics import CategoryIndex, LendingSnapshot
+from src.infrastructure.utils.memindex import INDEX_SYNC_LIMIT, sync_index
+from src.infrastructure.utils.snapshots import exported_snapshot, imported_snapshot
+
+logger = logging.getLogger(__name__)
+
+TOP_BOOKS_COUNT = 10
+
+# The columns of the lendings read by the statistics of the dashboard.
+DASHBOARD_COLUMNS = ("book_id", "borrowed_date")
+
+# Columns of the lendings frozen while the sections of a dashboard are
+# computed, seen only by the tasks of that dashboard since the service is
+# shared by concurrent requests.
+_frozen: contextvars.ContextVar[Optional[dict[str, np.ndarray]]] = contextvars.ContextVar(
+    "frozen_lendings",
+    default=None,
+)
+
+
+def count_periods(start: date, end: date, granularity: Granularity) -> int:
+    """Count the periods overlapping a date range.
+
+    Args:
+        start (date): The first day of the range.
+        end (date): The last day of the range.
+        granularity (Granularity): The length of the periods.
+
+    Returns:
+        int: The number of periods.
+    """
+    if granularity == Granularity.day:
+        return (end - start).days + 1
+    if granularity == Granularity.week:
+        return (end - (start - timedelta(days=start.weekday()))).days // 7 + 1
+    if granularity == Granularity.month:
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    if granularity == Granularity.quarter:
+        return (end.year - start.year) * 4 + (end.month - 1) // 3 - (start.month - 1) // 3 + 1
+    return end.year - start.year + 1
+
+
+def month_range(month: str) -> tuple[date, date]:
+    """Get the first and last day of a month.
+
+    Args:
+        month (str): The month, e.g. `2024-05`.
+
+    Returns:
+        tuple[date, date]: The first and last day.
+    """
+    year, number = map(int, month.split("-"))
+    return date(year, number, 1), date(year, number, calendar.monthrange(year, number)[1])
+
+
+def changes_other_years(event: Any, year: int) -> bool:
+    """Check whether a lend event may change the summary of a year other than one.
+
+    Args:
+        event (Any): The lend event of the outbox.
+        year (int): The year.
+
+    Returns:
+        bool: True unless the event only changes lendings of the year.
+    """
+    if event.action == "updated":
+        return True
+    if event.action not in ("created", "deleted"):
+        return False
+
+    borrowed_date = (event.payload or {}).get("borrowed_date")
+    return borrowed_date is None or not str(borrowed_date).startswith(f"{year}-")
+
 
 class StatisticsService(IStatisticsService):
-    """A class implementing the statistics service."""
+    """A class implementing the statistics service.
+
+    With `in_memory` set, the statistics are computed from a columnar
+    snapshot of the lendings kept current from the outbox instead of by SQL
+    aggregations. Snapshots of at least `pool_min_rows` lendings are
+    processed in `pool`, keeping the event loop responsive.
+    """
     _repository: IStatisticsRepository
 
-    def __init__(self, repository: IStatisticsRepository) -> None:
+    def __init__(
+            self,
+            repository: IStatisticsRepository,
+            lendings: LendingSnapshot,
+            categories: CategoryIndex,
+            change_repository: IChangeRepository,
+            pool: Executor,
+            pool_min_rows: int,
+            in_memory: bool,
+            max_points: int,
+            section_timeout: float,
+            rollup_batch_size: int,
+    ) -> None:
         """The initializer of the `statistics service`.
 
         Args:
             repository (IStatisticsRepository): The reference to the statistics repository.
+            lendings (LendingSnapshot): The shared snapshot of the lendings.
+            categories (CategoryIndex): The shared categories of the books.
+            change_repository (IChangeRepository): The reference to the change repository.
+            pool (Executor): The process pool computing over large snapshots.
+            pool_min_rows (int): The number of lendings from which the pool is used.
+            in_memory (bool): Whether the statistics are computed from the snapshot.
+            max_points (int): The maximum number of periods of a time series.
+            section_timeout (float): The seconds after which a section of the dashboard is left out.
+            rollup_batch_size (int): The maximum number of lendings checked against the rollups at once.
         """
         self._repository = repository
+        self._lendings = lendings
+        self._categories = categories
+        self._change_repository = change_repository
+        self._pool = pool
+        self._pool_min_rows = pool_min_rows
+        self._in_memory = in_memory
+        self._max_points = max_points
+        self._section_timeout = section_timeout
+        self._rollup_batch_size = rollup_batch_size
 
-    async def get_top_borrowed_books(self) -> List[TopBorrowedBooks]:
+    async def get_top_borrowed_books(self, month: Optional[str] = None) -> List[TopBorrowedBooks]:
         """The method getting the top borrowed books.
 
+        Args:
+            month (Optional[str], optional): Counts only borrows of this month, e.g. `2024-05`.
+
         Returns:
             List[TopBorrowedBooks]: The list of the top borrowed books.
         """
-        return await self._repository.get_top_borrowed_books()
+        start, end = month_range(month) if month else (None, None)
+        if not self._in_memory:
+            return await self._repository.get_top_borrowed_books(start, end)
+
+        await self._sync_lendings()
+        columns, days = (("book_id",), ())
+        if month:
+            columns, days = (("book_id", "borrowed_date"), ((analytics.to_day(start), analytics.to_day(end) + 1),))
+
+        # Lendings may keep the IDs of books which no longer exist, which the
+        # SQL join skips, so the ranking is extended past them.
+        ranked = TOP_BOOKS_COUNT
+        while True:
+            book_ids, counts = await self._compute(analytics.top_books, columns, ranked, *days)
+            titles = await self._repository.get_book_titles(book_ids.tolist())
+            if len(titles) >= TOP_BOOKS_COUNT or len(book_ids) < ranked:
+                break
+            ranked = TOP_BOOKS_COUNT + len(book_ids) - len(titles)
+
+        return [
+            TopBorrowedBooks(id=book_id, title=titles[book_id], borrow_count=count)
+            for book_id, count in zip(book_ids.tolist(), counts.tolist())
+            if book_id in titles
+        ]
 
     async def get_monthly_borrowed_books(self) -> List[MonthlyBorrowedBooks]:
         """The method getting the monthly borrowed books.
@@ -31,18 +190,85 @@ class StatisticsService(IStatisticsService):
         Returns:
             List[MonthlyBorrowedBooks]: The list of the monthly borrowed books.
         """
-        return await self._repository.get_monthly_borrowed_books()
+        if not self._in_memory:
+            return await self._repository.get_monthly_borrowed_books()
+
+        await self._sync_lendings()
+        months, counts = await self._compute(analytics.monthly_counts, ("borrowed_date",))
 
-    async def get_year_summary(self, year: int):
+        return [
+            MonthlyBorrowedBooks(month=calendar.month_name[month], borrow_count=count)
+            for month, count in zip(months.tolist(), counts.tolist())
+        ]
+
+    async def get_year_summary(self, year: int) -> YearSummary:
         """The method getting the yearly statistics summary.
 
         Args:
             year (int): The year for which the summary is requested.
 
+        Raises:
+            HTTPException: If no data is found for the given year.
+
         Returns:
-            Any: The yearly summary data.
+            YearSummary: The yearly summary data.
         """
-        return await self._repository.get_year_summary(year)
+        if not self._in_memory:
+            return await self._repository.get_year_summary(year)
+
+        await self._sync_lendings()
+        total, book_id = await self._compute(analytics.year_summary, ("book_id", "borrowed_date"), year)
+        if not total:
+            raise HTTPException(status_code=404, detail=f"No data for year {year}")
+
+        titles = await self._repository.get_book_titles([] if book_id is None else [book_id])
+
+        return YearSummary(
+            year=year,
+            total_borrows=total,
+            most_borrowed_book_title=titles.get(book_id),
+        )
+
+    async def get_year_summaries(self, first_year: int, last_year: int) -> StoredYearSummaries:
+        """The method getting the precomputed summaries of a range of years.
+
+        Args:
+            first_year (int): The first year.
+            last_year (int): The last year.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            StoredYearSummaries: The summaries of the years with lendings, oldest first.
+        """
+        if last_year < first_year:
+            raise HTTPException(status_code=400, detail="`to_year` must not precede `from_year`")
+
+        return await self._repository.get_stored_year_summaries(first_year, last_year)
+
+    async def refresh_year_summaries(self) -> None:
+        """The method updating the precomputed yearly summaries with new lendings.
+
+        Only the current year is summarized again, unless a lend event since
+        the last refresh created or deleted a lending of another year. Updates
+        lack the previous borrow date, so they summarize every year again.
+        """
+        current_year = date.today().year
+        last_seq = await self._change_repository.get_last_seq(("lend",))
+        seq = await self._repository.get_year_summaries_seq()
+
+        everything = seq is None
+        while not everything and seq < last_seq:
+            events = await self._change_repository.get_changes(seq, INDEX_SYNC_LIMIT, entities=("lend",))
+            if not events:
+                break
+            everything = any(changes_other_years(event, current_year) for event in events)
+            seq = events[-1].seq
+
+        year = None if everything else current_year
+        rows = await self._repository.compute_year_summaries(year)
+        await self._repository.save_year_summaries(rows, last_seq, year)
 
     async def get_average_borrowed_per_category_monthly(self) -> List[MonthlyCategoryStats]:
         """The method getting the average number of books borrowed per category each month.
@@ -50,4 +276,326 @@ class StatisticsService(IStatisticsService):
         Returns:
             List[MonthlyCategoryStats]: A list of average number of books borrowed per category each month.
         """
-        return await self._repository.get_average_borrowed_per_category_monthly()
+        if not self._in_memory:
+            return await self._repository.get_average_borrowed_per_category_monthly()
+
+        await self._sync_lendings()
+        await self._sync_categories()
+        months, codes, averages = await self._compute(
+            analytics.category_monthly_averages,
+            ("book_id", "borrowed_date"),
+            self._categories.codes.copy(),
+        )
+
+        return [
+            MonthlyCategoryStats(
+                month=str(month),
+                category=self._categories.names[code],
+                average_borrows_per_month=average,
+            )
+            for month, code, average in zip(months, codes.tolist(), averages.tolist())
+        ]
+
+    async def get_borrow_timeseries(
+            self,
+            start: date,
+            end: date,
+            granularity: Granularity,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+    ) -> BorrowTimeSeries:
+        """The method getting the number of borrows in every period of a date range.
+
+        Args:
+            start (date): The first day of the range.
+            end (date): The last day of the range.
+            granularity (Granularity): The length of the periods.
+            book_id (Optional[int], optional): Counts only borrows of this book.
+            category (Optional[str], optional): Counts only borrows of books of this category.
+            publisher_id (Optional[int], optional): Counts only borrows of books of this publisher.
+
+        Raises:
+            HTTPException: If the range is reversed or has too many periods.
+
+        Returns:
+            BorrowTimeSeries: The zero-filled series of borrow counts.
+        """
+        if end < start:
+            raise HTTPException(status_code=400, detail="`to` must not precede `from`")
+        if count_periods(start, end, granularity) > self._max_points:
+            raise HTTPException(
+                status_code=400,
+                detail=f"The range spans more than {self._max_points} periods; use a coarser granularity",
+            )
+
+        points = await self._repository.get_borrow_timeseries(
+            start,
+            end,
+            granularity,
+            book_id=book_id,
+            category=category,
+            publisher_id=publisher_id,
+        )
+
+        return BorrowTimeSeries(granularity=granularity, start=start, end=end, points=points)
+
+    async def get_loan_durations(
+            self,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+            group_by: Optional[DurationGrouping] = None,
+            book_id: Optional[int] = None,
+            category: Optional[str] = None,
+            publisher_id: Optional[int] = None,
+            limit: int = 50,
+    ) -> List[LoanDurationStats]:
+        """The method getting the distribution of the durations of returned loans.
+
+        Args:
+            start (Optional[date], optional): The first borrow day of the loans.
+            end (Optional[date], optional): The last borrow day of the loans.
+            group_by (Optional[DurationGrouping], optional): Summarizes the
+                loans of every book, category or publisher instead of all loans.
+            book_id (Optional[int], optional): Summarizes only loans of this book.
+            category (Optional[str], optional): Summarizes only loans of books of this category.
+            publisher_id (Optional[int], optional): Summarizes only loans of books of this publisher.
+            limit (int, optional): The maximum number of groups, those with the most loans.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            List[LoanDurationStats]: The distributions, most loans first, or a
+                single distribution without a key when not grouped.
+        """
+        if start is not None and end is not None and end < start:
+            raise HTTPException(status_code=400, detail="`to` must not precede `from`")
+
+        return await self._repository.get_loan_durations(
+            start,
+            end,
+            group_by,
+            book_id=book_id,
+            category=category,
+            publisher_id=publisher_id,
+            limit=limit,
+        )
+
+    async def get_distinct_borrowers(
+            self,
+            book_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> DistinctBorrowers:
+        """The method counting the distinct patrons who borrowed a book.
+
+        Args:
+            book_id (int): The ID of the book.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            DistinctBorrowers: The number of borrowers.
+        """
+        if start is not None and end is not None and end < start:
+            raise HTTPException(status_code=400, detail="`to` must not precede `from`")
+
+        borrowers = await self._repository.get_distinct_borrowers(book_id, start, end)
+
+        return DistinctBorrowers(
+            book_id=book_id,
+            start=start,
+            end=end,
+            borrowers=borrowers,
+            approximate=False,
+        )
+
+    async def get_publisher_statistics(
+            self,
+            publisher_id: int,
+            start: Optional[date] = None,
+            end: Optional[date] = None,
+    ) -> PublisherStatistics:
+        """The method getting the borrows of the books of a publisher.
+
+        The statistics are read from the per-publisher daily rollups, so
+        their cost depends on the days of the publisher's range and not on
+        the number of lendings of the library.
+
+        Args:
+            publisher_id (int): The ID of the publisher.
+            start (Optional[date], optional): The first borrow day counted.
+            end (Optional[date], optional): The last borrow day counted.
+
+        Raises:
+            HTTPException: If the range is reversed.
+
+        Returns:
+            PublisherStatistics: The total, most borrowed books and monthly borrows.
+        """
+        if start is not None and end is not None and end < start:
+            raise HTTPException(status_code=400, detail="`to` must not precede `from`")
+
+        monthly_borrows = await self._repository.get_publisher_monthly_borrows(publisher_id, start, end)
+        top_books = await self._repository.get_publisher_top_books(publisher_id, start, end, TOP_BOOKS_COUNT)
+
+        return PublisherStatistics(
+            publisher_id=publisher_id,
+            start=start,
+            end=end,
+            total_borrows=sum(month.borrow_count for month in monthly_borrows),
+            top_books=top_books,
+            monthly_borrows=monthly_borrows,
+        )
+
+    async def reconcile_publisher_rollups(self) -> None:
+        """The method adding the lendings added since the last check to the rollups if they miss them."""
+        if corrected := await self._repository.reconcile_publisher_rollups(self._rollup_batch_size):
+            logger.info("Corrected %d per-publisher rollups of borrows", corrected)
+
+    async def get_dashboard(self, year: int) -> StatisticsDashboard:
+        """The method getting every statistic of the dashboard concurrently from one snapshot.
+
+        From the database, every section runs on its own pooled connection
+        in a REPEATABLE READ transaction importing one exported snapshot. In
+        memory, every section reads the same copy of the lendings. Sections
+        taking longer than the section timeout or failing are left out.
+
+        Args:
+            year (int): The year of the yearly summary.
+
+        Returns:
+            StatisticsDashboard: The statistics, without the sections which timed out or failed.
+        """
+        sections: dict[str, Callable[[], Awaitable[Any]]] = {
+            "top_books": self.get_top_borrowed_books,
+            "monthly_borrowed_books": self.get_monthly_borrowed_books,
+            "year_summary": lambda: self.get_year_summary(year),
+            "category_monthly_averages": self.get_average_borrowed_per_category_monthly,
+        }
+
+        if self._in_memory:
+            await self.sync_snapshots()
+            token = _frozen.set(self._lendings.frame(DASHBOARD_COLUMNS, copy=True))
+            try:
+                results = await asyncio.gather(*(
+                    self._run_section(name, section, None) for name, section in sections.items()
+                ))
+            finally:
+                _frozen.reset(token)
+        else:
+            async with exported_snapshot() as snapshot_id:
+                results = await asyncio.gather(*(
+                    self._run_section(name, section, snapshot_id) for name, section in sections.items()
+                ))
+
+        dashboard = StatisticsDashboard()
+        for name, (value, complete) in zip(sections, results):
+            setattr(dashboard, name, value)
+            if not complete:
+                dashboard.incomplete.append(name)
+
+        return dashboard
+
+    async def sync_snapshots(self) -> None:
+        """The method bringing the in-memory snapshots of the statistics up to date."""
+        if self._in_memory:
+            await self._sync_lendings()
+            await self._sync_categories()
+
+    async def _run_section(
+            self,
+            name: str,
+            section: Callable[[], Awaitable[Any]],
+            snapshot_id: Optional[str],
+    ) -> tuple[Any, bool]:
+        """Compute a section of the dashboard within the section timeout.
+
+        Args:
+            name (str): The name of the section.
+            section (Callable[[], Awaitable[Any]]): The statistic of the section.
+            snapshot_id (Optional[str]): The database snapshot read by the section.
+
+        Returns:
+            tuple[Any, bool]: The statistic, None without data, and whether it was computed.
+        """
+        async def compute() -> Any:
+            if self._in_memory:
+                return await section()
+            async with imported_snapshot(snapshot_id):
+                return await section()
+
+        try:
+            return await asyncio.wait_for(compute(), self._section_timeout), True
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            return None, True
+        except asyncio.TimeoutError:
+            logger.warning("Dashboard section %s timed out", name)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Dashboard section %s failed", name)
+
+        return None, False
+
+    async def _sync_lendings(self) -> None:
+        """Bring the snapshot of the lendings up to date with the outbox."""
+        if _frozen.get() is not None:
+            return
+
+        await sync_index(
+            self._lendings,
+            self._change_repository,
+            "lend",
+            self._repository.iterate_lend_rows,
+            self._repository.get_lend_rows,
+        )
+
+    async def _sync_categories(self) -> None:
+        """Bring the categories of the books up to date with the outbox."""
+        if _frozen.get() is not None:
+            return
+
+        await sync_index(
+            self._categories,
+            self._change_repository,
+            "book",
+            self._repository.iterate_category_rows,
+            self._repository.get_category_rows,
+        )
+
+    async def _compute(
+            self,
+            function: Callable[..., Any],
+            columns: tuple[str, ...],
+            *args: Any,
+    ) -> Any:
+        """Apply a function of the `analytics` module to the lendings.
+
+        Small snapshots are processed inline, since sending the columns to
+        another process costs more than the computation. While a dashboard is
+        computed, the frozen columns are used instead of the snapshot.
+
+        Args:
+            function (Callable[..., Any]): The function taking the columns first.
+            columns (tuple[str, ...]): The columns used by the function.
+            *args (Any): The other arguments of the function.
+
+        Returns:
+            Any: The result of the function.
+        """
+        frozen = _frozen.get()
+        if frozen is not None:
+            frame = {name: frozen[name] for name in columns}
+            if len(frame[columns[0]]) < self._pool_min_rows:
+                return function(frame, *args)
+        elif len(self._lendings) < self._pool_min_rows:
+            return function(self._lendings.frame(columns), *args)
+        else:
+            frame = self._lendings.frame(columns, copy=True)
+
+        return await asyncio.get_running_loop().run_in_executor(self._pool, function, frame, *args)
@@ -1,5 +1,5 @@
 """Module containing user service implementation."""
-from typing import Iterable
+from typing import Iterable, Sequence
 
 from pydantic import UUID4
 
@@ -8,6 +8,8 @@ from src.core.repositories.iuser import IUserRepository
 from src.infrastructure.dto.tokendto import TokenDTO
 from src.infrastructure.dto.userdto import UserDTO
 from src.infrastructure.services.iuser import IUserService
+from src.infrastructure.utils.cache import ReadThroughCache
+from src.infrastructure.utils.loaders import request_loader
 from src.infrastructure.utils.password import verify_password
 from src.infrastructure.utils.token import generate_user_token
 
@@ -15,14 +17,17 @@ from src.infrastructure.utils.token import generate_user_token
 class UserService(IUserService):
     """A class implementing the user service."""
     _repository: IUserRepository
+    _cache: ReadThroughCache
 
-    def __init__(self, repository: IUserRepository) -> None:
+    def __init__(self, repository: IUserRepository, cache: ReadThroughCache) -> None:
         """The initializer of the `user service`.
 
         Args:
             repository (IUserRepository): The reference to the user repository.
+            cache (ReadThroughCache): The shared cache of lookups by ID.
         """
         self._repository = repository
+        self._cache = cache
 
     async def register_user(self, user: UserIn) -> UserDTO | None:
         """The method registering a new user.
@@ -76,24 +81,35 @@ class UserService(IUserService):
         """
         return await self.get_by_email(email)
 
-    async def get_all(self) -> Iterable[UserDTO]:
+    async def get_all(self, fields: Sequence[str] | None = None) -> Iterable[UserDTO]:
         """The method getting all users.
 
+        Args:
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
+
         Returns:
             Iterable[UserDTO]: A collection of all users.
         """
-        return await self._repository.get_all_users()
+        return await self._repository.get_all_users(fields)
 
-    async def get_user_by_id(self, user_uuid: UUID4) -> UserDTO | None:
+    async def get_user_by_id(
+            self,
+            user_uuid: UUID4,
+            fields: Sequence[str] | None = None,
+    ) -> UserDTO | None:
         """The method getting a user by ID.
 
         Args:
             user_uuid (UUID4): The UUID of the user.
+            fields (Sequence[str] | None, optional): The requested DTO fields, returned as dicts.
 
         Returns:
             UserDTO | None: The user data if found, otherwise None.
         """
-        return await self._repository.get_user_by_id(user_uuid)
+        if fields:
+            return await self._repository.get_user_by_id(user_uuid, fields)
+
+        return await request_loader("user", self._load_users).load(str(user_uuid))
 
     # async def add_user(self, data: UserIn) -> User | None:
     #     """The method adding a new user.
@@ -120,10 +136,13 @@ class UserService(IUserService):
         Returns:
             User | None: The updated user data if successful, otherwise None.
         """
-        return await self._repository.update_user(
+        updated_user = await self._repository.update_user(
             user_id=user_id,
             data=data,
         )
+        await self._cache.invalidate("user", str(user_id))
+
+        return updated_user
 
     async def delete_user(self, user_id: int) -> dict:
         """The method deleting a user by ID.
@@ -134,7 +153,10 @@ class UserService(IUserService):
         Returns:
             dict: A success or error message.
         """
-        return await self._repository.delete_user(user_id)
+        result = await self._repository.delete_user(user_id)
+        await self._cache.invalidate("user", str(user_id))
+
+        return result
 
     async def has_active_lendings(self, user_id: UUID4, book_id: int = 0) -> bool:
         """The method checking if the user has active lendings.
@@ -148,4 +170,18 @@ class UserService(IUserService):
         """
         if book_id != 0:
             return await self._repository.has_active_lendings(user_id, book_id)
-        return await self._repository.has_active_lendings(user_id)
\ No newline at end of file
+        return await self._repository.has_active_lendings(user_id)
+
+    async def _load_users(self, user_uuids: list[str]) -> dict[str, UserDTO]:
+        """Load users through the cache, reading the missing ones with one query.
+
+        Args:
+            user_uuids (list[str]): The UUIDs of the users.
+
+        Returns:
+            dict[str, UserDTO]: The users which exist, by UUID.
+        """
+        async def read(missing: list[str]) -> dict[str, UserDTO]:
+            return {str(user.id): user for user in await self._repository.get_users_by_ids(missing)}
+
+        return await self._cache.get_or_load_many("user", user_uuids, read)
@@ -0,0 +1,169 @@
+"""A module containing the admission control of requests by route class.
+
+Every class of routes runs at most a fixed number of requests at once in a
+worker, so slow analytics and exports cannot take every pooled connection
+while checkouts wait behind them. Requests beyond the limit wait in a
+bounded queue, first come first served; when the queue is full, or the
+wait exceeds the queue timeout, they are refused at once instead of timing
+out later.
+"""
+import asyncio
+import re
+from collections import deque
+
+CHECKOUT = "checkout"
+CATALOG = "catalog"
+ANALYTICS = "analytics"
+EXPORT = "export"
+
+# Route classes by method and path, the first matching rule wins. Methods
+# of None match every method. Routes matching no rule, e.g. the docs, the
+# monitoring and the availability stream, are never limited.
+ROUTE_CLASSES = (
+    (EXPORT, ("POST",), re.compile(r"^/exports/")),
+    (EXPORT, ("GET",), re.compile(r"^/exports/[^/]+/file$")),
+    (ANALYTICS, None, re.compile(r"^/statistics/")),
+    (ANALYTICS, ("GET",), re.compile(r"^/publisher/me/statistics$")),
+    (ANALYTICS, ("GET",), re.compile(r"^/lend/all$")),
+    (CHECKOUT, ("POST", "PUT"), re.compile(r"^/lend/")),
+    (CHECKOUT, ("POST",), re.compile(r"^/user/(token|register)$")),
+    (None, ("GET",), re.compile(r"^/book/all/books_availability/stream$")),
+    (CATALOG, None, re.compile(r"^/(book|publisher|lend|user|changes|exports)(/|$)")),
+)
+
+
+class ConcurrencyLimit:
+    """A class limiting the concurrent requests of a route class, with a bounded queue."""
+
+    def __init__(self, limit: int, queue_size: int) -> None:
+        """The initializer of the limit.
+
+        Args:
+            limit (int): The requests running at once.
+            queue_size (int): The requests waiting at most.
+        """
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        """The number of waiting requests."""
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting in the queue if every slot is taken.
+
+        Args:
+            timeout (float): The seconds to wait at most.
+
+        Returns:
+            bool: Whether a slot was taken; callers taking one must release it.
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._leave(waiter)
+                self.rejected += 1
+                return False
+        except BaseException:
+            # A slot handed over just before the cancellation goes to the next request.
+            if waiter.done():
+                self.release()
+            else:
+                self._leave(waiter)
+            raise
+
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Give a slot back, handing it over to the first waiting request."""
+        if self._waiters:
+            self._waiters.popleft().set_result(None)
+        else:
+            self.active -= 1
+
+    def _leave(self, waiter: asyncio.Future) -> None:
+        """Remove a request from the queue.
+
+        Args:
+            waiter (asyncio.Future): The future the request waits on.
+        """
+        waiter.cancel()
+        self._waiters.remove(waiter)
+
+
+class AdmissionController:
+    """A class admitting requests by the limit of their route class."""
+
+    def __init__(
+            self,
+            limits: dict[str, int],
+            queue_sizes: dict[str, int],
+            queue_timeout: float,
+    ) -> None:
+        """The initializer of the controller.
+
+        Args:
+            limits (dict[str, int]): The concurrent requests by route class;
+                classes without a positive limit are not limited.
+            queue_sizes (dict[str, int]): The waiting requests by route class.
+            queue_timeout (float): The seconds a request waits at most.
+        """
+        self.queue_timeout = queue_timeout
+        self._limits = {
+            route_class: ConcurrencyLimit(limit, queue_sizes.get(route_class, 0))
+            for route_class, limit in limits.items()
+            if limit > 0
+        }
+
+    def classify(self, method: str, path: str) -> ConcurrencyLimit | None:
+        """Find the limit of a request.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path of the URL.
+
+        Returns:
+            ConcurrencyLimit | None: The limit of its route class, None if it is not limited.
+        """
+        for route_class, methods, pattern in ROUTE_CLASSES:
+            if (methods is None or method in methods) and pattern.match(path):
+                return self._limits.get(route_class) if route_class else None
+
+        return None
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Report the state and counters of every limited route class.
+
+        Returns:
+            dict[str, dict[str, int]]: The limit, queue size, active, queued,
+                admitted and rejected requests keyed by route class.
+        """
+        return {
+            route_class: {
+                "limit": limit.limit,
+                "queue_size": limit.queue_size,
+                "active": limit.active,
+                "queued": limit.queued,
+                "admitted": limit.admitted,
+                "rejected": limit.rejected,
+            }
+            for route_class, limit in self._limits.items()
+        }
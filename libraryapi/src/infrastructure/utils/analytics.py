@@ -0,0 +1,398 @@
+"""A module containing the columnar snapshot of lendings and its vectorized statistics."""
+from datetime import date
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+from src.infrastructure.utils.memindex import MemoryIndex
+
+# Dates are stored as days since 1970-01-01, which numpy reads as `datetime64[D]`.
+_EPOCH = date(1970, 1, 1).toordinal()
+
+# The book of a lend whose book was removed, and the return date of a lend
+# which was not returned yet.
+NO_BOOK = -1
+NO_DATE = np.iinfo(np.int32).min
+
+# The category code of books without a category.
+NO_CATEGORY = -1
+
+# The columns of `LendingSnapshot.frame`; patrons are dense codes.
+FRAME_COLUMNS = ("book_id", "user_id", "borrowed_date", "returned_date")
+
+
+def to_day(value: date | None) -> int:
+    """Convert a date to the number of days since 1970-01-01.
+
+    Args:
+        value (date | None): The date.
+
+    Returns:
+        int: The number of days, or `NO_DATE` for None.
+    """
+    return NO_DATE if value is None else value.toordinal() - _EPOCH
+
+
+def _months(days: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split days since 1970-01-01 into months since 1970 and days of the month.
+
+    Only the days of the covered range are converted by numpy, which is much
+    faster than converting every lending.
+
+    Args:
+        days (np.ndarray): The days.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The months and the zero-based days of the month.
+    """
+    if len(days) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    first = int(days.min())
+    covered = np.arange(first, int(days.max()) + 1)
+    months = covered.astype("datetime64[D]").astype("datetime64[M]")
+    days_of_month = covered - months.astype("datetime64[D]").astype(np.int64)
+    return months.astype(np.int64)[days - first], days_of_month[days - first]
+
+
+class LendingSnapshot(MemoryIndex):
+    """A class keeping the lendings as aligned numpy columns.
+
+    Rows are appended in place with amortized growth; removed rows are
+    masked out until the next bulk load. `frame` hands the live rows to the
+    vectorized functions of this module, which may run in other processes.
+    """
+    columns = ("book_id", "user_id", "borrowed_date", "returned_date", "status")
+
+    def __init__(self, sync_interval: float = 1.0) -> None:
+        """The initializer of the snapshot.
+
+        Args:
+            sync_interval (float, optional): The minimum delay between outbox checks.
+        """
+        super().__init__(sync_interval)
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every lending."""
+        self._size = 0
+        self._dead = 0
+        self._positions: dict[int, int] = {}
+        self._users: dict[Any, int] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._book_ids = np.empty(0, dtype=np.int64)
+        self._user_ids = np.empty(0, dtype=np.int32)
+        self._borrowed = np.empty(0, dtype=np.int32)
+        self._returned = np.empty(0, dtype=np.int32)
+        self._live = np.empty(0, dtype=np.bool_)
+
+    def __len__(self) -> int:
+        """The number of lendings."""
+        return self._size - self._dead
+
+    def bulk_load(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the lendings.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows with an `id` and the lend columns.
+        """
+        rows = list(rows)
+        count = len(rows)
+        self.clear()
+        self._allocate(count)
+
+        self._ids[:count] = np.fromiter((row["id"] for row in rows), dtype=np.int64, count=count)
+        self._book_ids[:count] = np.fromiter(
+            (NO_BOOK if row["book_id"] is None else row["book_id"] for row in rows),
+            dtype=np.int64,
+            count=count,
+        )
+        users = self._users
+        self._user_ids[:count] = np.fromiter(
+            (users.setdefault(row["user_id"], len(users)) for row in rows),
+            dtype=np.int32,
+            count=count,
+        )
+        self._borrowed[:count] = np.fromiter(
+            (to_day(row["borrowed_date"]) for row in rows),
+            dtype=np.int32,
+            count=count,
+        )
+        self._returned[:count] = np.fromiter(
+            (to_day(row["returned_date"]) for row in rows),
+            dtype=np.int32,
+            count=count,
+        )
+        self._live[:count] = True
+        self._positions = {int(lend_id): position for position, lend_id in enumerate(self._ids[:count])}
+        self._size = count
+
+    def upsert(self, item_id: int, values: Mapping[str, Any]) -> None:
+        """Add a lending or update it.
+
+        Args:
+            item_id (int): The ID of the lend.
+            values (Mapping[str, Any]): The lend columns.
+        """
+        position = self._positions.get(item_id)
+        if position is None:
+            if self._size == len(self._ids):
+                self._allocate(max(1024, 2 * self._size))
+            position = self._size
+            self._size += 1
+            self._positions[item_id] = position
+        elif not self._live[position]:
+            self._dead -= 1
+
+        self._ids[position] = item_id
+        self._book_ids[position] = NO_BOOK if values["book_id"] is None else values["book_id"]
+        self._user_ids[position] = self._user_code(values["user_id"])
+        self._borrowed[position] = to_day(values["borrowed_date"])
+        self._returned[position] = to_day(values["returned_date"])
+        self._live[position] = True
+
+    def remove(self, item_id: int) -> None:
+        """Remove a lending if it is present.
+
+        Args:
+            item_id (int): The ID of the lend.
+        """
+        position = self._positions.get(item_id)
+        if position is not None and self._live[position]:
+            self._live[position] = False
+            self._dead += 1
+
+    def frame(self, names: Iterable[str] = FRAME_COLUMNS, copy: bool = False) -> dict[str, np.ndarray]:
+        """Get columns of the live lendings.
+
+        Args:
+            names (Iterable[str], optional): The names of the columns among
+                `FRAME_COLUMNS`; every column by default.
+            copy (bool, optional): Whether the columns must not share memory
+                with the snapshot, e.g. when they are sent to another process.
+
+        Returns:
+            dict[str, np.ndarray]: The aligned columns keyed by name, dates in
+                days since 1970-01-01.
+        """
+        stored = {
+            "book_id": self._book_ids,
+            "user_id": self._user_ids,
+            "borrowed_date": self._borrowed,
+            "returned_date": self._returned,
+        }
+        columns = {name: stored[name][:self._size] for name in names}
+        if self._dead:
+            live = self._live[:self._size]
+            return {name: column[live] for name, column in columns.items()}
+        if copy:
+            return {name: column.copy() for name, column in columns.items()}
+        return columns
+
+    def _allocate(self, capacity: int) -> None:
+        """Resize the columns, keeping the stored rows.
+
+        Args:
+            capacity (int): The number of rows to fit.
+        """
+        def resized(column: np.ndarray) -> np.ndarray:
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            return grown
+
+        self._ids = resized(self._ids)
+        self._book_ids = resized(self._book_ids)
+        self._user_ids = resized(self._user_ids)
+        self._borrowed = resized(self._borrowed)
+        self._returned = resized(self._returned)
+        self._live = resized(self._live)
+
+    def _user_code(self, user_id: Any) -> int:
+        """Get the dense code of a patron.
+
+        Args:
+            user_id (Any): The UUID of the patron.
+
+        Returns:
+            int: The code.
+        """
+        return self._users.setdefault(user_id, len(self._users))
+
+
+class CategoryIndex(MemoryIndex):
+    """A class mapping book IDs to dense category codes."""
+    columns = ("categories",)
+
+    def __init__(self, sync_interval: float = 1.0) -> None:
+        """The initializer of the index.
+
+        Args:
+            sync_interval (float, optional): The minimum delay between outbox checks.
+        """
+        super().__init__(sync_interval)
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every book."""
+        self.codes = np.full(0, NO_CATEGORY, dtype=np.int32)
+        self.names: list[str] = []
+        self._code_of: dict[str, int] = {}
+
+    def bulk_load(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the categories of the books.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows with an `id` and `categories`.
+        """
+        self.clear()
+        for row in rows:
+            self.upsert(row["id"], row)
+
+    def upsert(self, item_id: int, values: Mapping[str, Any]) -> None:
+        """Set the category of a book.
+
+        Args:
+            item_id (int): The ID of the book.
+            values (Mapping[str, Any]): The `categories` of the book.
+        """
+        if item_id >= len(self.codes):
+            grown = np.full(max(item_id + 1, 2 * len(self.codes)), NO_CATEGORY, dtype=np.int32)
+            grown[:len(self.codes)] = self.codes
+            self.codes = grown
+
+        category = values["categories"]
+        if category is None:
+            self.codes[item_id] = NO_CATEGORY
+        else:
+            self.codes[item_id] = self._code_of.setdefault(category, len(self._code_of))
+            if len(self.names) < len(self._code_of):
+                self.names.append(category)
+
+    def remove(self, item_id: int) -> None:
+        """Forget the category of a book if it is present.
+
+        Args:
+            item_id (int): The ID of the book.
+        """
+        if item_id < len(self.codes):
+            self.codes[item_id] = NO_CATEGORY
+
+
+def top_books(
+        frame: Mapping[str, np.ndarray],
+        count: int,
+        days: tuple[int, int] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the most borrowed books.
+
+    Args:
+        frame (Mapping[str, np.ndarray]): The columns of the lendings.
+        count (int): The maximum number of books.
+        days (tuple[int, int] | None, optional): Counts only lendings from the
+            first day up to the second one excluded, as returned by `to_day`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The IDs of the books and their lend
+            counts, most borrowed first and by ID among ties.
+    """
+    book_ids = frame["book_id"]
+    if days is not None:
+        borrowed = frame["borrowed_date"]
+        book_ids = book_ids[(borrowed >= days[0]) & (borrowed < days[1])]
+    borrows = np.bincount(book_ids[book_ids != NO_BOOK])
+    count = min(count, int(np.count_nonzero(borrows)))
+    if count == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # Books tied with the last selected one are taken by ID, so the result
+    # does not depend on the partitioning.
+    threshold = np.partition(borrows, len(borrows) - count)[len(borrows) - count]
+    above = np.flatnonzero(borrows > threshold)
+    tied = np.flatnonzero(borrows == threshold)[:count - len(above)]
+    top = np.concatenate((above, tied))
+    top = top[np.lexsort((top, -borrows[top]))]
+    return top, borrows[top]
+
+
+def monthly_counts(frame: Mapping[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Count the lendings of every calendar month, all years together.
+
+    Args:
+        frame (Mapping[str, np.ndarray]): The columns of the lendings.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The months (1-12) with lendings and
+            their counts, most lendings first.
+    """
+    months = _months(frame["borrowed_date"])[0] % 12
+    borrows = np.bincount(months, minlength=12)
+    order = np.argsort(-borrows, kind="stable")
+    order = order[borrows[order] > 0]
+    return order + 1, borrows[order]
+
+
+def year_summary(frame: Mapping[str, np.ndarray], year: int) -> tuple[int, int | None]:
+    """Summarize the lendings of a year.
+
+    Args:
+        frame (Mapping[str, np.ndarray]): The columns of the lendings.
+        year (int): The year.
+
+    Returns:
+        tuple[int, int | None]: The number of lendings and the ID of the most
+            borrowed book, None without lendings of books.
+    """
+    days = frame["borrowed_date"]
+    in_year = (days >= to_day(date(year, 1, 1))) & (days < to_day(date(year + 1, 1, 1)))
+    book_ids = frame["book_id"][in_year]
+    book_ids = book_ids[book_ids != NO_BOOK]
+
+    top_book = int(np.bincount(book_ids).argmax()) if len(book_ids) else None
+    return int(np.count_nonzero(in_year)), top_book
+
+
+def category_monthly_averages(
+        frame: Mapping[str, np.ndarray],
+        categories: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Average the daily lendings of every category in every month.
+
+    As in SQL, the lendings of a month are divided by the number of
+    distinct days with lendings of the category in that month.
+
+    Args:
+        frame (Mapping[str, np.ndarray]): The columns of the lendings.
+        categories (np.ndarray): The category codes indexed by book ID.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The months as
+            `datetime64[M]`, the category codes and the averages, latest
+            month first and by code within a month.
+    """
+    book_ids, days = frame["book_id"], frame["borrowed_date"]
+    known = (book_ids != NO_BOOK) & (book_ids < len(categories))
+    book_ids, days = book_ids[known], days[known]
+    codes = categories[book_ids]
+    categorized = codes != NO_CATEGORY
+    codes, days = codes[categorized].astype(np.int64), days[categorized]
+    if len(days) == 0:
+        return np.empty(0, dtype="datetime64[M]"), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    months, days_of_month = _months(days)
+    first_month = months.min()
+    width = int(codes.max()) + 1
+    groups = (months - first_month) * width + codes
+
+    borrows = np.bincount(groups)
+    group_days = np.bincount(groups * 31 + days_of_month, minlength=len(borrows) * 31)
+    active_days = np.count_nonzero(group_days.reshape(-1, 31), axis=1)
+
+    present = np.flatnonzero(borrows)
+    group_months, group_codes = present // width + first_month, present % width
+    order = np.lexsort((group_codes, -group_months))
+    present = present[order]
+    return (
+        (group_months[order]).astype("datetime64[M]"),
+        group_codes[order],
+        borrows[present] / active_days[present],
+    )
@@ -0,0 +1,81 @@
+"""A module containing the in-process fan-out of live events."""
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+class Subscription:
+    """A single subscriber with a bounded buffer of pending messages."""
+
+    def __init__(self, buffer_size: int) -> None:
+        """The initializer of the subscription.
+
+        Args:
+            buffer_size (int): The maximum number of buffered messages.
+        """
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.lagged = False
+
+    def put(self, message: Any) -> None:
+        """Buffer a message, dropping the oldest one when the buffer is full.
+
+        Args:
+            message (Any): The message to deliver.
+        """
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.lagged = True
+        self._queue.put_nowait(message)
+
+    async def get(self) -> Any:
+        """Wait for the next message.
+
+        Returns:
+            Any: The next buffered message.
+        """
+        return await self._queue.get()
+
+
+class Broadcaster:
+    """A class delivering published messages to every current subscriber.
+
+    Publishing never blocks: a slow subscriber loses its oldest messages and
+    is flagged as lagged, so it can ask the client to resynchronize.
+    """
+
+    def __init__(self, buffer_size: int) -> None:
+        """The initializer of the broadcaster.
+
+        Args:
+            buffer_size (int): The buffer size of each subscription.
+        """
+        self._buffer_size = buffer_size
+        self._subscriptions: set[Subscription] = set()
+
+    @property
+    def subscribers(self) -> int:
+        """The number of current subscribers."""
+        return len(self._subscriptions)
+
+    def publish(self, message: Any) -> None:
+        """Deliver a message to every subscriber.
+
+        Args:
+            message (Any): The message to deliver.
+        """
+        for subscription in self._subscriptions:
+            subscription.put(message)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        """Register a subscription for the duration of the context.
+
+        Yields:
+            Subscription: The new subscription.
+        """
+        subscription = Subscription(self._buffer_size)
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
@@ -0,0 +1,496 @@
+"""A module containing the read-through cache of repository lookups."""
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable
+
+from src.infrastructure.utils.invalidation import InvalidationBus
+from src.infrastructure.utils.loaders import forget_loaded
+from src.infrastructure.utils.replicas import primary_reads
+from src.infrastructure.utils.unitofwork import after_transaction
+
+try:
+    from redis import asyncio as redis  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+def namespace_of(key: str) -> str:
+    """Get the namespace of a full cache key.
+
+    Args:
+        key (str): The full key, e.g. `book:42`.
+
+    Returns:
+        str: The namespace, e.g. `book`.
+    """
+    return key.partition(":")[0]
+
+
+class CacheBackend(ABC):
+    """An abstract class representing the storage of cached values.
+
+    Every deletion bumps the epoch of the namespaces of the deleted values,
+    and values are stored only while the epoch read before loading them is
+    current, so a value loaded before an invalidation, in any worker sharing
+    the storage, is not stored after it.
+    """
+    # Whether every worker reads the same storage, making invalidations
+    # of other workers already applied.
+    shared: bool = False
+
+    @abstractmethod
+    async def epoch(self, namespace: str) -> int:
+        """Get the number of invalidations of a namespace, read before loading its values.
+
+        Args:
+            namespace (str): The namespace.
+
+        Returns:
+            int: The epoch.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        """Get a value which has not expired yet.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Any | None: The cached value or None if it is missing.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_seconds: float, epoch: int) -> None:
+        """Store a value for a limited time unless its namespace was invalidated since the epoch.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to store.
+            ttl_seconds (float): How long the value is served.
+            epoch (int): The epoch of the namespace read before loading the value.
+        """
+
+    @abstractmethod
+    async def delete(self, keys: list[str]) -> None:
+        """Drop values if they are present and bump the epochs of their namespaces.
+
+        Args:
+            keys (list[str]): The keys of the values.
+        """
+
+    @abstractmethod
+    async def clear(self, prefix: str = "") -> None:
+        """Drop every value whose key starts with a prefix and bump the epochs of their namespaces.
+
+        Args:
+            prefix (str, optional): The prefix of the keys, e.g. `book:`; every value by default.
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """An in-process LRU storage of values with expiry times.
+
+    One epoch counts the invalidations of every namespace, since they only
+    happen in this worker.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """The initializer of the backend.
+
+        Args:
+            max_entries (int): The maximum number of stored values.
+        """
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._epoch = 0
+
+    async def epoch(self, namespace: str) -> int:
+        """Get the number of invalidations of a namespace, read before loading its values.
+
+        Args:
+            namespace (str): The namespace.
+
+        Returns:
+            int: The epoch, shared by every namespace.
+        """
+        return self._epoch
+
+    async def get(self, key: str) -> Any | None:
+        """Get a value which has not expired yet.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Any | None: The cached value or None if it is missing.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl_seconds: float, epoch: int) -> None:
+        """Store a value for a limited time, evicting the least recently used ones.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to store.
+            ttl_seconds (float): How long the value is served.
+            epoch (int): The epoch read before loading the value.
+        """
+        if epoch != self._epoch:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, keys: list[str]) -> None:
+        """Drop values if they are present and bump the epoch.
+
+        Args:
+            keys (list[str]): The keys of the values.
+        """
+        self._epoch += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self, prefix: str = "") -> None:
+        """Drop every value whose key starts with a prefix and bump the epoch.
+
+        Args:
+            prefix (str, optional): The prefix of the keys, e.g. `book:`; every value by default.
+        """
+        self._epoch += 1
+        if not prefix:
+            self._entries.clear()
+            return
+
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+
+# The prefix of the keys of the epochs of namespaces.
+EPOCH_PREFIX = "epoch:"
+
+# Stores a value only while the epoch of its namespace is the one read
+# before loading it; a missing epoch is 0.
+STORE_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+end
+"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """A storage of pickled values in a Redis-compatible server shared by workers.
+
+    The epoch of every namespace is a counter in the server, so a value one
+    worker loaded before another worker invalidated it is not stored. The
+    value is stored by a script comparing the epoch atomically.
+    """
+    shared = True
+
+    def __init__(self, url: str) -> None:
+        """The initializer of the backend.
+
+        Args:
+            url (str): The URL of the server.
+
+        Raises:
+            RuntimeError: If the optional `redis` package is not installed.
+        """
+        if redis is None:
+            raise RuntimeError("CACHE_REDIS_URL requires the `redis` package")
+
+        self._client = redis.from_url(url)
+        self._store_if_current = self._client.register_script(STORE_IF_CURRENT)
+
+    async def epoch(self, namespace: str) -> int:
+        """Get the number of invalidations of a namespace, read before loading its values.
+
+        Args:
+            namespace (str): The namespace.
+
+        Returns:
+            int: The epoch.
+        """
+        return int(await self._client.get(self._epoch_key(namespace)) or 0)
+
+    async def get(self, key: str) -> Any | None:
+        """Get a value which has not expired yet.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Any | None: The cached value or None if it is missing.
+        """
+        data = await self._client.get(key)
+        # trunk-ignore(bandit/B301)
+        return None if data is None else pickle.loads(data)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float, epoch: int) -> None:
+        """Store a value for a limited time unless its namespace was invalidated since the epoch.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value to store.
+            ttl_seconds (float): How long the value is served.
+            epoch (int): The epoch of the namespace read before loading the value.
+        """
+        await self._store_if_current(
+            keys=[key, self._epoch_key(namespace_of(key))],
+            args=[epoch, pickle.dumps(value), int(ttl_seconds * 1000)],
+        )
+
+    async def delete(self, keys: list[str]) -> None:
+        """Drop values if they are present and bump the epochs of their namespaces.
+
+        Args:
+            keys (list[str]): The keys of the values.
+        """
+        if not keys:
+            return
+
+        async with self._client.pipeline(transaction=True) as pipeline:
+            for namespace in {namespace_of(key) for key in keys}:
+                pipeline.incr(self._epoch_key(namespace))
+            pipeline.delete(*keys)
+            await pipeline.execute()
+
+    async def clear(self, prefix: str = "") -> None:
+        """Drop every value whose key starts with a prefix and bump the epochs of their namespaces.
+
+        Args:
+            prefix (str, optional): The prefix of the keys, e.g. `book:`; every value by default.
+        """
+        if prefix:
+            await self._client.incr(self._epoch_key(namespace_of(prefix)))
+        keys = [
+            key async for key in self._client.scan_iter(match=f"{prefix}*")
+            if not key.startswith(EPOCH_PREFIX.encode())
+        ]
+        await self.delete([key.decode() for key in keys])
+
+    @staticmethod
+    def _epoch_key(namespace: str) -> str:
+        """Build the key of the epoch of a namespace.
+
+        Args:
+            namespace (str): The namespace.
+
+        Returns:
+            str: The key, outside of every namespace of values.
+        """
+        return f"{EPOCH_PREFIX}{namespace}"
+
+
+def create_cache_backend(redis_url: str | None, max_entries: int) -> CacheBackend:
+    """Create the configured cache backend.
+
+    Args:
+        redis_url (str | None): The URL of a Redis-compatible server or None
+            to keep values in process memory.
+        max_entries (int): The maximum number of values kept in process memory.
+
+    Returns:
+        CacheBackend: The backend.
+    """
+    if redis_url:
+        return RedisCacheBackend(redis_url)
+    return MemoryCacheBackend(max_entries)
+
+
+class ReadThroughCache:
+    """A cache loading missing values from the repositories.
+
+    Values are grouped in namespaces, e.g. `book`, which are counted
+    separately. Only found objects are cached, so a lookup of a missing row
+    always reaches the database. Cached objects are shared between callers
+    and must not be mutated. Missing values are loaded from the primary, so
+    a lagging replica does not cache a value older than an invalidation.
+
+    Invalidations are published on the bus, so workers keeping values in
+    their own memory drop them as well.
+    """
+
+    def __init__(
+            self,
+            backend: CacheBackend,
+            ttl_seconds: float,
+            bus: InvalidationBus | None = None,
+    ) -> None:
+        """The initializer of the cache.
+
+        Args:
+            backend (CacheBackend): The storage of cached values.
+            ttl_seconds (float): How long a value is served; 0 disables caching.
+            bus (InvalidationBus | None, optional): The bus spreading invalidations.
+        """
+        self._backend = backend
+        self._ttl = ttl_seconds
+        self._bus = bus
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "invalidations": 0, "remote_invalidations": 0}
+        )
+
+    async def get_or_load(
+            self,
+            namespace: str,
+            key: Any,
+            loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Get a cached value or load and cache it.
+
+        Args:
+            namespace (str): The namespace of the value.
+            key (Any): The key of the value within the namespace.
+            loader (Callable[[], Awaitable[Any]]): The repository lookup.
+
+        Returns:
+            Any: The cached or loaded value.
+        """
+        if self._ttl <= 0:
+            return await loader()
+
+        stats = self._stats[namespace]
+        cache_key = f"{namespace}:{key}"
+        if (value := await self._backend.get(cache_key)) is not None:
+            stats["hits"] += 1
+            return value
+
+        stats["misses"] += 1
+        epoch = await self._backend.epoch(namespace)
+        with primary_reads():
+            value = await loader()
+        if value is not None:
+            await self._backend.set(cache_key, value, self._ttl, epoch)
+
+        return value
+
+    async def get_or_load_many(
+            self,
+            namespace: str,
+            keys: list[Any],
+            loader: Callable[[list[Any]], Awaitable[dict[Any, Any]]],
+    ) -> dict[Any, Any]:
+        """Get cached values and load the missing ones with one lookup.
+
+        Args:
+            namespace (str): The namespace of the values.
+            keys (list[Any]): The keys of the values within the namespace.
+            loader (Callable[[list[Any]], Awaitable[dict[Any, Any]]]): The
+                repository lookup of the missing keys, returning the found
+                values keyed like them.
+
+        Returns:
+            dict[Any, Any]: The found values by key.
+        """
+        if self._ttl <= 0:
+            return await loader(keys)
+
+        stats = self._stats[namespace]
+        values = {}
+        missing = []
+        for key in keys:
+            if (value := await self._backend.get(f"{namespace}:{key}")) is not None:
+                values[key] = value
+            else:
+                missing.append(key)
+
+        stats["hits"] += len(values)
+        stats["misses"] += len(missing)
+        if missing:
+            epoch = await self._backend.epoch(namespace)
+            with primary_reads():
+                loaded = await loader(missing)
+            for key, value in loaded.items():
+                if value is not None:
+                    await self._backend.set(f"{namespace}:{key}", value, self._ttl, epoch)
+            values.update(loaded)
+
+        return values
+
+    async def invalidate(self, namespace: str, *keys: Any) -> None:
+        """Drop cached values after they changed.
+
+        The current request forgets the values at once. Within a unit of
+        work, the cache drops them once its transaction ended, so no request
+        caches them again before the change is visible.
+
+        Args:
+            namespace (str): The namespace of the values.
+            *keys (Any): The keys of the values within the namespace,
+                or `*` for the whole namespace.
+        """
+        self._stats[namespace]["invalidations"] += len(keys)
+        cache_keys = [f"{namespace}:{key}" for key in keys]
+        # Without keys, the loaders of the request forget the whole namespace.
+        forget_loaded(namespace, *([] if "*" in keys else keys))
+
+        async def drop() -> None:
+            await self._drop(cache_keys)
+            if self._bus is not None and not self._backend.shared:
+                await self._bus.publish(cache_keys)
+
+        await after_transaction(drop)
+
+    async def apply_remote(self, cache_keys: list[str]) -> None:
+        """Drop values invalidated by another worker.
+
+        Args:
+            cache_keys (list[str]): The full keys, e.g. `book:42` or `stats:*`.
+        """
+        if self._backend.shared:
+            return
+
+        for cache_key in cache_keys:
+            self._stats[namespace_of(cache_key)]["remote_invalidations"] += 1
+        await self._drop(cache_keys)
+
+    async def flush(self) -> None:
+        """Drop every value after invalidations may have been missed."""
+        if self._backend.shared:
+            return
+
+        await self._backend.clear()
+
+    async def _drop(self, cache_keys: list[str]) -> None:
+        """Drop values and namespaces from the backend.
+
+        Args:
+            cache_keys (list[str]): The full keys, e.g. `book:42` or `stats:*`.
+        """
+        await self._backend.delete([key for key in cache_keys if not key.endswith(":*")])
+        for key in cache_keys:
+            if key.endswith(":*"):
+                await self._backend.clear(key[:-1])
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Report the counters of every namespace.
+
+        Returns:
+            dict[str, dict[str, float]]: The hits, misses, local and remote
+                invalidations and hit ratio keyed by namespace.
+        """
+        return {
+            namespace: {
+                **counters,
+                "hit_ratio": counters["hits"] / lookups
+                if (lookups := counters["hits"] + counters["misses"]) else 0.0,
+            }
+            for namespace, counters in sorted(self._stats.items())
+        }
@@ -1,4 +1,8 @@
 """A module containing constant values for infrastructure layer."""
 EXPIRATION_MINUTES = 60
 SECRET_KEY = "s3cr3t"
-ALGORITHM = "HS256"
\ No newline at end of file
+ALGORITHM = "HS256"
+AVAILABILITY_CHANNEL = "book_availability"
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+BOOK_FACETS = ("genre", "epoch", "kind", "language", "publisher_id")
+LOAN_DURATION_BUCKETS = (0, 1, 3, 7, 14, 21, 30, 60, 90)
@@ -0,0 +1,189 @@
+"""A module containing the sparse book co-borrowing matrix."""
+from typing import Any, Hashable, Iterable
+
+import numpy as np
+
+# Pairs of books are encoded as `book << _SHIFT | other_book`.
+_SHIFT = 32
+_LOW_BITS = (1 << _SHIFT) - 1
+
+
+class CoOccurrence:
+    """A class counting how many patrons borrowed each pair of books.
+
+    The non-zero cells of the symmetric book×book matrix are kept as two
+    aligned numpy arrays sorted by the encoded pair, so a row is a
+    contiguous slice found with `searchsorted`. New borrows are merged in
+    batches; only the rows they touch need new neighbors.
+
+    Patrons who borrowed more than `max_user_books` books contribute only
+    their first ones, bounding the number of pairs per patron.
+    """
+
+    def __init__(self, max_user_books: int) -> None:
+        """The initializer of the matrix.
+
+        Args:
+            max_user_books (int): The maximum number of books counted per patron.
+        """
+        self.max_user_books = max_user_books
+        self.seq = 0
+        self.loaded = False
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every borrow."""
+        self._keys = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._popularity = np.zeros(0, dtype=np.int64)
+        self._user_books: dict[Hashable, set[int]] = {}
+
+    def __len__(self) -> int:
+        """The number of non-zero cells."""
+        return len(self._keys)
+
+    def build(self, borrows: Iterable[tuple[Hashable, int]]) -> np.ndarray:
+        """Replace the matrix with the co-borrowings of `(patron, book)` pairs.
+
+        Args:
+            borrows (Iterable[tuple[Hashable, int]]): The borrowed books of patrons.
+
+        Returns:
+            np.ndarray: The IDs of the books having neighbors.
+        """
+        self.clear()
+        for user, book in borrows:
+            books = self._user_books.setdefault(user, set())
+            if len(books) < self.max_user_books:
+                books.add(book)
+
+        sets = [np.fromiter(books, dtype=np.int64) for books in self._user_books.values()]
+        if not sets:
+            return np.empty(0, dtype=np.int64)
+
+        sizes = np.fromiter((len(books) for books in sets), dtype=np.int64, count=len(sets))
+        books = np.concatenate(sets)
+        self._grow(int(books.max()))
+        self._popularity += np.bincount(books, minlength=len(self._popularity))
+
+        # Pair every book of a patron with every book of the same patron:
+        # element `i` of a group of size `s` starting at `start` is repeated
+        # `s` times and matched with `start`, `start + 1`, ... `start + s - 1`.
+        element_sizes = np.repeat(sizes, sizes)
+        element_starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        left = np.repeat(np.arange(len(books)), element_sizes)
+        pair_starts = np.cumsum(element_sizes) - element_sizes
+        right = (
+            np.repeat(element_starts, element_sizes)
+            + np.arange(len(left)) - np.repeat(pair_starts, element_sizes)
+        )
+
+        distinct = books[left] != books[right]
+        keys = books[left][distinct] << _SHIFT | books[right][distinct]
+        self._keys, counts = np.unique(keys, return_counts=True)
+        self._counts = counts.astype(np.int64)
+
+        return np.unique(self._keys >> _SHIFT)
+
+    def add(self, borrows: Iterable[tuple[Hashable, int]]) -> np.ndarray:
+        """Count new borrows.
+
+        Borrowing a book again does not change the matrix.
+
+        Args:
+            borrows (Iterable[tuple[Hashable, int]]): The newly borrowed books of patrons.
+
+        Returns:
+            np.ndarray: The IDs of the books whose rows changed.
+        """
+        left: list[int] = []
+        right: list[int] = []
+        for user, book in borrows:
+            books = self._user_books.setdefault(user, set())
+            if book in books or len(books) >= self.max_user_books:
+                continue
+
+            self._grow(book)
+            self._popularity[book] += 1
+            left.extend(books)
+            right.extend([book] * len(books))
+            books.add(book)
+
+        if not left:
+            return np.empty(0, dtype=np.int64)
+
+        old, new = np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+        delta, delta_counts = np.unique(
+            np.concatenate((old << _SHIFT | new, new << _SHIFT | old)),
+            return_counts=True,
+        )
+
+        positions = np.searchsorted(self._keys, delta)
+        found = positions < len(self._keys)
+        found[found] = self._keys[positions[found]] == delta[found]
+        self._counts[positions[found]] += delta_counts[found]
+        self._keys = np.insert(self._keys, positions[~found], delta[~found])
+        self._counts = np.insert(self._counts, positions[~found], delta_counts[~found])
+
+        return np.unique(delta >> _SHIFT)
+
+    def top_neighbors(self, books: np.ndarray, k: int) -> dict[str, np.ndarray]:
+        """Find the books most often co-borrowed with each of some books.
+
+        Counts are normalized by the popularity of both books (cosine
+        similarity of their patron sets), so bestsellers do not top every list.
+
+        Args:
+            books (np.ndarray): The IDs of the books.
+            k (int): The maximum number of neighbors per book.
+
+        Returns:
+            dict[str, np.ndarray]: The aligned `book_id`, `rank`, `neighbor_id`
+                and `score` arrays, ordered by book and rank.
+        """
+        books = np.asarray(books, dtype=np.int64)
+        lows = np.searchsorted(self._keys, books << _SHIFT)
+        highs = np.searchsorted(self._keys, (books + 1) << _SHIFT)
+        sizes = highs - lows
+
+        cells = np.repeat(lows, sizes) + np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        row = self._keys[cells] >> _SHIFT
+        neighbor = self._keys[cells] & _LOW_BITS
+        score = self._counts[cells] / np.sqrt(self._popularity[row] * self._popularity[neighbor])
+
+        order = np.lexsort((neighbor, -score, row))
+        row, neighbor, score = row[order], neighbor[order], score[order]
+
+        group_starts = np.flatnonzero(np.r_[True, row[1:] != row[:-1]]) if len(row) else row
+        rank = np.arange(len(row)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(row)]))
+        kept = rank < k
+
+        return {
+            "book_id": row[kept],
+            "rank": rank[kept],
+            "neighbor_id": neighbor[kept],
+            "score": score[kept],
+        }
+
+    def _grow(self, book: int) -> None:
+        """Make room for the popularity of a book.
+
+        Args:
+            book (int): The highest book ID to fit.
+        """
+        if book >= len(self._popularity):
+            grown = np.zeros(max(book + 1, 2 * len(self._popularity)), dtype=np.int64)
+            grown[:len(self._popularity)] = self._popularity
+            self._popularity = grown
+
+
+def borrow_pairs(rows: Iterable[Any]) -> list[tuple[Hashable, int]]:
+    """Extract `(patron, book)` pairs from rows with a `user_id` and `book_id`.
+
+    Args:
+        rows (Iterable[Any]): The rows.
+
+    Returns:
+        list[tuple[Hashable, int]]: The pairs.
+    """
+    return [(str(row["user_id"]), int(row["book_id"])) for row in rows if row["book_id"] is not None]
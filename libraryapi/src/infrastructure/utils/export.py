@@ -0,0 +1,187 @@
+"""A module containing the writing of lendings to columnar files for analytics.
+
+Rows arrive in chunks of tuples and are converted column by column into
+Arrow record batches, so memory holds one chunk at a time whatever the size
+of the export. Repetitive strings (titles, authors, categories, publishers,
+statuses) are dictionary-encoded: the files store every distinct value once
+per batch and analytics tools read them back as categoricals.
+"""
+import asyncio
+import functools
+import importlib
+import importlib.util
+import os
+from typing import Any, AsyncIterator, Sequence
+
+PARQUET = "parquet"
+ARROW = "arrow"
+
+# File name extensions of the export formats.
+EXPORT_EXTENSIONS = {PARQUET: ".parquet", ARROW: ".arrows"}
+
+# Media types of exported files, by file name extension.
+EXPORT_MEDIA_TYPES = {
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrows": "application/vnd.apache.arrow.stream",
+}
+
+# The exported columns, in the order of the rows, with their Arrow types.
+# Strings repeated across lendings are dictionary-encoded.
+EXPORT_COLUMNS = (
+    ("lend_id", "int32"),
+    ("book_id", "int32"),
+    ("user_id", "string"),
+    ("borrowed_date", "date32"),
+    ("returned_date", "date32"),
+    ("status", "dictionary"),
+    ("title", "dictionary"),
+    ("author", "dictionary"),
+    ("publication_year", "dictionary"),
+    ("language", "dictionary"),
+    ("categories", "dictionary"),
+    ("genre", "dictionary"),
+    ("kind", "dictionary"),
+    ("epoch", "dictionary"),
+    ("publisher_id", "int32"),
+    ("publisher", "dictionary"),
+)
+
+
+def is_available() -> bool:
+    """Check whether the optional `pyarrow` package exports depend on is installed.
+
+    Returns:
+        bool: Whether exports can be written.
+    """
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@functools.cache
+def load_pyarrow() -> Any:
+    """Import the optional `pyarrow` package on the first export, keeping it out of the startup of the app.
+
+    Raises:
+        RuntimeError: If `pyarrow` is not installed.
+
+    Returns:
+        module: The `pyarrow` package with its `ipc` and `parquet` modules.
+    """
+    try:
+        importlib.import_module("pyarrow.ipc")
+        importlib.import_module("pyarrow.parquet")
+    except ImportError as e:
+        raise RuntimeError("Exports require the optional `pyarrow` package") from e
+
+    return importlib.import_module("pyarrow")
+
+
+def export_schema() -> Any:
+    """Build the Arrow schema of exported lendings.
+
+    Returns:
+        pyarrow.Schema: The schema of the columns in `EXPORT_COLUMNS`.
+    """
+    pyarrow = load_pyarrow()
+    types = {
+        "int32": pyarrow.int32(),
+        "string": pyarrow.string(),
+        "date32": pyarrow.date32(),
+        "dictionary": pyarrow.dictionary(pyarrow.int32(), pyarrow.string()),
+    }
+
+    return pyarrow.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+
+class LendingExportWriter:
+    """A class writing chunks of exported lendings to a Parquet or Arrow IPC stream file.
+
+    Every chunk becomes one Parquet row group or one Arrow record batch.
+    Arrow files use the streaming IPC format, which unlike the random-access
+    one accepts a new dictionary in every batch.
+    """
+
+    def __init__(self, path: str, export_format: str, compression: str = "zstd") -> None:
+        """The initializer of the writer.
+
+        Args:
+            path (str): The path of the written file.
+            export_format (str): `parquet` or `arrow`.
+            compression (str, optional): The compression codec of the file.
+
+        Raises:
+            RuntimeError: If `pyarrow` is not installed.
+        """
+        pyarrow = load_pyarrow()
+        self.rows = 0
+        self._pyarrow = pyarrow
+        self._schema = export_schema()
+        if export_format == PARQUET:
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression=compression)
+        else:
+            self._writer = pyarrow.ipc.new_stream(
+                path,
+                self._schema,
+                options=pyarrow.ipc.IpcWriteOptions(compression=compression),
+            )
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Append a chunk of rows.
+
+        Args:
+            rows (Sequence[Sequence[Any]]): The rows, with values in the order of `EXPORT_COLUMNS`.
+        """
+        if not rows:
+            return
+
+        columns = list(zip(*rows))
+        batch = self._pyarrow.record_batch(
+            [
+                self._pyarrow.array(values, type=field.type)
+                for values, field in zip(columns, self._schema)
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        """Finish the file."""
+        self._writer.close()
+
+
+async def write_export(chunks: AsyncIterator[Sequence[Sequence[Any]]], path: str, export_format: str) -> int:
+    """Write streamed chunks of lendings to a file.
+
+    Conversion and compression run in a thread, overlapping with the fetch
+    of the next chunk. The file is written under a temporary name and
+    renamed when complete, so a present file is always a whole export.
+
+    Args:
+        chunks (AsyncIterator[Sequence[Sequence[Any]]]): The chunks of rows.
+        path (str): The path of the written file.
+        export_format (str): `parquet` or `arrow`.
+
+    Returns:
+        int: The number of written rows.
+    """
+    partial_path = f"{path}.part"
+    writer = await asyncio.to_thread(LendingExportWriter, partial_path, export_format)
+    pending: asyncio.Future | None = None
+    try:
+        async for chunk in chunks:
+            if pending is not None:
+                await pending
+            pending = asyncio.ensure_future(asyncio.to_thread(writer.write, chunk))
+        if pending is not None:
+            await pending
+    except BaseException:
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+        await asyncio.to_thread(writer.close)
+        os.remove(partial_path)
+        raise
+
+    await asyncio.to_thread(writer.close)
+    os.replace(partial_path, path)
+
+    return writer.rows
@@ -0,0 +1,202 @@
+"""A module containing the in-memory bitmap index of facet values."""
+from collections import defaultdict
+from typing import Any, Collection, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from src.infrastructure.utils.memindex import MemoryIndex
+
+
+class FacetIndex(MemoryIndex):
+    """A class keeping one bitmap of item IDs per facet value.
+
+    Bitmaps are arbitrary-precision ints with bit `n` set for item `n`, so
+    matching is a few ORs and ANDs and counting is `int.bit_count`. Counts
+    are disjunctive: the counts of a facet ignore that facet's own filter,
+    so clients can show how selecting another value would change results.
+    """
+
+    def __init__(self, facets: Sequence[str], sync_interval: float = 1.0) -> None:
+        """The initializer of the index.
+
+        Args:
+            facets (Sequence[str]): The names of the indexed facets.
+            sync_interval (float, optional): The minimum delay between outbox checks.
+        """
+        super().__init__(sync_interval)
+        self.facets = self.columns = tuple(facets)
+        self._all = 0
+        self._bitmaps: dict[str, dict[str, int]] = {facet: {} for facet in self.facets}
+        self._values: dict[int, tuple[str | None, ...]] = {}
+
+    def __len__(self) -> int:
+        """The number of indexed items."""
+        return len(self._values)
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._all = 0
+        self._bitmaps = {facet: {} for facet in self.facets}
+        self._values = {}
+
+    def bulk_load(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the content of the index.
+
+        Setting bits one by one would copy a growing int per item, so IDs are
+        grouped per value first and every bitmap is packed once.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows with an `id` and the facet values.
+        """
+        self.clear()
+        groups: dict[str, dict[str, list[int]]] = {facet: defaultdict(list) for facet in self.facets}
+        for row in rows:
+            values = tuple(
+                None if row.get(facet) is None else str(row[facet])
+                for facet in self.facets
+            )
+            self._values[row["id"]] = values
+            for facet, value in zip(self.facets, values):
+                if value is not None:
+                    groups[facet][value].append(row["id"])
+
+        self._all = self._pack(list(self._values))
+        for facet in self.facets:
+            self._bitmaps[facet] = {
+                value: self._pack(ids) for value, ids in groups[facet].items()
+            }
+
+    def upsert(self, item_id: int, values: Mapping[str, Any]) -> None:
+        """Index an item or move it to its new facet values.
+
+        Args:
+            item_id (int): The ID of the item.
+            values (Mapping[str, Any]): The facet values of the item.
+        """
+        new = tuple(
+            None if values.get(facet) is None else str(values[facet])
+            for facet in self.facets
+        )
+        if self._values.get(item_id) == new:
+            return
+
+        self.remove(item_id)
+
+        bit = 1 << item_id
+        for facet, value in zip(self.facets, new):
+            if value is not None:
+                bitmaps = self._bitmaps[facet]
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+
+        self._all |= bit
+        self._values[item_id] = new
+
+    def remove(self, item_id: int) -> None:
+        """Remove an item from the index if it is present.
+
+        Args:
+            item_id (int): The ID of the item.
+        """
+        old = self._values.pop(item_id, None)
+        if old is None:
+            return
+
+        mask = ~(1 << item_id)
+        for facet, value in zip(self.facets, old):
+            if value is None:
+                continue
+
+            bitmaps = self._bitmaps[facet]
+            bitmaps[value] &= mask
+            if not bitmaps[value]:
+                del bitmaps[value]
+
+        self._all &= mask
+
+    def match(
+            self,
+            filters: Mapping[str, Collection[str]],
+            exclude: str | None = None,
+    ) -> int:
+        """Build the bitmap of items matching the filters.
+
+        Values of one facet are ORed, facets are ANDed.
+
+        Args:
+            filters (Mapping[str, Collection[str]]): The selected values keyed by facet.
+            exclude (str | None, optional): The facet whose filter is ignored.
+
+        Returns:
+            int: The bitmap of matching items.
+        """
+        result = self._all
+        for facet, selected in filters.items():
+            if facet == exclude or not selected:
+                continue
+
+            bitmaps = self._bitmaps[facet]
+            union = 0
+            for value in selected:
+                union |= bitmaps.get(str(value), 0)
+            result &= union
+
+        return result
+
+    def counts(self, filters: Mapping[str, Collection[str]]) -> dict[str, dict[str, int]]:
+        """Count the matching items of every facet value.
+
+        Args:
+            filters (Mapping[str, Collection[str]]): The selected values keyed by facet.
+
+        Returns:
+            dict[str, dict[str, int]]: The non-zero counts keyed by facet and value.
+        """
+        counts = {}
+        for facet in self.facets:
+            base = self.match(filters, exclude=facet)
+            facet_counts = {
+                value: count
+                for value, bitmap in self._bitmaps[facet].items()
+                if (count := (base & bitmap).bit_count())
+            }
+            counts[facet] = dict(
+                sorted(facet_counts.items(), key=lambda item: (-item[1], item[0]))
+            )
+
+        return counts
+
+    @staticmethod
+    def _pack(item_ids: list[int]) -> int:
+        """Build the bitmap of a list of item IDs.
+
+        Args:
+            item_ids (list[int]): The IDs of the items.
+
+        Returns:
+            int: The bitmap.
+        """
+        if not item_ids:
+            return 0
+
+        bits = np.zeros(max(item_ids) + 1, dtype=np.uint8)
+        bits[item_ids] = 1
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    @staticmethod
+    def ids(bitmap: int, offset: int, limit: int) -> list[int]:
+        """Page through the item IDs of a bitmap in ascending order.
+
+        Args:
+            bitmap (int): The bitmap of items.
+            offset (int): The number of IDs to skip.
+            limit (int): The maximum number of IDs to return.
+
+        Returns:
+            list[int]: The IDs of the page.
+        """
+        if not bitmap:
+            return []
+
+        raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")
+        return np.flatnonzero(bits)[offset:offset + limit].tolist()
@@ -0,0 +1,148 @@
+"""A module containing the store for idempotency keys shared by every worker."""
+import hashlib
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, select, text, update
+
+from src.db import database, idempotency_table
+
+MAX_KEY_LENGTH = 255
+
+# Claims a key which is new or expired. A key inserted by a transaction
+# still running blocks the claim until that transaction ends.
+CLAIM_KEY = text(
+    """
+    INSERT INTO idempotency_keys AS entry (key, fingerprint, expires_at)
+    VALUES (:key, :fingerprint, statement_timestamp() + make_interval(secs => :ttl))
+    ON CONFLICT (key) DO UPDATE SET
+        fingerprint = EXCLUDED.fingerprint,
+        response = NULL,
+        expires_at = EXCLUDED.expires_at
+    WHERE entry.expires_at <= statement_timestamp()
+    RETURNING key
+    """
+)
+
+
+class IdempotencyStore:
+    """A key -> response store in the database with TTL-based expiry.
+
+    Keys and payloads are kept as 16-byte digests. The key is claimed and
+    the response recorded in the transaction of the unit of work, so both
+    are committed or rolled back with the changes of the request. While the
+    first request for a key is still running, duplicates sent to any worker
+    wait for its transaction and then replay its response, or execute the
+    handler if it rolled back.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        """The initializer of the store.
+
+        Args:
+            ttl_seconds (float): How long a completed response is replayed.
+        """
+        self._ttl = ttl_seconds
+
+    async def run(
+            self,
+            key: str | None,
+            payload: str,
+            handler: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Execute the handler at most once per key.
+
+        Must be awaited in a unit of work, which holds the claimed key until
+        the request ends.
+
+        Args:
+            key (str | None): The scoped idempotency key or None to bypass the store.
+            payload (str): The serialized request payload.
+            handler (Callable[[], Awaitable[Any]]): The operation to execute.
+
+        Raises:
+            HTTPException:
+                - 400 if the key is too long.
+                - 409 if the key was claimed without a recorded response.
+                - 422 if the key was already used with a different payload.
+
+        Returns:
+            Any: The result of the first execution for the key.
+        """
+        if key is None:
+            return await handler()
+
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+        digest = self._digest(key)
+        fingerprint = self._digest(payload)
+
+        claimed = await database.fetch_val(
+            CLAIM_KEY,
+            {"key": digest, "fingerprint": fingerprint, "ttl": self._ttl},
+        )
+        if claimed is None:
+            return await self._replay(digest, fingerprint)
+
+        result = await handler()
+        await database.execute(
+            update(idempotency_table)
+            .where(idempotency_table.c.key == digest)
+            .values(response=jsonable_encoder(result))
+        )
+
+        return result
+
+    async def prune(self) -> None:
+        """Remove the expired keys."""
+        await database.execute(
+            delete(idempotency_table).where(idempotency_table.c.expires_at <= func.now())
+        )
+
+    @staticmethod
+    async def _replay(digest: bytes, fingerprint: bytes) -> Any:
+        """Get the recorded response of a key claimed by an earlier request.
+
+        Args:
+            digest (bytes): The digest of the key.
+            fingerprint (bytes): The digest of the request payload.
+
+        Raises:
+            HTTPException:
+                - 409 if the key has no recorded response.
+                - 422 if the key was used with a different payload.
+
+        Returns:
+            Any: The recorded response.
+        """
+        entry = await database.fetch_one(
+            select(idempotency_table.c.fingerprint, idempotency_table.c.response)
+            .where(idempotency_table.c.key == digest)
+        )
+        if entry is not None and entry["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different payload",
+            )
+
+        if entry is None or entry["response"] is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Idempotency-Key is used by a request which did not complete",
+            )
+
+        return entry["response"]
+
+    @staticmethod
+    def _digest(value: str) -> bytes:
+        """Hash a value into a compact digest.
+
+        Args:
+            value (str): The value to hash.
+
+        Returns:
+            bytes: The 16-byte digest.
+        """
+        return hashlib.blake2b(value.encode(), digest_size=16).digest()
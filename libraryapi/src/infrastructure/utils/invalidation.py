@@ -0,0 +1,130 @@
+"""A module containing the bus spreading cache invalidations between workers."""
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable
+
+from src.infrastructure.utils.pgnotify import PgNotifyListener, notify
+
+logger = logging.getLogger(__name__)
+
+KeysHandler = Callable[[list[str]], Awaitable[None] | None]
+FlushHandler = Callable[[], Awaitable[None] | None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; the budget leaves
+# room for the origin and sequence number around the keys.
+KEYS_BUDGET_BYTES = 7000
+
+
+class InvalidationBus:
+    """A class publishing invalidated cache keys to every worker over NOTIFY.
+
+    Keys look like `book:42`, or `stats:*` for a whole namespace. Every
+    message carries the ID of the publishing worker and a sequence number
+    counting its messages, so a receiver noticing a skipped number knows it
+    missed invalidations and flushes everything, as it does after the
+    listening connection was re-established.
+    """
+
+    def __init__(self, channel: str) -> None:
+        """The initializer of the bus.
+
+        Args:
+            channel (str): The name of the Postgres channel.
+        """
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._seq = 0
+        self._last_seqs: dict[str, int] = {}
+        self._apply: KeysHandler | None = None
+        self._flush: FlushHandler | None = None
+
+    async def publish(self, keys: list[str]) -> None:
+        """Send invalidated keys to the other workers.
+
+        Sent outside of a transaction, the notification is delivered
+        immediately, so callers publish after their write was committed.
+
+        Args:
+            keys (list[str]): The invalidated keys.
+        """
+        for chunk in self._chunks(keys):
+            # The number is taken even if sending fails, so receivers see
+            # the gap and flush.
+            self._seq += 1
+            try:
+                await notify(self.channel, {"origin": self.origin, "seq": self._seq, "keys": chunk})
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Publishing cache invalidations failed")
+
+    def listen(
+            self,
+            listener: PgNotifyListener,
+            apply: KeysHandler,
+            flush: FlushHandler,
+    ) -> None:
+        """Apply the invalidations of other workers received by a listener.
+
+        Args:
+            listener (PgNotifyListener): The dedicated listening connection.
+            apply (KeysHandler): The callable dropping invalidated keys.
+            flush (FlushHandler): The callable dropping every key.
+        """
+        self._apply = apply
+        self._flush = flush
+        listener.subscribe(self.channel, self._receive)
+        listener.on_reconnect(self._reset)
+
+    def _receive(self, payload: str) -> Awaitable[None] | None:
+        """Handle a message of the channel.
+
+        Args:
+            payload (str): The raw payload.
+
+        Returns:
+            Awaitable[None] | None: The result of the invoked handler.
+        """
+        message = json.loads(payload)
+        origin, seq = message["origin"], message["seq"]
+        if origin == self.origin:
+            return None
+
+        last_seq = self._last_seqs.get(origin)
+        self._last_seqs[origin] = max(seq, last_seq or 0)
+        if last_seq is not None and seq != last_seq + 1:
+            logger.warning("Cache invalidations of worker %s were missed, flushing", origin)
+            return self._flush()
+
+        return self._apply(message["keys"])
+
+    def _reset(self) -> Awaitable[None] | None:
+        """Forget the sequence numbers and flush after a reconnect.
+
+        Returns:
+            Awaitable[None] | None: The result of the flush handler.
+        """
+        self._last_seqs.clear()
+        return self._flush()
+
+    @staticmethod
+    def _chunks(keys: list[str]) -> list[list[str]]:
+        """Split keys into groups fitting in one notification.
+
+        Args:
+            keys (list[str]): The keys.
+
+        Returns:
+            list[list[str]]: The groups of keys.
+        """
+        chunks: list[list[str]] = []
+        size = KEYS_BUDGET_BYTES
+        for key in keys:
+            # The quoted key and the separator after it.
+            key_size = len(json.dumps(key)) + 2
+            if size + key_size > KEYS_BUDGET_BYTES:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(key)
+            size += key_size
+
+        return chunks
@@ -0,0 +1,153 @@
+"""A module containing the batching loaders and the identity map of a request.
+
+Nested service calls of one request look up the same entities repeatedly,
+e.g. the book of a lend in the router, the service and the repository. The
+loaders of a request remember every entity they loaded, so later lookups
+of it cost nothing, and the lookups issued concurrently in one tick of the
+event loop are sent as one batched query.
+"""
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Hashable, Iterator
+
+from src.infrastructure.utils.unitofwork import in_unit_of_work
+
+BatchLoad = Callable[[list[Any]], Awaitable[dict[Any, Any]]]
+
+_loaders: contextvars.ContextVar[dict[str, "DataLoader"] | None] = contextvars.ContextVar(
+    "request_loaders",
+    default=None,
+)
+
+
+class DataLoader:
+    """A class batching and remembering the lookups of one kind of entity by key.
+
+    The first lookup of a tick starts a batch, which waits for the others
+    of the tick and then loads all of their keys with one call of the batch
+    function. The batch runs in a task of its own, and lookups wait for it
+    through a shield, so a cancelled lookup does not cancel the load of the
+    others. In a unit of work, the batch runs in the task of the first
+    lookup instead, so the query joins the connection and transaction of
+    the request rather than reading without its writes on a second
+    connection. Missing entities are remembered as None. Failed loads are
+    not remembered, so a later lookup retries them.
+    """
+
+    def __init__(self, batch_load: BatchLoad) -> None:
+        """The initializer of the loader.
+
+        Args:
+            batch_load (BatchLoad): The function loading entities by a list
+                of keys, returning them in a dict keyed like the list.
+        """
+        self._batch_load = batch_load
+        self._futures: dict[Hashable, asyncio.Future] = {}
+        self._queue: list[Hashable] = []
+        self._batches: set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """Get an entity, loading it with the other keys of the tick if it was not loaded yet.
+
+        Args:
+            key (Hashable): The key of the entity.
+
+        Returns:
+            Any: The entity or None if it does not exist.
+        """
+        if (future := self._futures.get(key)) is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                if in_unit_of_work():
+                    await self._dispatch()
+                else:
+                    batch = asyncio.create_task(self._dispatch())
+                    self._batches.add(batch)
+                    batch.add_done_callback(self._batches.discard)
+
+        return await asyncio.shield(future)
+
+    def forget(self, *keys: Hashable) -> None:
+        """Drop remembered entities after they changed, or every entity without keys.
+
+        Args:
+            *keys (Hashable): The keys of the entities.
+        """
+        if not keys:
+            keys = tuple(self._futures)
+
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and future.done():
+                del self._futures[key]
+
+    async def _dispatch(self) -> None:
+        """Load the queued keys once the other lookups of the tick were queued."""
+        keys: list[Hashable] = []
+        try:
+            await asyncio.sleep(0)
+            keys, self._queue = self._queue, []
+            values = await self._batch_load(keys)
+        except BaseException as e:
+            if not keys:
+                keys, self._queue = self._queue, []
+            for key in keys:
+                future = self._futures.pop(key)
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                else:
+                    future.cancel()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for key in keys:
+            self._futures[key].set_result(values.get(key))
+
+
+@contextmanager
+def request_scope() -> Iterator[None]:
+    """Give the current request its own loaders until the block ends."""
+    token = _loaders.set({})
+    try:
+        yield
+    finally:
+        _loaders.reset(token)
+
+
+def request_loader(name: str, batch_load: BatchLoad) -> DataLoader:
+    """Get the loader of a kind of entity for the current request.
+
+    Outside of a request, e.g. in background jobs, a new loader is returned
+    every time, which loads its one lookup and remembers nothing.
+
+    Args:
+        name (str): The kind of entity, e.g. `book`.
+        batch_load (BatchLoad): The batch function of a new loader.
+
+    Returns:
+        DataLoader: The loader.
+    """
+    loaders = _loaders.get()
+    if loaders is None:
+        return DataLoader(batch_load)
+
+    if (loader := loaders.get(name)) is None:
+        loader = loaders[name] = DataLoader(batch_load)
+
+    return loader
+
+
+def forget_loaded(name: str, *keys: Hashable) -> None:
+    """Drop entities the current request remembers after they changed.
+
+    Args:
+        name (str): The kind of entity, e.g. `book`.
+        *keys (Hashable): The keys of the entities, or none for every entity of the kind.
+    """
+    loaders = _loaders.get()
+    if loaders is not None and (loader := loaders.get(name)) is not None:
+        loader.forget(*keys)
@@ -0,0 +1,136 @@
+"""A module containing the base of in-memory indexes kept current from the outbox."""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Mapping
+
+from src.core.repositories.ichange import IChangeRepository
+from src.infrastructure.utils.replicas import primary_reads
+
+# The number of outbox events above which an index is reloaded instead of
+# being patched.
+INDEX_SYNC_LIMIT = 10_000
+
+
+class MemoryIndex(ABC):
+    """A base class of per-process indexes over the rows of a table.
+
+    The owner applies its own writes immediately and catches up on writes
+    of other processes by replaying outbox events after `seq`, at most once
+    per `sync_interval` seconds.
+    """
+    # The columns whose changes affect the index.
+    columns: tuple[str, ...] = ()
+
+    def __init__(self, sync_interval: float = 1.0) -> None:
+        """The initializer of the index.
+
+        Args:
+            sync_interval (float, optional): The minimum delay between outbox checks.
+        """
+        self.sync_interval = sync_interval
+        self.seq = 0
+        self.loaded = False
+        self.checked_at = float("-inf")
+        self.lock = asyncio.Lock()
+
+    def reset(self) -> None:
+        """Remove every item and mark the index for a full reload."""
+        self.clear()
+        self.seq = 0
+        self.loaded = False
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every item."""
+
+    @abstractmethod
+    def bulk_load(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the content of the index.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows with an `id` and the indexed columns.
+        """
+
+    @abstractmethod
+    def upsert(self, item_id: int, values: Mapping[str, Any]) -> None:
+        """Index an item or update it.
+
+        Args:
+            item_id (int): The ID of the item.
+            values (Mapping[str, Any]): The indexed columns of the item.
+        """
+
+    @abstractmethod
+    def remove(self, item_id: int) -> None:
+        """Remove an item from the index if it is present.
+
+        Args:
+            item_id (int): The ID of the item.
+        """
+
+
+async def sync_index(
+        index: MemoryIndex,
+        change_repository: IChangeRepository,
+        entity: str,
+        iterate_rows: Callable[[], AsyncIterator[Any]],
+        get_rows: Callable[[set[int]], Awaitable[Iterable[Any]]],
+) -> None:
+    """Bring an in-memory index up to date with the outbox.
+
+    Writes of this process are applied when they happen; writes of other
+    processes are found through the events of the outbox, and only the rows
+    whose indexed columns may have changed are reloaded. The rows are read
+    on the primary, which has every change up to the sequence number read
+    there, since a lagging replica would miss changes marked as applied.
+
+    Args:
+        index (MemoryIndex): The index to synchronize.
+        change_repository (IChangeRepository): The repository of the outbox.
+        entity (str): The outbox entity of the indexed rows, e.g. `book`.
+        iterate_rows (Callable[[], AsyncIterator[Any]]): Streams every indexed row.
+        get_rows (Callable[[set[int]], Awaitable[Iterable[Any]]]): Loads the
+            indexed rows with the given IDs, leaving out removed ones.
+    """
+    if index.loaded and time.monotonic() - index.checked_at < index.sync_interval:
+        return
+
+    last_seq = await change_repository.get_last_seq((entity,))
+    if index.loaded and last_seq <= index.seq:
+        index.checked_at = time.monotonic()
+        return
+
+    async with index.lock:
+        if index.loaded and last_seq <= index.seq:
+            return
+
+        events = []
+        if index.loaded:
+            events = await change_repository.get_changes(
+                index.seq,
+                INDEX_SYNC_LIMIT,
+                entities=(entity,),
+            )
+
+        if not index.loaded or len(events) == INDEX_SYNC_LIMIT:
+            with primary_reads():
+                index.bulk_load([dict(row) async for row in iterate_rows()])
+        else:
+            changed = {
+                int(event.entity_id) for event in events
+                if event.action != "updated"
+                or event.payload is None
+                or not set(event.payload).isdisjoint(index.columns)
+            }
+            if changed:
+                with primary_reads():
+                    rows = await get_rows(changed)
+                for row in rows:
+                    index.upsert(row["id"], dict(row))
+                for item_id in changed - {row["id"] for row in rows}:
+                    index.remove(item_id)
+
+        index.seq = max(last_seq, events[-1].seq if events else 0)
+        index.loaded = True
+        index.checked_at = time.monotonic()
@@ -0,0 +1,101 @@
+"""A module containing helpers for appending events to the transactional outbox.
+
+Writers insert events without locking each other out, so their sequence
+numbers cannot follow the commit order. Events are therefore inserted
+unnumbered and numbered by `publish_events` once the transactions which
+could still insert earlier events have ended, i.e. in an order consumers
+reading `seq > after` never skip.
+"""
+import asyncio
+import logging
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+
+from src.db import database, outbox_table
+from src.infrastructure.utils.replicas import stick_to_primary
+from src.infrastructure.utils.unitofwork import after_transaction
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key of the advisory lock serializing the numbering of events.
+OUTBOX_LOCK_KEY = 27_000_001
+
+# Numbers the unnumbered events of ended transactions after the last number.
+# Transactions with an ID below the snapshot's xmin have ended, and every
+# transaction still running or starting later has an ID of at least xmin.
+# The events of the current transaction are numbered as well, which only
+# happens with DB_FORCE_ROLLBACK, where every write shares one transaction.
+PUBLISH_EVENTS = """
+WITH last AS (
+    SELECT COALESCE(MAX(seq), 0) AS seq FROM outbox
+),
+ready AS (
+    SELECT id, row_number() OVER (ORDER BY xid, id) AS position
+    FROM outbox
+    WHERE seq IS NULL
+    AND (
+        xid < CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint)
+        OR xid = CAST(CAST(pg_current_xact_id_if_assigned() AS text) AS bigint)
+    )
+)
+UPDATE outbox SET seq = last.seq + ready.position
+FROM last, ready
+WHERE outbox.id = ready.id
+"""
+
+
+async def append_event(
+        entity: str,
+        entity_id: Any,
+        action: str,
+        payload: dict | None = None,
+) -> None:
+    """Append a change event to the outbox.
+
+    The function must be awaited inside the transaction of the mutation it
+    describes, so that the event is committed or rolled back together with it.
+    The event is numbered once the unit of work of the request ended, or by
+    the next numbering after it. The remaining reads of the request go to
+    the primary, which has the change.
+
+    Args:
+        entity (str): The kind of the changed entity, e.g. `book`.
+        entity_id (Any): The ID of the changed entity.
+        action (str): The kind of the change, e.g. `created`.
+        payload (dict | None, optional): The changed attributes. Defaults to None.
+    """
+    stick_to_primary()
+    await database.execute(
+        outbox_table.insert().values(
+            entity=entity,
+            entity_id=str(entity_id),
+            action=action,
+            payload=jsonable_encoder(payload) if payload is not None else None,
+        )
+    )
+    await after_transaction(publish_events)
+
+
+async def publish_events() -> None:
+    """Number the events of the ended transactions.
+
+    Runs in a task of its own, so it numbers on a connection of its own
+    rather than in a transaction of the caller. Only the numbering is
+    serialized, by a lock held for one statement; failures are logged and
+    retried by the next numbering.
+    """
+    try:
+        await asyncio.create_task(_number_events())
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Publishing outbox events failed")
+
+
+async def _number_events() -> None:
+    """Number the events of the ended transactions under the numbering lock."""
+    async with database.transaction():
+        await database.execute(
+            "SELECT pg_advisory_xact_lock(:key)",
+            {"key": OUTBOX_LOCK_KEY},
+        )
+        await database.execute(PUBLISH_EVENTS)
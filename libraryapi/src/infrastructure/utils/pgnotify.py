@@ -0,0 +1,198 @@
+"""A module containing helpers for Postgres LISTEN/NOTIFY."""
+import asyncio
+import inspect
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+import asyncpg  # type: ignore
+
+from src.db import database
+
+logger = logging.getLogger(__name__)
+
+NotifyHandler = Callable[[str], Awaitable[None] | None]
+ReconnectHandler = Callable[[], Awaitable[None] | None]
+
+
+async def notify(channel: str, payload: dict) -> None:
+    """Send a notification on the current connection.
+
+    Inside a transaction the notification is delivered only after commit
+    and dropped on rollback.
+
+    Args:
+        channel (str): The name of the channel.
+        payload (dict): The JSON-serializable payload.
+    """
+    await database.execute(
+        "SELECT pg_notify(:channel, :payload)",
+        {"channel": channel, "payload": json.dumps(payload, default=str)},
+    )
+
+
+class PgNotifyListener:
+    """A class holding one dedicated connection listening on Postgres channels.
+
+    The connection is re-established with exponential backoff when it is
+    lost. Notifications sent while disconnected are lost, so reconnect
+    handlers are called after every successful reconnect.
+    """
+
+    def __init__(
+            self,
+            dsn: str,
+            keepalive_seconds: float = 15.0,
+            reconnect_delay: float = 1.0,
+            max_reconnect_delay: float = 30.0,
+    ) -> None:
+        """The initializer of the listener.
+
+        Args:
+            dsn (str): The asyncpg connection string.
+            keepalive_seconds (float, optional): The interval of connection health checks.
+            reconnect_delay (float, optional): The initial delay between reconnects.
+            max_reconnect_delay (float, optional): The maximum delay between reconnects.
+        """
+        self._dsn = dsn
+        self._keepalive = keepalive_seconds
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._handlers: dict[str, list[NotifyHandler]] = {}
+        self._reconnect_handlers: list[ReconnectHandler] = []
+        self._task: asyncio.Task | None = None
+        # The running async handlers, referenced until they finish.
+        self._handler_tasks: set[asyncio.Task] = set()
+
+    def subscribe(self, channel: str, handler: NotifyHandler) -> None:
+        """Register a handler for the notifications of a channel.
+
+        Handlers must be registered before the listener is started.
+
+        Args:
+            channel (str): The name of the channel.
+            handler (NotifyHandler): The callable receiving the raw payload.
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        """Register a handler called after the connection was re-established.
+
+        Args:
+            handler (ReconnectHandler): The callable to run.
+        """
+        self._reconnect_handlers.append(handler)
+
+    async def start(self) -> None:
+        """Start listening in a background task."""
+        if self._handlers and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening, cancel the running async handlers and close the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in self._handler_tasks:
+            task.cancel()
+        await asyncio.gather(*self._handler_tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        """Keep a listening connection open until cancelled."""
+        delay = self._reconnect_delay
+        connected_before = False
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("LISTEN connection failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_delay)
+                continue
+
+            delay = self._reconnect_delay
+            try:
+                await self._listen(connection, run_reconnect_handlers=connected_before)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("LISTEN connection lost: %s", e)
+            finally:
+                connected_before = True
+                if not connection.is_closed():
+                    connection.terminate()
+
+    async def _listen(self, connection: Any, run_reconnect_handlers: bool) -> None:
+        """Listen on every channel until the connection is lost.
+
+        Args:
+            connection (Any): The dedicated asyncpg connection.
+            run_reconnect_handlers (bool): Whether the connection replaces a lost one.
+        """
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+
+        for channel in self._handlers:
+            await connection.add_listener(channel, self._dispatch)
+
+        if run_reconnect_handlers:
+            for handler in self._reconnect_handlers:
+                await self._call(handler)
+
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=self._keepalive)
+            except asyncio.TimeoutError:
+                await connection.execute("SELECT 1")
+
+    def _dispatch(self, _: Any, __: int, channel: str, payload: str) -> None:
+        """Forward a notification to the handlers of its channel.
+
+        Sync handlers run immediately, so they observe notifications in order.
+
+        Args:
+            channel (str): The name of the channel.
+            payload (str): The raw payload.
+        """
+        for handler in self._handlers.get(channel, []):
+            try:
+                result = handler(payload)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("LISTEN handler failed")
+                continue
+
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(self._wait(result))
+                self._handler_tasks.add(task)
+                task.add_done_callback(self._handler_tasks.discard)
+
+    async def _call(self, handler: Callable) -> None:
+        """Call a sync or async handler without arguments.
+
+        Args:
+            handler (Callable): The handler to call.
+        """
+        try:
+            result = handler()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("LISTEN handler failed")
+            return
+
+        if inspect.isawaitable(result):
+            await self._wait(result)
+
+    @staticmethod
+    async def _wait(result: Awaitable) -> None:
+        """Await the result of an async handler, logging its failures.
+
+        Args:
+            result (Awaitable): The awaitable returned by the handler.
+        """
+        try:
+            await result
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("LISTEN handler failed")
@@ -0,0 +1,294 @@
+"""A module containing the in-memory prefix index of titles and authors."""
+import bisect
+import unicodedata
+from typing import Any, Iterable, Mapping
+
+import numpy as np
+
+from src.infrastructure.utils.memindex import MemoryIndex
+
+# Sorts after every character, so `prefix + _MAX_CHAR` bounds the keys
+# starting with the prefix.
+_MAX_CHAR = "\U0010ffff"
+
+# The score marking removed keys, lower than any live score.
+_REMOVED = -1
+
+# The number of overlay or removed keys above which the arrays are rebuilt.
+_MERGE_THRESHOLD = 2048
+
+# Prefixes up to this length match large ranges, so their results are cached
+# until the index changes.
+_CACHED_PREFIX_LENGTH = 2
+
+
+def normalize(text: str) -> str:
+    """Normalize a text for case- and accent-insensitive prefix matching.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The casefolded text without diacritics and with single spaces.
+    """
+    if text.isascii():
+        return " ".join(text.casefold().split())
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+class PrefixIndex(MemoryIndex):
+    """A class answering prefix lookups over titles and authors ranked by score.
+
+    Every item contributes the keys `"<normalized text>\\x00<id>"` to one
+    sorted list, so the keys starting with a prefix form a contiguous range
+    found by binary search. The scores of the keys are kept in an aligned
+    numpy array and the best items of a range are picked with `argpartition`.
+
+    Shifting millions of entries on every write would be slow, so removed
+    keys are only marked with a negative score and new keys go to a small
+    sorted overlay, merged into the main arrays once it grows.
+
+    Memory is bounded by `max_items`: when the index is full, new items are
+    skipped until the next full load, which keeps the best-scored rows.
+    """
+    columns = ("title", "author", "borrowed_count")
+
+    def __init__(self, max_items: int, sync_interval: float = 1.0) -> None:
+        """The initializer of the index.
+
+        Args:
+            max_items (int): The maximum number of indexed items.
+            sync_interval (float, optional): The minimum delay between outbox checks.
+        """
+        super().__init__(sync_interval)
+        self.max_items = max_items
+        self.clear()
+
+    def __len__(self) -> int:
+        """The number of indexed items."""
+        return len(self._items)
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._keys: list[str] = []
+        self._ids = np.empty(0, dtype=np.int64)
+        self._scores = np.empty(0, dtype=np.int64)
+        self._dead = 0
+        self._overlay_keys: list[str] = []
+        self._overlay: dict[str, int] = {}
+        self._items: dict[int, tuple[str, str, int]] = {}
+        self._cache: dict[tuple[str, int], list[tuple[int, str, str, int]]] = {}
+
+    def bulk_load(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the content of the index with one sort.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows with an `id`, `title`,
+                `author` and `borrowed_count`, best-scored first.
+        """
+        self.clear()
+        for row in rows:
+            if len(self._items) >= self.max_items:
+                break
+            self._items[row["id"]] = self._item(row)
+
+        self._rebuild(
+            [key for item_id, item in self._items.items() for key in self._make_keys(item_id, item)]
+        )
+
+    def upsert(self, item_id: int, values: Mapping[str, Any]) -> None:
+        """Index an item or update its texts and score.
+
+        Args:
+            item_id (int): The ID of the item.
+            values (Mapping[str, Any]): The `title`, `author` and `borrowed_count`.
+        """
+        item = self._item(values)
+        old = self._items.get(item_id)
+        if old == item:
+            return
+
+        if old is not None and old[:2] == item[:2]:
+            self.set_score(item_id, item[2])
+            return
+
+        if old is None and len(self._items) >= self.max_items:
+            return
+
+        self.remove(item_id)
+        self._items[item_id] = item
+        for key in self._make_keys(item_id, item):
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                # A removed key of the same text and item is revived in place.
+                self._scores[position] = item[2]
+                self._dead -= 1
+            else:
+                bisect.insort(self._overlay_keys, key)
+                self._overlay[key] = item[2]
+        self._cache.clear()
+
+        if len(self._overlay) > _MERGE_THRESHOLD:
+            self._merge()
+
+    def set_score(self, item_id: int, score: int) -> None:
+        """Update the score of an indexed item.
+
+        Args:
+            item_id (int): The ID of the item.
+            score (int): The new score.
+        """
+        old = self._items.get(item_id)
+        if old is None or old[2] == score:
+            return
+
+        self._items[item_id] = (old[0], old[1], score)
+        for key in self._make_keys(item_id, old):
+            if key in self._overlay:
+                self._overlay[key] = score
+            else:
+                self._scores[bisect.bisect_left(self._keys, key)] = score
+        self._cache.clear()
+
+    def remove(self, item_id: int) -> None:
+        """Remove an item from the index if it is present.
+
+        Args:
+            item_id (int): The ID of the item.
+        """
+        old = self._items.pop(item_id, None)
+        if old is None:
+            return
+
+        for key in self._make_keys(item_id, old):
+            if self._overlay.pop(key, None) is not None:
+                del self._overlay_keys[bisect.bisect_left(self._overlay_keys, key)]
+            else:
+                self._scores[bisect.bisect_left(self._keys, key)] = _REMOVED
+                self._dead += 1
+        self._cache.clear()
+
+        if self._dead > _MERGE_THRESHOLD and self._dead > len(self._keys) // 10:
+            self._merge()
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[int, str, str, int]]:
+        """Find the best-scored items whose title or author starts with a prefix.
+
+        Args:
+            prefix (str): The typed prefix.
+            limit (int): The maximum number of items to return.
+
+        Returns:
+            list[tuple[int, str, str, int]]: The ID, title, author and score of each item.
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+
+        cacheable = len(key) <= _CACHED_PREFIX_LENGTH
+        if cacheable and (key, limit) in self._cache:
+            return self._cache[(key, limit)]
+
+        low = bisect.bisect_left(self._keys, key)
+        high = bisect.bisect_left(self._keys, key + _MAX_CHAR, low)
+
+        # An item has at most two keys, so twice the limit yields enough
+        # distinct items. Removed keys score below every live key.
+        scores = self._scores[low:high]
+        wanted = min(2 * limit, high - low)
+        if wanted < high - low:
+            top = np.argpartition(scores, -wanted)[-wanted:]
+        else:
+            top = np.arange(high - low)
+        top = top[np.lexsort((top, -scores[top]))]
+
+        candidates = [
+            (score, item_id)
+            for item_id, score in zip(self._ids[low:high][top].tolist(), scores[top].tolist())
+            if score != _REMOVED
+        ]
+
+        overlay_low = bisect.bisect_left(self._overlay_keys, key)
+        overlay_high = bisect.bisect_left(self._overlay_keys, key + _MAX_CHAR, overlay_low)
+        if overlay_low < overlay_high:
+            candidates.extend(
+                (self._overlay[found], self._id_of(found))
+                for found in self._overlay_keys[overlay_low:overlay_high]
+            )
+            candidates.sort(key=lambda candidate: -candidate[0])
+
+        result: list[tuple[int, str, str, int]] = []
+        for _, item_id in candidates:
+            if len(result) == limit:
+                break
+            if all(found[0] != item_id for found in result):
+                result.append((item_id, *self._items[item_id]))
+
+        if cacheable:
+            self._cache[(key, limit)] = result
+        return result
+
+    def _merge(self) -> None:
+        """Fold the overlay into the main arrays and drop removed keys."""
+        live = [key for key, score in zip(self._keys, self._scores.tolist()) if score != _REMOVED]
+        # The sort merges the two sorted runs in linear time.
+        self._rebuild(live + self._overlay_keys)
+
+    def _rebuild(self, keys: list[str]) -> None:
+        """Rebuild the main arrays from keys of indexed items.
+
+        Args:
+            keys (list[str]): The keys, in any order.
+        """
+        keys.sort()
+        self._keys = keys
+        self._ids = np.fromiter((self._id_of(key) for key in keys), dtype=np.int64, count=len(keys))
+        self._scores = np.fromiter(
+            (self._items[item_id][2] for item_id in self._ids.tolist()),
+            dtype=np.int64,
+            count=len(keys),
+        )
+        self._dead = 0
+        self._overlay_keys = []
+        self._overlay = {}
+        self._cache.clear()
+
+    @staticmethod
+    def _id_of(key: str) -> int:
+        """Extract the item ID from a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            int: The ID of the item.
+        """
+        return int(key[key.rindex("\x00") + 1:])
+
+    @staticmethod
+    def _item(values: Mapping[str, Any]) -> tuple[str, str, int]:
+        """Extract the indexed columns of a row.
+
+        Args:
+            values (Mapping[str, Any]): The row.
+
+        Returns:
+            tuple[str, str, int]: The title, author and score.
+        """
+        return values["title"], values["author"], values.get("borrowed_count") or 0
+
+    @staticmethod
+    def _make_keys(item_id: int, item: tuple[str, str, int]) -> list[str]:
+        """Build the distinct keys of an item.
+
+        Args:
+            item_id (int): The ID of the item.
+            item (tuple[str, str, int]): The title, author and score.
+
+        Returns:
+            list[str]: The keys of the title and the author.
+        """
+        return list(dict.fromkeys(f"{normalize(text)}\x00{item_id}" for text in item[:2]))
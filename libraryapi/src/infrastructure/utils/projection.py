@@ -0,0 +1,76 @@
+"""A module containing sparse fieldset projections of DB queries."""
+from typing import Any, Mapping, Sequence
+
+from asyncpg import Record  # type: ignore
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Label
+
+ProjectedColumn = ColumnElement | Mapping[str, ColumnElement]
+
+
+class Projection:
+    """A class translating requested DTO fields into select lists and plain dicts.
+
+    Each DTO field maps onto a column, or onto a mapping of columns for a
+    nested model, so only the requested fields are read and serialized.
+    """
+
+    def __init__(self, model: type[BaseModel], columns: Mapping[str, ProjectedColumn]) -> None:
+        """The initializer of the projection.
+
+        Args:
+            model (type[BaseModel]): The DTO whose fields can be requested.
+            columns (Mapping[str, ProjectedColumn]): The columns keyed by DTO field.
+
+        Raises:
+            ValueError: If the columns do not cover exactly the DTO fields.
+        """
+        mismatched = set(model.model_fields) ^ set(columns)
+        if mismatched:
+            raise ValueError(
+                f"Projection of {model.__name__} does not match fields: {sorted(mismatched)}"
+            )
+
+        self.model = model
+        self._columns = columns
+
+    def select_list(self, fields: Sequence[str]) -> list[Label]:
+        """Build the labelled columns needed to render the fields.
+
+        Args:
+            fields (Sequence[str]): The requested DTO fields.
+
+        Returns:
+            list[Label]: The columns to select.
+        """
+        labels = []
+        for field in fields:
+            column = self._columns[field]
+            if isinstance(column, Mapping):
+                labels.extend(
+                    nested.label(f"{field}__{name}") for name, nested in column.items()
+                )
+            else:
+                labels.append(column.label(field))
+
+        return labels
+
+    def serialize(self, record: Record, fields: Sequence[str]) -> dict[str, Any]:
+        """Render a record selected with `select_list` without building the DTO.
+
+        Args:
+            record (Record): The DB record.
+            fields (Sequence[str]): The requested DTO fields.
+
+        Returns:
+            dict[str, Any]: The requested fields in the order they were asked for.
+        """
+        item = {}
+        for field in fields:
+            column = self._columns[field]
+            if isinstance(column, Mapping):
+                item[field] = {name: record[f"{field}__{name}"] for name in column}
+            else:
+                item[field] = record[field]
+
+        return item
@@ -0,0 +1,111 @@
+"""A module containing the per-user rate limits shared by every worker.
+
+Every limited key has a token bucket in the database holding up to
+`capacity` tokens and refilling at `rate` tokens per second. A request
+takes one token or is refused. The bucket is refilled and taken from in a
+single upsert, so concurrent requests of every worker see the same count.
+"""
+import asyncio
+import logging
+import math
+
+from sqlalchemy import text
+
+from src.db import database
+
+logger = logging.getLogger(__name__)
+
+# The tokens of an existing bucket after refilling it for the time since its last request.
+_REFILLED = (
+    "LEAST(CAST(:capacity AS double precision), bucket.tokens"
+    " + CAST(EXTRACT(EPOCH FROM statement_timestamp() - bucket.updated_at) AS double precision)"
+    " * CAST(:rate AS double precision))"
+)
+
+# Takes a token of a bucket if it has one, creating full buckets on first use.
+TAKE_TOKEN = text(
+    f"""
+    INSERT INTO rate_limit_buckets AS bucket (key, tokens, granted, updated_at)
+    VALUES (:key, CAST(:capacity AS double precision) - 1, TRUE, statement_timestamp())
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = {_REFILLED} - CASE WHEN {_REFILLED} >= 1 THEN 1 ELSE 0 END,
+        granted = {_REFILLED} >= 1,
+        updated_at = statement_timestamp()
+    RETURNING granted, tokens
+    """
+)
+
+# Removes the buckets of a limiter which refilled completely, as if never used.
+PRUNE_BUCKETS = text(
+    """
+    DELETE FROM rate_limit_buckets
+    WHERE key LIKE :prefix
+    AND updated_at < statement_timestamp() - make_interval(secs => :refill_seconds)
+    """
+)
+
+
+class TokenBucketLimiter:
+    """A class limiting the rate of requests by key, e.g. by user."""
+
+    def __init__(self, name: str, capacity: int, per_minute: float) -> None:
+        """The initializer of the limiter.
+
+        Args:
+            name (str): The name prefixing the keys of the limiter.
+            capacity (int): The requests allowed in a burst; 0 disables the limiter.
+            per_minute (float): The requests allowed per minute after a burst, positive.
+        """
+        self._name = name
+        self._capacity = capacity
+        self._rate = per_minute / 60
+
+    async def acquire(self, key: str) -> float:
+        """Take a token of the bucket of a key.
+
+        The bucket is updated in a task of its own, on a connection of its
+        own, so the token stays taken even if the unit of work of the request
+        rolls back. If the database fails, the request is let through.
+
+        Args:
+            key (str): The limited key, e.g. the ID of the user.
+
+        Returns:
+            float: 0 if the request may proceed, else the seconds until it may be retried.
+        """
+        if self._capacity <= 0:
+            return 0.0
+
+        values = {"key": f"{self._name}:{key}", "capacity": self._capacity, "rate": self._rate}
+        try:
+            bucket = await asyncio.create_task(database.fetch_one(TAKE_TOKEN, values))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Checking the rate limit %s failed", self._name)
+            return 0.0
+
+        if bucket["granted"]:
+            return 0.0
+
+        return (1 - bucket["tokens"]) / self._rate
+
+    async def prune(self) -> None:
+        """Remove the buckets which refilled completely."""
+        if self._capacity <= 0:
+            return
+
+        await database.execute(
+            PRUNE_BUCKETS,
+            {"prefix": f"{self._name}:%", "refill_seconds": self._capacity / self._rate},
+        )
+
+
+def retry_after(seconds: float) -> str:
+    """Format the `Retry-After` header of a refused request.
+
+    Args:
+        seconds (float): The seconds until the request may be retried.
+
+    Returns:
+        str: The whole seconds, rounded up.
+    """
+    return str(max(1, math.ceil(seconds)))
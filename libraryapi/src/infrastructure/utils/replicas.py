@@ -0,0 +1,311 @@
+"""A module containing the routing of reads to database replicas."""
+import asyncio
+import contextvars
+import itertools
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator
+
+import asyncpg  # type: ignore
+import databases
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary: 0 when it replayed everything
+# it received, and 0 on a primary, so a primary can stand in for a replica.
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# Errors after which a read is retried on the primary.
+REPLICA_ERRORS = (
+    OSError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.CannotConnectNowError,
+    # Queries canceled because of conflicts with the replayed WAL.
+    asyncpg.SerializationError,
+)
+
+_pinned: contextvars.ContextVar[bool] = contextvars.ContextVar("pinned_to_primary", default=False)
+
+# The database chosen by the first read of a consistent block, shared with
+# the tasks started within it.
+_chosen: contextvars.ContextVar[list[databases.Database] | None] = contextvars.ContextVar(
+    "chosen_database",
+    default=None,
+)
+
+
+def stick_to_primary() -> None:
+    """Route the remaining reads of the current request to the primary.
+
+    Called on every write, so a request reads its own writes even though
+    replicas apply them with a delay.
+    """
+    _pinned.set(True)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Route the reads of a block to the primary.
+
+    Used by reads which must see at least what an earlier read of the
+    primary saw, e.g. rows changed by outbox events up to a sequence number.
+    """
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def consistent_reads() -> Iterator[None]:
+    """Keep the reads of a block on the database chosen by its first read.
+
+    A replica which becomes unusable is replaced by the primary only, so a
+    read never sees older data than an earlier one, e.g. a body read after
+    the version it is tagged with.
+    """
+    token = _chosen.set([])
+    try:
+        yield
+    finally:
+        _chosen.reset(token)
+
+
+class ReadRouter:
+    """A class spreading reads over replicas which keep up with the primary.
+
+    It exposes the read methods of `databases.Database`. Replicas are
+    checked every `check_interval` seconds and used only while their lag is
+    at most `max_lag_seconds`; reads go to the primary when no replica
+    qualifies, after a write in the same request, and when a replica fails.
+    Within `consistent_reads`, every read goes to the same database.
+    """
+
+    def __init__(
+            self,
+            primary: databases.Database,
+            replicas: list[databases.Database],
+            max_lag_seconds: float,
+            check_interval: float,
+    ) -> None:
+        """The initializer of the router.
+
+        Args:
+            primary (databases.Database): The primary database.
+            replicas (list[databases.Database]): The read replicas.
+            max_lag_seconds (float): The maximum lag of a used replica.
+            check_interval (float): The delay between lag checks.
+        """
+        self._primary = primary
+        self._replicas = replicas
+        self._max_lag = max_lag_seconds
+        self._check_interval = check_interval
+        self._lags: list[float | None] = [None] * len(replicas)
+        self._healthy: list[databases.Database] = []
+        self._turns = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    def lags(self) -> list[float | None]:
+        """Report the last measured lag of every replica.
+
+        Returns:
+            list[float | None]: The lags in seconds, None for unreachable replicas.
+        """
+        return list(self._lags)
+
+    async def connect(self) -> None:
+        """Connect to the replicas and start checking their lag."""
+        if self._replicas and self._task is None:
+            await self._check()
+            self._task = asyncio.create_task(self._monitor())
+
+    async def disconnect(self) -> None:
+        """Stop checking the replicas and disconnect from them."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for replica in self._replicas:
+            if replica.is_connected:
+                await replica.disconnect()
+
+    async def fetch_all(self, query: Any, values: dict | None = None) -> list[Any]:
+        """Fetch every row of a query.
+
+        Args:
+            query (Any): The query.
+            values (dict | None, optional): The query parameters.
+
+        Returns:
+            list[Any]: The rows.
+        """
+        return await self._read("fetch_all", query, values)
+
+    async def fetch_one(self, query: Any, values: dict | None = None) -> Any | None:
+        """Fetch the first row of a query.
+
+        Args:
+            query (Any): The query.
+            values (dict | None, optional): The query parameters.
+
+        Returns:
+            Any | None: The row or None.
+        """
+        return await self._read("fetch_one", query, values)
+
+    async def fetch_val(self, query: Any, values: dict | None = None) -> Any:
+        """Fetch the first column of the first row of a query.
+
+        Args:
+            query (Any): The query.
+            values (dict | None, optional): The query parameters.
+
+        Returns:
+            Any: The value.
+        """
+        return await self._read("fetch_val", query, values)
+
+    async def iterate(self, query: Any, values: dict | None = None) -> AsyncIterator[Any]:
+        """Stream the rows of a query.
+
+        A replica failing after the first row ends the stream with the
+        error, since restarting would repeat rows.
+
+        Args:
+            query (Any): The query.
+            values (dict | None, optional): The query parameters.
+
+        Yields:
+            Any: The rows.
+        """
+        database = self._pick()
+        started = False
+        try:
+            async for row in database.iterate(query, values):
+                started = True
+                yield row
+            return
+        except REPLICA_ERRORS as e:
+            if database is self._primary or started:
+                raise
+            self._mark_failed(database, e)
+
+        async for row in self._primary.iterate(query, values):
+            yield row
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[databases.core.Connection]:
+        """Hold a connection of a replica or the primary for a long read.
+
+        Used by reads driving the driver directly, e.g. fetching a cursor in
+        large chunks. Failures are not retried on the primary.
+
+        Yields:
+            databases.core.Connection: The acquired connection.
+        """
+        async with self._pick().connection() as connection:
+            yield connection
+
+    async def _read(self, method: str, query: Any, values: dict | None) -> Any:
+        """Run a read on a replica, falling back to the primary.
+
+        Args:
+            method (str): The name of the `databases.Database` method.
+            query (Any): The query.
+            values (dict | None): The query parameters.
+
+        Returns:
+            Any: The result of the method.
+        """
+        database = self._pick()
+        if database is not self._primary:
+            try:
+                return await getattr(database, method)(query, values)
+            except REPLICA_ERRORS as e:
+                self._mark_failed(database, e)
+
+        return await getattr(self._primary, method)(query, values)
+
+    def _pick(self) -> databases.Database:
+        """Choose the database serving the next read.
+
+        Returns:
+            databases.Database: A healthy replica in turn, or the primary.
+        """
+        if _pinned.get():
+            return self._primary
+
+        chosen = _chosen.get()
+        if chosen:
+            if chosen[0] is self._primary or chosen[0] in self._healthy:
+                return chosen[0]
+            database = self._primary
+        elif self._healthy:
+            database = self._healthy[next(self._turns) % len(self._healthy)]
+        else:
+            database = self._primary
+
+        if chosen is not None:
+            chosen[:] = [database]
+
+        return database
+
+    def _mark_failed(self, replica: databases.Database, error: Exception) -> None:
+        """Stop using a replica until its next successful check.
+
+        A consistent block which read from it continues on the primary,
+        which answered the failed read.
+
+        Args:
+            replica (databases.Database): The failed replica.
+            error (Exception): The error of the read.
+        """
+        logger.warning("Read replica failed, reading from the primary: %s", error)
+        self._lags[self._replicas.index(replica)] = None
+        self._healthy = [healthy for healthy in self._healthy if healthy is not replica]
+        chosen = _chosen.get()
+        if chosen:
+            chosen[:] = [self._primary]
+
+    async def _monitor(self) -> None:
+        """Check the replicas until cancelled."""
+        while True:
+            await asyncio.sleep(self._check_interval)
+            await self._check()
+
+    async def _check(self) -> None:
+        """Measure the lag of every replica concurrently and choose the usable ones."""
+        await asyncio.gather(*(self._check_replica(position) for position in range(len(self._replicas))))
+
+        self._healthy = [
+            replica for replica, lag in zip(self._replicas, self._lags)
+            if lag is not None and lag <= self._max_lag
+        ]
+
+    async def _check_replica(self, position: int) -> None:
+        """Connect to a replica if needed and measure its lag.
+
+        Args:
+            position (int): The position of the replica.
+        """
+        replica = self._replicas[position]
+        try:
+            if not replica.is_connected:
+                await replica.connect()
+            self._lags[position] = float(await replica.fetch_val(LAG_QUERY))
+        except REPLICA_ERRORS as e:
+            if self._lags[position] is not None:
+                logger.warning("Read replica is unreachable: %s", e)
+            self._lags[position] = None
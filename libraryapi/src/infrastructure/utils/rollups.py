@@ -0,0 +1,71 @@
+"""A module containing helpers for maintaining the per-publisher rollups of borrows."""
+from datetime import date
+
+from sqlalchemy import text
+
+from src.db import database
+
+# Adds to the borrows of the publisher of a book on a day; a book without
+# a row, e.g. a lending whose book was removed, changes nothing. The book
+# row is share-locked, so a borrow waits for a change of its publisher and
+# counts under the new one.
+COUNT_BORROW = text(
+    """
+    INSERT INTO publisher_daily_borrows (publisher_id, day, book_id, borrows)
+    SELECT books.publisher_id, CAST(:day AS DATE), books.id, CAST(:delta AS INTEGER)
+    FROM books WHERE books.id = :book_id FOR SHARE
+    ON CONFLICT (publisher_id, day, book_id)
+    DO UPDATE SET borrows = publisher_daily_borrows.borrows + EXCLUDED.borrows
+    """
+)
+
+# Moves the borrows of a book from the rollups of its former publisher to
+# the rollups of its new one, adding them to rows it may already have.
+MOVE_BORROWS = text(
+    """
+    WITH moved AS (
+        DELETE FROM publisher_daily_borrows
+        WHERE publisher_id = :former_publisher_id AND book_id = :book_id
+        RETURNING day, borrows
+    )
+    INSERT INTO publisher_daily_borrows (publisher_id, day, book_id, borrows)
+    SELECT CAST(:publisher_id AS INTEGER), day, CAST(:book_id AS INTEGER), borrows FROM moved
+    ON CONFLICT (publisher_id, day, book_id)
+    DO UPDATE SET borrows = publisher_daily_borrows.borrows + EXCLUDED.borrows
+    """
+)
+
+
+async def count_borrow(book_id: int | None, day: date, delta: int = 1) -> None:
+    """Add to the borrows of a book on a day in the rollups of its publisher.
+
+    The function must be awaited inside the transaction of the lending write
+    it counts, so that the rollups always match the lendings.
+
+    Args:
+        book_id (int | None): The ID of the borrowed book.
+        day (date): The borrow day.
+        delta (int, optional): The change of the number of borrows. Defaults to 1.
+    """
+    if book_id is None:
+        return
+
+    await database.execute(COUNT_BORROW, {"book_id": book_id, "day": day, "delta": delta})
+
+
+async def move_borrows(book_id: int, former_publisher_id: int, publisher_id: int) -> None:
+    """Move the borrows of a book to the rollups of its new publisher.
+
+    The function must be awaited inside the transaction changing the
+    publisher of the book, with the book row locked, so that the borrows
+    are never counted under both publishers.
+
+    Args:
+        book_id (int): The ID of the book.
+        former_publisher_id (int): The ID of the former publisher of the book.
+        publisher_id (int): The ID of the new publisher of the book.
+    """
+    await database.execute(
+        MOVE_BORROWS,
+        {"book_id": book_id, "former_publisher_id": former_publisher_id, "publisher_id": publisher_id},
+    )
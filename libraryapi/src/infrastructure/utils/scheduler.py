@@ -0,0 +1,115 @@
+"""A module containing the scheduler of periodic background jobs."""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from src.core.repositories.ijob import IJobRepository
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class Scheduler:
+    """A class running periodic jobs in one worker at a time.
+
+    Every tick, the workers race for the scheduler lock and the winner runs
+    the jobs whose last run started at least their interval ago. The runs
+    are recorded in the database, so a job runs once per interval whichever
+    worker wins. The winner keeps the lock until it stops. Every job commits
+    with its recorded run in a transaction of its own, so a failing job is
+    rolled back alone, and no transaction stays open across jobs, which
+    would hold back the numbering of outbox events.
+    """
+
+    def __init__(self, repository: IJobRepository, tick_seconds: float = 1.0) -> None:
+        """The initializer of the scheduler.
+
+        Args:
+            repository (IJobRepository): The reference to the scheduled job repository.
+            tick_seconds (float, optional): The delay between checks for due jobs.
+        """
+        self._repository = repository
+        self._tick_seconds = tick_seconds
+        self._jobs: dict[str, tuple[float, Job]] = {}
+        self._task: asyncio.Task | None = None
+
+    def add_job(self, name: str, interval: float, job: Job) -> None:
+        """Register a periodic job.
+
+        Jobs must be registered before the scheduler is started.
+
+        Args:
+            name (str): The unique name of the job, under which its runs are recorded.
+            interval (float): The seconds between the starts of two runs.
+            job (Job): The coroutine function to run.
+        """
+        self._jobs[name] = (interval, job)
+
+    async def start(self) -> None:
+        """Start running the jobs in a background task."""
+        if self._jobs and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop running the jobs, cancelling a running one, and release the lock."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self._repository.release_leader_lock()
+
+    async def get_runs(self) -> list[dict[str, Any]]:
+        """Get the last run of every job recorded by any worker.
+
+        Returns:
+            list[dict[str, Any]]: The runs with a `name`, `interval_seconds`,
+                `last_started_at`, `last_finished_at` and `last_error`; the
+                interval is None for jobs not registered in this worker.
+        """
+        return [
+            {**dict(row), "interval_seconds": self._jobs[row["name"]][0] if row["name"] in self._jobs else None}
+            for row in await self._repository.get_runs()
+        ]
+
+    async def run_pending(self) -> list[str]:
+        """Run the due jobs if no other worker is running jobs.
+
+        Returns:
+            list[str]: The names of the jobs which ran.
+        """
+        if not await self._repository.hold_leader_lock():
+            return []
+
+        last_starts = {row["name"]: row["last_started_at"] for row in await self._repository.get_runs()}
+        ran = []
+        for name, (interval, job) in self._jobs.items():
+            started_at = datetime.now(timezone.utc)
+            last_start = last_starts.get(name)
+            if last_start is not None and (started_at - last_start).total_seconds() < interval:
+                continue
+
+            try:
+                async with self._repository.transaction():
+                    await job()
+                    await self._repository.save_run(name, started_at)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception("Scheduled job %s failed", name)
+                await self._repository.save_run(name, started_at, f"{type(e).__name__}: {e}")
+
+            ran.append(name)
+
+        return ran
+
+    async def _run(self) -> None:
+        """Run the due jobs every tick until cancelled."""
+        while True:
+            try:
+                await self.run_pending()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Running scheduled jobs failed")
+            await asyncio.sleep(self._tick_seconds)
@@ -0,0 +1,437 @@
+"""A module containing the probabilistic sketches of approximate statistics."""
+import hashlib
+import heapq
+import math
+import struct
+import zlib
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Any, Hashable, Iterable, Mapping
+
+import numpy as np
+
+# The window of a top-K sketch covering every lending.
+ALL_TIME = "all"
+
+# The sketch kinds, also stored in the `kind` column of the sketch table.
+BORROWERS = "borrowers"
+TOP_BOOKS = "top_books"
+
+
+def hash64(item: Hashable) -> int:
+    """Hash an item to 64 bits, identically in every process.
+
+    Args:
+        item (Hashable): The item, hashed through its string form.
+
+    Returns:
+        int: The hash.
+    """
+    return int.from_bytes(hashlib.blake2b(str(item).encode(), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """A class estimating the number of distinct items added to it.
+
+    The relative standard error is about `1.04 / sqrt(2 ** precision)`, e.g.
+    2.3% with the default precision of 11. Small sketches keep only their
+    non-zero registers, so one added item costs a few bytes instead of
+    `2 ** precision`.
+    """
+
+    def __init__(self, precision: int = 11) -> None:
+        """The initializer of the sketch.
+
+        Args:
+            precision (int, optional): The number of hash bits choosing a register, 4 to 16.
+        """
+        self.precision = precision
+        self._size = 1 << precision
+        self._sparse: dict[int, int] | None = {}
+        self._registers: np.ndarray | None = None
+
+    def add(self, item: Hashable) -> None:
+        """Count an item.
+
+        Args:
+            item (Hashable): The item.
+        """
+        hashed = hash64(item)
+        register = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - remainder.bit_length() + 1
+
+        if self._sparse is None:
+            if rank > self._registers[register]:
+                self._registers[register] = rank
+            return
+
+        if rank > self._sparse.get(register, 0):
+            self._sparse[register] = rank
+            # Three bytes per entry in `to_bytes` against one per register.
+            if len(self._sparse) * 3 > self._size:
+                self._densify()
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Count the items of another sketch of the same precision as well.
+
+        Args:
+            other (HyperLogLog): The other sketch.
+        """
+        if other._sparse is not None and self._sparse is not None:
+            for register, rank in other._sparse.items():
+                if rank > self._sparse.get(register, 0):
+                    self._sparse[register] = rank
+            if len(self._sparse) * 3 > self._size:
+                self._densify()
+            return
+
+        self._densify()
+        np.maximum(self._registers, other.registers(), out=self._registers)
+
+    def registers(self) -> np.ndarray:
+        """Get the value of every register.
+
+        Returns:
+            np.ndarray: The registers.
+        """
+        if self._registers is not None:
+            return self._registers
+
+        registers = np.zeros(self._size, dtype=np.uint8)
+        if self._sparse:
+            registers[np.fromiter(self._sparse.keys(), dtype=np.int64)] = list(self._sparse.values())
+        return registers
+
+    def count(self) -> float:
+        """Estimate the number of distinct items.
+
+        Returns:
+            float: The estimate.
+        """
+        registers = self.registers()
+        alpha = 0.7213 / (1 + 1.079 / self._size)
+        estimate = alpha * self._size ** 2 / float(np.sum(np.exp2(-registers.astype(np.float64))))
+
+        zeros = self._size - int(np.count_nonzero(registers))
+        if estimate <= 2.5 * self._size and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            return self._size * math.log(self._size / zeros)
+        return estimate
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch.
+
+        Returns:
+            bytes: The serialized sketch.
+        """
+        if self._sparse is not None:
+            registers = np.fromiter(self._sparse.keys(), dtype=np.uint16, count=len(self._sparse))
+            ranks = np.fromiter(self._sparse.values(), dtype=np.uint8, count=len(self._sparse))
+            return struct.pack("<BB", self.precision, 1) + registers.tobytes() + ranks.tobytes()
+
+        return struct.pack("<BB", self.precision, 0) + zlib.compress(self._registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        """Deserialize a sketch.
+
+        Args:
+            data (bytes): The output of `to_bytes`.
+
+        Returns:
+            HyperLogLog: The sketch.
+        """
+        precision, sparse = struct.unpack_from("<BB", data)
+        sketch = cls(precision)
+        body = data[2:]
+        if sparse:
+            count = len(body) // 3
+            registers = np.frombuffer(body, dtype=np.uint16, count=count)
+            ranks = np.frombuffer(body, dtype=np.uint8, offset=2 * count)
+            sketch._sparse = dict(zip(registers.tolist(), ranks.tolist()))
+        else:
+            sketch._sparse = None
+            sketch._registers = np.frombuffer(zlib.decompress(body), dtype=np.uint8).copy()
+        return sketch
+
+    def _densify(self) -> None:
+        """Switch to one byte per register."""
+        if self._sparse is not None:
+            self._registers = self.registers()
+            self._sparse = None
+
+
+class CountMinSketch:
+    """A class estimating how many times items were added to it.
+
+    Estimates never undercount; they overcount by at most `e / width` of all
+    additions with probability `1 - exp(-depth)`.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        """The initializer of the sketch.
+
+        Args:
+            width (int, optional): The number of counters per row.
+            depth (int, optional): The number of rows.
+        """
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._counters = np.zeros((depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+
+    def add(self, item: Hashable, count: int = 1) -> int:
+        """Count an item.
+
+        Args:
+            item (Hashable): The item.
+            count (int, optional): The number of occurrences.
+
+        Returns:
+            int: The new estimate of the item.
+        """
+        columns = self._columns(item)
+        self._counters[self._rows, columns] += count
+        self.total += count
+        return int(self._counters[self._rows, columns].min())
+
+    def estimate(self, item: Hashable) -> int:
+        """Estimate the number of occurrences of an item.
+
+        Args:
+            item (Hashable): The item.
+
+        Returns:
+            int: The estimate.
+        """
+        return int(self._counters[self._rows, self._columns(item)].min())
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch.
+
+        Returns:
+            bytes: The serialized sketch, compressed since most counters are small.
+        """
+        return struct.pack("<IIQ", self.width, self.depth, self.total) + zlib.compress(self._counters.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CountMinSketch":
+        """Deserialize a sketch.
+
+        Args:
+            data (bytes): The output of `to_bytes`.
+
+        Returns:
+            CountMinSketch: The sketch.
+        """
+        width, depth, total = struct.unpack_from("<IIQ", data)
+        sketch = cls(width, depth)
+        sketch.total = total
+        counters = np.frombuffer(zlib.decompress(data[struct.calcsize("<IIQ"):]), dtype=np.uint32)
+        sketch._counters = counters.reshape(depth, width).copy()
+        return sketch
+
+    def _columns(self, item: Hashable) -> np.ndarray:
+        """Choose the counter of an item in every row by double hashing.
+
+        Args:
+            item (Hashable): The item.
+
+        Returns:
+            np.ndarray: The column of the item in every row.
+        """
+        hashed = hash64(item)
+        first, second = hashed & 0xFFFFFFFF, (hashed >> 32) | 1
+        return (first + self._rows * second) % self.width
+
+
+class TopK:
+    """A class tracking the most frequent items with a Count-Min sketch.
+
+    A min-heap keeps the `k` items with the highest estimates seen so far;
+    an item enters it when its estimate exceeds the smallest one.
+    """
+
+    def __init__(self, k: int, width: int = 2048, depth: int = 4) -> None:
+        """The initializer of the sketch.
+
+        Args:
+            k (int): The number of tracked items.
+            width (int, optional): The number of counters per row of the Count-Min sketch.
+            depth (int, optional): The number of rows of the Count-Min sketch.
+        """
+        self.k = k
+        self.counts = CountMinSketch(width, depth)
+        self._top: dict[int, int] = {}
+        # Entries are `(estimate, item)`; outdated ones are skipped when popped.
+        self._heap: list[tuple[int, int]] = []
+
+    def add(self, item: int, count: int = 1) -> None:
+        """Count an item.
+
+        Args:
+            item (int): The item.
+            count (int, optional): The number of occurrences.
+        """
+        estimate = self.counts.add(item, count)
+        if item not in self._top and len(self._top) >= self.k:
+            self._drop_outdated()
+            if estimate <= self._heap[0][0]:
+                return
+            _, evicted = heapq.heappop(self._heap)
+            del self._top[evicted]
+
+        self._top[item] = estimate
+        heapq.heappush(self._heap, (estimate, item))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(estimate, item) for item, estimate in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, count: int) -> list[tuple[int, int]]:
+        """Get the most frequent items.
+
+        Args:
+            count (int): The maximum number of items, at most `k`.
+
+        Returns:
+            list[tuple[int, int]]: The items and their estimates, most frequent first.
+        """
+        return sorted(self._top.items(), key=lambda entry: (-entry[1], entry[0]))[:count]
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch.
+
+        Returns:
+            bytes: The serialized sketch.
+        """
+        items = np.fromiter(self._top.keys(), dtype=np.int64, count=len(self._top))
+        return struct.pack("<II", self.k, len(items)) + items.tobytes() + self.counts.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TopK":
+        """Deserialize a sketch.
+
+        Args:
+            data (bytes): The output of `to_bytes`.
+
+        Returns:
+            TopK: The sketch.
+        """
+        k, count = struct.unpack_from("<II", data)
+        offset = struct.calcsize("<II")
+        items = np.frombuffer(data, dtype=np.int64, count=count, offset=offset).tolist()
+        counts = CountMinSketch.from_bytes(data[offset + 8 * count:])
+
+        sketch = cls(k, counts.width, counts.depth)
+        sketch.counts = counts
+        sketch._top = {item: counts.estimate(item) for item in items}
+        sketch._heap = [(estimate, item) for item, estimate in sketch._top.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+    def _drop_outdated(self) -> None:
+        """Pop heap entries whose estimate was superseded or whose item was evicted."""
+        while self._heap and self._top.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+
+def month_of(day: date | str) -> str:
+    """Name the month of a day like the sketch periods, e.g. `2024-05`.
+
+    Args:
+        day (date | str): The day, or its ISO format as in outbox payloads.
+
+    Returns:
+        str: The month.
+    """
+    return str(day)[:7]
+
+
+class SketchStore:
+    """A class holding the sketches of a worker and the ones changed since saving.
+
+    Borrowers are counted per book and month in HyperLogLog sketches and
+    books per month and over all time in top-K sketches. Sketches are keyed
+    by `(kind, book_id, period)`, with book 0 for the top-K ones. Lendings
+    cannot be removed from the sketches, so deleted lendings stay counted.
+    """
+
+    def __init__(self, precision: int, width: int, depth: int, k: int) -> None:
+        """The initializer of the store.
+
+        Args:
+            precision (int): The precision of the HyperLogLog sketches.
+            width (int): The width of the Count-Min sketches.
+            depth (int): The depth of the Count-Min sketches.
+            k (int): The number of books tracked by the top-K sketches.
+        """
+        self.precision = precision
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.seq = 0
+        self.loaded = False
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every lending."""
+        self._borrowers: dict[tuple[int, str], HyperLogLog] = defaultdict(lambda: HyperLogLog(self.precision))
+        self._top: dict[str, TopK] = defaultdict(lambda: TopK(self.k, self.width, self.depth))
+        self._dirty: set[tuple[str, int, str]] = set()
+
+    def add_borrows(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Count lendings.
+
+        The borrows of a book are added to the top-K sketches at once, which
+        is much faster when building from all lendings.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The lendings with a `book_id`,
+                `user_id` and `borrowed_date`. Lendings without a book are skipped.
+        """
+        windows: dict[str, Counter] = defaultdict(Counter)
+        for row in rows:
+            book_id = row["book_id"]
+            if book_id is None:
+                continue
+
+            month = month_of(row["borrowed_date"])
+            self._borrowers[book_id, month].add(row["user_id"])
+            self._dirty.add((BORROWERS, book_id, month))
+            windows[month][book_id] += 1
+            windows[ALL_TIME][book_id] += 1
+
+        for window, borrows in windows.items():
+            top = self._top[window]
+            for book_id, count in borrows.items():
+                top.add(book_id, count)
+            self._dirty.add((TOP_BOOKS, 0, window))
+
+    def load(self, rows: Iterable[Any]) -> None:
+        """Replace the sketches with saved ones.
+
+        Args:
+            rows (Iterable[Any]): The rows with a `kind`, `book_id`, `period` and `data`.
+        """
+        self.clear()
+        for row in rows:
+            if row["kind"] == BORROWERS:
+                self._borrowers[row["book_id"], row["period"]] = HyperLogLog.from_bytes(row["data"])
+            elif row["kind"] == TOP_BOOKS:
+                self._top[row["period"]] = TopK.from_bytes(row["data"])
+
+    def take_dirty(self) -> list[dict[str, Any]]:
+        """Serialize the sketches changed since the last call.
+
+        Returns:
+            list[dict[str, Any]]: The rows with a `kind`, `book_id`, `period` and `data`.
+        """
+        rows = []
+        for kind, book_id, period in sorted(self._dirty):
+            sketch = self._borrowers[book_id, period] if kind == BORROWERS else self._top[period]
+            rows.append({"kind": kind, "book_id": book_id, "period": period, "data": sketch.to_bytes()})
+
+        self._dirty.clear()
+        return rows
@@ -0,0 +1,54 @@
+"""A module containing helpers sharing one database snapshot between connections."""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from src.config import config
+from src.db import database
+from src.infrastructure.utils.replicas import stick_to_primary
+
+
+@asynccontextmanager
+async def exported_snapshot() -> AsyncIterator[str | None]:
+    """Open a read-only REPEATABLE READ transaction and export its snapshot.
+
+    The snapshot can be imported by other connections with
+    `imported_snapshot` until the context exits. With `DB_FORCE_ROLLBACK`,
+    every query runs on one connection inside one transaction, so there is
+    no snapshot to share.
+
+    Yields:
+        str | None: The ID of the snapshot, None without one.
+    """
+    if config.DB_FORCE_ROLLBACK:
+        yield None
+        return
+
+    stick_to_primary()
+    async with database.transaction(isolation="repeatable_read", readonly=True):
+        yield await database.fetch_val("SELECT pg_export_snapshot()")
+
+
+@asynccontextmanager
+async def imported_snapshot(snapshot_id: str | None) -> AsyncIterator[None]:
+    """Read the data of an exported snapshot on the connection of the current task.
+
+    Reads go to the primary, since snapshots cannot be imported on replicas.
+    Each task gets its own pooled connection, so tasks importing the same
+    snapshot run their queries concurrently and see the same data.
+
+    Args:
+        snapshot_id (str | None): The ID from `exported_snapshot`; None reads
+            the latest data.
+
+    Yields:
+        None: Nothing.
+    """
+    stick_to_primary()
+    if snapshot_id is None:
+        yield
+        return
+
+    async with database.transaction(isolation="repeatable_read", readonly=True):
+        # The ID comes from `pg_export_snapshot`; SET does not take parameters.
+        await database.execute(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'")
+        yield
@@ -0,0 +1,116 @@
+"""A module containing the unit of work binding a request to one connection and one transaction.
+
+`databases` keeps one connection per asyncio task and releases it after
+every query unless something holds it. The unit of work holds it in a
+transaction for the whole request, so every repository call of the request
+runs on that connection, the transactions of the repositories become
+savepoints, and the writes are committed together or rolled back together.
+"""
+import contextvars
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+import databases
+
+from src.infrastructure.utils.replicas import stick_to_primary
+
+AfterTransaction = Callable[[], Awaitable[None]]
+AfterCommit = Callable[[], None]
+
+_after_transaction: contextvars.ContextVar[list[AfterTransaction] | None] = contextvars.ContextVar(
+    "after_transaction",
+    default=None,
+)
+
+_after_commit: contextvars.ContextVar[list[AfterCommit] | None] = contextvars.ContextVar(
+    "after_commit",
+    default=None,
+)
+
+
+async def after_transaction(callback: AfterTransaction) -> None:
+    """Run a callback once the transaction of the current unit of work ended.
+
+    Used by cache invalidations, which other workers must not receive before
+    the changes are visible. The callback runs after a rollback too, since
+    values cached meanwhile may hold the uncommitted changes. A callback
+    queued again runs once. Outside of a unit of work, the callback runs at once.
+
+    Args:
+        callback (AfterTransaction): The callback.
+    """
+    pending = _after_transaction.get()
+    if pending is None:
+        await callback()
+    elif callback not in pending:
+        pending.append(callback)
+
+
+def after_commit(callback: AfterCommit) -> None:
+    """Run a callback once the transaction of the current unit of work committed.
+
+    Used by changes of in-memory state shared by the requests of a worker,
+    e.g. the indexes of the catalog, which must not keep the changes of a
+    transaction rolled back. Outside of a unit of work, the callback runs at once.
+
+    Args:
+        callback (AfterCommit): The callback.
+    """
+    committed = _after_commit.get()
+    if committed is None:
+        callback()
+    else:
+        committed.append(callback)
+
+
+def in_unit_of_work() -> bool:
+    """Check whether the current code runs in a unit of work.
+
+    Returns:
+        bool: True inside a unit of work, whose queries must run in its task.
+    """
+    return _after_transaction.get() is not None
+
+
+class UnitOfWork:
+    """A class running the database work of a request in one transaction."""
+
+    def __init__(self, database: databases.Database) -> None:
+        """The initializer of the unit of work.
+
+        Args:
+            database (databases.Database): The primary database.
+        """
+        self._database = database
+
+    @asynccontextmanager
+    async def begin(self) -> AsyncIterator[None]:
+        """Hold a connection of the primary in a transaction until the block ends.
+
+        The transaction commits when the block ends normally and rolls back
+        when it raises, e.g. an `HTTPException` refusing the request. Reads
+        go to the primary, so they see the uncommitted writes. A unit of
+        work begun within another one joins it.
+
+        Yields:
+            None: Control while the work runs.
+        """
+        if _after_transaction.get() is not None:
+            yield
+            return
+
+        pending: list[AfterTransaction] = []
+        committed: list[AfterCommit] = []
+        token = _after_transaction.set(pending)
+        commit_token = _after_commit.set(committed)
+        stick_to_primary()
+        try:
+            async with self._database.transaction():
+                yield
+            for callback in committed:
+                callback()
+        finally:
+            _after_commit.reset(commit_token)
+            _after_transaction.reset(token)
+            for callback in pending:
+                await callback()
@@ -1,10 +1,33 @@
+"""A module seeding the database with sample data for development.
+
+Usage (from the `libraryapi` directory, with `DB_FORCE_ROLLBACK=false` so
+the rows are committed):
+    python -m src.init_data
+"""
+import argparse
+import asyncio
 from datetime import date
 from uuid import uuid4
-from src.db import database
+from src.config import config
+from src.db import database, init_db
 from src.infrastructure.utils.password import hash_password
 
+# Arbitrary application-wide key of the advisory lock letting one worker seed the database.
+SEED_LOCK_KEY = 27_000_006
+
 
 async def init_data():
+    """Inserts the sample data in one worker at a time.
+
+    Workers starting together wait for the one seeding the database and
+    then find its users committed, so the data is inserted only once.
+    """
+    async with database.transaction():
+        await database.execute("SELECT pg_advisory_xact_lock(:key)", {"key": SEED_LOCK_KEY})
+        await _insert_sample_data()
+
+
+async def _insert_sample_data():
     """
     Inserts sample data into the database for users, publishers, books, and lendings.
 
@@ -23,7 +46,12 @@ async def init_data():
     - Sample lending data is generated with borrow and return details for each book borrowed by the users.
 
     The function prints progress messages to the console, indicating the addition of users, publishers, books, and lending data.
+    The database is left unchanged when it already has users.
     """
+    if await database.fetch_val("SELECT EXISTS (SELECT 1 FROM users)"):
+        print("Sample data: skipped, the database already has users.")
+        return
+
     print("= = = = = = = = = = = = = = = = = = = =")
     users = [
         {
@@ -444,3 +472,27 @@ async def init_data():
 
     print("Sample data: Lendings added.")
     print("= = = = = = = = = = = = = = = = = = = =")
+
+
+async def seed() -> None:
+    """Bring the schema up to date and insert the sample data."""
+    await init_db()
+    await database.connect()
+    try:
+        await init_data()
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    """Run the command."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    if config.DB_FORCE_ROLLBACK:
+        parser.error("the sample data would be rolled back, set DB_FORCE_ROLLBACK=false")
+
+    asyncio.run(seed())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,34 @@
 """Main module of the app"""
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 
-from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.exception_handlers import http_exception_handler
 
 
 from src.api.routers.user import router as user_router
+from src.api.utils.admission import AdmissionMiddleware
+from src.api.utils.compression import CompressionMiddleware
+from src.api.utils.loaders import request_loaders
+from src.api.utils.replicas import request_reads
 from src.api.routers.book import router as book_router
 from src.api.routers.lend import router as lend_router
 from src.api.routers.publisher import router as publisher_router
 from src.api.routers.statistic import router as statistics_router
+from src.api.routers.change import router as change_router
+from src.api.routers.monitoring import router as monitoring_router
+from src.api.routers.export import router as export_router
 
+from src.config import config
 from src.container import Container
-from src.db import database
+from src.db import database, read_database
 from src.db import init_db
 
 from src.init_data import init_data
+from src.infrastructure.utils.consts import AVAILABILITY_CHANNEL
+from src.infrastructure.utils.outbox import publish_events
 
 container = Container()
 container.wire(modules=[
@@ -26,24 +37,96 @@ container.wire(modules=[
     "src.api.routers.lend",
     "src.api.routers.publisher",
     "src.api.routers.statistic",
+    "src.api.routers.change",
+    "src.api.routers.monitoring",
+    "src.api.routers.export",
+    "src.api.utils.transactions",
 ])
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator:
     """Lifespan function working on app startup."""
     await init_db()
-    await database.connect()
-    await init_data()
+    await asyncio.gather(database.connect(), read_database.connect())
+    if config.SEED_SAMPLE_DATA:
+        await init_data()
+    await asyncio.gather(
+        container.book_service().sync_indexes(),
+        container.statistics_service().sync_snapshots(),
+    )
+
+    listener = container.notify_listener()
+    listener.subscribe(AVAILABILITY_CHANNEL, container.availability_broadcaster().publish)
+    lookup_cache = container.lookup_cache()
+    container.invalidation_bus().listen(listener, lookup_cache.apply_remote, lookup_cache.flush)
+    await listener.start()
+    scheduler = container.scheduler()
+    scheduler.add_job("outbox", config.OUTBOX_PUBLISH_SECONDS, publish_events)
+    scheduler.add_job(
+        "recommendations",
+        config.RECOMMENDATION_REFRESH_SECONDS,
+        lambda: container.recommendation_service().refresh(),
+    )
+    scheduler.add_job(
+        "statistics_sketches",
+        config.SKETCH_REFRESH_SECONDS,
+        lambda: container.sketch_service().refresh(),
+    )
+    scheduler.add_job(
+        "year_summaries",
+        config.YEAR_SUMMARY_REFRESH_SECONDS,
+        lambda: container.statistics_service().refresh_year_summaries(),
+    )
+    scheduler.add_job(
+        "publisher_rollups",
+        config.PUBLISHER_ROLLUP_CHECK_SECONDS,
+        lambda: container.statistics_service().reconcile_publisher_rollups(),
+    )
+    scheduler.add_job(
+        "idempotency_keys",
+        config.IDEMPOTENCY_PRUNE_SECONDS,
+        lambda: container.idempotency_store().prune(),
+    )
+    scheduler.add_job(
+        "rate_limit_buckets",
+        config.RATE_LIMIT_PRUNE_SECONDS,
+        lambda: asyncio.gather(container.token_rate_limiter().prune(), container.lend_rate_limiter().prune()),
+    )
+    await scheduler.start()
+
     yield
+
+    await scheduler.stop()
+    container.analytics_pool().shutdown(cancel_futures=True)
+    await listener.stop()
+    await read_database.disconnect()
     await database.disconnect()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(request_loaders), Depends(request_reads)])
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+    levels={
+        "gzip": config.COMPRESSION_GZIP_LEVEL,
+        "br": config.COMPRESSION_BROTLI_QUALITY,
+        "zstd": config.COMPRESSION_ZSTD_LEVEL,
+    },
+)
+# Added last, so it is the outermost middleware and refuses requests before any work.
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=container.admission_controller(),
+    retry_after=config.ADMISSION_RETRY_AFTER_SECONDS,
+)
 
 app.include_router(user_router, prefix="/user")
 app.include_router(book_router, prefix="/book")
 app.include_router(lend_router, prefix="/lend")
 app.include_router(publisher_router, prefix="/publisher")
 app.include_router(statistics_router, prefix="/statistics")
+app.include_router(change_router, prefix="/changes")
+app.include_router(monitoring_router, prefix="/monitoring")
+app.include_router(export_router, prefix="/exports")
 
 @app.exception_handler(HTTPException)
 async def http_exception_handle_logging(
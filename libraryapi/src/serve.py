@@ -0,0 +1,233 @@
+"""The production server of the app.
+
+Runs uvicorn with uvloop and httptools when they are installed, in as many
+worker processes as the usable CPUs and the database connection budget
+allow. The app is imported once before the workers are forked, so they
+start quickly and share the memory of its modules. On SIGTERM or SIGINT the
+workers stop accepting connections and finish their requests before exiting.
+
+Usage (from the `libraryapi` directory):
+    python -m src.serve
+    python -m src.serve --workers 4 --port 8080
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from src.config import config
+
+# Logged like the messages of uvicorn itself, which configures its loggers.
+logger = logging.getLogger("uvicorn.error")
+
+# Connections a worker opens besides its pool: the notification listener,
+# the scheduler lock and the engine checking the schema at startup.
+EXTRA_CONNECTIONS_PER_WORKER = 3
+
+# Seconds before replacing a worker which exited on its own, so a worker
+# failing at startup does not restart in a busy loop.
+RESTART_DELAY_SECONDS = 1.0
+
+# Seconds added to the graceful timeout for the shutdown of the lifespan
+# before the remaining workers are killed.
+SHUTDOWN_MARGIN_SECONDS = 5.0
+
+
+def usable_cpus() -> int:
+    """Count the CPUs this process may run on, e.g. as limited by a container's cpuset.
+
+    Returns:
+        int: The number of CPUs.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not on Linux
+        return os.cpu_count() or 1
+
+
+def worker_count(cpus: int, pool_size: int, max_connections: int) -> int:
+    """Choose the number of workers.
+
+    Args:
+        cpus (int): The usable CPUs.
+        pool_size (int): The maximum size of the connection pool of a worker.
+        max_connections (int): The connections the database accepts from all workers.
+
+    Returns:
+        int: One worker per CPU, fewer if their connections would not fit, at least one.
+    """
+    return max(1, min(cpus, max_connections // (pool_size + EXTRA_CONNECTIONS_PER_WORKER)))
+
+
+def event_loop() -> str:
+    """Choose the event loop implementation.
+
+    Returns:
+        str: `uvloop` if it is installed, else `asyncio`.
+    """
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    """Choose the HTTP parser.
+
+    Returns:
+        str: `httptools` if it is installed, else `h11`.
+    """
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class Supervisor:
+    """A class running forked uvicorn workers on one shared listening socket.
+
+    Workers exiting on their own are replaced. On SIGTERM or SIGINT, every
+    worker receives SIGTERM, which makes uvicorn drain it, and the workers
+    still running after the graceful timeout are killed.
+    """
+
+    def __init__(self, server_config: uvicorn.Config, workers: int) -> None:
+        """The initializer of the supervisor.
+
+        Args:
+            server_config (uvicorn.Config): The configuration of every worker, with a loaded app.
+            workers (int): The number of workers.
+        """
+        self._config = server_config
+        self._workers = workers
+        self._children: set[int] = set()
+        self._stopping = False
+        self._socket: socket.socket | None = None
+
+    def run(self) -> None:
+        """Start the workers and supervise them until they all stopped."""
+        self._socket = self._config.bind_socket()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGALRM, self._kill)
+
+        for _ in range(self._workers):
+            self._spawn()
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            self._children.discard(pid)
+            if not self._stopping:
+                logger.warning("Worker %d exited with status %d, restarting it", pid, os.waitstatus_to_exitcode(status))
+                time.sleep(RESTART_DELAY_SECONDS)
+                if not self._stopping:
+                    self._spawn()
+
+        self._socket.close()
+        logger.info("All workers stopped")
+
+    def _spawn(self) -> None:
+        """Fork a worker serving the shared socket."""
+        pid = os.fork()
+        if pid:
+            self._children.add(pid)
+            return
+
+        # The worker leaves the process group of the terminal, so that only
+        # the supervisor receives Ctrl+C and a worker gets a single signal.
+        os.setpgid(0, 0)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+            signal.signal(signum, signal.SIG_DFL)
+
+        code = 0
+        try:
+            uvicorn.Server(self._config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum: int, _frame: object) -> None:
+        """Drain every worker.
+
+        Args:
+            signum (int): The received signal.
+            _frame (object): The interrupted frame.
+        """
+        if self._stopping:
+            return
+
+        self._stopping = True
+        logger.info("Received %s, draining %d workers", signal.Signals(signum).name, len(self._children))
+        self._signal_children(signal.SIGTERM)
+        signal.alarm(int(self._config.timeout_graceful_shutdown + SHUTDOWN_MARGIN_SECONDS))
+
+    def _kill(self, _signum: int, _frame: object) -> None:
+        """Kill the workers still running after the graceful timeout.
+
+        Args:
+            _signum (int): The received signal.
+            _frame (object): The interrupted frame.
+        """
+        logger.warning("Killing %d workers still running", len(self._children))
+        self._signal_children(signal.SIGKILL)
+
+    def _signal_children(self, signum: int) -> None:
+        """Send a signal to every worker.
+
+        Args:
+            signum (int): The signal.
+        """
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self._children.discard(pid)
+
+
+def main() -> None:
+    """Run the server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=config.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVE_WORKERS)
+    args = parser.parse_args()
+
+    workers = args.workers or worker_count(usable_cpus(), config.DB_POOL_MAX_SIZE, config.DB_MAX_CONNECTIONS)
+    server_config = uvicorn.Config(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        loop=event_loop(),
+        http=http_protocol(),
+        access_log=config.SERVE_ACCESS_LOG,
+        timeout_graceful_shutdown=int(config.SERVE_GRACEFUL_TIMEOUT_SECONDS),
+    )
+    if config.DB_FORCE_ROLLBACK and workers > 1:
+        # Every worker would hold its own uncommitted transaction, blocking
+        # the writes of the others and serving only its own changes.
+        logger.warning("DB_FORCE_ROLLBACK keeps writes uncommitted, serving with 1 worker instead of %d", workers)
+        workers = 1
+    # Imports the app before forking, so the workers inherit it loaded.
+    server_config.load()
+    logger.info(
+        "Serving on %s:%d with %d workers, %s loop and %s parser",
+        args.host,
+        args.port,
+        workers,
+        server_config.loop,
+        server_config.http,
+    )
+
+    if workers == 1:
+        uvicorn.Server(server_config).run()
+    else:
+        Supervisor(server_config, workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Tests comparing the in-memory statistics with the SQL aggregations they replace.
+
+The queries of the statistics repository run on SQLite, with the Postgres
+functions they use registered in Python, so both paths read the same
+fixture of books and lendings.
+"""
+import asyncio
+import uuid
+from datetime import date
+from typing import Any, AsyncIterator, Iterable
+
+import pytest
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from src.db import book_table, lend_table
+from src.infrastructure.repositories import statisticsdb
+from src.infrastructure.repositories.statisticsdb import StatisticsRepository
+from src.infrastructure.services.statistics import StatisticsService
+from src.infrastructure.utils.analytics import CategoryIndex, LendingSnapshot
+
+CATEGORIES = ("fantasy", "history", "poetry")
+
+# A book borrowed most of all which no longer exists, e.g. removed while
+# the snapshot still counted its lendings.
+REMOVED_BOOK_ID = 99
+
+
+def to_char(value: str, layout: str) -> str:
+    """Format an ISO date like the Postgres `to_char` of the repository.
+
+    Args:
+        value (str): The date as stored by SQLite.
+        layout (str): `Month` or `YYYY-MM`.
+
+    Returns:
+        str: The formatted date.
+    """
+    day = date.fromisoformat(value)
+    if layout == "Month":
+        return f"{day:%B}".ljust(9)
+    return f"{day:%Y-%m}"
+
+
+def extract(field: str, value: str) -> int:
+    """Extract the year of an ISO date like the Postgres `extract`.
+
+    Args:
+        field (str): The field, always `year` here.
+        value (str): The date as stored by SQLite.
+
+    Returns:
+        int: The year.
+    """
+    assert field == "year"
+    return date.fromisoformat(value).year
+
+
+class SQLiteDatabase:
+    """A database answering the queries of the repository from SQLite."""
+
+    def __init__(self, connection: Connection) -> None:
+        """The initializer of the database.
+
+        Args:
+            connection (Connection): The connection to the fixture.
+        """
+        self._connection = connection
+
+    async def fetch_all(self, query: Any) -> list[Any]:
+        """Fetch every row of a query."""
+        return [row._mapping for row in self._connection.execute(query)]
+
+    async def fetch_val(self, query: Any) -> Any:
+        """Fetch the first column of the first row of a query."""
+        return self._connection.execute(query).scalar()
+
+    async def iterate(self, query: Any) -> AsyncIterator[Any]:
+        """Stream the rows of a query."""
+        for row in self._connection.execute(query):
+            yield row._mapping
+
+
+class EmptyChangeRepository:
+    """An outbox without events, so the snapshots are loaded once."""
+
+    async def get_last_seq(self, entities: Iterable[str] | None = None) -> int:
+        """Get the sequence number of the last event."""
+        return 0
+
+    async def get_changes(self, after: int, limit: int, entities: Iterable[str] | None = None) -> list[Any]:
+        """Get the events after a sequence number."""
+        return []
+
+
+def fixture_rows() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Build books borrowed a distinct number of times over two years.
+
+    Returns:
+        tuple[list[dict[str, Any]], list[dict[str, Any]]]: The books and the lendings.
+    """
+    books = [
+        {
+            "id": book_id,
+            "title": f"Book {book_id}",
+            "author": "Author",
+            "publication_year": "2000",
+            "publisher_id": 1,
+            "categories": CATEGORIES[book_id % len(CATEGORIES)],
+        }
+        for book_id in range(1, 15)
+    ]
+    borrows = [(book_id, 2 * book_id) for book_id in range(1, 15)] + [(REMOVED_BOOK_ID, 40), (None, 3)]
+    lendings = []
+    for book_id, count in borrows:
+        for number in range(count):
+            seed = (book_id or 0) + number
+            lendings.append({
+                "id": len(lendings) + 1,
+                "book_id": book_id,
+                "user_id": uuid.uuid5(uuid.NAMESPACE_OID, str(seed % 7)),
+                "borrowed_date": (
+                    date(2022, 1 + number % 12, 1) if book_id == REMOVED_BOOK_ID
+                    else date(2023 + seed % 2, 1 + (3 * seed) % 12, 1 + (7 * seed + number) % 28)
+                ),
+                "returned_date": None,
+                "status": "borrowed",
+            })
+
+    return books, lendings
+
+
+@pytest.fixture
+def services(monkeypatch: pytest.MonkeyPatch) -> Iterable[tuple[StatisticsService, StatisticsService]]:
+    engine = sqlalchemy.create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def register_functions(connection: Any, _: Any) -> None:
+        connection.create_function("to_char", 2, to_char)
+        connection.create_function("extract", 2, extract)
+
+    tables = [book_table, lend_table]
+    books, lendings = fixture_rows()
+    with engine.connect() as connection:
+        book_table.metadata.create_all(connection, tables=tables)
+        connection.execute(book_table.insert(), books)
+        connection.execute(lend_table.insert(), lendings)
+        monkeypatch.setattr(statisticsdb, "read_database", SQLiteDatabase(connection))
+
+        def service(in_memory: bool) -> StatisticsService:
+            return StatisticsService(
+                repository=StatisticsRepository(),
+                lendings=LendingSnapshot(),
+                categories=CategoryIndex(),
+                change_repository=EmptyChangeRepository(),
+                pool=None,
+                pool_min_rows=len(lendings) + 1,
+                in_memory=in_memory,
+                max_points=100,
+                section_timeout=1.0,
+                rollup_batch_size=100,
+            )
+
+        yield service(False), service(True)
+
+
+@pytest.mark.parametrize("month", [None, "2023-04", "2022-01"])
+def test_top_books_match_sql(services: tuple[StatisticsService, StatisticsService], month: str | None) -> None:
+    sql, in_memory = services
+
+    expected = asyncio.run(sql.get_top_borrowed_books(month))
+    actual = asyncio.run(in_memory.get_top_borrowed_books(month))
+
+    assert actual == expected
+    assert REMOVED_BOOK_ID not in {book.id for book in actual}
+    if month is None:
+        assert len(actual) == 10
+
+
+def test_monthly_counts_match_sql(services: tuple[StatisticsService, StatisticsService]) -> None:
+    sql, in_memory = services
+
+    expected = asyncio.run(sql.get_monthly_borrowed_books())
+    actual = asyncio.run(in_memory.get_monthly_borrowed_books())
+
+    # SQL leaves the order of months with as many borrows unspecified.
+    assert [month.borrow_count for month in actual] == [month.borrow_count for month in expected]
+    assert sorted(actual, key=lambda month: month.month) == sorted(expected, key=lambda month: month.month)
+
+
+@pytest.mark.parametrize("year", [2022, 2023, 2024])
+def test_year_summary_matches_sql(services: tuple[StatisticsService, StatisticsService], year: int) -> None:
+    sql, in_memory = services
+
+    assert asyncio.run(in_memory.get_year_summary(year)) == asyncio.run(sql.get_year_summary(year))
+
+
+def test_category_monthly_averages_match_sql(services: tuple[StatisticsService, StatisticsService]) -> None:
+    sql, in_memory = services
+
+    expected = asyncio.run(sql.get_average_borrowed_per_category_monthly())
+    actual = asyncio.run(in_memory.get_average_borrowed_per_category_monthly())
+
+    # SQL orders only by month, latest first.
+    assert [stats.month for stats in actual] == [stats.month for stats in expected]
+
+    def averages(rows: list[Any]) -> dict[tuple[str, str], float]:
+        return {(stats.month, stats.category): stats.average_borrows_per_month for stats in rows}
+
+    # Postgres divides as numerics, rounded differently than floats.
+    assert averages(actual) == pytest.approx(averages(expected))
+    assert any(not average.is_integer() for average in averages(actual).values())
@@ -0,0 +1,55 @@
+"""Tests of the read-through cache shared by workers."""
+import asyncio
+
+from src.infrastructure.utils.cache import MemoryCacheBackend, ReadThroughCache
+
+
+class SharedBackend(MemoryCacheBackend):
+    """A storage read by every worker, like a Redis-compatible server."""
+    shared = True
+
+
+def test_value_loaded_before_another_workers_invalidation_is_not_stored() -> None:
+    async def scenario() -> None:
+        backend = SharedBackend(100)
+        reader, writer = ReadThroughCache(backend, 60.0), ReadThroughCache(backend, 60.0)
+        loading, committed = asyncio.Event(), asyncio.Event()
+
+        async def stale_load() -> str:
+            loading.set()
+            await committed.wait()
+            return "old title"
+
+        lookup = asyncio.create_task(reader.get_or_load("book", 1, stale_load))
+        await loading.wait()
+        await writer.invalidate("book", 1)
+        committed.set()
+
+        assert await lookup == "old title"
+        assert await backend.get("book:1") is None
+
+        async def fresh_load() -> str:
+            return "new title"
+
+        assert await reader.get_or_load("book", 1, fresh_load) == "new title"
+        assert await backend.get("book:1") == "new title"
+
+    asyncio.run(scenario())
+
+
+def test_namespace_invalidation_blocks_pending_loads_of_many() -> None:
+    async def scenario() -> None:
+        backend = SharedBackend(100)
+        reader, writer = ReadThroughCache(backend, 60.0), ReadThroughCache(backend, 60.0)
+
+        async def load_during_invalidation(keys: list[int]) -> dict[int, str]:
+            await writer.invalidate("book", "*")
+            return {key: f"book-{key}" for key in keys}
+
+        assert await reader.get_or_load_many("book", [1, 2], load_during_invalidation) == {
+            1: "book-1", 2: "book-2",
+        }
+        assert await backend.get("book:1") is None
+        assert await backend.get("book:2") is None
+
+    asyncio.run(scenario())
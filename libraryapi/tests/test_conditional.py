@@ -0,0 +1,48 @@
+"""Tests of conditional requests on compressed responses."""
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from src.api.utils.compression import CompressionMiddleware
+from src.api.utils.conditional import CATALOG_CACHE_CONTROL, conditional_response, make_etag
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=16)
+
+
+@app.get("/items", response_model=list[str])
+async def get_items(request: Request, response: Response) -> list[str] | Response:
+    """A route tagged by a fixed version."""
+    etag = make_etag(request, 1)
+    if not_modified := conditional_response(request, response, etag, CATALOG_CACHE_CONTROL):
+        return not_modified
+
+    return ["item"] * 100
+
+
+client = TestClient(app)
+
+
+def test_each_content_coding_has_its_own_etag() -> None:
+    identity = client.get("/items", headers={"Accept-Encoding": "identity"})
+    gzip = client.get("/items", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert gzip.headers["content-encoding"] == "gzip"
+    assert gzip.headers["etag"] == f'{identity.headers["etag"][:-1]}-gzip"'
+
+
+def test_tags_of_every_coding_revalidate() -> None:
+    identity = client.get("/items", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    gzip = client.get("/items", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    for tag, coding in ((identity, "identity"), (gzip, "gzip")):
+        response = client.get("/items", headers={"Accept-Encoding": coding, "If-None-Match": tag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == tag
+
+
+def test_stale_tags_do_not_revalidate() -> None:
+    response = client.get("/items", headers={"Accept-Encoding": "gzip", "If-None-Match": '"stale-gzip"'})
+
+    assert response.status_code == 200
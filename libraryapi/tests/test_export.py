@@ -0,0 +1,80 @@
+"""Tests of the writing of lendings to columnar files."""
+import asyncio
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterator, Sequence
+
+import pytest
+
+from src.infrastructure.utils.export import ARROW, EXPORT_COLUMNS, PARQUET, write_export
+
+pyarrow = pytest.importorskip("pyarrow")
+
+ROWS = [
+    (1, 10, "user-1", date(2024, 5, 1), None, "borrowed", "Dune", "Herbert", "1965",
+     "en", "sci-fi", "novel", "epic", "modern", 3, "Ace"),
+    (2, 11, "user-2", date(2024, 5, 2), date(2024, 5, 9), "returned", "Dune", "Herbert", "1965",
+     "en", "sci-fi", "novel", "epic", "modern", 3, "Ace"),
+    (3, 12, "user-1", date(2024, 6, 1), None, "borrowed", "Emma", "Austen", "1815",
+     "en", "romance", "novel", "comedy", "romanticism", 4, "Penguin"),
+]
+
+
+async def chunks_of(rows: list[tuple], size: int) -> AsyncIterator[Sequence[Sequence[Any]]]:
+    """Stream rows in chunks like the export repository.
+
+    Args:
+        rows (list[tuple]): The rows.
+        size (int): The number of rows per chunk.
+
+    Yields:
+        Sequence[Sequence[Any]]: The chunks.
+    """
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def read_back(path: Path, export_format: str) -> Any:
+    """Read an exported file.
+
+    Args:
+        path (Path): The path of the file.
+        export_format (str): `parquet` or `arrow`.
+
+    Returns:
+        pyarrow.Table: The exported rows.
+    """
+    if export_format == PARQUET:
+        return pyarrow.parquet.read_table(path)
+
+    with pyarrow.ipc.open_stream(path) as reader:
+        return reader.read_all()
+
+
+@pytest.mark.parametrize("export_format", [PARQUET, ARROW])
+def test_chunks_are_written_with_dictionary_encoded_strings(tmp_path: Path, export_format: str) -> None:
+    path = tmp_path / f"lendings.{export_format}"
+
+    rows = asyncio.run(write_export(chunks_of(ROWS, 2), str(path), export_format))
+    table = read_back(path, export_format)
+
+    assert rows == len(ROWS)
+    assert table.column_names == [name for name, _ in EXPORT_COLUMNS]
+    assert pyarrow.types.is_dictionary(table.schema.field("title").type)
+    assert table.column("title").to_pylist() == ["Dune", "Dune", "Emma"]
+    assert table.column("returned_date").to_pylist() == [None, date(2024, 5, 9), None]
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_failed_export_leaves_no_file(tmp_path: Path) -> None:
+    path = tmp_path / "lendings.parquet"
+
+    async def failing_chunks() -> AsyncIterator[Sequence[Sequence[Any]]]:
+        yield ROWS[:1]
+        raise OSError("connection lost")
+
+    with pytest.raises(OSError):
+        asyncio.run(write_export(failing_chunks(), str(path), PARQUET))
+
+    assert list(tmp_path.iterdir()) == []
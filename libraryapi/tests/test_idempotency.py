@@ -0,0 +1,139 @@
+"""Tests of the replay of requests sent again with an idempotency key."""
+import asyncio
+from datetime import date
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+
+from src.infrastructure.utils import idempotency
+from src.infrastructure.utils.idempotency import CLAIM_KEY, IdempotencyStore
+
+LEND = {"book_id": 1, "borrowed_date": "2024-05-01"}
+
+
+class FakeDatabase:
+    """A table of idempotency keys in memory, recording the statements run.
+
+    A claim is seen at once by other requests, like a claim committed
+    without a response, where Postgres would make them wait for its
+    transaction instead.
+    """
+
+    def __init__(self) -> None:
+        """The initializer of the fake."""
+        self.entries: dict[bytes, dict[str, Any]] = {}
+        self.statements: list[str] = []
+
+    async def fetch_val(self, query: Any, values: dict[str, Any]) -> Any:
+        """Claim a key unless it is already present."""
+        assert query is CLAIM_KEY
+        self.statements.append("claim")
+        if values["key"] in self.entries:
+            return None
+
+        self.entries[values["key"]] = {"fingerprint": values["fingerprint"], "response": None}
+        return values["key"]
+
+    async def execute(self, query: Any) -> None:
+        """Record the response of a key."""
+        self.statements.append("record")
+        params = query.compile().params
+        self.entries[params["key_1"]]["response"] = params["response"]
+
+    async def fetch_one(self, query: Any) -> dict[str, Any] | None:
+        """Get the fingerprint and the response of a key."""
+        return self.entries.get(query.compile().params["key_1"])
+
+
+@pytest.fixture
+def database(monkeypatch: pytest.MonkeyPatch) -> FakeDatabase:
+    fake = FakeDatabase()
+    monkeypatch.setattr(idempotency, "database", fake)
+    return fake
+
+
+class LendHandler:
+    """A handler counting the lendings it creates."""
+
+    def __init__(self, database: FakeDatabase) -> None:
+        """The initializer of the handler.
+
+        Args:
+            database (FakeDatabase): The database recording the statements.
+        """
+        self.database = database
+        self.calls = 0
+
+    async def __call__(self) -> dict[str, Any]:
+        """Create a lending."""
+        self.calls += 1
+        self.database.statements.append("lend")
+        return {"id": self.calls, "book_id": 1, "borrowed_date": date(2024, 5, 1)}
+
+
+def test_repeated_request_replays_the_recorded_response(database: FakeDatabase) -> None:
+    store = IdempotencyStore(ttl_seconds=60.0)
+    handler = LendHandler(database)
+
+    first = asyncio.run(store.run("user-1:key", str(LEND), handler))
+    second = asyncio.run(store.run("user-1:key", str(LEND), handler))
+
+    assert handler.calls == 1
+    assert first == {"id": 1, "book_id": 1, "borrowed_date": date(2024, 5, 1)}
+    assert second == {"id": 1, "book_id": 1, "borrowed_date": "2024-05-01"}
+    # The key is claimed before the lending is created, in the same transaction.
+    assert database.statements == ["claim", "lend", "record", "claim"]
+
+
+def test_key_reused_with_another_payload_is_rejected(database: FakeDatabase) -> None:
+    store = IdempotencyStore(ttl_seconds=60.0)
+    handler = LendHandler(database)
+    asyncio.run(store.run("user-1:key", str(LEND), handler))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(store.run("user-1:key", str({**LEND, "book_id": 2}), handler))
+
+    assert error.value.status_code == 422
+    assert handler.calls == 1
+
+
+def test_key_of_an_incomplete_request_is_rejected(database: FakeDatabase) -> None:
+    store = IdempotencyStore(ttl_seconds=60.0)
+    handler = LendHandler(database)
+
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def slow_handler() -> dict[str, Any]:
+            await release.wait()
+            return await handler()
+
+        in_flight = asyncio.create_task(store.run("user-1:key", str(LEND), slow_handler))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as error:
+            await store.run("user-1:key", str(LEND), handler)
+
+        assert error.value.status_code == 409
+        release.set()
+        await in_flight
+
+    asyncio.run(scenario())
+
+    assert handler.calls == 1
+
+
+def test_requests_without_a_key_bypass_the_store(database: FakeDatabase) -> None:
+    store = IdempotencyStore(ttl_seconds=60.0)
+    handler = LendHandler(database)
+
+    asyncio.run(store.run(None, str(LEND), handler))
+    asyncio.run(store.run(None, str(LEND), handler))
+
+    assert handler.calls == 2
+    assert database.statements == ["lend", "lend"]
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(store.run("k" * 256, str(LEND), handler))
+
+    assert error.value.status_code == 400
@@ -0,0 +1,40 @@
+"""Tests of the cold start of the app.
+
+The app is imported in fresh interpreters with `-X importtime`, parsed by
+the import time report of `benchmarks.importtime`, which also lists the
+slowest modules when this budget is exceeded.
+"""
+import os
+import statistics
+
+from benchmarks.importtime import import_times
+
+MODULE = "src.main"
+
+# The median import time allowed, overridable for slow CI machines.
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "3000"))
+
+RUNS = 3
+
+# Packages imported only on their first use.
+DEFERRED_MODULES = ("pyarrow",)
+
+
+def test_app_imports_within_the_budget() -> None:
+    # The first import compiles the bytecode, which is not part of a cold start.
+    import_times(MODULE)
+    totals = [
+        sum(cumulative for _, depth, _, cumulative in import_times(MODULE) if depth == 0) / 1000
+        for _ in range(RUNS)
+    ]
+
+    assert statistics.median(totals) <= BUDGET_MS, (
+        f"importing {MODULE} took {statistics.median(totals):.0f}ms, over the {BUDGET_MS:.0f}ms budget;"
+        " run `python -m benchmarks.importtime` for the slowest modules"
+    )
+
+
+def test_deferred_packages_are_not_imported_at_startup() -> None:
+    imported = {name.split(".")[0] for name, _, _, _ in import_times(MODULE)}
+
+    assert imported.isdisjoint(DEFERRED_MODULES)
@@ -0,0 +1,70 @@
+"""Tests of the batching loaders of a request."""
+import asyncio
+
+import pytest
+
+from src.infrastructure.utils.loaders import DataLoader
+
+
+class SlowBatchLoad:
+    """A batch function recording its calls and answering after a delay."""
+
+    def __init__(self) -> None:
+        """The initializer of the batch function."""
+        self.calls: list[list[int]] = []
+
+    async def __call__(self, keys: list[int]) -> dict[int, str]:
+        """Load entities named after their keys, except the negative ones, which do not exist."""
+        self.calls.append(keys)
+        await asyncio.sleep(0.01)
+        return {key: f"entity-{key}" for key in keys if key >= 0}
+
+
+def test_lookups_of_a_tick_are_batched_and_remembered() -> None:
+    async def scenario() -> None:
+        batch_load = SlowBatchLoad()
+        loader = DataLoader(batch_load)
+        first = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(-1))
+        second = await loader.load(2)
+
+        assert first == ["entity-1", "entity-2", "entity-1", None]
+        assert second == "entity-2"
+        assert batch_load.calls == [[1, 2, -1]]
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("cancelled", [0, 1])
+def test_cancelled_lookup_does_not_cancel_the_others(cancelled: int) -> None:
+    async def scenario() -> None:
+        loader = DataLoader(SlowBatchLoad())
+        lookups = [asyncio.create_task(loader.load(key)) for key in (1, 2)]
+        await asyncio.sleep(0.001)
+        lookups[cancelled].cancel()
+        other = lookups[1 - cancelled]
+
+        assert await other == f"entity-{2 - cancelled}"
+        with pytest.raises(asyncio.CancelledError):
+            await lookups[cancelled]
+
+    asyncio.run(scenario())
+
+
+def test_failed_loads_are_retried() -> None:
+    async def scenario() -> None:
+        attempts = []
+
+        async def flaky(keys: list[int]) -> dict[int, int]:
+            attempts.append(keys)
+            if len(attempts) == 1:
+                raise OSError("connection lost")
+            return {key: key for key in keys}
+
+        loader = DataLoader(flaky)
+        with pytest.raises(OSError):
+            await loader.load(1)
+
+        assert await loader.load(1) == 1
+        assert attempts == [[1], [1]]
+
+    asyncio.run(scenario())
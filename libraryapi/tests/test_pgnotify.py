@@ -0,0 +1,46 @@
+"""Tests of the dispatch of Postgres notifications to their handlers."""
+import asyncio
+
+from src.infrastructure.utils.pgnotify import PgNotifyListener
+
+
+def test_async_handlers_are_kept_until_done_and_cancelled_on_stop() -> None:
+    async def scenario() -> None:
+        listener = PgNotifyListener("postgresql://unused")
+        received, release = [], asyncio.Event()
+
+        async def handler(payload: str) -> None:
+            received.append(payload)
+            await release.wait()
+
+        listener.subscribe("cache", handler)
+        listener._dispatch(None, 0, "cache", "first")
+        listener._dispatch(None, 0, "cache", "second")
+        await asyncio.sleep(0)
+        tasks = set(listener._handler_tasks)
+
+        assert received == ["first", "second"]
+        assert len(tasks) == 2
+
+        await listener.stop()
+
+        assert all(task.cancelled() for task in tasks)
+        assert not listener._handler_tasks
+
+    asyncio.run(scenario())
+
+
+def test_finished_handlers_are_forgotten() -> None:
+    async def scenario() -> None:
+        listener = PgNotifyListener("postgresql://unused")
+
+        async def failing_handler(payload: str) -> None:
+            raise ValueError(payload)
+
+        listener.subscribe("cache", failing_handler)
+        listener._dispatch(None, 0, "cache", "broken")
+        await asyncio.sleep(0.01)
+
+        assert not listener._handler_tasks
+
+    asyncio.run(scenario())
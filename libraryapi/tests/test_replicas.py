@@ -0,0 +1,226 @@
+"""Tests of the routing of reads to database replicas.
+
+The databases are fakes answering every read with their name, so the tests
+check which database serves a read without running Postgres.
+"""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import pytest
+
+from src.infrastructure.utils.replicas import (
+    LAG_QUERY,
+    ReadRouter,
+    consistent_reads,
+    primary_reads,
+    stick_to_primary,
+)
+
+
+class FakeDatabase:
+    """A database answering reads with its name, or failing like an unreachable replica."""
+
+    def __init__(self, name: str, lag: float = 0.0) -> None:
+        """The initializer of the fake.
+
+        Args:
+            name (str): The name returned by every read.
+            lag (float, optional): The lag reported to the router.
+        """
+        self.name = name
+        self.lag = lag
+        self.failing = False
+        self.is_connected = True
+
+    async def connect(self) -> None:
+        """Connect to the database."""
+        self.is_connected = True
+
+    async def disconnect(self) -> None:
+        """Disconnect from the database."""
+        self.is_connected = False
+
+    async def fetch_val(self, query: Any, values: dict | None = None) -> Any:
+        """Answer a lag check with the lag and other reads with the name."""
+        self._raise_if_failing()
+        return self.lag if query == LAG_QUERY else self.name
+
+    async def fetch_all(self, query: Any, values: dict | None = None) -> list[Any]:
+        """Answer a read with the name."""
+        self._raise_if_failing()
+        return [self.name]
+
+    async def iterate(self, query: Any, values: dict | None = None) -> AsyncIterator[Any]:
+        """Stream the name twice."""
+        self._raise_if_failing()
+        for _ in range(2):
+            yield self.name
+
+    def _raise_if_failing(self) -> None:
+        """Fail like a replica which cannot be reached."""
+        if self.failing:
+            raise OSError(f"{self.name} is unreachable")
+
+
+async def connected_router(*replicas: FakeDatabase) -> tuple[ReadRouter, FakeDatabase]:
+    """Create a router over the replicas and run its first lag check.
+
+    Args:
+        *replicas (FakeDatabase): The replicas.
+
+    Returns:
+        tuple[ReadRouter, FakeDatabase]: The router and its primary.
+    """
+    primary = FakeDatabase("primary")
+    router = ReadRouter(primary, list(replicas), max_lag_seconds=5.0, check_interval=3600.0)
+    await router.connect()
+    return router, primary
+
+
+def run(scenario: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a test scenario in a fresh event loop, with a context of its own.
+
+    Args:
+        scenario (Callable[[], Awaitable[Any]]): The coroutine function of the scenario.
+
+    Returns:
+        Any: The result of the scenario.
+    """
+    return asyncio.run(scenario())
+
+
+def test_reads_rotate_over_replicas() -> None:
+    async def scenario() -> None:
+        router, _ = await connected_router(FakeDatabase("replica-1"), FakeDatabase("replica-2"))
+        names = [await router.fetch_val("SELECT 1") for _ in range(4)]
+        await router.disconnect()
+
+        assert names == ["replica-1", "replica-2", "replica-1", "replica-2"]
+
+    run(scenario)
+
+
+def test_lagging_replicas_are_skipped() -> None:
+    async def scenario() -> None:
+        router, _ = await connected_router(FakeDatabase("replica-1", lag=30.0), FakeDatabase("replica-2"))
+        names = {await router.fetch_val("SELECT 1") for _ in range(4)}
+        await router.disconnect()
+
+        assert names == {"replica-2"}
+        assert router.lags() == [30.0, 0.0]
+
+    run(scenario)
+
+
+def test_reads_go_to_the_primary_without_usable_replicas() -> None:
+    async def scenario() -> None:
+        unreachable = FakeDatabase("replica-1")
+        unreachable.failing = True
+        router, _ = await connected_router(unreachable, FakeDatabase("replica-2", lag=30.0))
+        name = await router.fetch_val("SELECT 1")
+        await router.disconnect()
+
+        assert name == "primary"
+        assert router.lags() == [None, 30.0]
+
+    run(scenario)
+
+
+def test_failed_read_falls_back_to_the_primary() -> None:
+    async def scenario() -> None:
+        replica = FakeDatabase("replica-1")
+        router, _ = await connected_router(replica)
+        replica.failing = True
+        first = await router.fetch_all("SELECT 1")
+        replica.failing = False
+        second = await router.fetch_all("SELECT 1")
+        await router.disconnect()
+
+        assert first == ["primary"]
+        # The replica is used again only after its next successful check.
+        assert second == ["primary"]
+        assert router.lags() == [None]
+
+    run(scenario)
+
+
+def test_failed_stream_falls_back_before_its_first_row() -> None:
+    async def scenario() -> None:
+        replica = FakeDatabase("replica-1")
+        router, _ = await connected_router(replica)
+        replica.failing = True
+        rows = [row async for row in router.iterate("SELECT 1")]
+        await router.disconnect()
+
+        assert rows == ["primary", "primary"]
+
+    run(scenario)
+
+
+def test_writes_pin_the_remaining_reads_to_the_primary() -> None:
+    async def scenario() -> None:
+        router, _ = await connected_router(FakeDatabase("replica-1"))
+
+        async def request() -> tuple[str, str]:
+            before = await router.fetch_val("SELECT 1")
+            stick_to_primary()
+            return before, await router.fetch_val("SELECT 1")
+
+        pinned = await asyncio.create_task(request())
+        other = await asyncio.create_task(router.fetch_val("SELECT 1"))
+        await router.disconnect()
+
+        assert pinned == ("replica-1", "primary")
+        # Pinning is scoped to the request which wrote.
+        assert other == "replica-1"
+
+    run(scenario)
+
+
+def test_primary_reads_pin_only_their_block() -> None:
+    async def scenario() -> None:
+        router, _ = await connected_router(FakeDatabase("replica-1"))
+        with primary_reads():
+            inside = await router.fetch_val("SELECT 1")
+        after = await router.fetch_val("SELECT 1")
+        await router.disconnect()
+
+        assert (inside, after) == ("primary", "replica-1")
+
+    run(scenario)
+
+
+def test_consistent_reads_stay_on_the_first_database() -> None:
+    async def scenario() -> None:
+        router, _ = await connected_router(FakeDatabase("replica-1"), FakeDatabase("replica-2"))
+        with consistent_reads():
+            first = await router.fetch_val("SELECT 1")
+            rest = await asyncio.gather(*(router.fetch_val("SELECT 1") for _ in range(3)))
+        await router.disconnect()
+
+        assert first == "replica-1"
+        assert rest == ["replica-1"] * 3
+
+    run(scenario)
+
+
+@pytest.mark.parametrize("failure", ["read", "check"])
+def test_consistent_reads_move_only_to_the_primary(failure: str) -> None:
+    async def scenario() -> None:
+        chosen, other = FakeDatabase("replica-1"), FakeDatabase("replica-2")
+        router, _ = await connected_router(chosen, other)
+        with consistent_reads():
+            first = await router.fetch_val("SELECT 1")
+            chosen.failing = True
+            if failure == "check":
+                await router._check()
+            moved = await router.fetch_val("SELECT 1")
+            chosen.failing = False
+            await router._check()
+            # A recovered or other replica may be behind the primary.
+            after_recovery = await router.fetch_val("SELECT 1")
+        await router.disconnect()
+
+        assert (first, moved, after_recovery) == ("replica-1", "primary", "primary")
+
+    run(scenario)
@@ -0,0 +1,100 @@
+"""Tests of the scheduler of periodic background jobs."""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from src.core.repositories.ijob import IJobRepository
+from src.infrastructure.utils.scheduler import Scheduler
+
+
+class FakeJobRepository(IJobRepository):
+    """A repository recording transactions and runs in memory."""
+
+    def __init__(self, leader: bool = True) -> None:
+        """The initializer of the fake.
+
+        Args:
+            leader (bool, optional): Whether this worker gets the scheduler lock.
+        """
+        self.leader = leader
+        self.events: list[str] = []
+        self.runs: dict[str, dict[str, Any]] = {}
+
+    async def hold_leader_lock(self) -> bool:
+        """Report whether this worker holds the scheduler lock."""
+        return self.leader
+
+    async def release_leader_lock(self) -> None:
+        """Release the scheduler lock."""
+        self.leader = False
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Record the start and the end of a transaction."""
+        self.events.append("begin")
+        try:
+            yield
+        except Exception:
+            self.events.append("rollback")
+            raise
+        self.events.append("commit")
+
+    async def get_runs(self) -> Iterable[Any]:
+        """Get the recorded runs."""
+        return list(self.runs.values())
+
+    async def save_run(self, name: str, started_at: datetime, error: Optional[str] = None) -> None:
+        """Record a run."""
+        self.events.append(f"save {name}")
+        self.runs[name] = {"name": name, "last_started_at": started_at, "last_error": error}
+
+
+def test_every_job_commits_with_its_run_in_its_own_transaction() -> None:
+    async def scenario() -> None:
+        repository = FakeJobRepository()
+        scheduler = Scheduler(repository)
+
+        async def job() -> None:
+            repository.events.append("job")
+
+        async def failing_job() -> None:
+            raise ValueError("broken")
+
+        scheduler.add_job("first", 60.0, job)
+        scheduler.add_job("failing", 60.0, failing_job)
+        scheduler.add_job("second", 60.0, job)
+
+        assert await scheduler.run_pending() == ["first", "failing", "second"]
+        assert repository.events == [
+            "begin", "job", "save first", "commit",
+            "begin", "rollback", "save failing",
+            "begin", "job", "save second", "commit",
+        ]
+        assert repository.runs["failing"]["last_error"] == "ValueError: broken"
+        assert repository.runs["first"]["last_error"] is None
+
+    asyncio.run(scenario())
+
+
+def test_only_due_jobs_run_in_the_leader() -> None:
+    async def scenario() -> None:
+        repository = FakeJobRepository(leader=False)
+        scheduler = Scheduler(repository)
+
+        async def job() -> None:
+            pass
+
+        scheduler.add_job("recent", 60.0, job)
+        scheduler.add_job("due", 60.0, job)
+
+        assert await scheduler.run_pending() == []
+
+        repository.leader = True
+        now = datetime.now(timezone.utc)
+        await repository.save_run("recent", now - timedelta(seconds=10))
+        await repository.save_run("due", now - timedelta(seconds=90))
+
+        assert await scheduler.run_pending() == ["due"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,126 @@
+"""Tests of the accuracy of the sketches of approximate statistics.
+
+The hashes of the sketches are deterministic, so the bounds checked here,
+a few standard errors wide, hold on every run.
+"""
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.infrastructure.utils.sketches import (
+    ALL_TIME,
+    BORROWERS,
+    TOP_BOOKS,
+    CountMinSketch,
+    HyperLogLog,
+    SketchStore,
+    TopK,
+)
+
+PRECISION = 11
+
+# Four relative standard errors of a HyperLogLog sketch of PRECISION.
+HLL_ERROR_BOUND = 4 * 1.04 / math.sqrt(2 ** PRECISION)
+
+
+def zipf_books(count: int, books_count: int = 10_000) -> list[int]:
+    """Draw Zipf-distributed book IDs, like the borrows of a catalog.
+
+    Args:
+        count (int): The number of borrows.
+        books_count (int, optional): The highest book ID.
+
+    Returns:
+        list[int]: The borrowed book IDs.
+    """
+    rng = np.random.default_rng(7)
+    return np.minimum(rng.zipf(1.3, count), books_count).tolist()
+
+
+@pytest.mark.parametrize("distinct", [1, 50, 1_000, 20_000, 50_000])
+def test_hyperloglog_error_is_bounded(distinct: int) -> None:
+    sketch = HyperLogLog(PRECISION)
+    for user in range(distinct):
+        # Repeated items must not be counted twice.
+        sketch.add(f"user-{user}")
+        sketch.add(f"user-{user}")
+
+    assert abs(sketch.count() - distinct) / distinct <= HLL_ERROR_BOUND
+
+
+def test_hyperloglog_merge_counts_the_union() -> None:
+    first, second = HyperLogLog(PRECISION), HyperLogLog(PRECISION)
+    for user in range(30_000):
+        first.add(f"user-{user}")
+    for user in range(20_000, 50_000):
+        second.add(f"user-{user}")
+
+    first.merge(HyperLogLog.from_bytes(second.to_bytes()))
+
+    assert abs(first.count() - 50_000) / 50_000 <= HLL_ERROR_BOUND
+
+
+def test_hyperloglog_survives_serialization() -> None:
+    for distinct in (10, 10_000):
+        sketch = HyperLogLog(PRECISION)
+        for user in range(distinct):
+            sketch.add(user)
+
+        assert HyperLogLog.from_bytes(sketch.to_bytes()).count() == sketch.count()
+
+
+def test_count_min_overcount_is_bounded() -> None:
+    width, depth = 2048, 4
+    borrows = zipf_books(200_000)
+    sketch = CountMinSketch(width, depth)
+    for book_id in borrows:
+        sketch.add(book_id)
+
+    exact = Counter(borrows)
+    bound = math.e / width * len(borrows)
+    overcounts = [sketch.estimate(book_id) - count for book_id, count in exact.items()]
+
+    assert min(overcounts) >= 0
+    # Each estimate exceeds the bound with a probability of at most exp(-depth).
+    assert sum(overcount > bound for overcount in overcounts) <= 2 * math.exp(-depth) * len(exact)
+
+
+def test_top_k_finds_the_most_borrowed_books() -> None:
+    width, depth = 2048, 4
+    borrows = zipf_books(200_000)
+    sketch = TopK(100, width, depth)
+    for book_id in borrows:
+        sketch.add(book_id)
+
+    exact = Counter(borrows)
+    top = TopK.from_bytes(sketch.to_bytes()).top(10)
+    bound = math.e / width * len(borrows)
+
+    assert [book_id for book_id, _ in top] == [book_id for book_id, _ in exact.most_common(10)]
+    assert all(0 <= count - exact[book_id] <= bound for book_id, count in top)
+
+
+def test_store_saves_only_changed_sketches() -> None:
+    store = SketchStore(PRECISION, 2048, 4, 100)
+    store.add_borrows([
+        {"book_id": 1, "user_id": "user-1", "borrowed_date": "2024-05-02"},
+        {"book_id": 1, "user_id": "user-2", "borrowed_date": "2024-05-20"},
+        {"book_id": 2, "user_id": "user-1", "borrowed_date": "2024-06-01"},
+        {"book_id": None, "user_id": "user-3", "borrowed_date": "2024-06-01"},
+    ])
+    rows = store.take_dirty()
+
+    assert {(row["kind"], row["book_id"], row["period"]) for row in rows} == {
+        (BORROWERS, 1, "2024-05"),
+        (BORROWERS, 2, "2024-06"),
+        (TOP_BOOKS, 0, "2024-05"),
+        (TOP_BOOKS, 0, "2024-06"),
+        (TOP_BOOKS, 0, ALL_TIME),
+    }
+    assert store.take_dirty() == []
+
+    all_time = next(row for row in rows if row["period"] == ALL_TIME)
+
+    assert TopK.from_bytes(all_time["data"]).top(2) == [(1, 2), (2, 1)]
@@ -0,0 +1,69 @@
+"""Tests of the unit of work of a request."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+
+from src.infrastructure.utils.unitofwork import UnitOfWork, after_commit, after_transaction
+
+
+class FakeDatabase:
+    """A database recording the outcome of its transactions."""
+
+    def __init__(self) -> None:
+        """The initializer of the fake."""
+        self.events: list[str] = []
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Record a commit or a rollback."""
+        try:
+            yield
+        except BaseException:
+            self.events.append("rollback")
+            raise
+        self.events.append("commit")
+
+
+def test_commit_runs_both_kinds_of_callbacks_after_the_transaction() -> None:
+    async def scenario() -> None:
+        database = FakeDatabase()
+
+        async def invalidate() -> None:
+            database.events.append("after transaction")
+
+        async with UnitOfWork(database).begin():
+            after_commit(lambda: database.events.append("after commit"))
+            await after_transaction(invalidate)
+            await after_transaction(invalidate)
+            assert database.events == []
+
+        assert database.events == ["commit", "after commit", "after transaction"]
+
+    asyncio.run(scenario())
+
+
+def test_rollback_skips_the_callbacks_of_commits() -> None:
+    async def scenario() -> None:
+        database = FakeDatabase()
+
+        async def invalidate() -> None:
+            database.events.append("after transaction")
+
+        with pytest.raises(ValueError):
+            async with UnitOfWork(database).begin():
+                after_commit(lambda: database.events.append("after commit"))
+                await after_transaction(invalidate)
+                raise ValueError("refused")
+
+        assert database.events == ["rollback", "after transaction"]
+
+    asyncio.run(scenario())
+
+
+def test_callbacks_outside_of_a_unit_of_work_run_at_once() -> None:
+    events = []
+    after_commit(lambda: events.append("after commit"))
+
+    assert events == ["after commit"]